@@ -1,12 +1,16 @@
 import asyncio
 import logging
 import re
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future
 from datetime import date, datetime
 from typing import Callable, Optional, Dict, Any, List, Tuple
 
 import pandas as pd
 
+from browser_pool import BrowserLease, get_browser_pool
+from dbd_record import DBDCompanyRecord
+from statement_parser import parse_amount_series
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -22,7 +26,7 @@ class NewPeakBot:
         self.browser = None
         self.page = None
         self.playwright = None
-        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lease: Optional[BrowserLease] = None
         self.is_logged_in = False
 
         self.link_company = "https://secure.peakaccount.com/home?emi=MzIwNjE5"
@@ -31,24 +35,6 @@ class NewPeakBot:
         if use_browser:
             self._start_browser()
 
-    @staticmethod
-    def _parse_amount(raw: Any) -> Optional[float]:
-        if raw is None or (isinstance(raw, float) and pd.isna(raw)):
-            return None
-        text = str(raw).strip()
-        if not text:
-            return None
-        negative = False
-        if text.startswith("(") and text.endswith(")"):
-            negative = True
-            text = text[1:-1]
-        text = text.replace(",", "").replace("+", "").replace(" ", "")
-        try:
-            value = float(text)
-            return -value if negative else value
-        except ValueError:
-            return None
-
     @staticmethod
     def _determine_url(transfer_type: str, has_dbd: bool) -> str:
         normalized = (transfer_type or "").strip()
@@ -91,26 +77,6 @@ class NewPeakBot:
                 return digits[:13]
         return None
 
-    @staticmethod
-    def _parse_dbd_details(value: Any) -> Dict[str, str]:
-        details: Dict[str, str] = {}
-        if value is None or (isinstance(value, float) and pd.isna(value)):
-            return details
-        raw_text = str(value).strip()
-        if not raw_text or raw_text.lower() == "none":
-            return details
-
-        parts = [part.strip() for part in raw_text.split("|") if part.strip()]
-        for part in parts:
-            if ":" not in part:
-                continue
-            key, val = part.split(":", 1)
-            key = key.strip()
-            val = val.strip()
-            if key and val:
-                details[key] = val
-        return details
-
     async def _iter_frame_contexts(self):
         """
         รวม page หลักและทุก iframe ที่พร้อมใช้งาน เพื่อใช้ค้นหา element
@@ -200,11 +166,16 @@ class NewPeakBot:
         tasks: List[Dict[str, Any]] = []
         skipped: List[Dict[str, Any]] = []
 
-        for index, row in df.iterrows():
+        # แปลงจำนวนเงินทั้งคอลัมน์ครั้งเดียวก่อนวนทีละแถว
+        if amount_column in df.columns:
+            amounts = parse_amount_series(df[amount_column])
+        else:
+            amounts = pd.Series(float("nan"), index=df.index)
+
+        for (index, row), amount in zip(df.iterrows(), amounts.tolist()):
             row_number = index + 1
 
-            amount = self._parse_amount(row.get(amount_column))
-            if amount is None:
+            if pd.isna(amount):
                 skipped.append(
                     {
                         "row_number": row_number,
@@ -247,12 +218,14 @@ class NewPeakBot:
                 )
                 continue
 
-            registration_number = self._extract_registration(dbd_value)
+            # ใช้คอลัมน์ของ DBDCompanyRecord (แยกข้อความ ข้อมูล DBD เฉพาะไฟล์เก่า)
+            dbd_record = DBDCompanyRecord.from_row(row, dbd_column)
+            registration_number = self._extract_registration(dbd_record.registration_number or dbd_value)
             document_date = None
             if date_column:
                 document_date = self._parse_document_date(row.get(date_column))
 
-            dbd_details = self._parse_dbd_details(dbd_value)
+            dbd_details = dbd_record.to_details()
             company_name = ""
             if company_column:
                 company_name = str(row.get(company_column) or "").strip()
@@ -315,72 +288,46 @@ class NewPeakBot:
         return {"ready": ready_df, "skipped": skipped_df}
 
     def _start_browser(self) -> None:
+        logger.info("🚀 กำลังยืม Browser จาก browser pool สำหรับ NewPeakBot")
+
+        # Chromium เปิดค้างไว้ใน browser pool - bot แต่ละตัวได้ context/page แยกของตัวเอง
+        # และส่งงาน async ผ่าน submit() ไปรันบน event loop ถาวรของ pool (loop เดียวกับที่สร้าง page)
         try:
-            from playwright.async_api import async_playwright
+            pool = get_browser_pool()
+            self._lease = pool.acquire(
+                headless=self.headless,
+                context_options={
+                    "viewport": {"width": 1920, "height": 1080},
+                    "screen": {"width": 1920, "height": 1080},
+                    "user_agent": (
+                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                        "AppleWebKit/537.36 (KHTML, like Gecko) "
+                        "Chrome/120.0.0.0 Safari/537.36"
+                    ),
+                },
+            )
         except ImportError as exc:
             raise RuntimeError(
                 "ไม่สามารถ import Playwright ได้ กรุณาติดตั้งด้วยคำสั่ง `pip install playwright` "
                 "และรัน `playwright install chromium`"
             ) from exc
-
-        logger.info("🚀 กำลังเริ่มต้น Playwright สำหรับ NewPeakBot")
-
-        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="newpeak_playwright")
-
-        def init_playwright_in_thread():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            async def async_init():
-                logger.info("🌐 เริ่มต้น async_playwright สำหรับ NewPeakBot")
-                pw = await async_playwright().start()
-                browser = await pw.chromium.launch(
-                    headless=self.headless,
-                    args=[
-                        "--disable-blink-features=AutomationControlled",
-                        "--disable-dev-shm-usage",
-                        "--no-sandbox",
-                        "--start-maximized",
-                    ],
-                )
-                context = await browser.new_context(
-                    viewport={"width": 1920, "height": 1080},
-                    screen={"width": 1920, "height": 1080},
-                    user_agent=(
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0.0.0 Safari/537.36"
-                    ),
-                )
-                page = await context.new_page()
-                return pw, browser, page
-
-            return loop.run_until_complete(async_init())
-
-        try:
-            future = self._executor.submit(init_playwright_in_thread)
-            self.playwright, self.browser, self.page = future.result(timeout=60)
-            logger.info("✅ เปิด Browser สำหรับ NewPeakBot สำเร็จ")
         except Exception as exc:
             logger.exception("❌ เปิด Browser สำหรับ NewPeakBot ไม่สำเร็จ")
             raise RuntimeError("ไม่สามารถเปิด Browser ได้") from exc
 
-    def _run_async(self, coro_callable, timeout: int = 60):
-        if not self._executor:
-            raise RuntimeError("Thread executor ยังไม่ได้เริ่มต้น")
-
-        def runner():
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    raise RuntimeError
-            except Exception:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
+        self.browser = self._lease.browser
+        self.page = self._lease.page
+        logger.info("✅ เปิด Browser สำหรับ NewPeakBot สำเร็จ")
 
-            return loop.run_until_complete(coro_callable())
+    def submit(self, coro) -> Future:
+        """ส่ง coroutine ไปรันบน event loop ถาวรของ browser (คืน concurrent.futures.Future)"""
+        if self._lease is None:
+            coro.close()
+            raise RuntimeError("Browser ยังไม่ได้เปิด")
+        return self._lease.pool.submit(coro)
 
-        return self._executor.submit(runner).result(timeout=timeout)
+    def _run_async(self, coro_callable, timeout: int = 60):
+        return self.submit(coro_callable()).result(timeout=timeout)
 
     def login(
         self,
@@ -580,36 +527,19 @@ class NewPeakBot:
                 log(f"⚠️ ไปหน้า Link_receipt_newpeak ไม่สำเร็จ: {exc}", "warning")
 
     def close(self) -> None:
-        if not self._executor:
+        """คืน context/page ให้ browser pool (Chromium ยังเปิดค้างไว้ให้ bot ตัวถัดไปใช้)"""
+        if self._lease is None:
             return
 
-        def close_runner():
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    raise RuntimeError
-            except Exception:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            async def async_close():
-                if self.page:
-                    await self.page.close()
-                if self.browser:
-                    await self.browser.close()
-                if self.playwright:
-                    await self.playwright.stop()
-
-            return loop.run_until_complete(async_close())
-
         try:
-            self._executor.submit(close_runner).result(timeout=20)
+            self._lease.release()
             logger.info("✅ ปิด Browser สำหรับ NewPeakBot สำเร็จ")
         except Exception:
             logger.exception("⚠️ ปิด Browser สำหรับ NewPeakBot ไม่สำเร็จ")
         finally:
-            self._executor.shutdown(wait=True)
-            self._executor = None
+            self._lease = None
+            self.page = None
+            self.browser = None
 
     def process_excel_transactions(
         self,
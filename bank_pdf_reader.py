@@ -0,0 +1,423 @@
+"""
+คลาสอ่านและแปลงไฟล์ PDF Statement ของธนาคาร (ไม่พึ่ง Streamlit ใช้ได้ทั้งหน้าเว็บและ command line)
+"""
+import itertools
+import logging
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from pdf_extraction import extract_pdf_content, extract_pdf_content_parallel, iter_pdf_page_texts
+from statement_parser import (
+    DATE_DATETIME_COLUMN, KBANK_COLUMNS, KBANK_LINE_PATTERN, EntityNameExtractor, TransferTypeClassifier,
+    build_kbank_transaction, build_rule_engines, drop_internal_columns, iter_record_frames,
+    normalize_date_series, parse_amount_series, write_frames_to_excel
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BankPDFReader:
+    """คลาสสำหรับอ่านไฟล์ PDF ของธนาคารต่างๆ"""
+    
+    def __init__(self):
+        self.bank_configs = self.load_bank_configs()
+        # คอมไพล์ pattern ของทุกธนาคารครั้งเดียว ใช้ซ้ำทุกบรรทัด/ทุกไฟล์
+        self.rule_engines = build_rule_engines(self.bank_configs)
+        self.transfer_classifier = TransferTypeClassifier()
+        self.entity_extractor = EntityNameExtractor()
+    
+    def load_bank_configs(self) -> Dict:
+        """โหลดการตั้งค่าสำหรับแต่ละธนาคาร"""
+        return {
+            "กสิกรไทย": {
+                "patterns": {
+                    "date": r"(\d{2}/\d{2}/\d{4})",
+                    "amount": r"([\d,]+\.\d{2})",
+                    "description": r"([A-Za-z0-9\s\-\.]+)",
+                    "balance": r"([\d,]+\.\d{2})"
+                },
+                "line_pattern": KBANK_LINE_PATTERN,
+                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
+            },
+            "กรุงเทพ": {
+                "patterns": {
+                    "date": r"(\d{2}/\d{2}/\d{4})",
+                    "amount": r"([\d,]+\.\d{2})",
+                    "description": r"([A-Za-z0-9\s\-\.]+)",
+                    "balance": r"([\d,]+\.\d{2})"
+                },
+                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
+            },
+            "กรุงศรี": {
+                "patterns": {
+                    "date": r"(\d{2}/\d{2}/\d{4})",
+                    "amount": r"([\d,]+\.\d{2})",
+                    "description": r"([A-Za-z0-9\s\-\.]+)",
+                    "balance": r"([\d,]+\.\d{2})"
+                },
+                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
+            },
+            "กรุงไทย": {
+                "patterns": {
+                    "date": r"(\d{2}/\d{2}/\d{4})",
+                    "amount": r"([\d,]+\.\d{2})",
+                    "description": r"([A-Za-z0-9\s\-\.]+)",
+                    "balance": r"([\d,]+\.\d{2})"
+                },
+                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
+            },
+            "TMB": {
+                "patterns": {
+                    "date": r"(\d{2}/\d{2}/\d{4})",
+                    "amount": r"([\d,]+\.\d{2})",
+                    "description": r"([A-Za-z0-9\s\-\.]+)",
+                    "balance": r"([\d,]+\.\d{2})"
+                },
+                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
+            },
+            "ธนชาต": {
+                "patterns": {
+                    "date": r"(\d{2}/\d{2}/\d{4})",
+                    "amount": r"([\d,]+\.\d{2})",
+                    "description": r"([A-Za-z0-9\s\-\.]+)",
+                    "balance": r"([\d,]+\.\d{2})"
+                },
+                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
+            }
+        }
+    
+    def extract_pdf_content(self, pdf_file, include_tables: bool = True,
+                            parallel: bool = False, max_workers: Optional[int] = None) -> Dict:
+        """ดึงข้อความ ข้อมูลแต่ละหน้า และตารางจากไฟล์ PDF โดยเปิดไฟล์เพียงครั้งเดียว
+        
+        ถ้า parallel=True จะกระจายช่วงหน้าไปประมวลผลหลาย process แล้วรวมผลตามลำดับหน้า
+        """
+        try:
+            if parallel:
+                content = extract_pdf_content_parallel(pdf_file, include_tables=include_tables,
+                                                       max_workers=max_workers)
+            else:
+                content = extract_pdf_content(pdf_file, include_tables=include_tables)
+        except Exception as e:
+            logger.error(f"เกิดข้อผิดพลาดในการอ่านไฟล์ PDF: {str(e)}")
+            return {"text": "", "pages": [], "tables": [], "error": str(e)}
+        
+        # เก็บข้อมูลหน้าไว้สำหรับการวิเคราะห์
+        self.pdf_pages_info = content["pages"]
+        return content
+    
+    def extract_text_from_pdf(self, pdf_file) -> str:
+        """ดึงข้อความจากไฟล์ PDF"""
+        return self.extract_pdf_content(pdf_file, include_tables=False)["text"]
+    
+    def extract_tables_from_pdf(self, pdf_file) -> List:
+        """ดึงตารางจากไฟล์ PDF"""
+        try:
+            import pdfplumber
+
+            tables = []
+            with pdfplumber.open(pdf_file) as pdf:
+                for i, page in enumerate(pdf.pages):
+                    page_tables = page.extract_tables()
+                    if page_tables:
+                        for j, table in enumerate(page_tables):
+                            tables.append({
+                                "page_number": i + 1,
+                                "table_number": j + 1,
+                                "table_data": table,
+                                "row_count": len(table),
+                                "col_count": len(table[0]) if table else 0
+                            })
+            return tables
+        except Exception as e:
+            logger.error(f"เกิดข้อผิดพลาดในการดึงตาราง: {str(e)}")
+            return []
+    
+    def analyze_kbank_statement(self, text: str) -> Dict:
+        """วิเคราะห์ข้อมูลดิบของธนาคารกสิกรไทย"""
+        analysis = {
+            "account_info": {},
+            "transaction_patterns": [],
+            "date_ranges": [],
+            "amount_patterns": [],
+            "keywords": []
+        }
+        
+        # ค้นหาข้อมูลบัญชี
+        account_patterns = {
+            "account_number": r"เลขที่บัญชี[:\s]*(\d+)",
+            "account_name": r"ชื่อบัญชี[:\s]*([^\n]+)",
+            "account_type": r"ประเภทบัญชี[:\s]*([^\n]+)",
+            "branch": r"สาขา[:\s]*([^\n]+)"
+        }
+        
+        for key, pattern in account_patterns.items():
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                analysis["account_info"][key] = match.group(1).strip()
+        
+        # ค้นหารูปแบบวันที่
+        date_patterns = [
+            r"(\d{1,2}/\d{1,2}/\d{4})",
+            r"(\d{1,2}-\d{1,2}-\d{4})",
+            r"(\d{4}-\d{1,2}-\d{1,2})"
+        ]
+        
+        for pattern in date_patterns:
+            dates = re.findall(pattern, text)
+            analysis["date_ranges"].extend(dates)
+        
+        # ค้นหารูปแบบจำนวนเงิน
+        amount_patterns = [
+            r"([\d,]+\.\d{2})",
+            r"([\d,]+\.\d{2})",
+            r"([\d,]+)"
+        ]
+        
+        for pattern in amount_patterns:
+            amounts = re.findall(pattern, text)
+            analysis["amount_patterns"].extend(amounts)
+        
+        # ค้นหาคำสำคัญ
+        keywords = [
+            "ถอน", "ฝาก", "โอน", "ชำระ", "รายได้", "รายจ่าย",
+            "ยอดคงเหลือ", "ยอดยกมา", "ยอดยกไป", "ดอกเบี้ย",
+            "ค่าธรรมเนียม", "ค่าบริการ", "ATM", "POS"
+        ]
+        
+        for keyword in keywords:
+            if keyword in text:
+                analysis["keywords"].append(keyword)
+        
+        return analysis
+    
+    def parse_bank_statement(self, text: str, bank_name: str) -> pd.DataFrame:
+        """แปลงข้อความจาก PDF เป็น DataFrame"""
+        if bank_name == "กสิกรไทย":
+            return self.parse_kbank_statement(text)
+        else:
+            return self.parse_generic_statement(text, bank_name)
+    
+    def parse_statement_frame(self, text: str, bank_name: str) -> pd.DataFrame:
+        """แปลงข้อความ Statement เป็น DataFrame พร้อมวันที่ ยอดเงินตัวเลข และประเภทผู้ส่งโอน"""
+        df = self.parse_bank_statement(text, bank_name)
+        
+        # แปลงรูปแบบวันที่เป็น dd/MM/yyyy
+        df = self.format_date_column(df)
+        
+        if not df.empty and 'จำนวนเงิน' in df.columns:
+            df['ยอดเงิน_numeric'] = parse_amount_series(df['จำนวนเงิน'])
+        else:
+            df['ยอดเงิน_numeric'] = pd.Series(dtype=float)
+        
+        if not df.empty and 'คำอธิบาย' in df.columns:
+            df['ประเภทผู้ส่งโอน'] = self.classify_transfer_types(df['คำอธิบาย'])
+        
+        return df
+    
+    def parse_kbank_statement(self, text: str) -> pd.DataFrame:
+        """แปลงข้อความจาก PDF ธนาคารกสิกรไทยเป็น DataFrame"""
+        transactions = list(self.iter_kbank_transactions([text]))
+        return pd.DataFrame(transactions)
+    
+    def iter_kbank_transactions(self, page_texts: Iterable[str]) -> Iterator[Dict]:
+        """
+        แปลงข้อความทีละหน้าเป็นรายการธุรกรรมแบบ generator
+        
+        ยอดคงเหลือก่อนหน้า (previous_balance) ถูกส่งต่อข้ามหน้า
+        เพื่อให้ทิศทางของจำนวนเงินในบรรทัดแรกของหน้าถัดไปถูกต้อง
+        """
+        # เก็บยอดคงเหลือก่อนหน้าเพื่อเปรียบเทียบ
+        previous_balance = None
+        
+        for page_text in page_texts:
+            for line in page_text.split('\n'):
+                transaction = self._parse_kbank_line(line, previous_balance)
+                if transaction is None:
+                    continue
+                
+                # อัปเดตยอดคงเหลือก่อนหน้า
+                if transaction["ยอดคงเหลือ"]:
+                    previous_balance = transaction["ยอดคงเหลือ"]
+                
+                yield transaction
+    
+    def _parse_kbank_line(self, line: str, previous_balance: Optional[str]) -> Optional[Dict]:
+        """แปลงบรรทัดเดียวของ Statement กสิกรไทยเป็นรายการธุรกรรม (None ถ้าไม่ใช่บรรทัดธุรกรรม)"""
+        line = line.strip()
+        if not line:
+            return None
+        
+        tokens = self.rule_engines["กสิกรไทย"].tokenize(line)
+        if tokens is None:
+            return None
+        
+        return build_kbank_transaction(tokens, previous_balance)
+    
+    def stream_kbank_statements(self, pdf_files: Iterable, chunk_size: int = 5000) -> Iterator[pd.DataFrame]:
+        """
+        อ่าน PDF ทีละหน้าแล้วคืน DataFrame ธุรกรรมทีละก้อน (วันที่แปลงเป็น dd/MM/yyyy แล้ว)
+        
+        รองรับหลายไฟล์ต่อเนื่องกัน (เช่น Statement ทั้งปี) โดยใช้หน่วยความจำตามขนาดก้อน
+        """
+        page_texts = itertools.chain.from_iterable(
+            iter_pdf_page_texts(pdf_file) for pdf_file in pdf_files
+        )
+        records = self.iter_kbank_transactions(page_texts)
+        for frame in iter_record_frames(records, chunk_size=chunk_size, columns=KBANK_COLUMNS):
+            yield self.format_date_column(frame)
+    
+    def export_kbank_statements_excel(self, pdf_files: Iterable, output, chunk_size: int = 5000) -> int:
+        """แปลง PDF กสิกรไทย (หนึ่งหรือหลายไฟล์) เป็น Excel แบบ streaming และคืนจำนวนแถวที่เขียน"""
+        frames = self.stream_kbank_statements(pdf_files, chunk_size=chunk_size)
+        return write_frames_to_excel((drop_internal_columns(frame) for frame in frames), output,
+                                     sheet_name='Bank_Statement')
+    
+    def extract_account_info(self, text: str) -> Dict:
+        """ดึงข้อมูลบัญชีจากข้อความ"""
+        account_info = {}
+        
+        # ค้นหาเลขที่บัญชี
+        account_match = re.search(r'เลขที่บัญชีเงินฝาก\s*(\d+-\d+-\d+-\d+)', text)
+        if account_match:
+            account_info['account_number'] = account_match.group(1)
+        
+        # ค้นหาชื่อบัญชี
+        name_match = re.search(r'ชื่อบัญชี\s*([^\n]+)', text)
+        if name_match:
+            account_info['account_name'] = name_match.group(1).strip()
+        
+        # ค้นหาสาขา
+        branch_match = re.search(r'สาขาเจ้าของบัญชี\s*([^\n]+)', text)
+        if branch_match:
+            account_info['branch'] = branch_match.group(1).strip()
+        
+        # ค้นหาช่วงวันที่
+        period_match = re.search(r'รอบระหว่างวันที่\s*(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})', text)
+        if period_match:
+            account_info['period_start'] = period_match.group(1)
+            account_info['period_end'] = period_match.group(2)
+        
+        # ค้นหายอดยกไป
+        balance_match = re.search(r'ยอดยกไป\s*([\d,]+\.\d{2})', text)
+        if balance_match:
+            account_info['opening_balance'] = balance_match.group(1)
+        
+        return account_info
+    
+    def classify_transfer_type(self, description: str) -> str:
+        """จำแนกประเภทผู้ส่งโอนเงินจากรายการธุรกรรม"""
+        return self.transfer_classifier.classify(description)
+    
+    def classify_transfer_types(self, descriptions: pd.Series) -> pd.Series:
+        """จำแนกประเภทผู้ส่งโอนของทั้งคอลัมน์คำอธิบายในครั้งเดียว"""
+        return self.transfer_classifier.classify_series(descriptions)
+    
+    def extract_entity_name(self, description: str) -> str:
+        """แยกชื่อบริษัท/บุคคลออกจากคำอธิบาย"""
+        return self.entity_extractor.extract(description)
+    
+    def extract_entity_names(self, descriptions: pd.Series) -> pd.Series:
+        """แยกชื่อบริษัท/บุคคลของทั้งคอลัมน์คำอธิบายในครั้งเดียว"""
+        return self.entity_extractor.extract_many(descriptions)
+    
+    def format_date_column(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        แปลงคอลัมน์วันที่เป็นรูปแบบ dd/MM/yyyy และเพิ่มคอลัมน์ วันที่_datetime (datetime64)
+
+        วันที่_datetime ใช้ภายในเท่านั้น - ตัดออกด้วย drop_internal_columns ก่อนเขียนไฟล์ Excel
+        """
+        if df.empty or 'วันที่' not in df.columns:
+            return df
+        
+        df_formatted = df.copy()
+        
+        # แปลงทั้งคอลัมน์ครั้งเดียว พร้อมเก็บ datetime64 ไว้สำหรับเรียง/กรอง/หาช่วงวันที่
+        df_formatted['วันที่'], df_formatted[DATE_DATETIME_COLUMN] = normalize_date_series(df_formatted['วันที่'])
+        
+        return df_formatted
+    
+    def create_transfer_summary(self, df: pd.DataFrame) -> pd.DataFrame:
+        """สร้างตารางสรุปข้อมูลแยกตามประเภทผู้ส่งโอน"""
+        if df.empty or 'คำอธิบาย' not in df.columns:
+            return pd.DataFrame()
+        
+        # เพิ่มคอลัมน์ประเภทผู้ส่งโอน (ใช้คอลัมน์คำอธิบาย)
+        df['ประเภทผู้ส่งโอน'] = self.classify_transfer_types(df['คำอธิบาย'])
+        
+        # เพิ่มคอลัมน์ชื่อบริษัท/บุคคล
+        df['ชื่อบริษัท/บุคคล'] = self.extract_entity_names(df['คำอธิบาย'])
+        
+        # แปลงจำนวนเงินทั้งคอลัมน์ครั้งเดียว (ยอดในวงเล็บเป็นรายการติดลบ)
+        amounts = parse_amount_series(df['จำนวนเงิน'])
+        grouped = pd.DataFrame({
+            'ประเภทผู้ส่งโอน': df['ประเภทผู้ส่งโอน'],
+            'ยอดรวม': amounts,
+            'ยอดเพิ่ม': amounts.where(amounts >= 0),
+            'ยอดลด': -amounts.where(amounts < 0)
+        }).groupby('ประเภทผู้ส่งโอน', sort=False, dropna=False)
+        totals = grouped[['ยอดรวม', 'ยอดเพิ่ม', 'ยอดลด']].sum()
+        counts = grouped.size()
+        
+        # สร้างตารางสรุป
+        summary_data = []
+        for transfer_type, count in counts.items():
+            summary_data.append({
+                'ประเภทผู้ส่งโอน': transfer_type,
+                'จำนวนรายการ': count,
+                'ยอดรวม': f"{totals.at[transfer_type, 'ยอดรวม']:,.2f}",
+                'ยอดเพิ่ม': f"{totals.at[transfer_type, 'ยอดเพิ่ม']:,.2f}",
+                'ยอดลด': f"{totals.at[transfer_type, 'ยอดลด']:,.2f}",
+                'ร้อยละ': f"{(count/len(df)*100):.1f}%"
+            })
+        
+        # เรียงลำดับตามจำนวนรายการ (มากไปน้อย)
+        summary_df = pd.DataFrame(summary_data)
+        summary_df = summary_df.sort_values('จำนวนรายการ', ascending=False)
+        
+        return summary_df
+    
+    def parse_generic_statement(self, text: str, bank_name: str) -> pd.DataFrame:
+        """แปลงข้อความจาก PDF ธนาคารอื่นๆ เป็น DataFrame"""
+        engine = self.rule_engines.get(bank_name, self.rule_engines["กสิกรไทย"])
+        
+        lines = text.split('\n')
+        transactions = []
+        
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            
+            # ค้นหาวันที่ จำนวนเงิน คำอธิบาย และยอดคงเหลือด้วย pattern ที่คอมไพล์ไว้แล้ว
+            fields = engine.search_fields(line)
+            if fields:
+                transactions.append({
+                    "วันที่": fields.get("date", ""),
+                    "รายการ": fields.get("description", ""),
+                    "จำนวนเงิน": fields.get("amount", ""),
+                    "ยอดคงเหลือ": fields.get("balance", "")
+                })
+        
+        return pd.DataFrame(transactions)
+    
+    def detect_bank(self, text: str) -> str:
+        """ตรวจสอบว่าเป็นธนาคารไหนจากข้อความ"""
+        bank_keywords = {
+            "กสิกรไทย": ["กสิกรไทย", "Kasikorn", "KBank"],
+            "กรุงเทพ": ["กรุงเทพ", "Bangkok Bank", "BBL"],
+            "กรุงศรี": ["กรุงศรี", "Krungsri", "Bank of Ayudhya"],
+            "กรุงไทย": ["กรุงไทย", "Krung Thai", "KTB"],
+            "TMB": ["TMB", "ธนาคารทหารไทย"],
+            "ธนชาต": ["ธนชาต", "Thanachart", "TBank"]
+        }
+        
+        text_lower = text.lower()
+        for bank, keywords in bank_keywords.items():
+            for keyword in keywords:
+                if keyword.lower() in text_lower:
+                    return bank
+        
+        return "กสิกรไทย"  # default
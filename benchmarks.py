@@ -0,0 +1,356 @@
+"""
+สคริปต์วัดประสิทธิภาพส่วนประมวลผลหลัก (รันด้วยมือ ไม่ใช่ส่วนหนึ่งของแอป)
+
+ตัวอย่าง:
+    python benchmarks.py rule-engine --lines 50000
+    python benchmarks.py entities --rows 50000
+    python benchmarks.py import-time main bot_data
+    python benchmarks.py dbd-summary --rows 100000
+    python benchmarks.py addresses --rows 100000
+"""
+import argparse
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from dbd_record import ADDRESS_COLUMNS, DBDCompanyRecord, create_dbd_summary_table
+from statement_parser import (
+    KBANK_LINE_PATTERN, EntityNameExtractor, KBankRuleEngine, TransferTypeClassifier,
+    build_kbank_transaction
+)
+from thai_address import ADDRESS_KEYS, _parse_address_text, parse_thai_addresses
+
+
+def _generate_kbank_lines(count: int, seed: int = 42) -> List[str]:
+    """สร้างบรรทัด Statement กสิกรไทยจำลอง (มีบรรทัดหัวกระดาษปนเหมือนไฟล์จริง)"""
+    rng = random.Random(seed)
+    kinds = ['โอนเงิน', 'รับโอนเงิน', 'ชำระเงิน', 'ค่าธรรมเนียม', 'ถอนเงินสด']
+    balance = 1_000_000.0
+    lines = []
+    for i in range(count):
+        if i % 25 == 0:
+            lines.append(f"หน้า {i // 25 + 1} รายการเดินบัญชี")
+            continue
+        amount = round(rng.uniform(1, 50_000), 2)
+        # ยอดคงเหลือไม่ติดลบเหมือนบัญชีจริง
+        balance += amount if rng.random() < 0.5 or balance < amount else -amount
+        lines.append(
+            f"{rng.randint(1, 28):02d}-10-25 {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d} "
+            f"{rng.choice(kinds)} {amount:,.2f} {balance:,.2f} "
+            f"จาก X{rng.randint(1000, 9999)} บจก. ทดสอบ {rng.randint(1, 500)}"
+        )
+    return lines
+
+
+def _legacy_parse_kbank_line(line: str, previous_balance: Optional[str]) -> Optional[Dict]:
+    """ตัวแยกบรรทัดแบบเดิม (เรียก re.search/findall/match ทีละส่วนทุกบรรทัด) ใช้เป็นเกณฑ์เปรียบเทียบ"""
+    line = line.strip()
+    if not line:
+        return None
+    date_match = re.search(r'(\d{2}[-/]\d{2}[-/]\d{2,4})', line)
+    if not date_match:
+        return None
+    time_match = re.search(r'(\d{2}:\d{2})', line)
+    amount_matches = re.findall(r'([\d,]+\.\d{2})', line)
+    amount = amount_matches[0] if amount_matches else ""
+    balance = amount_matches[1] if len(amount_matches) >= 2 else ""
+
+    parts = line.split()
+    transaction_type = ""
+    description = ""
+    amount_pos = -1
+    for i, part in enumerate(parts):
+        if re.match(r'[\d,]+\.\d{2}', part):
+            amount_pos = i
+            break
+    if amount_pos > 2:
+        transaction_type = re.sub(r'\d{2}:\d{2}\s*', '', " ".join(parts[2:amount_pos])).strip()
+    if len(amount_matches) >= 2:
+        balance_pos = -1
+        for i, part in enumerate(parts):
+            if part == balance:
+                balance_pos = i
+                break
+        if balance_pos > -1 and balance_pos < len(parts) - 1:
+            description = " ".join(parts[balance_pos + 1:])
+
+    tokens = {
+        "date": date_match.group(1),
+        "time": time_match.group(1) if time_match else "",
+        "type": transaction_type,
+        "amount": amount,
+        "balance": balance,
+        "description": description
+    }
+    return build_kbank_transaction(tokens, previous_balance)
+
+
+def _run_parser(lines: List[str], parse_line: Callable) -> List[Dict]:
+    """แปลงทุกบรรทัดพร้อมส่งต่อยอดคงเหลือก่อนหน้า เหมือน BankPDFReader.iter_kbank_transactions"""
+    previous_balance = None
+    transactions = []
+    for line in lines:
+        transaction = parse_line(line, previous_balance)
+        if transaction is None:
+            continue
+        if transaction["ยอดคงเหลือ"]:
+            previous_balance = transaction["ยอดคงเหลือ"]
+        transactions.append(transaction)
+    return transactions
+
+
+def _timed(func: Callable, repeat: int):
+    """คืน (เวลาที่ดีที่สุดเป็นวินาที, ผลลัพธ์ของรอบสุดท้าย)"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_rule_engine(line_count: int, repeat: int) -> None:
+    """เปรียบเทียบตัวแยกบรรทัดแบบเดิมกับ KBankRuleEngine"""
+    lines = _generate_kbank_lines(line_count)
+    engine = KBankRuleEngine({}, KBANK_LINE_PATTERN)
+
+    def engine_parse_line(line: str, previous_balance: Optional[str]) -> Optional[Dict]:
+        line = line.strip()
+        if not line:
+            return None
+        tokens = engine.tokenize(line)
+        return build_kbank_transaction(tokens, previous_balance) if tokens else None
+
+    legacy_time, legacy_rows = _timed(lambda: _run_parser(lines, _legacy_parse_kbank_line), repeat)
+    engine_time, engine_rows = _timed(lambda: _run_parser(lines, engine_parse_line), repeat)
+
+    print(f"บรรทัดทั้งหมด: {len(lines):,} | ธุรกรรม: {len(engine_rows):,}")
+    print(f"แบบเดิม:      {legacy_time:.3f} s ({len(lines) / legacy_time:,.0f} บรรทัด/วินาที)")
+    print(f"rule engine:  {engine_time:.3f} s ({len(lines) / engine_time:,.0f} บรรทัด/วินาที)")
+    print(f"เร็วขึ้น:       {legacy_time / engine_time:.2f}x")
+    print(f"ผลลัพธ์ตรงกัน: {'✅' if legacy_rows == engine_rows else '❌'}")
+
+
+def bench_entities(row_count: int) -> None:
+    """วัดเวลาจำแนกประเภทผู้ส่งโอนและแยกชื่อของทั้งคอลัมน์คำอธิบาย"""
+    rng = random.Random(7)
+    prefixes = ['บจก.', 'บริษัท', 'ห้างหุ้นส่วน', 'นาย', 'นาง', 'MR']
+    descriptions = pd.Series([
+        f"โอนจาก X{rng.randint(1000, 9999)} {rng.choice(prefixes)} ทดสอบ {rng.randint(1, row_count // 10)} จำกัด"
+        for _ in range(row_count)
+    ])
+
+    start = time.perf_counter()
+    types = TransferTypeClassifier().classify_series(descriptions)
+    classify_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    names = EntityNameExtractor().extract_many(descriptions)
+    extract_time = time.perf_counter() - start
+
+    print(f"แถวทั้งหมด: {row_count:,} | คำอธิบายไม่ซ้ำ: {descriptions.nunique():,}")
+    print(f"จำแนกประเภท:  {classify_time:.3f} s ({types.nunique()} ประเภท)")
+    print(f"แยกชื่อ:       {extract_time:.3f} s ({names.nunique():,} ชื่อ)")
+
+
+def _generate_dbd_frame(row_count: int, seed: int = 11) -> pd.DataFrame:
+    """
+    สร้างตารางธุรกรรมพร้อมข้อมูล DBD จำลอง: ครึ่งหนึ่งมีคอลัมน์ของ DBDCompanyRecord
+    อีกส่วนเป็นไฟล์เก่าที่มีแต่ข้อความ ข้อมูล DBD (ปนรายการไม่พบข้อมูลและข้อผิดพลาด)
+    """
+    rng = random.Random(seed)
+    provinces = ['กรุงเทพมหานคร', 'เชียงใหม่', 'ขอนแก่น', 'ชลบุรี']
+    rows = []
+    for i in range(row_count):
+        company = f"บริษัท ทดสอบ {rng.randint(1, row_count // 5 + 1)} จำกัด"
+        kind = rng.random()
+        if kind < 0.1:
+            record = DBDCompanyRecord(error="timeout")
+        elif kind < 0.2:
+            record = DBDCompanyRecord(company_name=company)
+        else:
+            province = rng.choice(provinces)
+            record = DBDCompanyRecord(
+                registration_number=f"0105{rng.randint(0, 10 ** 9 - 1):09d}",
+                company_name=company,
+                business_type="บริษัทจำกัด",
+                status=rng.choice(["ยังดำเนินกิจการอยู่", "เลิก"]),
+                registered_capital=f"{rng.randint(1, 100) * 100_000:,}.00 บาท",
+                address=f"{rng.randint(1, 999)} ถนนทดสอบ {province} 10{rng.randint(100, 999)}",
+                directors=f"นาย ก {i} | นาง ข {i}",
+                address_components={"house_no": str(rng.randint(1, 999)), "province": province}
+            )
+        row = {"วันที่": f"{rng.randint(1, 28):02d}/10/2025", "ชื่อบริษัท/บุคคล": company,
+               "จำนวนเงิน": round(rng.uniform(1, 50_000), 2)}
+        columns = record.to_columns()
+        if i % 2:
+            # ไฟล์เก่า: มีเฉพาะข้อความแสดงผลและที่อยู่แยกส่วน
+            columns = {column: value for column, value in columns.items()
+                       if column == "ข้อมูล DBD" or column in ADDRESS_COLUMNS.values()}
+        row.update(columns)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def _rowwise_dbd_summary_table(df: pd.DataFrame) -> pd.DataFrame:
+    """ตารางสรุปแบบเดิม (iterrows + DBDCompanyRecord.from_row ทีละแถว) ใช้เป็นเกณฑ์เปรียบเทียบ"""
+    summary_data = []
+    for _, row in df.iterrows():
+        record = DBDCompanyRecord.from_row(row)
+        if record.error or not record.to_details():
+            continue
+        directors_value = record.directors or row.get('รายชื่อกรรมการ', '')
+        if isinstance(directors_value, list):
+            directors_value = " | ".join(directors_value)
+        elif pd.isna(directors_value):
+            directors_value = ""
+        else:
+            directors_value = str(directors_value).strip()
+        summary_row = {
+            'ชื่อบริษัท': row.get('ชื่อบริษัท/บุคคล', ''),
+            'ชื่อบริษัทจาก DBD': row.get('ชื่อบริษัทจาก DBD', ''),
+            'เลขทะเบียน': record.registration_number,
+            'ประเภทธุรกิจ': record.business_type,
+            'สถานะ': record.status,
+            'ทุนจดทะเบียน': record.registered_capital,
+            'ที่อยู่': record.address,
+            'รายชื่อกรรมการ': directors_value
+        }
+        for column in ADDRESS_COLUMNS.values():
+            summary_row[column] = row.get(column, '')
+        summary_data.append(summary_row)
+    return pd.DataFrame(summary_data)
+
+
+def bench_dbd_summary(row_count: int, repeat: int) -> None:
+    """เปรียบเทียบตารางสรุปข้อมูล DBD แบบทีละแถวกับ create_dbd_summary_table"""
+    df = _generate_dbd_frame(row_count)
+
+    rowwise_time, rowwise_summary = _timed(lambda: _rowwise_dbd_summary_table(df), repeat)
+    vectorized_time, vectorized_summary = _timed(lambda: create_dbd_summary_table(df), repeat)
+
+    print(f"แถวทั้งหมด: {len(df):,} | แถวในตารางสรุป: {len(vectorized_summary):,}")
+    print(f"ทีละแถว:      {rowwise_time:.3f} s ({len(df) / rowwise_time:,.0f} แถว/วินาที)")
+    print(f"vectorized:   {vectorized_time:.3f} s ({len(df) / vectorized_time:,.0f} แถว/วินาที)")
+    print(f"เร็วขึ้น:       {rowwise_time / vectorized_time:.2f}x")
+    print(f"ผลลัพธ์ตรงกัน: {'✅' if rowwise_summary.equals(vectorized_summary) else '❌'}")
+
+
+def bench_addresses(row_count: int, repeat: int) -> None:
+    """เปรียบเทียบการแยกที่อยู่ทีละแถว (ไม่มีแคช) กับ parse_thai_addresses ทั้งคอลัมน์"""
+    rng = random.Random(5)
+    places = [
+        ("บางพูด", "ปากเกร็ด", "จังหวัดนนทบุรี", "11120"),
+        ("แขวงคลองเตย", "เขตคลองเตย", "กรุงเทพมหานคร", "10110"),
+        ("ต.ในเมือง", "อ.เมือง", "จ.ขอนแก่น", "40000"),
+        ("ตำบลสุเทพ", "อำเภอเมืองเชียงใหม่", "จังหวัดเชียงใหม่", "50200"),
+    ]
+    # ผู้ส่งโอนรายเดิมโอนซ้ำหลายครั้ง: ที่อยู่ไม่ซ้ำประมาณ 1 ใน 20 ของจำนวนแถว
+    companies = []
+    for _ in range(max(row_count // 20, 1)):
+        subdistrict, district, province, postal_code = rng.choice(places)
+        subdistrict = subdistrict if subdistrict[0] in "ตแ" else f"ตำบล{subdistrict}"
+        companies.append(f"{rng.randint(1, 999)}/{rng.randint(1, 9)} หมู่ที่ {rng.randint(1, 12)} "
+                         f"{subdistrict} {district} {province} {postal_code}")
+    addresses = [rng.choice(companies) for _ in range(row_count)]
+    series = pd.Series(addresses)
+    parse_uncached = _parse_address_text.__wrapped__
+
+    def rowwise() -> pd.DataFrame:
+        return pd.DataFrame([parse_uncached(address) for address in addresses], columns=list(ADDRESS_KEYS), dtype=object)
+
+    def batch() -> pd.DataFrame:
+        _parse_address_text.cache_clear()
+        return parse_thai_addresses(series)
+
+    rowwise_time, rowwise_result = _timed(rowwise, repeat)
+    batch_time, batch_result = _timed(batch, repeat)
+
+    print(f"ที่อยู่ทั้งหมด: {len(series):,} | ไม่ซ้ำ: {series.nunique():,}")
+    print(f"ทีละแถว:      {rowwise_time:.3f} s ({len(series) / rowwise_time:,.0f} แถว/วินาที)")
+    print(f"ทั้งคอลัมน์:    {batch_time:.3f} s ({len(series) / batch_time:,.0f} แถว/วินาที)")
+    print(f"เร็วขึ้น:       {rowwise_time / batch_time:.2f}x")
+    print(f"ผลลัพธ์ตรงกัน: {'✅' if rowwise_result.equals(batch_result.reset_index(drop=True)) else '❌'}")
+
+
+# โมดูลหนักที่ควรถูกโหลดเฉพาะเมื่อหน้าที่ใช้งานถูกเปิด
+_HEAVY_MODULES = ("pdfplumber", "playwright", "bs4", "requests", "openpyxl", "pyarrow")
+
+# รันใน interpreter ใหม่ทุกครั้ง เพื่อวัดเวลา import แบบ cold start
+_IMPORT_PROBE = """
+import importlib, sys, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+print("@@" + str(elapsed) + "|" + ",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def bench_import_time(modules: List[str], repeat: int) -> None:
+    """วัดเวลา import แต่ละโมดูลใน process ใหม่ และแสดงโมดูลหนักที่ถูกโหลดตามมา"""
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    print(f"{'โมดูล':<20} {'เวลา (ms)':>10}  โมดูลหนักที่ถูกโหลด")
+    for module in modules:
+        probe = _IMPORT_PROBE.format(module=module, heavy=_HEAVY_MODULES)
+        best = float("inf")
+        loaded = ""
+        for _ in range(repeat):
+            completed = subprocess.run([sys.executable, "-c", probe], cwd=repo_dir,
+                                       capture_output=True, text=True, encoding="utf-8")
+            result_lines = [line for line in completed.stdout.splitlines() if line.startswith("@@")]
+            if completed.returncode != 0 or not result_lines:
+                error_lines = completed.stderr.strip().splitlines()
+                loaded = f"❌ {error_lines[-1] if error_lines else 'import ไม่สำเร็จ'}"
+                best = float("nan")
+                break
+            elapsed, loaded = result_lines[-1][2:].split("|", 1)
+            best = min(best, float(elapsed))
+        print(f"{module:<20} {best * 1000:>10.1f}  {loaded or '-'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="วัดประสิทธิภาพ Bank_to_bot")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rule_engine = subparsers.add_parser("rule-engine", help="ตัวแยกบรรทัด Statement กสิกรไทย")
+    rule_engine.add_argument("--lines", type=int, default=50_000)
+    rule_engine.add_argument("--repeat", type=int, default=3)
+
+    entities = subparsers.add_parser("entities", help="จำแนกประเภทผู้ส่งโอนและแยกชื่อ")
+    entities.add_argument("--rows", type=int, default=50_000)
+
+    dbd_summary = subparsers.add_parser("dbd-summary", help="ตารางสรุปข้อมูล DBD")
+    dbd_summary.add_argument("--rows", type=int, default=100_000)
+    dbd_summary.add_argument("--repeat", type=int, default=1)
+
+    addresses = subparsers.add_parser("addresses", help="แยกที่อยู่ภาษาไทยทั้งคอลัมน์")
+    addresses.add_argument("--rows", type=int, default=100_000)
+    addresses.add_argument("--repeat", type=int, default=1)
+
+    import_time = subparsers.add_parser("import-time", help="เวลา import ตอนเริ่มแอป (cold start)")
+    import_time.add_argument("modules", nargs="*",
+                             default=["main", "bank_pdf_reader", "statement_batch", "bot_data", "NewPeak"])
+    import_time.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args()
+    if args.command == "rule-engine":
+        bench_rule_engine(args.lines, args.repeat)
+    elif args.command == "entities":
+        bench_entities(args.rows)
+    elif args.command == "dbd-summary":
+        bench_dbd_summary(args.rows, args.repeat)
+    elif args.command == "addresses":
+        bench_addresses(args.rows, args.repeat)
+    elif args.command == "import-time":
+        bench_import_time(args.modules, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
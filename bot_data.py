@@ -1,104 +1,108 @@
+import numpy as np
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, Comment, NavigableString
 import time
 import re
-from typing import Dict, Optional, Callable
+import threading
+from typing import Dict, Iterator, List, Optional, Callable, Tuple
 import logging
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import asyncio
 
-def parse_thai_address(address: str) -> Dict[str, str]:
-    """แยกองค์ประกอบที่อยู่ภาษาไทยออกเป็นส่วนๆ"""
-    components = {
-        "house_no": "",
-        "village": "",
-        "moo": "",
-        "subdistrict": "",
-        "district": "",
-        "province": "",
-        "postal_code": ""
-    }
-
-    if not address:
-        return components
-
-    text = str(address)
-    text = re.sub(r"\s+", " ", text).strip().strip(',')
-
-    if not text:
-        return components
-
-    def remove_match(src: str, match: re.Match) -> str:
-        return (src[:match.start()] + src[match.end():]).strip(' ,')
-
-    postal_match = re.search(r"(\d{5})(?!.*\d)", text)
-    if postal_match:
-        components["postal_code"] = postal_match.group(1)
-        text = remove_match(text, postal_match)
-
-    province_patterns = [
-        r"(?:จังหวัด|จ\.)\s*([ก-๙]+)",
-        r"(กรุงเทพมหานคร)"
-    ]
-    for pattern in province_patterns:
-        province_match = re.search(pattern, text)
-        if province_match:
-            group_index = province_match.lastindex or 0
-            components["province"] = province_match.group(group_index).strip()
-            text = remove_match(text, province_match)
-            break
-
-    district_match = re.search(r"(?:อำเภอ|อ\.|เขต)\s*([ก-๙]+(?:\s[ก-๙]+)*)", text)
-    if district_match:
-        components["district"] = district_match.group(1).strip()
-        text = remove_match(text, district_match)
-
-    subdistrict_match = re.search(r"(?:ตำบล|ต\.|แขวง)\s*([ก-๙]+(?:\s[ก-๙]+)*)", text)
-    if subdistrict_match:
-        components["subdistrict"] = subdistrict_match.group(1).strip()
-        text = remove_match(text, subdistrict_match)
-
-    moo_match = re.search(r"(?:หมู่ที่|หมู่)\s*([\d]+)", text)
-    if moo_match:
-        components["moo"] = moo_match.group(1).strip()
-        text = remove_match(text, moo_match)
-
-    village_match = re.search(r"(?:หมู่บ้าน|บ้าน)\s*([ก-๙0-9\s]+?)(?=(?:หมู่ที่|หมู่|ตำบล|ต\.|แขวง|อำเภอ|อ\.|เขต|จังหวัด|จ\.|กรุงเทพ|$))", text)
-    if village_match:
-        components["village"] = village_match.group(1).strip()
-        text = remove_match(text, village_match)
-
-    house_match = re.search(r"^(?:บ้านเลขที่|เลขที่)?\s*([^\s,]+)", text)
-    if house_match:
-        components["house_no"] = house_match.group(1).strip()
-        text = remove_match(text, house_match)
-
-    if not components["house_no"]:
-        fallback_match = re.search(r"([0-9]+[\/0-9-]*)", text)
-        if fallback_match and fallback_match.start() == 0:
-            components["house_no"] = fallback_match.group(1).strip()
-            text = remove_match(text, fallback_match)
-
-    if not components["province"] and "กรุงเทพมหานคร" in address:
-        components["province"] = "กรุงเทพมหานคร"
-
-    return components
+from browser_pool import get_browser_pool
+from dbd_record import ADDRESS_COLUMNS, DBDCompanyRecord, RECORD_COLUMNS, DBD_INFO_COLUMN
+from thai_address import get_address_gazetteer, parse_thai_address
 
 # ตั้งค่า logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+# ค่า context ที่ใช้ร่วมกันระหว่าง DBDDataWarehouseBot และ DBDLookupEngine (Chromium เปิดโดย browser pool)
+BROWSER_CONTEXT_OPTIONS = {
+    "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    "viewport": {'width': 1920, 'height': 1080},
+    "screen": {'width': 1920, 'height': 1080}
+}
+# แท็บข้อมูลบริษัทที่แสดงเมื่อค้นหาพบ และเวลารอผลการค้นหา
+DBD_PROFILE_SELECTOR = '#companyProfileTab1'
+DBD_SEARCH_INPUT_SELECTOR = '#key-word'
+DBD_RESULT_TIMEOUT_MS = 15000
+# เมื่อเว็บตอบกลับผลการค้นหาแล้ว รอให้แท็บข้อมูลบริษัทแสดงอีกไม่เกินเท่านี้ (วินาที) ก่อนสรุปว่าไม่พบ
+DBD_RENDER_GRACE_SECONDS = 3
+# endpoint ที่หน้าเว็บเรียกเอง (ดูจาก network ของ browser flow): ค้นหาชื่อ -> รายการนิติบุคคล, หน้าข้อมูลบริษัทตามเลขทะเบียน
+# juristic_type คือหลักที่ 4 ของเลขทะเบียน 13 หลัก (เช่น 0105... -> 5 = บริษัทจำกัด)
+DBD_HTTP_SEARCH_PATH = "/searchJuristicInfo"
+DBD_HTTP_SEARCH_FIELD = "textSearch"
+DBD_HTTP_PROFILE_PATH = "/company/profile/{juristic_type}/{registration_number}"
+DBD_HTTP_TIMEOUT = 20
+# ข้อความในหน้าผลค้นหาที่บอกว่าค้นหาแล้วไม่พบ (HTTP: หน้าที่ไม่มีทั้งลิงก์บริษัทและข้อความนี้ถือว่าอ่านไม่ออก
+# Browser: สรุปว่าไม่พบเฉพาะเมื่อหน้าเว็บแสดงข้อความนี้)
+DBD_HTTP_NO_RESULT_TEXTS = ("ไม่พบข้อมูล",)
+# จำนวน connection ที่ session เก็บไว้ใช้ซ้ำ (พอสำหรับ worker ของ DBDLookupEngine)
+DBD_HTTP_POOL_SIZE = 16
+
+_BLOCK_TAGS = {"div", "p", "li", "ul", "ol", "br", "tr", "table", "section", "h1", "h2", "h3", "h4", "h5", "h6"}
+_PROFILE_LINK_RE = re.compile(r"/company/profile/(\d)/(\d{13})")
+
+
+def _html_inner_text(element) -> str:
+    """ข้อความของ element แบบเดียวกับ inner_text ของ browser (ขึ้นบรรทัดใหม่ที่ block element เท่านั้น)"""
+    if element is None:
+        return ""
+    parts = []
+    for node in element.descendants:
+        if isinstance(node, NavigableString):
+            if not isinstance(node, Comment) and node.parent.name not in ("script", "style"):
+                parts.append(str(node))
+        elif node.name in _BLOCK_TAGS:
+            parts.append("\n")
+    lines = (re.sub(r"\s+", " ", line).strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _child_div(element, *positions: int):
+    """เลียนแบบ XPath div[n]/div[m]/... (ลำดับ div ลูกโดยตรง เริ่มที่ 1) คืน None ถ้าไม่มี"""
+    for position in positions:
+        if element is None:
+            return None
+        divs = element.find_all("div", recursive=False)
+        element = divs[position - 1] if len(divs) >= position else None
+    return element
+
+
+def _task_succeeded(task: Optional[asyncio.Task]) -> bool:
+    """task เสร็จแล้วโดยไม่ถูกยกเลิกและไม่มี exception (เช่น timeout)"""
+    return task is not None and task.done() and not task.cancelled() and task.exception() is None
+
+
+def _make_log(log_callback: Optional[Callable] = None) -> Callable:
+    """สร้างฟังก์ชัน log ที่ส่งข้อความไปยัง log_callback (message, status) และ logger"""
+    def log(message: str, status: str = "info"):
+        if log_callback:
+            try:
+                log_callback(message, status)
+            except:
+                pass
+        logger.info(message)
+    return log
+
 class DBDDataWarehouseBot:
     """คลาสสำหรับดึงข้อมูลจาก DBD DataWarehouse"""
     
-    def __init__(self, use_browser: bool = False, headless: bool = False):
+    def __init__(self, use_browser: bool = False, headless: bool = False, cache=None, fast_mode: bool = False,
+                 use_http_api: bool = False):
         """
         Initialize bot
         
         Args:
             use_browser (bool): ใช้ browser (Playwright) แทน requests
             headless (bool): เปิด browser แบบ headless (ซ่อนหน้าจอ)
+            cache (Optional[DBDCompanyCache]): แคชข้อมูลบริษัท (None = ค้นหาจากเว็บทุกครั้ง)
+            fast_mode (bool): ไม่หน่วงเวลาให้คนดูการทำงานใน browser (รอเฉพาะเว็บตอบกลับ)
+            use_http_api (bool): เมื่อไม่ใช้ browser ให้เรียก endpoint ค้นหา/หน้าข้อมูลบริษัทของเว็บโดยตรง
         """
         self.base_url = "https://datawarehouse.dbd.go.th"
         self.search_url = f"{self.base_url}/index"
@@ -107,66 +111,24 @@ class DBDDataWarehouseBot:
         self.browser = None
         self.page = None
         self.playwright = None
-        self._executor = None
+        self._lease = None
+        self.cache = cache
+        self.fast_mode = fast_mode
+        self.use_http_api = use_http_api
+        self._http_ready = False
         
         if use_browser:
             try:
-                from playwright.async_api import async_playwright
-                
-                # ใช้ ThreadPoolExecutor เพื่อหลีกเลี่ยงปัญหา event loop ใน Streamlit
-                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="playwright")
-                
-                def init_playwright_in_new_event_loop():
-                    """สร้าง event loop ใหม่ใน thread เพื่อหลีกเลี่ยงปัญหา Streamlit"""
-                    # สร้าง event loop ใหม่ใน thread นี้
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    try:
-                        async def async_init():
-                            logger.info("🚀 กำลังเปิด Playwright Browser (async mode)...")
-                            pw = await async_playwright().start()
-                            
-                            logger.info("🌐 กำลัง launch Chromium browser...")
-                            browser = await pw.chromium.launch(
-                                headless=False,  # แสดงหน้าจอ browser เสมอ
-                                args=[
-                                    '--disable-blink-features=AutomationControlled',
-                                    '--disable-dev-shm-usage',
-                                    '--no-sandbox',
-                                    '--start-maximized'
-                                ]
-                            )
-                            
-                            logger.info("📄 กำลังสร้าง browser context...")
-                            context = await browser.new_context(
-                                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                                viewport={'width': 1920, 'height': 1080},
-                                screen={'width': 1920, 'height': 1080}
-                            )
-                            
-                            logger.info("🆕 กำลังสร้าง new page...")
-                            page = await context.new_page()
-                            
-                            logger.info("✅ เปิด Playwright Browser สำเร็จ!")
-                            return pw, browser, page
-                        
-                        # รัน async function ใน event loop ใหม่
-                        return loop.run_until_complete(async_init())
-                    finally:
-                        # เก็บ event loop ไว้ใช้งานต่อไป
-                        pass
-                
-                logger.info("🚀 กำลังเริ่มต้น Playwright Browser ใน thread แยก...")
+                # ยืม context/page จาก Chromium ที่เปิดค้างไว้ใน browser pool (เปิดจริงแค่ครั้งแรกของโปรเซส)
+                # งาน async ทั้งหมดส่งผ่าน submit() ไปรันบน event loop ถาวรของ pool ที่เป็นเจ้าของ page
+                pool = get_browser_pool()
+                logger.info("🚀 กำลังยืม Playwright Browser จาก browser pool...")
                 logger.info("👀 Browser จะเปิดขึ้นมาในอีกสักครู่...")
+                self._lease = pool.acquire(headless=False, context_options=BROWSER_CONTEXT_OPTIONS)
+                self.browser = self._lease.browser
+                self.page = self._lease.page
                 
-                # รันใน thread แยก
-                future = self._executor.submit(init_playwright_in_new_event_loop)
-                self.playwright, self.browser, self.page = future.result(timeout=60)
-                
-                # เก็บ event loop ไว้
                 logger.info("✅ เปิด Playwright Browser (แสดงหน้าจอ) สำเร็จ!")
-                logger.info("👀 Browser window กำลังเปิดขึ้นมา - ดูได้เลย!")
                 logger.info("🌐 Browser จะปรากฏหน้าต่างใหม่ - ดูการทำงานแบบเรียลไทม์ได้เลย!")
                     
             except Exception as e:
@@ -205,6 +167,10 @@ class DBDDataWarehouseBot:
             'Sec-Fetch-Site': 'none',
             'Cache-Control': 'max-age=0'
         })
+        # เก็บ connection ไว้ใช้ซ้ำ (keep-alive) ไม่ต้อง handshake TLS ใหม่ทุกบริษัท
+        adapter = HTTPAdapter(pool_connections=DBD_HTTP_POOL_SIZE, pool_maxsize=DBD_HTTP_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
     def _add_address_components(self, company_info: Dict) -> Dict:
         """เพิ่มข้อมูลที่อยู่แยกส่วนลงใน company_info"""
@@ -212,7 +178,7 @@ class DBDDataWarehouseBot:
             return company_info
 
         address_text = company_info.get("address", "")
-        components = parse_thai_address(address_text)
+        components = parse_thai_address(address_text, get_address_gazetteer())
 
         company_info["address_components"] = components
         company_info["address_house_no"] = components.get("house_no", "")
@@ -264,6 +230,32 @@ class DBDDataWarehouseBot:
 
         return company_info
 
+    def _cached_company_info(self, clean_name: str) -> Optional[Dict]:
+        """ผลจากแคช: ค้นด้วยเลขทะเบียน 13 หลักใช้ผลของเลขทะเบียนนั้นจากการค้นหาด้วยชื่อได้ด้วย"""
+        if self.cache is None:
+            return None
+        if re.fullmatch(r"\d{13}", clean_name):
+            cached_info = self.cache.get_by_registration(clean_name)
+            if cached_info is not None:
+                return cached_info
+        return self.cache.get(clean_name)
+
+    def _store_in_cache(self, clean_name: str, company_info: Dict, require_registration: bool = False) -> Dict:
+        """
+        บันทึกผลการค้นหาลงแคช (ถ้ามี) แล้วคืนผลเดิม
+
+        require_registration=True เก็บเฉพาะผลที่พบเลขทะเบียน (ใช้กับ Requests Mode ที่เดา form ของเว็บ
+        หน้าที่ตอบกลับอาจไม่ใช่ผลค้นหาจริง จึงไม่เก็บ "ไม่พบข้อมูล" ที่อาจผิดไว้ให้ทุกโหมดใช้ร่วมกัน)
+        """
+        if require_registration and not (isinstance(company_info, dict) and company_info.get("registration_number")):
+            return company_info
+        if self.cache is not None:
+            try:
+                self.cache.put(clean_name, company_info)
+            except Exception as e:
+                logger.warning(f"⚠️ บันทึกแคช DBD ไม่สำเร็จ: {e}")
+        return company_info
+
     def _post_process_company_info(self, company_info: Dict) -> Dict:
         """จัดการข้อมูลเพิ่มเติมหลังดึงเสร็จ"""
         if not isinstance(company_info, dict):
@@ -273,25 +265,20 @@ class DBDDataWarehouseBot:
         company_info = self._normalize_directors_data(company_info)
         return company_info
 
-    def search_company_info(self, company_name: str, log_callback: Optional[Callable] = None) -> Dict:
+    def search_company_info(self, company_name: str, log_callback: Optional[Callable] = None,
+                            force_refresh: bool = False) -> Dict:
         """
         ค้นหาข้อมูลบริษัทจาก DBD DataWarehouse
         
         Args:
             company_name (str): ชื่อบริษัทที่ต้องการค้นหา
             log_callback (Optional[Callable]): ฟังก์ชันสำหรับแสดง log (message, status)
+            force_refresh (bool): ไม่ใช้ข้อมูลในแคช (ค้นหาจากเว็บแล้วบันทึกทับ)
             
         Returns:
             Dict: ข้อมูลบริษัทที่พบ
         """
-        def log(message: str, status: str = "info"):
-            """Helper function สำหรับ log"""
-            if log_callback:
-                try:
-                    log_callback(message, status)
-                except:
-                    pass
-            logger.info(message)
+        log = _make_log(log_callback)
         
         try:
             # ทำความสะอาดชื่อบริษัท
@@ -302,250 +289,34 @@ class DBDDataWarehouseBot:
                 log("ไม่พบชื่อบริษัทที่ถูกต้อง", "error")
                 return {"error": "ไม่พบชื่อบริษัทที่ถูกต้อง"}
             
+            if not force_refresh:
+                cached_info = self._cached_company_info(clean_name)
+                if cached_info is not None:
+                    log("⚡ ใช้ข้อมูลจากแคช (ไม่ต้องค้นหาจากเว็บ DBD)", "success")
+                    return cached_info
+            
             if self.use_browser and self.page:
-                # ใช้ Playwright browser - รันใน thread ด้วย async
+                # ใช้ Playwright browser - ส่งไปรันบน event loop ถาวรของ browser
                 log("ใช้ Playwright Browser Mode ในการค้นหา", "info")
                 
-                def search_with_playwright_async():
-                    """รัน Playwright operations ใน thread ด้วย async"""
-                    # ใช้ event loop ที่มีอยู่หรือสร้างใหม่
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_closed():
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                    except:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                    
-                    async def async_search():
-                        try:
-                            log("🌐 กำลังเปิด Chromium Browser...", "info")
-                            log("👀 Browser จะปรากฏขึ้นมาในอีกสักครู่ - ดูการทำงานแบบเรียลไทม์ได้เลย!", "success")
-                            await asyncio.sleep(0.5)  # ให้เวลา browser เปิดก่อน
-                            
-                            log("📍 กำลังเข้าหน้าเว็บ DBD DataWarehouse...", "info")
-                            log(f"🔗 URL: {self.search_url}", "info")
-                            await self.page.goto(self.search_url, wait_until='networkidle', timeout=30000)
-                            
-                            # รอให้หน้าเว็บโหลดเสร็จ
-                            await self.page.wait_for_load_state('domcontentloaded')
-                            log("✅ โหลดหน้าเว็บเสร็จแล้ว - ดูใน Browser window ได้เลย!", "success")
-                            await asyncio.sleep(0.8)
-                            
-                            # ปิด warning modal หากมีแสดงขึ้นมา
-                            try:
-                                if await self.page.is_visible('#warningModal'):
-                                    log("⚠️ พบหน้าต่างแจ้งเตือน (warningModal) กำลังปิด...", "warning")
-                                    # หาและคลิกปุ่มปิด
-                                    close_selectors = [
-                                        '#btnWarning',
-                                        '#warningModal button.btn',
-                                        '#warningModal button',
-                                        'button:has-text("ปิด")'
-                                    ]
-                                    close_button = None
-                                    for selector in close_selectors:
-                                        try:
-                                            close_button = await self.page.query_selector(selector)
-                                            if close_button:
-                                                break
-                                        except:
-                                            continue
-                                    if close_button:
-                                        await close_button.click()
-                                        await asyncio.sleep(1)
-                                        log("✅ ปิดหน้าต่างแจ้งเตือนสำเร็จ", "success")
-                                    else:
-                                        log("⚠️ ไม่พบปุ่มปิด warningModal", "warning")
-                            except Exception as modal_error:
-                                log(f"⚠️ ปิด warningModal ไม่สำเร็จ: {modal_error}", "warning")
-
-                            log("🔍 กำลังค้นหาช่องกรอกข้อมูลในหน้าเว็บ...", "info")
-                            log("👀 ดู Browser window - จะเห็นการสแกนหา input field", "info")
-                            # หาช่องค้นหา - ลองหลายวิธี
-                            search_input = None
-                            selectors = [
-                                '#key-word',
-                                'input[name="search_value"]',
-                                'input[type="text"]',
-                                'input#search_value',
-                                'input.search-input',
-                                'input.form-control'
-                            ]
-                            
-                            for selector in selectors:
-                                try:
-                                    search_input = await self.page.wait_for_selector(selector, timeout=5000)
-                                    if search_input:
-                                        log(f"✅ พบช่องค้นหาด้วย selector: {selector}", "success")
-                                        log("👀 ดู Browser window - จะเห็นการ highlight ช่องค้นหา", "info")
-                                        break
-                                except:
-                                    continue
-                            
-                            if not search_input:
-                                # ลองหา input แรกที่เจอ
-                                try:
-                                    search_input = await self.page.query_selector('input')
-                                except:
-                                    pass
-                            
-                            if search_input:
-                                log("⌨️ กำลังกรอกชื่อบริษัท: " + clean_name, "info")
-                                log("👀 ดู Browser window - จะเห็นการพิมพ์ข้อความ", "info")
-                                await search_input.fill('')  # ล้างข้อมูลเก่า
-                                await search_input.fill(clean_name)
-                                await asyncio.sleep(1)  # เพิ่มเวลาให้เห็นการพิมพ์
-                                
-                                log("🔘 กำลังกดปุ่มค้นหา...", "info")
-                                log("👀 ดู Browser window - จะเห็นการคลิกปุ่มค้นหา", "info")
-                                
-                                # พยายามค้นหาโดยเริ่มจาก searchicon โดยตรง
-                                search_button = None
-                                direct_button = await self.page.query_selector('#searchicon')
-                                if direct_button:
-                                    search_button = direct_button
-                                    log("✅ พบปุ่มค้นหา #searchicon", "success")
-                                else:
-                                    # ลองหา selector อื่นๆ
-                                    button_selectors = [
-                                        'button[type="submit"]',
-                                        'input[type="submit"]',
-                                        'button:has-text("ค้นหา")',
-                                        'button:has-text("Search")',
-                                        '.btn-search',
-                                        '.search-btn'
-                                    ]
-                                    for selector in button_selectors:
-                                        try:
-                                            search_button = await self.page.query_selector(selector)
-                                            if search_button:
-                                                log(f"✅ พบปุ่มค้นหาด้วย selector: {selector}", "success")
-                                                break
-                                        except:
-                                            continue
-                                
-                                if search_button:
-                                    log("🔘 กำลังกดปุ่มค้นหา (ผ่านปุ่มค้นหา)", "info")
-                                    try:
-                                        await search_button.click()
-                                        await asyncio.sleep(0.4)
-                                        log("✅ กดปุ่มค้นหาสำเร็จ", "success")
-                                    except Exception as click_error:
-                                        log(f"⚠️ คลิกปุ่ม searchicon ไม่สำเร็จ: {click_error} -> ลองกด Enter", "warning")
-                                        try:
-                                            await search_input.press('Enter', timeout=5000)
-                                        except:
-                                            log("⚠️ กด Enter ไม่สำเร็จ", "warning")
-                                else:
-                                    log("⚠️ ไม่พบปุ่มค้นหา -> กด Enter แทน", "warning")
-                                    try:
-                                        await search_input.press('Enter', timeout=5000)
-                                        log("✅ กด Enter สำเร็จ", "success")
-                                    except Exception as enter_error:
-                                        log(f"⚠️ กด Enter ไม่สำเร็จ: {enter_error}", "warning")
-                                
-                                log("⏳ กำลังรอผลลัพธ์จากเว็บ...", "info")
-                                log("👀 ดู Browser window - กำลังโหลดผลลัพธ์", "info")
-                                # รอผลลัพธ์
-                                await self.page.wait_for_load_state('networkidle', timeout=15000)
-                                await asyncio.sleep(1.0)
-                                
-                                log("📊 กำลังอ่านข้อมูลผลลัพธ์...", "info")
-                                log("👀 ดู Browser window - จะเห็นผลลัพธ์ในหน้าเว็บ", "info")
-                                
-                                # ดึงข้อมูลจาก xpath โดยตรงด้วย Playwright
-                                company_info = await self.extract_company_data_from_page(clean_name)
-                                company_info = self._post_process_company_info(company_info)
-                                
-                                if company_info.get("registration_number"):
-                                    log(f"พบข้อมูลบริษัท: {company_info.get('registration_number')}", "success")
-                                else:
-                                    log("ไม่พบข้อมูลบริษัท", "warning")
-                                
-                                return company_info
-                            else:
-                                log("ไม่พบช่องกรอกข้อมูลในการค้นหา", "error")
-                                return {"error": "ไม่พบช่องกรอกข้อมูลในการค้นหา"}
-                        except Exception as e:
-                            log(f"เกิดข้อผิดพลาดใน Browser Mode: {str(e)}", "error")
-                            logger.error(f"Playwright error: {str(e)}", exc_info=True)
-                            return {"error": f"เกิดข้อผิดพลาด: {str(e)}"}
-                    
-                    return loop.run_until_complete(async_search())
-                
-                # รัน Playwright operations ใน thread
                 try:
-                    if self._executor:
-                        future = self._executor.submit(search_with_playwright_async)
-                        result = future.result(timeout=90)
-                    else:
-                        result = search_with_playwright_async()
-                    return self._post_process_company_info(result)
+                    result = self.submit(self._search_with_page(self.page, clean_name, log)).result(timeout=90)
+                    return self._store_in_cache(clean_name, self._post_process_company_info(result))
                 except Exception as e:
                     log(f"เกิดข้อผิดพลาดในการรัน Playwright: {str(e)}", "error")
                     return {"error": f"เกิดข้อผิดพลาด: {str(e)}"}
+            elif self.use_http_api:
+                # เรียก endpoint เดียวกับที่หน้าเว็บใช้ โดยไม่ต้องเปิด Chromium
+                log("ใช้ HTTP API Mode ในการค้นหา (ไม่เปิด browser)", "info")
+                return self._store_in_cache(clean_name, self._search_with_http_api(clean_name, log))
             else:
                 # ใช้ requests - ต้องใช้ browser เพราะเว็บอาจมี JavaScript protection
                 log("ใช้ Requests Mode ในการค้นหา", "info")
                 log("⚠️ หมายเหตุ: Requests อาจไม่ทำงานเนื่องจากเว็บมี JavaScript protection", "warning")
                 log("💡 แนะนำให้ใช้ Browser Mode แทน", "info")
                 
-                # ลอง GET request ก่อน
-                try:
-                    log("กำลังเข้าถึงหน้าค้นหา...", "info")
-                    response = self.session.get(self.search_url, timeout=10)
-                    
-                    if response.status_code == 200:
-                        log("ได้รับหน้าค้นหาแล้ว กำลังค้นหา...", "info")
-                        # ดูว่าเว็บต้องการอะไร - อาจต้องใช้ form หรือ JavaScript
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # ลองหา search form
-                        form = soup.find('form')
-                        if form and form.get('action'):
-                            search_url = form.get('action')
-                            if not search_url.startswith('http'):
-                                search_url = self.base_url + search_url
-                            
-                            # ส่ง POST ไปที่ form action
-                            log(f"พบ form action: {search_url}", "info")
-                            response = self.session.post(
-                                search_url,
-                                data={'search_value': clean_name},
-                                timeout=10
-                            )
-                        else:
-                            # ลองใช้ query parameter
-                            log("ลองใช้ GET with query parameters...", "info")
-                            response = self.session.get(
-                                self.search_url,
-                                params={'search_value': clean_name, 'search_type': 'company_name'},
-                                timeout=10
-                            )
-                        
-                        if response.status_code == 200:
-                            log("ได้รับข้อมูลสำเร็จ", "success")
-                            soup = BeautifulSoup(response.content, 'html.parser')
-                            company_info = self.parse_company_data(soup, clean_name)
-                            company_info = self._post_process_company_info(company_info)
-                            
-                            if company_info.get("registration_number"):
-                                log(f"พบข้อมูลบริษัท: {company_info.get('registration_number')}", "success")
-                            else:
-                                log("ไม่พบข้อมูลบริษัท", "warning")
-                            
-                            return company_info
-                        else:
-                            log(f"ไม่สามารถค้นหาได้ (Status: {response.status_code})", "error")
-                            return {"error": f"ไม่สามารถค้นหาข้อมูลได้ (Status: {response.status_code}) - แนะนำให้ใช้ Browser Mode"}
-                    else:
-                        log(f"ไม่สามารถเข้าถึงเว็บได้ (Status: {response.status_code})", "error")
-                        return {"error": f"ไม่สามารถเข้าถึง DBD DataWarehouse ได้ (Status: {response.status_code}) - แนะนำให้ใช้ Browser Mode"}
-                except Exception as e:
-                    log(f"เกิดข้อผิดพลาดในการใช้ Requests: {str(e)}", "error")
-                    return {"error": f"เกิดข้อผิดพลาด: {str(e)} - แนะนำให้ใช้ Browser Mode"}
+                return self._store_in_cache(clean_name, self._search_with_requests(clean_name, log),
+                                            require_registration=True)
                 
         except Exception as e:
             error_msg = f"เกิดข้อผิดพลาด: {str(e)}"
@@ -553,54 +324,444 @@ class DBDDataWarehouseBot:
             logger.error(f"เกิดข้อผิดพลาดในการค้นหาข้อมูลบริษัท {company_name}: {str(e)}")
             return {"error": error_msg}
     
-    def __del__(self):
-        """Close browser when object is deleted"""
+    async def _pace(self, seconds: float) -> None:
+        """หน่วงเวลาให้คนดูการทำงานใน browser ทัน (ข้ามเมื่อ fast_mode)"""
+        if not self.fast_mode:
+            await asyncio.sleep(seconds)
+
+    def _start_result_wait(self, page) -> Tuple[asyncio.Task, asyncio.Task]:
+        """
+        เริ่มรอผลการค้นหา (ต้องเรียกก่อนกดค้นหา เพื่อไม่พลาด response ที่ตอบกลับเร็ว)
+
+        Returns:
+            Tuple: (task รอแท็บข้อมูลบริษัทแสดง, task รอ XHR/fetch ของ endpoint ค้นหาของเว็บ DBD)
+        """
+        search_url = self.base_url + DBD_HTTP_SEARCH_PATH
+        profile_task = asyncio.ensure_future(
+            page.wait_for_selector(DBD_PROFILE_SELECTOR, state='visible', timeout=DBD_RESULT_TIMEOUT_MS)
+        )
+        response_task = asyncio.ensure_future(page.wait_for_event(
+            'response',
+            predicate=lambda response: (response.request.resource_type in ('xhr', 'fetch')
+                                        and response.url.startswith(search_url)),
+            timeout=DBD_RESULT_TIMEOUT_MS
+        ))
+        return profile_task, response_task
+
+    async def _finish_result_wait(self, page, profile_task: asyncio.Task,
+                                  response_task: asyncio.Task) -> Optional[bool]:
+        """
+        รอจนแท็บข้อมูลบริษัทแสดง หรือ endpoint ค้นหาตอบกลับแล้วหน้าเว็บแสดงข้อความไม่พบข้อมูล
+
+        Returns:
+            Optional[bool]: True = พบข้อมูลบริษัท, False = เว็บแจ้งว่าไม่พบ,
+            None = ยืนยันไม่ได้ (ไม่มีทั้งสองอย่างภายในเวลาที่รอ - ห้ามสรุปว่าไม่พบ)
+        """
+        no_result_task = None
         try:
-            if self.page:
-                try:
-                    def close_page():
+            await asyncio.wait({profile_task, response_task}, return_when=asyncio.FIRST_COMPLETED)
+            if not _task_succeeded(profile_task):
+                # เว็บตอบกลับแล้ว (หรือรอครบเวลา) - ให้เวลา render แท็บข้อมูลบริษัท หรือข้อความไม่พบข้อมูล
+                no_result_task = asyncio.ensure_future(page.wait_for_function(
+                    "texts => texts.some(text => document.body && document.body.innerText.includes(text))",
+                    arg=list(DBD_HTTP_NO_RESULT_TEXTS), timeout=DBD_RENDER_GRACE_SECONDS * 1000
+                ))
+                await asyncio.wait({profile_task, no_result_task}, timeout=DBD_RENDER_GRACE_SECONDS,
+                                   return_when=asyncio.FIRST_COMPLETED)
+            if _task_succeeded(profile_task):
+                return True
+            if no_result_task is not None and _task_succeeded(no_result_task):
+                return False
+            return None
+        finally:
+            for task in (profile_task, response_task, no_result_task):
+                if task is None:
+                    continue
+                if not task.done():
+                    task.cancel()
+                # อ่าน exception ทิ้ง (เช่น timeout) เพื่อไม่ให้ asyncio เตือนว่าไม่มีใครรับ
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _search_with_page(self, page, clean_name: str, log: Callable) -> Dict:
+        """ค้นหาบริษัทหนึ่งรายด้วย Playwright page ที่กำหนด (ใช้ร่วมกับ DBDLookupEngine ที่มีหลาย page)"""
+        try:
+            log("🌐 กำลังเปิด Chromium Browser...", "info")
+            log("👀 Browser จะปรากฏขึ้นมาในอีกสักครู่ - ดูการทำงานแบบเรียลไทม์ได้เลย!", "success")
+            await self._pace(0.5)  # ให้คนดูเห็น browser ก่อน
+
+            log("📍 กำลังเข้าหน้าเว็บ DBD DataWarehouse...", "info")
+            log(f"🔗 URL: {self.search_url}", "info")
+            # ไม่รอ networkidle (เว็บมี analytics ที่ยิงต่อเนื่อง) - รอ DOM แล้วรอช่องค้นหาแสดงแทน
+            await page.goto(self.search_url, wait_until='domcontentloaded', timeout=30000)
+            try:
+                await page.wait_for_selector(DBD_SEARCH_INPUT_SELECTOR, state='visible', timeout=10000)
+            except Exception:
+                log(f"⚠️ ไม่พบ {DBD_SEARCH_INPUT_SELECTOR} - จะลองหาช่องค้นหาแบบอื่น", "warning")
+            log("✅ โหลดหน้าเว็บเสร็จแล้ว - ดูใน Browser window ได้เลย!", "success")
+
+            # ปิด warning modal หากมีแสดงขึ้นมา
+            try:
+                if await page.is_visible('#warningModal'):
+                    log("⚠️ พบหน้าต่างแจ้งเตือน (warningModal) กำลังปิด...", "warning")
+                    # หาและคลิกปุ่มปิด
+                    close_selectors = [
+                        '#btnWarning',
+                        '#warningModal button.btn',
+                        '#warningModal button',
+                        'button:has-text("ปิด")'
+                    ]
+                    close_button = None
+                    for selector in close_selectors:
                         try:
-                            self.page.close()
+                            close_button = await page.query_selector(selector)
+                            if close_button:
+                                break
                         except:
-                            pass
-                    if self._executor:
-                        self._executor.submit(close_page).result(timeout=5)
+                            continue
+                    if close_button:
+                        await close_button.click()
+                        await page.wait_for_selector('#warningModal', state='hidden', timeout=5000)
+                        log("✅ ปิดหน้าต่างแจ้งเตือนสำเร็จ", "success")
                     else:
-                        close_page()
+                        log("⚠️ ไม่พบปุ่มปิด warningModal", "warning")
+            except Exception as modal_error:
+                log(f"⚠️ ปิด warningModal ไม่สำเร็จ: {modal_error}", "warning")
+
+            log("🔍 กำลังค้นหาช่องกรอกข้อมูลในหน้าเว็บ...", "info")
+            log("👀 ดู Browser window - จะเห็นการสแกนหา input field", "info")
+            # หาช่องค้นหา - ลองหลายวิธี
+            search_input = None
+            selectors = [
+                DBD_SEARCH_INPUT_SELECTOR,
+                'input[name="search_value"]',
+                'input[type="text"]',
+                'input#search_value',
+                'input.search-input',
+                'input.form-control'
+            ]
+
+            for selector in selectors:
+                try:
+                    # ช่องแรกรอได้นาน (หน้าเว็บอาจยัง render ไม่เสร็จ) ช่องสำรองแค่ตรวจว่ามีหรือไม่
+                    timeout = 5000 if selector == DBD_SEARCH_INPUT_SELECTOR else 1000
+                    search_input = await page.wait_for_selector(selector, timeout=timeout)
+                    if search_input:
+                        log(f"✅ พบช่องค้นหาด้วย selector: {selector}", "success")
+                        log("👀 ดู Browser window - จะเห็นการ highlight ช่องค้นหา", "info")
+                        break
                 except:
-                    pass
-            if self.browser:
+                    continue
+
+            if not search_input:
+                # ลองหา input แรกที่เจอ
                 try:
-                    def close_browser():
-                        try:
-                            self.browser.close()
-                        except:
-                            pass
-                    if self._executor:
-                        self._executor.submit(close_browser).result(timeout=5)
-                    else:
-                        close_browser()
+                    search_input = await page.query_selector('input')
                 except:
                     pass
-            if self.playwright:
-                try:
-                    def stop_playwright():
+
+            if search_input:
+                log("⌨️ กำลังกรอกชื่อบริษัท: " + clean_name, "info")
+                log("👀 ดู Browser window - จะเห็นการพิมพ์ข้อความ", "info")
+                await search_input.fill('')  # ล้างข้อมูลเก่า
+                await search_input.fill(clean_name)
+                await self._pace(1)  # ให้คนดูเห็นการพิมพ์
+
+                log("🔘 กำลังกดปุ่มค้นหา...", "info")
+                log("👀 ดู Browser window - จะเห็นการคลิกปุ่มค้นหา", "info")
+
+                # พยายามค้นหาโดยเริ่มจาก searchicon โดยตรง
+                search_button = None
+                direct_button = await page.query_selector('#searchicon')
+                if direct_button:
+                    search_button = direct_button
+                    log("✅ พบปุ่มค้นหา #searchicon", "success")
+                else:
+                    # ลองหา selector อื่นๆ
+                    button_selectors = [
+                        'button[type="submit"]',
+                        'input[type="submit"]',
+                        'button:has-text("ค้นหา")',
+                        'button:has-text("Search")',
+                        '.btn-search',
+                        '.search-btn'
+                    ]
+                    for selector in button_selectors:
                         try:
-                            self.playwright.stop()
+                            search_button = await page.query_selector(selector)
+                            if search_button:
+                                log(f"✅ พบปุ่มค้นหาด้วย selector: {selector}", "success")
+                                break
                         except:
-                            pass
-                    if self._executor:
-                        self._executor.submit(stop_playwright).result(timeout=5)
-                        self._executor.shutdown(wait=False)
+                            continue
+
+                # เริ่มรอผลลัพธ์ก่อนกดค้นหา (แท็บข้อมูลบริษัท หรือ XHR ผลการค้นหาจากเว็บ DBD)
+                result_wait = self._start_result_wait(page)
+
+                if search_button:
+                    log("🔘 กำลังกดปุ่มค้นหา (ผ่านปุ่มค้นหา)", "info")
+                    try:
+                        await search_button.click()
+                        log("✅ กดปุ่มค้นหาสำเร็จ", "success")
+                    except Exception as click_error:
+                        log(f"⚠️ คลิกปุ่ม searchicon ไม่สำเร็จ: {click_error} -> ลองกด Enter", "warning")
+                        try:
+                            await search_input.press('Enter', timeout=5000)
+                        except:
+                            log("⚠️ กด Enter ไม่สำเร็จ", "warning")
+                else:
+                    log("⚠️ ไม่พบปุ่มค้นหา -> กด Enter แทน", "warning")
+                    try:
+                        await search_input.press('Enter', timeout=5000)
+                        log("✅ กด Enter สำเร็จ", "success")
+                    except Exception as enter_error:
+                        log(f"⚠️ กด Enter ไม่สำเร็จ: {enter_error}", "warning")
+
+                log("⏳ กำลังรอผลลัพธ์จากเว็บ...", "info")
+                log("👀 ดู Browser window - กำลังโหลดผลลัพธ์", "info")
+                # รอผลลัพธ์จากเว็บ (ไม่ใช้ networkidle และไม่หน่วงเวลาตายตัว)
+                result_found = await self._finish_result_wait(page, *result_wait)
+                if result_found is False:
+                    log("🔍 เว็บแจ้งว่าไม่พบข้อมูลบริษัท", "warning")
+                elif result_found is None:
+                    log("⚠️ ยังไม่เห็นทั้งแท็บข้อมูลบริษัทและข้อความไม่พบข้อมูล", "warning")
+
+                log("📊 กำลังอ่านข้อมูลผลลัพธ์...", "info")
+                log("👀 ดู Browser window - จะเห็นผลลัพธ์ในหน้าเว็บ", "info")
+
+                # ดึงข้อมูลจาก xpath โดยตรงด้วย Playwright
+                company_info = await self.extract_company_data_from_page(clean_name, page=page)
+                company_info = self._post_process_company_info(company_info)
+
+                if company_info.get("registration_number"):
+                    log(f"พบข้อมูลบริษัท: {company_info.get('registration_number')}", "success")
+                elif result_found is None:
+                    # ไม่คืนเป็น "ไม่พบข้อมูล" เพราะจะถูกเก็บในแคชทั้งที่เว็บอาจยัง render ไม่เสร็จ
+                    log("ไม่สามารถยืนยันผลการค้นหาได้ - ลองค้นหาใหม่อีกครั้ง", "error")
+                    return {"error": "ไม่ได้รับผลการค้นหาที่ยืนยันได้จากเว็บ DBD ภายในเวลาที่รอ - ลองค้นหาใหม่อีกครั้ง"}
+                else:
+                    log("ไม่พบข้อมูลบริษัท", "warning")
+
+                return company_info
+            else:
+                log("ไม่พบช่องกรอกข้อมูลในการค้นหา", "error")
+                return {"error": "ไม่พบช่องกรอกข้อมูลในการค้นหา"}
+        except Exception as e:
+            log(f"เกิดข้อผิดพลาดใน Browser Mode: {str(e)}", "error")
+            logger.error(f"Playwright error: {str(e)}", exc_info=True)
+            return {"error": f"เกิดข้อผิดพลาด: {str(e)}"}
+
+    def _search_with_requests(self, clean_name: str, log: Callable) -> Dict:
+        """ค้นหาบริษัทหนึ่งรายด้วย requests session ของ bot นี้"""
+        # ลอง GET request ก่อน
+        try:
+            log("กำลังเข้าถึงหน้าค้นหา...", "info")
+            response = self.session.get(self.search_url, timeout=10)
+
+            if response.status_code == 200:
+                log("ได้รับหน้าค้นหาแล้ว กำลังค้นหา...", "info")
+                # ดูว่าเว็บต้องการอะไร - อาจต้องใช้ form หรือ JavaScript
+                soup = BeautifulSoup(response.content, 'html.parser')
+
+                # ลองหา search form
+                form = soup.find('form')
+                if form and form.get('action'):
+                    search_url = form.get('action')
+                    if not search_url.startswith('http'):
+                        search_url = self.base_url + search_url
+
+                    # ส่ง POST ไปที่ form action
+                    log(f"พบ form action: {search_url}", "info")
+                    response = self.session.post(
+                        search_url,
+                        data={'search_value': clean_name},
+                        timeout=10
+                    )
+                else:
+                    # ลองใช้ query parameter
+                    log("ลองใช้ GET with query parameters...", "info")
+                    response = self.session.get(
+                        self.search_url,
+                        params={'search_value': clean_name, 'search_type': 'company_name'},
+                        timeout=10
+                    )
+
+                if response.status_code == 200:
+                    log("ได้รับข้อมูลสำเร็จ", "success")
+                    soup = BeautifulSoup(response.content, 'html.parser')
+                    company_info = self.parse_company_data(soup, clean_name)
+                    company_info = self._post_process_company_info(company_info)
+
+                    if company_info.get("registration_number"):
+                        log(f"พบข้อมูลบริษัท: {company_info.get('registration_number')}", "success")
                     else:
-                        stop_playwright()
-                except:
-                    pass
-            if self._executor:
-                try:
-                    self._executor.shutdown(wait=False)
-                except:
-                    pass
+                        log("ไม่พบข้อมูลบริษัท", "warning")
+
+                    return company_info
+                else:
+                    log(f"ไม่สามารถค้นหาได้ (Status: {response.status_code})", "error")
+                    return {"error": f"ไม่สามารถค้นหาข้อมูลได้ (Status: {response.status_code}) - แนะนำให้ใช้ Browser Mode"}
+            else:
+                log(f"ไม่สามารถเข้าถึงเว็บได้ (Status: {response.status_code})", "error")
+                return {"error": f"ไม่สามารถเข้าถึง DBD DataWarehouse ได้ (Status: {response.status_code}) - แนะนำให้ใช้ Browser Mode"}
+        except Exception as e:
+            log(f"เกิดข้อผิดพลาดในการใช้ Requests: {str(e)}", "error")
+            return {"error": f"เกิดข้อผิดพลาด: {str(e)} - แนะนำให้ใช้ Browser Mode"}
+
+    def _ensure_http_session(self) -> None:
+        """เปิดหน้าแรกครั้งเดียวต่อ session เพื่อรับ cookie และ CSRF token ที่ endpoint ค้นหาต้องการ"""
+        if getattr(self, "_http_ready", False):
+            return
+        response = self.session.get(self.search_url, timeout=DBD_HTTP_TIMEOUT)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.content, 'html.parser')
+        token = soup.find('meta', attrs={'name': '_csrf'})
+        header = soup.find('meta', attrs={'name': '_csrf_header'})
+        self._http_headers = {
+            'Accept': 'application/json, text/javascript, */*; q=0.01',
+            'X-Requested-With': 'XMLHttpRequest',
+            'Referer': self.search_url,
+            'Origin': self.base_url
+        }
+        if token is not None and token.get('content'):
+            self._http_headers[header.get('content') if header is not None else 'X-CSRF-TOKEN'] = token['content']
+        self._http_ready = True
+
+    def _parse_http_search_results(self, response) -> Optional[List[Tuple[str, str]]]:
+        """
+        แปลงผลของ endpoint ค้นหา (JSON หรือ HTML) เป็นรายการ (ชื่อนิติบุคคล, เลขทะเบียน 13 หลัก)
+
+        คืน [] เมื่อเป็นผลค้นหาที่ไม่พบบริษัท และคืน None เมื่ออ่านรูปแบบของหน้าไม่ออก
+        (เช่น JSON ที่ไม่มีรายการเลย หรือ HTML ที่ไม่ใช่หน้าผลค้นหา) เพื่อไม่ให้ถูกเก็บเป็น "ไม่พบข้อมูล"
+        """
+        results = []
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+
+        if payload is not None:
+            # ชื่อ field เปลี่ยนได้ - หา dict ที่มีเลข 13 หลัก และใช้ field ที่ชื่อมีคำว่า name เป็นชื่อบริษัท
+            has_list = False
+            stack = [payload]
+            while stack:
+                item = stack.pop()
+                if isinstance(item, list):
+                    has_list = True
+                    stack.extend(reversed(item))
+                elif isinstance(item, dict):
+                    registration_number = next(
+                        (str(value) for value in item.values() if re.fullmatch(r"\d{13}", str(value))), ""
+                    )
+                    if registration_number:
+                        name = next((str(value) for key, value in item.items()
+                                     if 'name' in str(key).lower() and isinstance(value, str) and value.strip()), "")
+                        results.append((name.strip(), registration_number))
+                    else:
+                        stack.extend(reversed([v for v in item.values() if isinstance(v, (list, dict))]))
+            return results if has_list else None
+
+        soup = BeautifulSoup(response.content, 'html.parser')
+        for link in soup.find_all('a', href=True):
+            match = _PROFILE_LINK_RE.search(link['href'])
+            if match and match.group(2) not in {number for _, number in results}:
+                results.append((_html_inner_text(link), match.group(2)))
+        if not results and not any(text in soup.get_text() for text in DBD_HTTP_NO_RESULT_TEXTS):
+            return None
+        return results
+
+    def _search_with_http_api(self, clean_name: str, log: Callable) -> Dict:
+        """
+        ค้นหาด้วย HTTP ตรง (ไม่เปิด browser): เรียก endpoint ค้นหาและหน้าข้อมูลบริษัทแบบเดียวกับที่หน้าเว็บเรียก
+
+        ใช้ session ที่เก็บ connection ไว้ใช้ซ้ำ แล้วแปลงหน้า profile ด้วย parse_profile_html
+        """
+        try:
+            self._ensure_http_session()
+
+            if re.fullmatch(r"\d{13}", clean_name):
+                # ค้นด้วยเลขทะเบียน - ไปหน้าข้อมูลบริษัทได้เลย
+                registration_number = clean_name
+            else:
+                log("กำลังค้นหาผ่าน HTTP API...", "info")
+                response = self.session.post(
+                    self.base_url + DBD_HTTP_SEARCH_PATH,
+                    data={DBD_HTTP_SEARCH_FIELD: clean_name},
+                    headers=self._http_headers,
+                    timeout=DBD_HTTP_TIMEOUT
+                )
+                if response.status_code != 200:
+                    log(f"ไม่สามารถค้นหาได้ (Status: {response.status_code})", "error")
+                    return {"error": f"ไม่สามารถค้นหาข้อมูลได้ (Status: {response.status_code}) - แนะนำให้ใช้ Browser Mode"}
+
+                if DBD_PROFILE_SELECTOR.lstrip('#') in response.text:
+                    # ผลค้นหาตรงตัวเดียว เว็บส่งหน้าข้อมูลบริษัทกลับมาเลย
+                    return self._finish_http_profile(response.text, clean_name, log)
+
+                candidates = self._parse_http_search_results(response)
+                if candidates is None:
+                    log("อ่านผลการค้นหาจาก HTTP API ไม่ได้", "error")
+                    return {"error": "อ่านผลการค้นหาจาก HTTP API ไม่ได้ (รูปแบบหน้าเว็บไม่ตรง) - แนะนำให้ใช้ Browser Mode"}
+                if not candidates:
+                    log("ไม่พบข้อมูลบริษัท", "warning")
+                    return self._post_process_company_info(self._empty_profile_info(clean_name))
+
+                # เลือกรายการที่ชื่อตรงกันก่อน ไม่เช่นนั้นใช้รายการแรก (เหมือนคลิกผลแรกใน browser)
+                registration_number = next(
+                    (number for name, number in candidates if self.clean_company_name(name) == clean_name),
+                    candidates[0][1]
+                )
+
+            profile_url = self.base_url + DBD_HTTP_PROFILE_PATH.format(
+                juristic_type=registration_number[3], registration_number=registration_number
+            )
+            response = self.session.get(profile_url, headers={'Referer': self.search_url}, timeout=DBD_HTTP_TIMEOUT)
+            if response.status_code != 200:
+                log(f"ไม่สามารถเปิดหน้าข้อมูลบริษัทได้ (Status: {response.status_code})", "error")
+                return {"error": f"ไม่สามารถเปิดหน้าข้อมูลบริษัทได้ (Status: {response.status_code}) - แนะนำให้ใช้ Browser Mode"}
+            if DBD_PROFILE_SELECTOR.lstrip('#') not in response.text:
+                log("หน้าข้อมูลบริษัทจาก HTTP API ไม่มีแท็บข้อมูลบริษัท", "error")
+                return {"error": "อ่านหน้าข้อมูลบริษัทจาก HTTP API ไม่ได้ (รูปแบบหน้าเว็บไม่ตรง) - แนะนำให้ใช้ Browser Mode"}
+
+            company_info = self._finish_http_profile(response.text, clean_name, log)
+            if not company_info.get("registration_number"):
+                company_info["registration_number"] = registration_number
+            return company_info
+        except Exception as e:
+            # cookie/token อาจหมดอายุ - เริ่ม session ใหม่ในครั้งถัดไป
+            self._http_ready = False
+            log(f"เกิดข้อผิดพลาดในการใช้ HTTP API: {str(e)}", "error")
+            return {"error": f"เกิดข้อผิดพลาด: {str(e)} - แนะนำให้ใช้ Browser Mode"}
+
+    def _finish_http_profile(self, html: str, clean_name: str, log: Callable) -> Dict:
+        """แปลงหน้าข้อมูลบริษัทที่ได้จาก HTTP แล้ว log ผลเหมือนโหมดอื่น"""
+        company_info = self._post_process_company_info(self.parse_profile_html(html, clean_name))
+        if company_info.get("registration_number"):
+            log(f"พบข้อมูลบริษัท: {company_info.get('registration_number')}", "success")
+        else:
+            log("ไม่พบข้อมูลบริษัท", "warning")
+        return company_info
+
+    def submit(self, coro) -> Future:
+        """ส่ง coroutine ไปรันบน event loop ถาวรของ browser (คืน concurrent.futures.Future)"""
+        if self._lease is None:
+            coro.close()
+            raise RuntimeError("Browser ยังไม่ได้เปิด")
+        return self._lease.pool.submit(coro)
+
+    def close(self) -> None:
+        """คืน context/page ให้ browser pool (Chromium ยังเปิดค้างไว้ให้ bot ตัวถัดไปใช้)"""
+        if self._lease is not None:
+            self._lease.release()
+            self._lease = None
+        self.page = None
+        self.browser = None
+
+    def __del__(self):
+        """คืน browser context เมื่อ object ถูกลบ (ไม่รอผล เพราะอาจถูกเรียกจาก thread ของ pool เอง)"""
+        try:
+            if self._lease is not None:
+                self._lease.pool.release(self._lease, wait=False)
+                self._lease = None
         except:
             pass
     
@@ -666,53 +827,194 @@ class DBDDataWarehouseBot:
 
         return results
 
-    async def extract_company_data_from_page(self, company_name: str) -> Dict:
+    def _empty_profile_info(self, company_name: str) -> Dict:
+        """company_info เริ่มต้นของหน้าข้อมูลบริษัท (ทุก key ที่หน้า profile อาจมี)"""
+        return {
+            "company_name": company_name,
+            "registration_number": "",
+            "business_type": "",
+            "status": "",
+            "registered_capital": "",
+            "address": "",
+            "phone": "",
+            "email": "",
+            "found_date": "",
+            "last_update": "",
+            "directors": "",
+            "authorized_signatories": "",
+            "business_type_registration": "",
+            "business_type_registration_objective": "",
+            "business_type_registration_raw": "",
+            "business_type_latest": "",
+            "business_type_latest_objective": "",
+            "business_type_latest_raw": "",
+            "directors_list": []
+        }
+
+    def _parse_name_registration_text(self, name_reg_text: str, company_info: Dict) -> None:
+        """แยกชื่อนิติบุคคลและเลขทะเบียนนิติบุคคลจากข้อความส่วนหัวของหน้าข้อมูลบริษัท"""
+        lines = name_reg_text.strip().split('\n')
+        for line in lines:
+            line = line.strip()
+            if 'ชื่อนิติบุคคล' in line:
+                if ':' in line:
+                    company_info["company_name"] = line.split(':', 1)[1].strip()
+                elif not company_info["company_name"]:
+                    company_info["company_name"] = line.replace('ชื่อนิติบุคคล', '').strip()
+            elif 'เลขทะเบียนนิติบุคคล' in line:
+                if ':' in line:
+                    company_info["registration_number"] = line.split(':', 1)[1].strip()
+                elif not company_info["registration_number"]:
+                    company_info["registration_number"] = line.replace('เลขทะเบียนนิติบุคคล', '').strip()
+
+    def _parse_company_details_text(self, info_text: str, company_info: Dict) -> None:
+        """แยกรายละเอียดนิติบุคคล (ประเภท สถานะ ทุน ที่ตั้ง ฯลฯ) จากข้อความส่วนข้อมูลนิติบุคคล"""
+        company_info["company_details"] = info_text
+        
+        # แยกข้อมูลสำคัญ - แยกรายละเอียดทั้งหมด
+        current_section = None
+        label_map = {
+            "ประเภทนิติบุคคล": "business_type",
+            "สถานะนิติบุคคล": "status",
+            "วันที่จดทะเบียนจัดตั้ง": "found_date",
+            "ทุนจดทะเบียน": "registered_capital",
+            "เลขทะเบียนเดิม": "old_registration_number",
+            "กลุ่มธุรกิจ": "business_group",
+            "ขนาดธุรกิจ": "business_size",
+            "ปีที่ส่งงบการเงิน": "financial_years",
+            "ที่ตั้งสำนักงานแห่งใหญ่": "address",
+            "Website": "website"
+        }
+
+        pending_label = None
+
+        for line in info_text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            
+            # ตรวจจับหัวข้อหลัก (ไม่มี ":")
+            if 'ข้อมูลนิติบุคคล' in line and ':' not in line:
+                current_section = "company_info"
+                continue
+            elif 'กลุ่มธุรกิจ' in line and ':' not in line:
+                current_section = "business_group"
+                continue
+            elif 'ปีที่ส่งงบการเงิน' in line and ':' not in line:
+                current_section = "financial_years"
+                if '(คลิกที่ปีเพื่อดูงบการเงิน)' in info_text:
+                    company_info["financial_years_note"] = "(คลิกที่ปีเพื่อดูงบการเงิน)"
+                continue
+            elif 'ที่ตั้งสำนักงานแห่งใหญ่' in line and ':' not in line:
+                current_section = "address"
+                continue
+            elif 'Website' in line and ':' not in line:
+                current_section = "website"
+                continue
+            
+            normalized = line.replace(':', '').strip()
+            if normalized in label_map:
+                pending_label = label_map[normalized]
+                value = ""
+                if ':' in line:
+                    value = line.split(':', 1)[1].strip()
+
+                if value:
+                    company_info[pending_label] = value
+                    pending_label = None
+                else:
+                    if pending_label == "financial_years":
+                        company_info[pending_label] = ""
+                    elif pending_label == "address":
+                        if not company_info.get("address"):
+                            company_info["address"] = ""
+                    else:
+                        company_info[pending_label] = ""
+                continue
+
+            # แยกข้อมูลที่มี ":"
+            if ':' in line:
+                key, value = line.split(':', 1)
+                key = key.strip()
+                value = value.strip()
+                
+                if 'ประเภทนิติบุคคล' in key:
+                    company_info["business_type"] = value
+                elif 'สถานะนิติบุคคล' in key:
+                    company_info["status"] = value
+                elif 'ทุนจดทะเบียน' in key:
+                    company_info["registered_capital"] = value
+                elif 'วันที่จดทะเบียนจัดตั้ง' in key:
+                    company_info["found_date"] = value
+                elif 'เลขทะเบียนเดิม' in key:
+                    company_info["old_registration_number"] = value
+                elif 'กลุ่มธุรกิจ' in key or current_section == "business_group":
+                    company_info["business_group"] = value
+                elif 'ขนาดธุรกิจ' in key:
+                    company_info["business_size"] = value
+                elif 'ปีที่ส่งงบการเงิน' in key or current_section == "financial_years":
+                    # ดึงปีทั้งหมด
+                    years = [y.strip() for y in value.split() if y.strip().isdigit()]
+                    company_info["financial_years"] = ' '.join(years) if years else value
+                elif 'ที่ตั้งสำนักงานแห่งใหญ่' in key or current_section == "address":
+                    company_info["address"] = value
+                elif 'Website' in key or current_section == "website":
+                    company_info["website"] = value
+            else:
+                if pending_label:
+                    target_key = pending_label
+                    if target_key == "financial_years":
+                        existing = company_info.get(target_key, "")
+                        combined = f"{existing} {line}".strip()
+                        company_info[target_key] = combined
+                    elif target_key == "address":
+                        existing = company_info.get(target_key, "")
+                        if existing:
+                            company_info[target_key] = f"{existing} {line}".strip()
+                        else:
+                            company_info[target_key] = line
+                    else:
+                        if company_info.get(target_key):
+                            company_info[target_key] = f"{company_info[target_key]} {line}".strip()
+                        else:
+                            company_info[target_key] = line
+                    pending_label = None
+                elif current_section == "address":
+                    if company_info.get("address"):
+                        company_info["address"] += " " + line
+                    else:
+                        company_info["address"] = line
+
+    def _assign_card_data(self, company_info: Dict, raw_text: str, type_key: str, objective_key: str,
+                          raw_key: str, context: str) -> bool:
+        """แยกประเภทธุรกิจ/วัตถุประสงค์จากข้อความการ์ด แล้วเก็บลง company_info (คืน False ถ้าไม่มีข้อความ)"""
+        if not raw_text:
+            return False
+        company_info[raw_key] = raw_text
+        parsed = self._parse_card_info_text(raw_text, {
+            "ประเภทธุรกิจ": "type",
+            "วัตถุประสงค์": "objective"
+        })
+        company_info[type_key] = parsed.get("type", "")
+        company_info[objective_key] = parsed.get("objective", "")
+        logger.info(f"✅ ดึง{context}สำเร็จ")
+        return True
+
+    async def extract_company_data_from_page(self, company_name: str, page=None) -> Dict:
         """
-        ดึงข้อมูลบริษัทจากหน้าเว็บโดยใช้ XPath
+        ดึงข้อมูลบริษัทจากหน้าเว็บโดยใช้ XPath (page = None ใช้ self.page)
         """
+        page = page or self.page
         try:
-            company_info = {
-                "company_name": company_name,
-                "registration_number": "",
-                "business_type": "",
-                "status": "",
-                "registered_capital": "",
-                "address": "",
-                "phone": "",
-                "email": "",
-                "found_date": "",
-                "last_update": "",
-                "directors": "",
-                "authorized_signatories": "",
-                "business_type_registration": "",
-                "business_type_registration_objective": "",
-                "business_type_registration_raw": "",
-                "business_type_latest": "",
-                "business_type_latest_objective": "",
-                "business_type_latest_raw": "",
-                "directors_list": []
-            }
+            company_info = self._empty_profile_info(company_name)
             
             # 1. ดึงชื่อนิติบุคคลและเลขทะเบียนนิติบุคคล จาก xpath: //*[@id="companyProfileTab1"]/div[1]/div[1]/div
             try:
-                name_reg_element = self.page.locator('//*[@id="companyProfileTab1"]/div[1]/div[1]/div').first
+                name_reg_element = page.locator('//*[@id="companyProfileTab1"]/div[1]/div[1]/div').first
                 if await name_reg_element.is_visible(timeout=3000):
                     name_reg_text = await name_reg_element.inner_text()
                     
-                    # แยกชื่อและเลขทะเบียน
-                    lines = name_reg_text.strip().split('\n')
-                    for line in lines:
-                        line = line.strip()
-                        if 'ชื่อนิติบุคคล' in line:
-                            if ':' in line:
-                                company_info["company_name"] = line.split(':', 1)[1].strip()
-                            elif not company_info["company_name"]:
-                                company_info["company_name"] = line.replace('ชื่อนิติบุคคล', '').strip()
-                        elif 'เลขทะเบียนนิติบุคคล' in line:
-                            if ':' in line:
-                                company_info["registration_number"] = line.split(':', 1)[1].strip()
-                            elif not company_info["registration_number"]:
-                                company_info["registration_number"] = line.replace('เลขทะเบียนนิติบุคคล', '').strip()
+                    self._parse_name_registration_text(name_reg_text, company_info)
                     
                     logger.info(f"✅ ดึงชื่อและเลขทะเบียน: ชื่อ={company_info.get('company_name', 'N/A')}, เลขทะเบียน={company_info.get('registration_number', 'N/A')}")
             except Exception as e:
@@ -720,124 +1022,10 @@ class DBDDataWarehouseBot:
             
             # 2. ดึงข้อมูลนิติบุคคลทั้งหมด: //*[@id="companyProfileTab1"]/div[2]/div[1]/div[1]/div
             try:
-                info_element = self.page.locator('//*[@id="companyProfileTab1"]/div[2]/div[1]/div[1]/div').first
+                info_element = page.locator('//*[@id="companyProfileTab1"]/div[2]/div[1]/div[1]/div').first
                 if await info_element.is_visible(timeout=3000):
                     info_text = await info_element.inner_text()
-                    company_info["company_details"] = info_text
-                    
-                    # แยกข้อมูลสำคัญ - แยกรายละเอียดทั้งหมด
-                    current_section = None
-                    label_map = {
-                        "ประเภทนิติบุคคล": "business_type",
-                        "สถานะนิติบุคคล": "status",
-                        "วันที่จดทะเบียนจัดตั้ง": "found_date",
-                        "ทุนจดทะเบียน": "registered_capital",
-                        "เลขทะเบียนเดิม": "old_registration_number",
-                        "กลุ่มธุรกิจ": "business_group",
-                        "ขนาดธุรกิจ": "business_size",
-                        "ปีที่ส่งงบการเงิน": "financial_years",
-                        "ที่ตั้งสำนักงานแห่งใหญ่": "address",
-                        "Website": "website"
-                    }
-
-                    pending_label = None
-
-                    for line in info_text.split('\n'):
-                        line = line.strip()
-                        if not line:
-                            continue
-                        
-                        # ตรวจจับหัวข้อหลัก (ไม่มี ":")
-                        if 'ข้อมูลนิติบุคคล' in line and ':' not in line:
-                            current_section = "company_info"
-                            continue
-                        elif 'กลุ่มธุรกิจ' in line and ':' not in line:
-                            current_section = "business_group"
-                            continue
-                        elif 'ปีที่ส่งงบการเงิน' in line and ':' not in line:
-                            current_section = "financial_years"
-                            if '(คลิกที่ปีเพื่อดูงบการเงิน)' in info_text:
-                                company_info["financial_years_note"] = "(คลิกที่ปีเพื่อดูงบการเงิน)"
-                            continue
-                        elif 'ที่ตั้งสำนักงานแห่งใหญ่' in line and ':' not in line:
-                            current_section = "address"
-                            continue
-                        elif 'Website' in line and ':' not in line:
-                            current_section = "website"
-                            continue
-                        
-                        normalized = line.replace(':', '').strip()
-                        if normalized in label_map:
-                            pending_label = label_map[normalized]
-                            value = ""
-                            if ':' in line:
-                                value = line.split(':', 1)[1].strip()
-
-                            if value:
-                                company_info[pending_label] = value
-                                pending_label = None
-                            else:
-                                if pending_label == "financial_years":
-                                    company_info[pending_label] = ""
-                                elif pending_label == "address":
-                                    if not company_info.get("address"):
-                                        company_info["address"] = ""
-                                else:
-                                    company_info[pending_label] = ""
-                            continue
-
-                        # แยกข้อมูลที่มี ":"
-                        if ':' in line:
-                            key, value = line.split(':', 1)
-                            key = key.strip()
-                            value = value.strip()
-                            
-                            if 'ประเภทนิติบุคคล' in key:
-                                company_info["business_type"] = value
-                            elif 'สถานะนิติบุคคล' in key:
-                                company_info["status"] = value
-                            elif 'ทุนจดทะเบียน' in key:
-                                company_info["registered_capital"] = value
-                            elif 'วันที่จดทะเบียนจัดตั้ง' in key:
-                                company_info["found_date"] = value
-                            elif 'เลขทะเบียนเดิม' in key:
-                                company_info["old_registration_number"] = value
-                            elif 'กลุ่มธุรกิจ' in key or current_section == "business_group":
-                                company_info["business_group"] = value
-                            elif 'ขนาดธุรกิจ' in key:
-                                company_info["business_size"] = value
-                            elif 'ปีที่ส่งงบการเงิน' in key or current_section == "financial_years":
-                                # ดึงปีทั้งหมด
-                                years = [y.strip() for y in value.split() if y.strip().isdigit()]
-                                company_info["financial_years"] = ' '.join(years) if years else value
-                            elif 'ที่ตั้งสำนักงานแห่งใหญ่' in key or current_section == "address":
-                                company_info["address"] = value
-                            elif 'Website' in key or current_section == "website":
-                                company_info["website"] = value
-                        else:
-                            if pending_label:
-                                target_key = pending_label
-                                if target_key == "financial_years":
-                                    existing = company_info.get(target_key, "")
-                                    combined = f"{existing} {line}".strip()
-                                    company_info[target_key] = combined
-                                elif target_key == "address":
-                                    existing = company_info.get(target_key, "")
-                                    if existing:
-                                        company_info[target_key] = f"{existing} {line}".strip()
-                                    else:
-                                        company_info[target_key] = line
-                                else:
-                                    if company_info.get(target_key):
-                                        company_info[target_key] = f"{company_info[target_key]} {line}".strip()
-                                    else:
-                                        company_info[target_key] = line
-                                pending_label = None
-                            elif current_section == "address":
-                                if company_info.get("address"):
-                                    company_info["address"] += " " + line
-                                else:
-                                    company_info["address"] = line
+                    self._parse_company_details_text(info_text, company_info)
                     
                     logger.info("✅ ดึงข้อมูลนิติบุคคลสำเร็จ")
             except Exception as e:
@@ -845,7 +1033,7 @@ class DBDDataWarehouseBot:
             
             # 3. ดึงรายชื่อกรรมการ: //*[@id="companyProfileTab1"]/div[2]/div[1]/div[2]/div
             try:
-                directors_element = self.page.locator('//*[@id="companyProfileTab1"]/div[2]/div[1]/div[2]/div').first
+                directors_element = page.locator('//*[@id="companyProfileTab1"]/div[2]/div[1]/div[2]/div').first
                 if await directors_element.is_visible(timeout=3000):
                     directors_text = await directors_element.inner_text()
                     company_info["directors"] = directors_text
@@ -874,7 +1062,7 @@ class DBDDataWarehouseBot:
             
             # 4. ดึงข้อมูลกรรมการลงชื่อผูกพัน: //*[@id="companyProfileTab1"]/div[2]/div[1]/div[3]/div[1]
             try:
-                auth_element = self.page.locator('//*[@id="companyProfileTab1"]/div[2]/div[1]/div[3]/div[1]').first
+                auth_element = page.locator('//*[@id="companyProfileTab1"]/div[2]/div[1]/div[3]/div[1]').first
                 if await auth_element.is_visible(timeout=3000):
                     auth_text = await auth_element.inner_text()
                     company_info["authorized_signatories"] = auth_text
@@ -884,20 +1072,7 @@ class DBDDataWarehouseBot:
             
             # 5. ดึงข้อมูลประเภทธุรกิจ (card-infos)
             try:
-                card_infos_locator = self.page.locator('#companyProfileTab1 .card-infos')
-
-                def assign_card_data(raw_text: str, type_key: str, objective_key: str, raw_key: str, context: str) -> bool:
-                    if not raw_text:
-                        return False
-                    company_info[raw_key] = raw_text
-                    parsed = self._parse_card_info_text(raw_text, {
-                        "ประเภทธุรกิจ": "type",
-                        "วัตถุประสงค์": "objective"
-                    })
-                    company_info[type_key] = parsed.get("type", "")
-                    company_info[objective_key] = parsed.get("objective", "")
-                    logger.info(f"✅ ดึง{context}สำเร็จ")
-                    return True
+                card_infos_locator = page.locator('#companyProfileTab1 .card-infos')
 
                 reg_handled = False
                 latest_handled = False
@@ -955,7 +1130,8 @@ class DBDDataWarehouseBot:
                                 continue
 
                             if 'ประเภทธุรกิจตอนจดทะเบียน' in title_text:
-                                if assign_card_data(
+                                if self._assign_card_data(
+                                    company_info,
                                     target_text,
                                     "business_type_registration",
                                     "business_type_registration_objective",
@@ -966,7 +1142,8 @@ class DBDDataWarehouseBot:
                                 continue
 
                             if 'ประเภทธุรกิจที่ส่งงบการเงินปีล่าสุด' in title_text:
-                                if assign_card_data(
+                                if self._assign_card_data(
+                                    company_info,
                                     target_text,
                                     "business_type_latest",
                                     "business_type_latest_objective",
@@ -980,10 +1157,11 @@ class DBDDataWarehouseBot:
 
                 if not reg_handled:
                     try:
-                        biz_type_reg_element = self.page.locator('//*[@id="companyProfileTab1"]/div[2]/div[1]/div[3]/div[2]').first
+                        biz_type_reg_element = page.locator('//*[@id="companyProfileTab1"]/div[2]/div[1]/div[3]/div[2]').first
                         if await biz_type_reg_element.is_visible(timeout=3000):
                             biz_type_reg_text = await biz_type_reg_element.inner_text()
-                            assign_card_data(
+                            self._assign_card_data(
+                                company_info,
                                 biz_type_reg_text,
                                 "business_type_registration",
                                 "business_type_registration_objective",
@@ -1000,10 +1178,11 @@ class DBDDataWarehouseBot:
                     ]
                     for locator_str in fallback_locators:
                         try:
-                            latest_element = self.page.locator(locator_str).first
+                            latest_element = page.locator(locator_str).first
                             if await latest_element.is_visible(timeout=3000):
                                 latest_text = await latest_element.inner_text()
-                                if assign_card_data(
+                                if self._assign_card_data(
+                                    company_info,
                                     latest_text,
                                     "business_type_latest",
                                     "business_type_latest_objective",
@@ -1022,6 +1201,92 @@ class DBDDataWarehouseBot:
             logger.error(f"เกิดข้อผิดพลาดในการดึงข้อมูล: {str(e)}")
             return {"error": f"เกิดข้อผิดพลาดในการดึงข้อมูล: {str(e)}"}
     
+    def parse_profile_html(self, html: str, company_name: str) -> Dict:
+        """
+        แปลง HTML หน้าข้อมูลบริษัท (/company/profile/...) เป็น company_info แบบเดียวกับ extract_company_data_from_page
+
+        ใช้ตำแหน่ง element เดียวกับ XPath ของ browser flow จึงทดสอบได้ด้วยไฟล์ HTML ที่บันทึกไว้
+        ถ้าไม่มีแท็บข้อมูลบริษัทจะใช้ parse_company_data (แบบตาราง) แทน
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        profile = soup.find(id=DBD_PROFILE_SELECTOR.lstrip('#'))
+        if profile is None:
+            return self.parse_company_data(soup, company_name)
+
+        company_info = self._empty_profile_info(company_name)
+
+        # 1. ชื่อนิติบุคคลและเลขทะเบียน: div[1]/div[1]/div
+        name_reg_text = _html_inner_text(_child_div(profile, 1, 1, 1))
+        if name_reg_text:
+            self._parse_name_registration_text(name_reg_text, company_info)
+
+        # 2. ข้อมูลนิติบุคคล: div[2]/div[1]/div[1]/div
+        info_text = _html_inner_text(_child_div(profile, 2, 1, 1, 1))
+        if info_text:
+            self._parse_company_details_text(info_text, company_info)
+
+        # 3. รายชื่อกรรมการ: div[2]/div[1]/div[2]/div
+        directors_element = _child_div(profile, 2, 1, 2, 1)
+        directors_text = _html_inner_text(directors_element)
+        if directors_text:
+            company_info["directors"] = directors_text
+            company_info["directors_raw"] = directors_text
+            list_items = [_html_inner_text(item) for item in directors_element.find_all('li')]
+            list_items = [item for item in list_items if item]
+            if list_items:
+                company_info["directors_list"] = list_items
+
+        # 4. กรรมการลงชื่อผูกพัน: div[2]/div[1]/div[3]/div[1]
+        company_info["authorized_signatories"] = _html_inner_text(_child_div(profile, 2, 1, 3, 1))
+
+        # 5. ประเภทธุรกิจ (card-infos)
+        reg_handled = False
+        latest_handled = False
+        for card in profile.select('.card-infos'):
+            card_raw_text = _html_inner_text(card)
+            for title in card.find_all('h5'):
+                title_text = _html_inner_text(title)
+                body = title.find_next_sibling(
+                    lambda tag: tag.name == 'div' and 'card-body' in (tag.get('class') or [])
+                )
+                target_text = _html_inner_text(body) or card_raw_text
+                if not target_text:
+                    continue
+
+                if 'กรรมการลงชื่อผูกพัน' in title_text:
+                    if not company_info.get("authorized_signatories"):
+                        company_info["authorized_signatories"] = target_text
+                elif 'ประเภทธุรกิจตอนจดทะเบียน' in title_text:
+                    reg_handled = self._assign_card_data(
+                        company_info, target_text, "business_type_registration",
+                        "business_type_registration_objective", "business_type_registration_raw",
+                        "ประเภทธุรกิจตอนจดทะเบียนจาก card"
+                    ) or reg_handled
+                elif 'ประเภทธุรกิจที่ส่งงบการเงินปีล่าสุด' in title_text:
+                    latest_handled = self._assign_card_data(
+                        company_info, target_text, "business_type_latest",
+                        "business_type_latest_objective", "business_type_latest_raw",
+                        "ประเภทธุรกิจที่ส่งงบการเงินปีล่าสุดจาก card"
+                    ) or latest_handled
+
+        if not reg_handled:
+            self._assign_card_data(
+                company_info, _html_inner_text(_child_div(profile, 2, 1, 3, 2)), "business_type_registration",
+                "business_type_registration_objective", "business_type_registration_raw", "ประเภทธุรกิจตอนจดทะเบียน"
+            )
+        if not latest_handled:
+            self._assign_card_data(
+                company_info, _html_inner_text(_child_div(profile, 2, 1, 4, 2)), "business_type_latest",
+                "business_type_latest_objective", "business_type_latest_raw", "ประเภทธุรกิจที่ส่งงบการเงินปีล่าสุด"
+            )
+
+        # เติมช่องที่ยังว่างจากตารางในหน้าเดียวกัน (ถ้ามี)
+        for key, value in self.parse_company_data(soup, company_name).items():
+            if value and not company_info.get(key):
+                company_info[key] = value
+
+        return company_info
+
     def parse_company_data(self, soup: BeautifulSoup, company_name: str) -> Dict:
         """
         แปลงข้อมูลจาก HTML เป็น Dictionary
@@ -1094,105 +1359,282 @@ class DBDDataWarehouseBot:
             company_info (Dict): ข้อมูลบริษัท
             
         Returns:
-            str: ข้อมูลที่จัดรูปแบบแล้ว
+            str: ข้อมูลที่จัดรูปแบบแล้ว (ใช้แสดงผลเท่านั้น - ข้อมูลจริงอยู่ใน DBDCompanyRecord.to_columns)
         """
-        if "error" in company_info:
-            return f"ข้อผิดพลาด: {company_info['error']}"
-        
-        info_parts = []
-        
-        if company_info.get("registration_number"):
-            info_parts.append(f"เลขทะเบียน: {company_info['registration_number']}")
-        
-        if company_info.get("business_type"):
-            info_parts.append(f"ประเภทธุรกิจ: {company_info['business_type']}")
-        
-        if company_info.get("status"):
-            info_parts.append(f"สถานะ: {company_info['status']}")
-        
-        if company_info.get("registered_capital"):
-            info_parts.append(f"ทุนจดทะเบียน: {company_info['registered_capital']}")
-        
-        if company_info.get("address"):
-            info_parts.append(f"ที่อยู่: {company_info['address']}")
-        
-        if company_info.get("phone"):
-            info_parts.append(f"โทรศัพท์: {company_info['phone']}")
-        
-        if company_info.get("found_date"):
-            info_parts.append(f"วันที่จดทะเบียน: {company_info['found_date']}")
-        
-        return " | ".join(info_parts) if info_parts else "ไม่พบข้อมูล"
+        return DBDCompanyRecord.from_company_info(company_info).display_text()
     
 
-def create_dbd_summary_table(df: pd.DataFrame) -> pd.DataFrame:
+class TokenBucket:
+    """จำกัดอัตราการเรียกเว็บแบบ token bucket (ใช้ได้ทั้งจากหลาย thread และใน asyncio)"""
+
+    def __init__(self, rate_per_second: float, capacity: int = 1):
+        """
+        Args:
+            rate_per_second (float): จำนวนครั้งต่อวินาทีโดยเฉลี่ย (<= 0 คือไม่จำกัด)
+            capacity (int): จำนวนครั้งที่ยอมให้เรียกติดกันได้ทันที (burst)
+        """
+        self.rate = rate_per_second
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """จอง token 1 อัน แล้วคืนเวลาที่ต้องรอ (วินาที) ก่อนจะใช้ได้"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class DBDLookupEngine:
     """
-    สร้างตารางสรุปข้อมูล DBD
-    
-    Args:
-        df (pd.DataFrame): DataFrame ที่มีข้อมูล DBD
-        
-    Returns:
-        pd.DataFrame: ตารางสรุปข้อมูล DBD
+    ค้นหาข้อมูลหลายบริษัทพร้อมกันจาก DBD DataWarehouse
+
+    Browser mode: ยืม context/page จาก browser pool ตามจำนวน workers แล้วรันทุก page บน event loop ของ pool
+    Requests mode: ThreadPoolExecutor ที่แต่ละ thread มี requests session ของตัวเอง
+    (use_http_api=True เรียก endpoint ค้นหา/หน้าข้อมูลบริษัทโดยตรงแทนการส่ง form)
+    ทุกการค้นหาต้องผ่าน TokenBucket เดียวกัน เพื่อไม่ให้ยิงเว็บ DBD ถี่เกินไป
     """
-    if 'ข้อมูล DBD' not in df.columns:
-        return pd.DataFrame()
-    
-    # สร้างตารางสรุป
-    summary_data = []
-    
-    for index, row in df.iterrows():
-        dbd_info = row.get('ข้อมูล DBD', '')
-        company_name = row.get('ชื่อบริษัท/บุคคล', '')
-        db_company_name = row.get('ชื่อบริษัทจาก DBD', '')
-        
-        if dbd_info and dbd_info != "ไม่พบข้อมูล" and "ข้อผิดพลาด" not in dbd_info:
-            # แยกข้อมูล
-            info_parts = dbd_info.split(' | ')
-            
-            directors_value = row.get('รายชื่อกรรมการ', '')
-            if isinstance(directors_value, list):
-                directors_value = " | ".join(directors_value)
-            elif pd.isna(directors_value):
-                directors_value = ""
-            else:
-                directors_value = str(directors_value).strip()
-
-            summary_row = {
-                'ชื่อบริษัท': company_name,
-                'ชื่อบริษัทจาก DBD': db_company_name,
-                'เลขทะเบียน': '',
-                'ประเภทธุรกิจ': '',
-                'สถานะ': '',
-                'ทุนจดทะเบียน': '',
-                'ที่อยู่': '',
-                'รายชื่อกรรมการ': directors_value,
-                'ที่อยู่_บ้านเลขที่': row.get('ที่อยู่_บ้านเลขที่', ''),
-                'ที่อยู่_หมู่บ้าน': row.get('ที่อยู่_หมู่บ้าน', ''),
-                'ที่อยู่_หมู่ที่': row.get('ที่อยู่_หมู่ที่', ''),
-                'ที่อยู่_ตำบล': row.get('ที่อยู่_ตำบล', ''),
-                'ที่อยู่_อำเภอ': row.get('ที่อยู่_อำเภอ', ''),
-                'ที่อยู่_จังหวัด': row.get('ที่อยู่_จังหวัด', ''),
-                'ที่อยู่_รหัสไปรษณีย์': row.get('ที่อยู่_รหัสไปรษณีย์', '')
-            }
-            
-            for part in info_parts:
-                if 'เลขทะเบียน:' in part:
-                    summary_row['เลขทะเบียน'] = part.replace('เลขทะเบียน:', '').strip()
-                elif 'ประเภทธุรกิจ:' in part:
-                    summary_row['ประเภทธุรกิจ'] = part.replace('ประเภทธุรกิจ:', '').strip()
-                elif 'สถานะ:' in part:
-                    summary_row['สถานะ'] = part.replace('สถานะ:', '').strip()
-                elif 'ทุนจดทะเบียน:' in part:
-                    summary_row['ทุนจดทะเบียน'] = part.replace('ทุนจดทะเบียน:', '').strip()
-                elif 'ที่อยู่:' in part:
-                    summary_row['ที่อยู่'] = part.replace('ที่อยู่:', '').strip()
-                elif 'รายชื่อกรรมการ:' in part:
-                    summary_row['รายชื่อกรรมการ'] = part.replace('รายชื่อกรรมการ:', '').strip()
-            
-            summary_data.append(summary_row)
-    
-    return pd.DataFrame(summary_data)
+
+    def __init__(self, workers: int = 3, rate_per_second: float = 1.0, burst: Optional[int] = None,
+                 use_browser: bool = False, headless: bool = False, timeout: float = 90, cache=None,
+                 fast_mode: bool = False, use_http_api: bool = False):
+        """
+        Args:
+            workers (int): จำนวนการค้นหาที่ทำพร้อมกัน
+            rate_per_second (float): จำนวนการค้นหาที่เริ่มได้ต่อวินาที
+            burst (Optional[int]): จำนวนที่เริ่มพร้อมกันได้ทันที (ค่าเริ่มต้น = workers)
+            use_browser (bool): ใช้ Playwright แทน requests
+            headless (bool): ซ่อนหน้าต่าง browser
+            timeout (float): เวลาสูงสุดต่อการค้นหา 1 รายการ (วินาที)
+            cache (Optional[DBDCompanyCache]): แคชข้อมูลบริษัท (รายการที่อยู่ในแคชจะไม่เรียกเว็บ)
+            fast_mode (bool): ไม่หน่วงเวลาให้คนดูการทำงานใน browser
+            use_http_api (bool): โหมดไม่ใช้ browser ให้ใช้ HTTP API ของเว็บ (_search_with_http_api)
+        """
+        self.workers = max(1, int(workers))
+        self.use_browser = use_browser
+        self.use_http_api = use_http_api
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(rate_per_second, burst or self.workers)
+        # bot หลักใช้เฉพาะ clean_company_name / format_company_info / แคช (ไม่เปิด browser)
+        self.bot = DBDDataWarehouseBot(use_browser=False, cache=cache, fast_mode=fast_mode)
+        self._local = threading.local()
+        self._executor = None
+        self._pool = None
+        self._leases = []
+        self._pages = None
+        # งานค้นหาของ browser mode ที่ยังไม่เสร็จ (Future ฝั่ง caller และ task บน event loop ของ pool)
+        # ถูกแก้จากทั้ง thread ของ caller และ event loop ของ pool จึงอ่าน/เขียนภายใต้ _pending_lock เสมอ
+        self._futures = set()
+        self._tasks = set()
+        self._pending_lock = threading.Lock()
+
+        if use_browser:
+            self._pool = get_browser_pool()
+            try:
+                self._pool.run(self._acquire_pages(headless), timeout=60)
+            except Exception:
+                self.close()
+                raise
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="dbd_lookup")
+
+    async def _acquire_pages(self, headless: bool) -> None:
+        logger.info(f"🚀 กำลังยืม Chromium จาก browser pool สำหรับค้นหาพร้อมกัน {self.workers} หน้า...")
+        self._pages = asyncio.Queue()
+        for _ in range(self.workers):
+            lease = await self._pool.acquire_async(headless, BROWSER_CONTEXT_OPTIONS)
+            self._leases.append(lease)
+            self._pages.put_nowait(lease.page)
+        logger.info("✅ พร้อมค้นหาพร้อมกันด้วย browser pool")
+
+    async def _lookup_with_page(self, clean_name: str, log: Callable) -> Dict:
+        """ยืม page ว่าง 1 หน้า รอ token แล้วค้นหา (คืน page เมื่อเสร็จ)"""
+        task = asyncio.current_task()
+        with self._pending_lock:
+            self._tasks.add(task)
+        try:
+            page = await self._pages.get()
+            try:
+                await self.rate_limiter.acquire_async()
+                company_info = await asyncio.wait_for(self.bot._search_with_page(page, clean_name, log), self.timeout)
+                return self.bot._store_in_cache(clean_name, company_info)
+            finally:
+                self._pages.put_nowait(page)
+        finally:
+            with self._pending_lock:
+                self._tasks.discard(task)
+
+    async def _cancel_lookups(self) -> None:
+        """ยกเลิก task ค้นหาที่ยังรอ page หรือค้นหาอยู่ แล้วรอจนคืน page ครบ (รันบน event loop ของ pool)"""
+        with self._pending_lock:
+            tasks = [task for task in self._tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _lookup_with_requests(self, clean_name: str, log: Callable) -> Dict:
+        """ค้นหาด้วย requests session ของ thread ปัจจุบัน"""
+        bot = getattr(self._local, "bot", None)
+        if bot is None:
+            bot = self._local.bot = DBDDataWarehouseBot(use_browser=False, use_http_api=self.use_http_api)
+        self.rate_limiter.acquire()
+        if self.use_http_api:
+            return self.bot._store_in_cache(clean_name, bot._search_with_http_api(clean_name, log))
+        return self.bot._store_in_cache(clean_name, bot._search_with_requests(clean_name, log), require_registration=True)
+
+    def plan_lookups(self, company_names: pd.Series) -> Tuple[np.ndarray, List[str]]:
+        """
+        จัดกลุ่มชื่อที่ได้ผล clean_company_name เดียวกัน เพื่อค้นหาแต่ละบริษัทเพียงครั้งเดียว
+
+        Args:
+            company_names (pd.Series): ชื่อบริษัท/บุคคลของทุกแถว (ไม่รวมแถวที่ชื่อว่าง)
+
+        Returns:
+            Tuple: (codes - ลำดับกลุ่มของแต่ละแถว, unique_names - ชื่อตัวแทนของแต่ละกลุ่มสำหรับส่งให้ค้นหา)
+        """
+        # clean_company_name เฉพาะชื่อดิบที่ไม่ซ้ำ แล้วจัดกลุ่มซ้ำอีกชั้นตามชื่อที่ทำความสะอาดแล้ว
+        raw_codes, raw_names = pd.factorize(company_names.astype(str))
+        clean_keys = pd.Series([self.bot.clean_company_name(name) for name in raw_names], dtype=object)
+        key_codes, _ = pd.factorize(clean_keys)
+        first_raw_positions = pd.Series(np.arange(len(raw_names))).groupby(key_codes).first()
+        unique_names = [raw_names[position] for position in first_raw_positions]
+        return key_codes[raw_codes], unique_names
+
+    def submit(self, company_name: str, log_callback: Optional[Callable] = None,
+               force_refresh: bool = False) -> Future:
+        """
+        ส่งงานค้นหา 1 บริษัท (ถ้ามีในแคชจะได้ Future ที่เสร็จแล้วทันที)
+
+        Returns:
+            Future: ผลลัพธ์เป็น company_info (Dict) เหมือน DBDDataWarehouseBot.search_company_info
+        """
+        log = _make_log(log_callback)
+        clean_name = self.bot.clean_company_name(company_name)
+        if not clean_name:
+            future = Future()
+            future.set_result({"error": "ไม่พบชื่อบริษัทที่ถูกต้อง"})
+            return future
+
+        log(f"กำลังค้นหาข้อมูล: {clean_name}")
+        if not force_refresh:
+            cached_info = self.bot._cached_company_info(clean_name)
+            if cached_info is not None:
+                log(f"⚡ ใช้ข้อมูลจากแคช: {clean_name}", "success")
+                future = Future()
+                future.set_result(cached_info)
+                return future
+
+        if self.use_browser:
+            future = self._pool.submit(self._lookup_with_page(clean_name, log))
+            with self._pending_lock:
+                self._futures.add(future)
+            future.add_done_callback(self._forget_future)
+            return future
+        return self._executor.submit(self._lookup_with_requests, clean_name, log)
+
+    def _forget_future(self, future: Future) -> None:
+        """done callback ของ Future ใน browser mode (ถูกเรียกจาก event loop ของ pool หรือ thread ที่ cancel)"""
+        with self._pending_lock:
+            self._futures.discard(future)
+
+    def iter_lookups(self, company_names: List[str], log_callback: Optional[Callable] = None,
+                     force_refresh: bool = False) -> Iterator[Tuple[int, Dict]]:
+        """
+        ค้นหาทุกชื่อพร้อมกัน แล้ว yield (ลำดับใน company_names, company_info) ตามลำดับที่ค้นหาเสร็จ
+
+        log_callback ถูกเรียกจาก thread ของ engine - ฝั่ง Streamlit ควรเก็บข้อความไว้แล้วแสดงใน thread หลัก
+        """
+        futures = {
+            self.submit(name, log_callback, force_refresh=force_refresh): index
+            for index, name in enumerate(company_names)
+        }
+        for future in as_completed(futures):
+            try:
+                company_info = future.result()
+            except Exception as e:
+                logger.error(f"เกิดข้อผิดพลาดในการค้นหาข้อมูลบริษัท {company_names[futures[future]]}: {str(e)}")
+                company_info = {"error": f"เกิดข้อผิดพลาด: {str(e) or type(e).__name__}"}
+            yield futures[future], company_info
+
+    def lookup_many(self, company_names: List[str], log_callback: Optional[Callable] = None,
+                    force_refresh: bool = False) -> List[Dict]:
+        """ค้นหาทุกชื่อพร้อมกัน แล้วคืนผลลัพธ์ตามลำดับเดียวกับ company_names"""
+        results: List[Optional[Dict]] = [None] * len(company_names)
+        for index, company_info in self.iter_lookups(company_names, log_callback, force_refresh=force_refresh):
+            results[index] = company_info
+        return results
+
+    def close(self) -> None:
+        """
+        ปิด thread ของ engine และคืน context/page ทั้งหมดให้ browser pool
+
+        งานที่ส่งแล้วแต่ยังไม่เริ่มถูกยกเลิก (ไม่ยิงเว็บ DBD ต่อหลังปิด) ส่วน browser mode
+        ยกเลิก task ที่ค้างอยู่และรอให้คืน page ก่อนคืน lease
+        """
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._pending_lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+        if self._pool is not None and self._leases:
+            try:
+                self._pool.run(self._cancel_lookups(), timeout=self.timeout)
+            except Exception as e:
+                logger.warning(f"⚠️ ยกเลิกงานค้นหาที่ค้างอยู่ไม่สำเร็จ: {e}")
+        for lease in self._leases:
+            lease.release()
+        self._leases = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def assign_lookup_results(df: pd.DataFrame, row_index: pd.Index, codes: np.ndarray,
+                          column: str, values: List) -> None:
+    """
+    กระจายค่าของแต่ละชื่อที่ไม่ซ้ำ (จาก DBDLookupEngine.plan_lookups) ไปยังทุกแถวในกลุ่มในครั้งเดียว
+
+    values[i] เป็นค่าของกลุ่ม i - ค่า None หมายถึงคงค่าเดิมของแถวในกลุ่มนั้นไว้
+    """
+    row_values = pd.Series(values, dtype=object).to_numpy()[codes]
+    assign_mask = ~pd.isna(row_values)
+    df.loc[row_index[assign_mask], column] = row_values[assign_mask]
+
+
+def assign_company_records(df: pd.DataFrame, row_index: pd.Index, codes: np.ndarray,
+                           records: List[Optional[DBDCompanyRecord]]) -> None:
+    """
+    เขียน DBDCompanyRecord ของแต่ละชื่อที่ไม่ซ้ำลงเป็นคอลัมน์จริง (ข้อมูล DBD, เลขทะเบียนจาก DBD, ที่อยู่_จังหวัด, ...)
+
+    record ที่เป็น None (ยังไม่ได้ค้นหา) คงค่าเดิมของแถวไว้ ส่วน record ที่มีข้อผิดพลาดล้างคอลัมน์ข้อมูลบริษัทเป็นค่าว่าง
+    """
+    record_columns = [record.to_columns() if record is not None else {} for record in records]
+    for column in [DBD_INFO_COLUMN, *RECORD_COLUMNS.values(), *ADDRESS_COLUMNS.values()]:
+        if column not in df.columns:
+            df[column] = ""
+        assign_lookup_results(df, row_index, codes, column, [values.get(column) for values in record_columns])
+
 
 def main():
     """ฟังก์ชันหลักสำหรับทดสอบ"""
@@ -1,75 +1,34 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import sys
 import os
 import inspect
-import importlib.util
 from datetime import datetime
 import io
-import time
 
 # เพิ่ม path โปรเจ็กต์เพื่อให้ import bot_data ได้
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-# Reload module เพื่อให้แน่ใจว่าใช้โค้ดล่าสุด
-# ลบโมดูลเก่าออกเพื่อบังคับให้โหลดใหม่
-modules_to_remove = [key for key in sys.modules.keys() if 'bot_data' in key.lower()]
-for module_name in modules_to_remove:
-    try:
-        del sys.modules[module_name]
-    except:
-        pass
+from dbd_cache import DBDCompanyCache
+from dbd_jobs import DBD_METRIC_LABELS, lookup_mode, run_enrichment_job_with_reporter, start_enrichment_job
+from dbd_record import ADDRESS_COLUMNS, RECORD_COLUMNS, create_dbd_summary_table
+from module_loader import is_dev_hot_reload_enabled, load_project_module
+from ui_reporter import UIReporter
 
-# ลบ __pycache__ เพื่อบังคับให้โหลดโค้ดใหม่
-import shutil
-cache_dirs = [
-    os.path.join(current_dir, '__pycache__'),
-    os.path.join(current_dir, '.pytest_cache')
-]
-for cache_dir in cache_dirs:
-    if os.path.exists(cache_dir):
-        try:
-            shutil.rmtree(cache_dir, ignore_errors=True)
-        except:
-            pass
-
-# Import โดยระบุ path โดยตรงเพื่อหลีกเลี่ยงปัญหา case-sensitivity และ network drive
+# Import bot_data ตามปกติ (ใช้โมดูลเดิมซ้ำทุก rerun)
+# ตั้ง DEV_HOT_RELOAD = True ใน config.py ตอนพัฒนา เพื่อโหลดใหม่อัตโนมัติเมื่อแก้ไข bot_data.py
 try:
-    bot_data_path = os.path.join(current_dir, 'bot_data.py')
-    if not os.path.exists(bot_data_path):
-        # ลองหาไฟล์ที่ชื่อคล้ายกัน (case-insensitive)
-        for file in os.listdir(current_dir):
-            if file.lower() == 'bot_data.py':
-                bot_data_path = os.path.join(current_dir, file)
-                break
-    
-    if os.path.exists(bot_data_path):
-        # ใช้ timestamp เป็น module name เพื่อบังคับให้โหลดใหม่ทุกครั้ง
-        module_name = f"bot_data_module_{int(time.time() * 1000)}"
-        spec = importlib.util.spec_from_file_location(module_name, bot_data_path)
-        bot_data_module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = bot_data_module
-        spec.loader.exec_module(bot_data_module)
-        DBDDataWarehouseBot = bot_data_module.DBDDataWarehouseBot
-        create_dbd_summary_table = bot_data_module.create_dbd_summary_table
-    else:
-        # Fallback to normal import แต่ลบ cache ก่อน
-        if 'bot_data' in sys.modules:
-            del sys.modules['bot_data']
-        import importlib
-        bot_data = importlib.import_module('bot_data')
-        importlib.reload(bot_data)
-        DBDDataWarehouseBot = bot_data.DBDDataWarehouseBot
-        create_dbd_summary_table = bot_data.create_dbd_summary_table
+    bot_data = load_project_module('bot_data', hot_reload=is_dev_hot_reload_enabled())
+    DBDDataWarehouseBot = bot_data.DBDDataWarehouseBot
 except ImportError as e:
     st.error(f"❌ Error: ไม่สามารถ import bot_data ได้: {str(e)}")
     st.error(f"โปรดตรวจสอบว่าไฟล์ bot_data.py อยู่ในโฟลเดอร์: {current_dir}")
     st.stop()
 except Exception as e:
     st.error(f"❌ Error: เกิดข้อผิดพลาดในการโหลดโมดูล: {str(e)}")
-    st.error(f"Path ที่ลองหา: {bot_data_path if 'bot_data_path' in locals() else 'ไม่พบ'}")
     st.stop()
 
 # ตรวจสอบว่า class มี use_browser parameter หรือไม่
@@ -113,6 +72,35 @@ headless_mode = st.sidebar.checkbox(
 if use_browser_mode and headless_mode:
     st.sidebar.warning("⚠️ Headless Mode เปิดอยู่ - จะไม่เห็น browser ทำงาน")
 
+fast_mode = st.sidebar.checkbox(
+    "⚡ โหมดเร็ว (ไม่หน่วงเวลาให้ดูการทำงาน)",
+    value=False,
+    help="Browser Mode: รอเฉพาะเว็บ DBD ตอบกลับ ไม่หยุดพักระหว่างขั้นตอนเพื่อให้ดูการทำงานใน browser",
+    disabled=not use_browser_mode
+)
+
+use_http_api = st.sidebar.checkbox(
+    "🔌 ใช้ HTTP API ของเว็บ DBD (ทดลอง - ไม่เปิด browser)",
+    value=False,
+    help="Requests Mode: เรียก endpoint ค้นหาและหน้าข้อมูลบริษัทโดยตรง เร็วกว่าเปิด Chromium มาก (ทดลอง - ถ้าพบข้อผิดพลาดให้ปิดแล้วใช้ Browser Mode)",
+    disabled=use_browser_mode
+)
+
+force_refresh = st.sidebar.checkbox(
+    "🔄 ดึงข้อมูลใหม่จาก DBD (ไม่ใช้แคช)",
+    value=False,
+    help="ข้อมูลบริษัทที่เคยค้นหาจะถูกเก็บในแคช 30 วัน - เลือกเพื่อค้นหาจากเว็บใหม่และบันทึกทับ"
+)
+
+
+@st.cache_resource(show_spinner=False)
+def get_dbd_cache() -> DBDCompanyCache:
+    """แคชข้อมูลบริษัทจาก DBD (SQLite) ที่ใช้ร่วมกันทุก session และทุก rerun"""
+    return DBDCompanyCache()
+
+
+dbd_cache = get_dbd_cache()
+
 # สร้างอินสแตนซ์ของ bot
 if use_browser_mode:
     if headless_mode:
@@ -121,10 +109,10 @@ if use_browser_mode:
         st.sidebar.info("🌐 ใช้ Chromium Browser Mode (แสดงหน้าจอ)\n\n👀 จะเปิด Chromium browser ให้เห็นการทำงานแบบเรียลไทม์")
         st.sidebar.success("💡 **เคล็ดลับ:** ตรวจสอบ Chromium window ที่เปิดอยู่เพื่อดูการทำงานแบบเรียลไทม์")
     
-    bot = DBDDataWarehouseBot(use_browser=True, headless=headless_mode)
+    bot = DBDDataWarehouseBot(use_browser=True, headless=headless_mode, cache=dbd_cache, fast_mode=fast_mode)
 else:
     st.sidebar.info("📡 ใช้ Requests Mode\n\nใช้ requests library ธรรมดา (เร็วกว่าแต่เสี่ยงได้ 403)")
-    bot = DBDDataWarehouseBot(use_browser=False)
+    bot = DBDDataWarehouseBot(use_browser=False, cache=dbd_cache, use_http_api=use_http_api)
 
 # Sidebar
 st.sidebar.header("⚙️ การตั้งค่า")
@@ -192,7 +180,8 @@ if mode == "🔍 ค้นหาบริษัทเดี่ยว":
                 log_expander.code(log_text, language=None)
             
             # ค้นหาข้อมูล (พร้อม log callback)
-            company_info = bot.search_company_info(company_name, log_callback=log_callback)
+            company_info = bot.search_company_info(company_name, log_callback=log_callback,
+                                                   force_refresh=force_refresh)
             
             if "error" in company_info:
                 st.error(f"❌ {company_info['error']}")
@@ -326,19 +315,29 @@ elif mode == "📊 อัปโหลดไฟล์ Excel":
                     
                     # ตั้งค่าการประมวลผล
                     st.subheader("⚙️ ตั้งค่าการประมวลผล")
-                    col1, col2 = st.columns(2)
+                    col1, col2, col3 = st.columns(3)
                     
                     with col1:
                         delay = st.slider(
-                            "หน่วงเวลาระหว่างการค้นหา (วินาที):",
+                            "ระยะห่างระหว่างการเริ่มค้นหา (วินาที):",
                             min_value=0.5,
                             max_value=5.0,
                             value=1.0,
                             step=0.5,
-                            help="หน่วงเวลาเพื่อไม่ให้โหลดเซิร์ฟเวอร์หนักเกินไป"
+                            help="จำกัดอัตราการค้นหาเพื่อไม่ให้โหลดเซิร์ฟเวอร์หนักเกินไป"
                         )
                     
                     with col2:
+                        workers = st.number_input(
+                            "จำนวนการค้นหาพร้อมกัน:",
+                            min_value=1,
+                            max_value=8,
+                            value=3,
+                            step=1,
+                            help="จำนวนหน้า browser (หรือ session) ที่ค้นหาพร้อมกัน"
+                        )
+                    
+                    with col3:
                         show_logs = st.checkbox("แสดงขั้นตอนการทำงาน", value=True)
                     
                     eligible_types_preview = {"บริษัท (บจก.)", "ห้างหุ้นส่วน (หจก.)"}
@@ -354,21 +353,11 @@ elif mode == "📊 อัปโหลดไฟล์ Excel":
                         if use_browser_mode and not headless_mode:
                             st.info("👀 **ดู Chromium Browser ที่เปิดอยู่** - จะเห็นการทำงานของทุกบริษัทแบบเรียลไทม์!")
                         
-                        # สร้างคอลัมน์ใหม่สำหรับข้อมูล DBD
+                        # สร้างคอลัมน์ใหม่สำหรับข้อมูล DBD (ข้อความแสดงผล + คอลัมน์ของ DBDCompanyRecord)
                         df['ข้อมูล DBD'] = ""
                         df['ชื่อบริษัทจาก DBD'] = ""
                         df['รายชื่อกรรมการ'] = ""
-                        address_column_map = [
-                            ('ที่อยู่_บ้านเลขที่', 'address_house_no'),
-                            ('ที่อยู่_หมู่บ้าน', 'address_village'),
-                            ('ที่อยู่_หมู่ที่', 'address_moo'),
-                            ('ที่อยู่_ตำบล', 'address_subdistrict'),
-                            ('ที่อยู่_อำเภอ', 'address_district'),
-                            ('ที่อยู่_จังหวัด', 'address_province'),
-                            ('ที่อยู่_รหัสไปรษณีย์', 'address_postal_code')
-                        ]
-
-                        for column_name, _ in address_column_map:
+                        for column_name in [*RECORD_COLUMNS.values(), *ADDRESS_COLUMNS.values()]:
                             if column_name not in df.columns:
                                 df[column_name] = ""
 
@@ -389,112 +378,66 @@ elif mode == "📊 อัปโหลดไฟล์ Excel":
                             st.warning("⚠️ ไม่พบชื่อบริษัท/บุคคลสำหรับรายการที่เป็น บริษัท (บจก.) หรือ ห้างหุ้นส่วน (หจก.)")
                             st.stop()
                         
-                        # สร้าง progress bar และ status
+                        # สร้าง progress bar, status, สถิติ และ log (วาดผ่าน UIReporter ไม่เกิน 4 ครั้งต่อวินาที)
                         progress_bar = st.progress(0)
                         status_text = st.empty()
                         
-                        # สร้างสถิติ
                         stats_container = st.container()
                         with stats_container:
-                            col1, col2, col3, col4 = st.columns(4)
-                            success_count = col1.metric("✅ สำเร็จ", "0")
-                            error_count = col2.metric("❌ ข้อผิดพลาด", "0")
-                            not_found_count = col3.metric("🔍 ไม่พบข้อมูล", "0")
-                            total_count = col4.metric("📊 รวม", "0")
+                            metric_columns = st.columns(4)
                         
-                        # สร้าง container สำหรับแสดงขั้นตอนการทำงาน
                         log_container = st.container()
-                        log_expander = None
-                        log_messages = []
                         log_placeholder = None
-                        
-                        if show_logs:
-                            with log_container:
-                                st.subheader("📋 ขั้นตอนการทำงานของบอท")
+                        with log_container:
+                            st.subheader("📋 ผลการค้นหารายบริษัท")
+                            outcome_placeholder = st.empty()
+                            if show_logs:
                                 log_expander = st.expander("🔍 ดูขั้นตอนการทำงานแบบละเอียด", expanded=False)
                                 log_placeholder = log_expander.empty()
                         
-                        def log_callback(message, status="info"):
-                            """Callback สำหรับแสดง log"""
-                            if show_logs and log_expander:
-                                log_messages.append({
-                                    "message": message,
-                                    "status": status,
-                                    "time": datetime.now().strftime("%H:%M:%S")
-                                })
-                                
-                                # แสดง log ใน expander
-                                log_text = ""
-                                for log in log_messages[-50:]:  # แสดงล่าสุด 50 รายการ
-                                    icon = {
-                                        "info": "ℹ️",
-                                        "success": "✅",
-                                        "warning": "⚠️",
-                                        "error": "❌"
-                                    }.get(log["status"], "📝")
-                                    
-                                    log_text += f"[{log['time']}] {icon} {log['message']}\n"
-                                
-                                log_placeholder.code(log_text, language=None)
+                        reporter = UIReporter(
+                            log_placeholder=log_placeholder,
+                            metrics={label: column.empty() for label, column in zip(DBD_METRIC_LABELS, metric_columns)},
+                            outcome_placeholder=outcome_placeholder, status_placeholder=status_text, progress_bar=progress_bar
+                        )
                         
                         # ดึงข้อมูลสำหรับแต่ละบริษัท
-                        total_companies = len(eligible_indices)
-                        processed_count = 0
-                        success_stats = 0
-                        error_stats = 0
-                        not_found_stats = 0
+                        lookup_index = pd.Index(eligible_indices)
+                        total_rows = len(lookup_index)
                         
-                        for index in eligible_indices:
-                            row = df.loc[index]
-                            company_name = row[selected_column]
-                            
-                            # อัปเดต status
-                            processed_count += 1
-                            progress = processed_count / total_companies
-                            progress_bar.progress(progress)
-                            
-                            status_text.text(f"กำลังประมวลผล {processed_count}/{total_companies}: {company_name}")
-                            
-                            # ค้นหาข้อมูลบริษัท (พร้อม log callback)
-                            company_info = bot.search_company_info(str(company_name), log_callback=log_callback if show_logs else None)
-                            
-                            # จัดรูปแบบข้อมูลสำหรับใส่ในคอลัมน์
-                            formatted_info = bot.format_company_info(company_info)
-                            df.at[index, 'ข้อมูล DBD'] = formatted_info
-
-                            if isinstance(company_info, dict):
-                                if company_info.get("directors_list"):
-                                    directors_value = " | ".join(company_info.get("directors_list", []))
-                                else:
-                                    directors_value = company_info.get("directors", "")
-                                df.at[index, 'รายชื่อกรรมการ'] = directors_value
-
-                                if company_info.get("company_name"):
-                                    df.at[index, 'ชื่อบริษัทจาก DBD'] = company_info.get("company_name")
-
-                                for column_name, key_name in address_column_map:
-                                    if key_name in company_info:
-                                        df.at[index, column_name] = company_info.get(key_name, "")
-                            
-                            # อัปเดตสถิติ
-                            if "error" in company_info:
-                                error_stats += 1
-                                st.warning(f"⚠️ {company_name}: {company_info['error']}")
-                            elif formatted_info == "ไม่พบข้อมูล":
-                                not_found_stats += 1
-                                st.info(f"🔍 {company_name}: ไม่พบข้อมูล")
-                            else:
-                                success_stats += 1
-                                st.success(f"✅ {company_name}: พบข้อมูล")
-                            
-                            # อัปเดต metrics
-                            success_count.metric("✅ สำเร็จ", str(success_stats))
-                            error_count.metric("❌ ข้อผิดพลาด", str(error_stats))
-                            not_found_count.metric("🔍 ไม่พบข้อมูล", str(not_found_stats))
-                            total_count.metric("📊 รวม", str(processed_count))
-                            
-                            # หน่วงเวลาเพื่อไม่ให้โหลดเซิร์ฟเวอร์หนักเกินไป
-                            time.sleep(delay)
+                        def make_engine():
+                            return bot_data.DBDLookupEngine(
+                                workers=int(workers), rate_per_second=1.0 / delay,
+                                use_browser=use_browser_mode, headless=headless_mode, cache=dbd_cache,
+                                fast_mode=fast_mode, use_http_api=use_http_api
+                            )
+                        
+                        # วางแผนการค้นหา: ชื่อที่ซ้ำกัน (หลัง clean_company_name) ค้นหาครั้งเดียวแล้วกระจายผลไปทุกแถว
+                        # (engine สำหรับวางแผนไม่เปิด browser - งานค้นหาสร้าง engine ของตัวเองใน thread ของงาน)
+                        with bot_data.DBDLookupEngine(workers=1, cache=dbd_cache) as planner:
+                            lookup_codes, company_names = planner.plan_lookups(df.loc[lookup_index, selected_column])
+                        group_sizes = np.bincount(lookup_codes, minlength=len(company_names))
+                        total_companies = len(company_names)
+                        st.info(f"🧮 {total_rows} แถว เป็นชื่อไม่ซ้ำ {total_companies} ราย - ลดการค้นหาได้ {total_rows - total_companies} ครั้ง")
+                        
+                        # ค้นหาใน thread ของงาน (ทำงานต่อแม้ปิดแท็บ) ผลแต่ละรายถูกบันทึกลง journal ทันที
+                        # ถ้ารอบก่อนหยุดกลางทาง จะใช้ผลที่เสร็จแล้วจาก journal และค้นหาเฉพาะที่เหลือ
+                        cache_stats_before = dbd_cache.stats()
+                        job = start_enrichment_job(company_names, make_engine, force_refresh=force_refresh,
+                                                   mode=lookup_mode(use_browser_mode, use_http_api))
+                        if job.resumed_count:
+                            st.info(f"♻️ ใช้ผลที่ค้นหาเสร็จแล้ว {job.resumed_count} ราย จากรอบก่อนที่หยุดกลางทาง - ค้นหาต่อเฉพาะที่เหลือ")
+                        reporter.set_progress(0.0, f"กำลังค้นหาพร้อมกัน {int(workers)} รายการ จากทั้งหมด {total_companies} รายการ...")
+                        company_records, stats = run_enrichment_job_with_reporter(job, reporter, company_names, group_sizes)
+                        success_stats, error_stats, not_found_stats = stats["success"], stats["error"], stats["not_found"]
+                        
+                        if job.error:
+                            st.error(f"❌ งานค้นหาหยุดกลางทาง: {job.error} - ผลที่เสร็จแล้วถูกบันทึกไว้ กดประมวลผลอีกครั้งเพื่อทำต่อ")
+                        
+                        # กระจายผลของแต่ละชื่อไปยังทุกแถวที่ชื่อตรงกัน
+                        bot_data.assign_company_records(df, lookup_index, lookup_codes, company_records)
+                        if not job.error:
+                            job.discard()
                         
                         # แสดงสรุปสุดท้าย
                         st.markdown("---")
@@ -502,11 +445,16 @@ elif mode == "📊 อัปโหลดไฟล์ Excel":
                         
                         col1, col2, col3 = st.columns(3)
                         with col1:
-                            st.metric("✅ สำเร็จ", success_stats, delta=f"{success_stats/total_companies*100:.1f}%")
+                            st.metric("✅ สำเร็จ", success_stats, delta=f"{success_stats/total_rows*100:.1f}%")
                         with col2:
-                            st.metric("❌ ข้อผิดพลาด", error_stats, delta=f"{error_stats/total_companies*100:.1f}%")
+                            st.metric("❌ ข้อผิดพลาด", error_stats, delta=f"{error_stats/total_rows*100:.1f}%")
                         with col3:
-                            st.metric("🔍 ไม่พบข้อมูล", not_found_stats, delta=f"{not_found_stats/total_companies*100:.1f}%")
+                            st.metric("🔍 ไม่พบข้อมูล", not_found_stats, delta=f"{not_found_stats/total_rows*100:.1f}%")
+                        
+                        cache_stats = dbd_cache.stats()
+                        cache_hits = cache_stats["hits"] - cache_stats_before["hits"]
+                        cache_misses = cache_stats["misses"] - cache_stats_before["misses"]
+                        st.caption(f"⚡ ใช้ข้อมูลจากแคช {cache_hits} รายการ | ค้นหาจากเว็บ DBD {cache_misses} รายการ (แคชมี {cache_stats['entries']} บริษัท)")
                         
                         # ล้าง progress bar และ status
                         progress_bar.empty()
@@ -0,0 +1,267 @@
+"""
+Pool ของ Chromium (Playwright) ที่เปิดค้างไว้และใช้ร่วมกันทั้งโปรเซส (ไม่พึ่ง Streamlit)
+
+DBDDataWarehouseBot, PeakEngineBot และ NewPeakBot ยืม context/page ของตัวเองจาก browser ตัวเดียวกัน
+จึงเสียเวลาเปิด Chromium ครั้งเดียวต่อโปรเซส แทนที่จะเปิดใหม่ทุกครั้งที่สร้าง bot
+งาน Playwright ทั้งหมดรันบน event loop ถาวรของ pool (thread เดียว รันตลอดอายุโปรเซส) ผ่าน submit(coro)
+browser ที่ไม่มีใครยืมนานเกิน idle_timeout จะถูกปิด และ browser ที่ตายจะถูกเปิดใหม่เมื่อยืมครั้งถัดไป
+"""
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAUNCH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--start-maximized'
+]
+DEFAULT_IDLE_TIMEOUT = 10 * 60
+DEFAULT_HEALTH_CHECK_INTERVAL = 30
+
+_pool: Optional["BrowserPool"] = None
+_pool_lock = threading.Lock()
+
+
+class BrowserLease:
+    """context + page ที่ยืมจาก BrowserPool (ใช้ได้จนกว่าจะเรียก release)"""
+
+    def __init__(self, pool: "BrowserPool", headless: bool, context, page):
+        self.pool = pool
+        self.headless = headless
+        self.context = context
+        self.page = page
+        self.released = False
+
+    @property
+    def browser(self):
+        return self.context.browser
+
+    def is_healthy(self) -> bool:
+        """page ยังเปิดอยู่และ browser ยังเชื่อมต่ออยู่หรือไม่"""
+        try:
+            return (not self.released and not self.page.is_closed()
+                    and self.browser is not None and self.browser.is_connected())
+        except Exception:
+            return False
+
+    def release(self) -> None:
+        """ปิด context แล้วคืนสิทธิ์ให้ pool (browser ยังเปิดค้างไว้ให้คนต่อไป)"""
+        self.pool.release(self)
+
+
+class BrowserPool:
+    """
+    เปิด Chromium ค้างไว้ (แยกตัวตามโหมด headless) แล้วแจก context ที่แยกจากกันให้ bot แต่ละตัว
+
+    page ทุกหน้าผูกกับ event loop ของ pool ซึ่งรัน run_forever อยู่ใน thread ของตัวเอง
+    bot จึงส่งงานด้วย submit(coro) -> Future ได้จากทุก thread และงานของหลาย page ทำงานซ้อนกันได้
+    """
+
+    def __init__(self, launch_args: Optional[List[str]] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL):
+        """
+        Args:
+            launch_args (Optional[List[str]]): argument ของ chromium.launch
+            idle_timeout (float): ปิด browser ที่ไม่มีใครยืมนานเกินกี่วินาที
+            health_check_interval (float): ตรวจสุขภาพ browser/ไล่ browser ที่ว่างทุกกี่วินาที
+        """
+        self.launch_args = list(launch_args or DEFAULT_LAUNCH_ARGS)
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, name="browser_pool_loop", daemon=True)
+        self._loop_thread.start()
+        self._playwright = None
+        self._browsers: Dict[bool, Any] = {}
+        self._last_used: Dict[bool, float] = {}
+        self._leases: List[BrowserLease] = []
+        self._stats = {"launches": 0, "leases": 0, "evictions": 0}
+        self._closed = False
+        self._monitor_task = self.run(self._start_monitor(), timeout=10)
+
+    def submit(self, coro) -> Future:
+        """ส่ง coroutine ไปรันบน event loop ของ pool (เรียกได้จากทุก thread) คืน concurrent.futures.Future"""
+        if self._closed:
+            coro.close()
+            raise RuntimeError("BrowserPool ถูกปิดไปแล้ว")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: Optional[float] = None) -> Any:
+        """รัน coroutine บน event loop ของ pool แล้วรอผลลัพธ์ (ห้ามเรียกจาก thread ของ pool เอง)"""
+        if threading.current_thread() is self._loop_thread:
+            coro.close()
+            raise RuntimeError("BrowserPool.run ถูกเรียกจาก event loop ของ pool - ใช้ await แทน")
+        return self.submit(coro).result(timeout=timeout)
+
+    async def _ensure_browser(self, headless: bool):
+        """คืน browser ที่ยังเชื่อมต่ออยู่ (เปิดใหม่ถ้ายังไม่มีหรือตายไปแล้ว)"""
+        browser = self._browsers.get(headless)
+        if browser is not None and not browser.is_connected():
+            logger.warning("⚠️ Chromium ใน pool หยุดทำงาน - กำลังเปิดใหม่")
+            self._drop_browser(headless)
+            browser = None
+        if browser is None:
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+            logger.info(f"🚀 กำลังเปิด Chromium (headless={headless}) สำหรับ pool...")
+            browser = await self._playwright.chromium.launch(headless=headless, args=self.launch_args)
+            self._browsers[headless] = browser
+            self._stats["launches"] += 1
+            logger.info("✅ เปิด Chromium สำหรับ pool สำเร็จ")
+        self._last_used[headless] = time.monotonic()
+        return browser
+
+    def _drop_browser(self, headless: bool) -> None:
+        self._browsers.pop(headless, None)
+        self._leases = [lease for lease in self._leases if lease.headless != headless]
+
+    async def acquire_async(self, headless: bool = False,
+                            context_options: Optional[Dict[str, Any]] = None) -> BrowserLease:
+        """ยืม context + page ใหม่ (ต้องเรียกบน event loop ของ pool)"""
+        browser = await self._ensure_browser(headless)
+        try:
+            context = await browser.new_context(**(context_options or {}))
+        except Exception as e:
+            # browser อาจตายระหว่างตรวจสอบกับการใช้งาน - เปิดใหม่แล้วลองอีกครั้ง
+            logger.warning(f"⚠️ สร้าง context ไม่สำเร็จ ({e}) - เปิด Chromium ใหม่")
+            self._drop_browser(headless)
+            browser = await self._ensure_browser(headless)
+            context = await browser.new_context(**(context_options or {}))
+        page = await context.new_page()
+        lease = BrowserLease(self, headless, context, page)
+        self._leases.append(lease)
+        self._stats["leases"] += 1
+        return lease
+
+    def acquire(self, headless: bool = False, context_options: Optional[Dict[str, Any]] = None,
+                timeout: float = 60) -> BrowserLease:
+        """
+        ยืม context + page ใหม่จาก browser ที่เปิดค้างไว้
+
+        Args:
+            headless (bool): ใช้ browser แบบซ่อนหน้าจอหรือไม่
+            context_options (Optional[Dict]): argument ของ browser.new_context (user_agent, viewport, ...)
+            timeout (float): เวลาสูงสุดที่รอ (วินาที) รวมเวลาเปิด Chromium ครั้งแรก
+
+        Returns:
+            BrowserLease: context/page ที่ยืมได้
+        """
+        return self.run(self.acquire_async(headless, context_options), timeout=timeout)
+
+    async def release_async(self, lease: BrowserLease) -> None:
+        if lease.released:
+            return
+        lease.released = True
+        if lease in self._leases:
+            self._leases.remove(lease)
+        self._last_used[lease.headless] = time.monotonic()
+        try:
+            await lease.context.close()
+        except Exception as e:
+            logger.debug(f"ปิด context ที่ยืมไม่สำเร็จ: {e}")
+
+    def release(self, lease: BrowserLease, timeout: float = 20, wait: bool = True) -> None:
+        """
+        คืน context ที่ยืมไป (browser ยังเปิดอยู่ จนกว่าจะว่างนานเกิน idle_timeout)
+
+        wait=False ใช้กับ __del__ ที่อาจถูกเรียกจาก thread ของ pool เอง (ส่งงานเข้า loop แล้วไม่รอผล)
+        """
+        if lease.released or self._closed:
+            return
+        try:
+            if not wait:
+                self.submit(self.release_async(lease))
+                return
+            self.run(self.release_async(lease), timeout=timeout)
+        except Exception as e:
+            logger.warning(f"⚠️ คืน browser context ไม่สำเร็จ: {e}")
+
+    async def _evict_idle(self) -> None:
+        """ตรวจสุขภาพ: ล้าง lease ที่ page ถูกปิดไปแล้ว และปิด browser ที่ตายหรือว่างนานเกิน idle_timeout"""
+        for lease in [lease for lease in self._leases if not lease.is_healthy()]:
+            await self.release_async(lease)
+
+        now = time.monotonic()
+        for headless, browser in list(self._browsers.items()):
+            if not browser.is_connected():
+                logger.warning("⚠️ Chromium ใน pool หยุดทำงาน - จะเปิดใหม่เมื่อมีการใช้งาน")
+                self._drop_browser(headless)
+                continue
+            in_use = any(lease.headless == headless for lease in self._leases)
+            if not in_use and now - self._last_used.get(headless, now) > self.idle_timeout:
+                logger.info(f"💤 ปิด Chromium (headless={headless}) ที่ไม่ได้ใช้งานนานเกิน {self.idle_timeout:.0f} วินาที")
+                self._drop_browser(headless)
+                self._stats["evictions"] += 1
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+
+        if not self._browsers and self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _start_monitor(self) -> asyncio.Task:
+        return asyncio.ensure_future(self._monitor())
+
+    async def _monitor(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            if not self._browsers:
+                continue
+            try:
+                await self._evict_idle()
+            except Exception as e:
+                logger.warning(f"⚠️ ตรวจสอบ browser pool ไม่สำเร็จ: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """จำนวน browser ที่เปิดอยู่, lease ที่ยืมอยู่ และสถิติการเปิด/ยืม/ไล่ออก"""
+        return {"browsers": len(self._browsers), "active_leases": len(self._leases), **self._stats}
+
+    async def _close_all(self) -> None:
+        self._monitor_task.cancel()
+        try:
+            await self._monitor_task
+        except asyncio.CancelledError:
+            pass
+        for lease in list(self._leases):
+            await self.release_async(lease)
+        for browser in self._browsers.values():
+            try:
+                await browser.close()
+            except Exception:
+                pass
+        self._browsers.clear()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def shutdown(self) -> None:
+        """ปิด browser ทั้งหมดและ thread ของ pool"""
+        if self._closed:
+            return
+        try:
+            self.run(self._close_all(), timeout=20)
+        except Exception as e:
+            logger.warning(f"⚠️ ปิด browser pool ไม่สำเร็จ: {e}")
+        self._closed = True
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join(timeout=5)
+
+
+def get_browser_pool() -> BrowserPool:
+    """คืน BrowserPool ที่ใช้ร่วมกันทั้งโปรเซส (สร้างเมื่อเรียกใช้ครั้งแรก ปิดอัตโนมัติเมื่อจบโปรเซส)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = BrowserPool()
+            atexit.register(_pool.shutdown)
+        return _pool
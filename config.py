@@ -16,6 +16,9 @@ PEAKENGINE_LOGIN_URL = "https://secure.peakengine.com/Home/Login"
 USE_BROWSER_MODE = True  # ใช้ Playwright Browser (True) หรือ Requests (False)
 HEADLESS_MODE = False  # แสดง Browser (False) หรือซ่อนหน้าจอ (True)
 
+# Development Settings
+DEV_HOT_RELOAD = False  # โหลด bot_data.py ใหม่อัตโนมัติเมื่อไฟล์ถูกแก้ไข (เปิดเฉพาะตอนพัฒนา)
+
 
 
 
@@ -0,0 +1,103 @@
+"""
+แปลง Statement ธนาคาร (PDF/ZIP) เป็น Excel หรือ CSV จาก command line โดยไม่ต้องเปิด Streamlit
+
+ตัวอย่าง:
+    python convert_statements.py ./statements -o statements.xlsx --workers 4
+    python convert_statements.py ./statements/2025-10 ./jan.zip -o out.csv --recursive
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import List
+
+from bank_pdf_reader import BankPDFReader
+from parse_cache import DEFAULT_CACHE_DIR, ParseCache
+from statement_batch import collect_pdf_sources, process_statement_batch, write_batch_workbook
+from statement_parser import PARSER_VERSION
+
+logger = logging.getLogger("convert_statements")
+
+_INPUT_EXTENSIONS = (".pdf", ".zip")
+
+
+def find_input_files(inputs: List[str], recursive: bool = False) -> List[str]:
+    """รวบรวมไฟล์ PDF/ZIP จาก path ที่ระบุ (โฟลเดอร์จะถูกค้นหาไฟล์ข้างใน)"""
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            if recursive:
+                for root, _, names in os.walk(path):
+                    files.extend(
+                        os.path.join(root, name) for name in sorted(names)
+                        if name.lower().endswith(_INPUT_EXTENSIONS)
+                    )
+            else:
+                files.extend(
+                    os.path.join(path, name) for name in sorted(os.listdir(path))
+                    if name.lower().endswith(_INPUT_EXTENSIONS)
+                )
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            logger.warning(f"⚠️ ไม่พบไฟล์หรือโฟลเดอร์: {path}")
+    return files
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="แปลง Statement ธนาคาร (PDF/ZIP) เป็น Excel หรือ CSV")
+    parser.add_argument("inputs", nargs="+", help="ไฟล์ PDF/ZIP หรือโฟลเดอร์ที่มีไฟล์เหล่านี้")
+    parser.add_argument("-o", "--output", required=True, help="ไฟล์ผลลัพธ์ (.xlsx หรือ .csv)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="จำนวน process ที่ใช้ดึงข้อความจาก PDF (ค่าเริ่มต้น = จำนวน CPU)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="ค้นหาไฟล์ในโฟลเดอร์ย่อยด้วย")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="โฟลเดอร์แคชผลการแปลง")
+    parser.add_argument("--no-cache", action="store_true", help="ไม่ใช้แคชผลการแปลง")
+    parser.add_argument("-q", "--quiet", action="store_true", help="แสดงเฉพาะคำเตือนและข้อผิดพลาด")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO,
+                        format="%(asctime)s %(levelname)s %(message)s")
+
+    output_format = os.path.splitext(args.output)[1].lower()
+    if output_format not in (".xlsx", ".csv"):
+        parser.error("ไฟล์ผลลัพธ์ต้องเป็น .xlsx หรือ .csv")
+
+    input_files = find_input_files(args.inputs, recursive=args.recursive)
+    sources = collect_pdf_sources(input_files)
+    if not sources:
+        logger.error("❌ ไม่พบไฟล์ PDF ที่จะแปลง")
+        return 1
+
+    cache = None if args.no_cache else ParseCache(args.cache_dir, version=PARSER_VERSION)
+    start_time = time.time()
+
+    def report_progress(done: int, total: int):
+        logger.info(f"📄 ดึงข้อความแล้ว {done}/{total} ไฟล์")
+
+    result = process_statement_batch(BankPDFReader(), sources, max_workers=args.workers,
+                                     cache=cache, progress_callback=report_progress)
+
+    if output_format == ".xlsx":
+        write_batch_workbook(result, args.output)
+    else:
+        result["transactions"].to_csv(args.output, index=False, encoding="utf-8-sig")
+        summary_path = f"{os.path.splitext(args.output)[0]}_files.csv"
+        result["files"].to_csv(summary_path, index=False, encoding="utf-8-sig")
+        logger.info(f"💾 บันทึกสรุปรายไฟล์ที่ {summary_path}")
+
+    files_df = result["files"]
+    failed = files_df[files_df["สถานะ"].str.startswith("❌")]
+    for _, row in failed.iterrows():
+        logger.error(f"{row['ไฟล์ต้นทาง']}: {row['สถานะ']}")
+
+    logger.info(
+        f"✅ แปลง {len(sources) - len(failed)}/{len(sources)} ไฟล์ "
+        f"({len(result['transactions'])} รายการ) ใน {time.time() - start_time:.1f} วินาที -> {args.output}"
+    )
+    return 1 if len(failed) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
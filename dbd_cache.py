@@ -0,0 +1,137 @@
+"""
+แคชข้อมูลบริษัทจาก DBD DataWarehouse ลง SQLite พร้อมอายุข้อมูล (TTL) (ไม่พึ่ง Streamlit)
+
+key หลักคือชื่อบริษัทหลังผ่าน clean_company_name และค้นด้วยเลขทะเบียนนิติบุคคลได้ด้วย
+ผู้ส่งโอนที่ซ้ำทุกเดือนจะได้ข้อมูลจากแคชโดยไม่ต้องเรียกเว็บ DBD
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".dbd_cache.sqlite3")
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+# ผลที่ค้นไม่พบ (ไม่มีเลขทะเบียน) เก็บไว้สั้นกว่า เผื่อเว็บมีปัญหาชั่วคราว
+DEFAULT_NOT_FOUND_TTL_SECONDS = 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    lookup_key TEXT PRIMARY KEY,
+    registration_number TEXT,
+    company_info TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_companies_registration ON companies (registration_number);
+"""
+
+
+class DBDCompanyCache:
+    """แคชข้อมูลบริษัท (company_info หลัง _post_process_company_info) แบบ thread-safe"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 not_found_ttl_seconds: float = DEFAULT_NOT_FOUND_TTL_SECONDS):
+        """
+        Args:
+            db_path (str): path ของไฟล์ SQLite
+            ttl_seconds (float): อายุข้อมูลบริษัทที่พบ
+            not_found_ttl_seconds (float): อายุผลที่ค้นไม่พบ
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.not_found_ttl_seconds = not_found_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def _read(self, column: str, value: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT lookup_key, company_info FROM companies "
+                f"WHERE {column} = ? AND expires_at > ? ORDER BY fetched_at DESC LIMIT 1",
+                (value, now)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE companies SET hit_count = hit_count + 1 WHERE lookup_key = ?", (row[0],))
+            self._conn.commit()
+        return json.loads(row[1])
+
+    def get(self, clean_name: str) -> Optional[Dict[str, Any]]:
+        """คืน company_info ของชื่อ (ผลจาก clean_company_name) ถ้ายังไม่หมดอายุ ไม่เช่นนั้นคืน None"""
+        if not clean_name:
+            return None
+        return self._read("lookup_key", clean_name)
+
+    def get_by_registration(self, registration_number: str) -> Optional[Dict[str, Any]]:
+        """คืน company_info ล่าสุดของเลขทะเบียนนิติบุคคล ถ้ายังไม่หมดอายุ"""
+        if not registration_number:
+            return None
+        return self._read("registration_number", str(registration_number).strip())
+
+    def put(self, clean_name: str, company_info: Dict[str, Any], ttl_seconds: Optional[float] = None) -> None:
+        """บันทึกผลการค้นหา (ผลที่มี error จะไม่ถูกเก็บ)"""
+        if not clean_name or not isinstance(company_info, dict) or "error" in company_info:
+            return
+        registration_number = str(company_info.get("registration_number") or "").strip()
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds if registration_number else self.not_found_ttl_seconds
+        now = time.time()
+        try:
+            payload = json.dumps(company_info, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️ บันทึกแคช DBD ของ {clean_name} ไม่ได้: {e}")
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO companies "
+                "(lookup_key, registration_number, company_info, fetched_at, expires_at, hit_count) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (clean_name, registration_number or None, payload, now, now + ttl_seconds)
+            )
+            self._conn.commit()
+
+    def invalidate(self, clean_name: str) -> None:
+        """ลบข้อมูลของชื่อนี้ออกจากแคช"""
+        with self._lock:
+            self._conn.execute("DELETE FROM companies WHERE lookup_key = ?", (clean_name,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """ลบรายการที่หมดอายุแล้ว คืนจำนวนที่ลบ"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM companies WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        """ลบแคชทั้งหมด"""
+        with self._lock:
+            self._conn.execute("DELETE FROM companies")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """สถิติการใช้งาน: hits/misses ของ instance นี้ และจำนวนรายการที่ยังไม่หมดอายุ"""
+        with self._lock:
+            entries = self._conn.execute(
+                "SELECT COUNT(*) FROM companies WHERE expires_at > ?", (time.time(),)
+            ).fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,388 @@
+"""
+งานค้นหาข้อมูล DBD แบบบันทึกผลทีละรายการและทำต่อได้ (ไม่พึ่ง Streamlit)
+
+DBDEnrichmentJob รัน DBDLookupEngine.iter_lookups ใน thread ของตัวเอง (ทำงานต่อแม้ปิดแท็บ browser)
+ผลแต่ละบริษัทถูกต่อท้าย journal (JSON Lines) ทันทีที่ค้นหาเสร็จ ถ้า session ตายกลางทาง
+การรันรายชื่อชุดเดิมอีกครั้งจะอ่าน journal แล้วค้นหาเฉพาะรายการที่ยังไม่เสร็จ (หรือผลเป็นข้อผิดพลาด)
+ฝั่ง UI อ่านความคืบหน้าด้วย progress() / completed_since() / recent_logs()
+หรือใช้ run_enrichment_job_with_reporter ที่รอจนงานเสร็จพร้อมส่งผลให้ reporter ของหน้า
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from dbd_record import DBDCompanyRecord
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".dbd_jobs")
+# journal ที่เก่ากว่านี้ไม่นำมาใช้ต่อ (ข้อมูลที่ค้นหาไว้นานแล้วให้แคช DBD จัดการตามอายุของมันเอง)
+DEFAULT_JOURNAL_MAX_AGE = 24 * 60 * 60
+MAX_LOG_MESSAGES = 500
+DEFAULT_POLL_INTERVAL = 0.2
+
+# metric ของงานค้นหาข้อมูล DBD (main.py และ bot_data_app.py) ตามลำดับคอลัมน์
+DBD_METRIC_LABELS = ("✅ สำเร็จ", "❌ ข้อผิดพลาด", "🔍 ไม่พบข้อมูล", "📊 รวม")
+
+_jobs: Dict[str, "DBDEnrichmentJob"] = {}
+_jobs_lock = threading.Lock()
+
+
+def lookup_mode(use_browser: bool = False, use_http_api: bool = False) -> str:
+    """ชื่อโหมดค้นหาของ DBDLookupEngine (ใช้เป็นส่วนหนึ่งของ id งาน)"""
+    if use_browser:
+        return "browser"
+    return "http_api" if use_http_api else "requests"
+
+
+def make_job_id(company_names: List[str], mode: str = "") -> str:
+    """
+    id ของงานจากรายชื่อที่ต้องค้นหาและโหมดค้นหา (ไฟล์เดิมในโหมดเดิมได้ id เดิม จึงหา journal ของรอบที่ค้างได้)
+
+    เปลี่ยนโหมด (browser / HTTP API / requests) ได้ id ใหม่ จึงไม่กลับไปใช้งานหรือ journal ของโหมดอื่น
+    """
+    digest = hashlib.sha256("\n".join([mode, *(str(name) for name in company_names)]).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class LookupJournal:
+    """ไฟล์ JSON Lines แบบต่อท้ายอย่างเดียว: บรรทัดละ 1 ผลการค้นหา {"name": ..., "company_info": {...}}"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def age(self) -> float:
+        """อายุของ journal นับจากบรรทัดล่าสุด (วินาที)"""
+        return time.time() - os.path.getmtime(self.path)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """อ่านผลที่บันทึกไว้ {ชื่อ: company_info} (ผลหลังทับผลก่อน บรรทัดที่เขียนไม่ครบถูกข้าม)"""
+        results: Dict[str, Dict[str, Any]] = {}
+        if not self.exists():
+            return results
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and isinstance(entry.get("company_info"), dict):
+                    results[entry.get("name", "")] = entry["company_info"]
+        return results
+
+    def append(self, name: str, company_info: Dict[str, Any]) -> None:
+        """ต่อท้ายผล 1 รายการแล้ว flush ลงดิสก์ทันที"""
+        try:
+            line = json.dumps({"name": name, "company_info": company_info, "t": time.time()}, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️ บันทึกผลของ {name} ลง journal ไม่ได้: {e}")
+            return
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self) -> None:
+        """ลบ journal (หลังนำผลไปใช้ครบแล้ว)"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class DBDEnrichmentJob:
+    """
+    ค้นหาข้อมูลบริษัทตาม company_names (ชื่อไม่ซ้ำจาก DBDLookupEngine.plan_lookups) ใน thread แยก
+
+    ผลของตำแหน่ง i อยู่ที่ results()[i] (None = ยังไม่เสร็จ) ผลที่ได้จาก journal นับเป็นเสร็จแล้ว
+    ยกเว้นผลที่มี error ซึ่งจะถูกค้นหาใหม่
+    """
+
+    def __init__(self, company_names: List[str], engine_factory: Callable[[], Any],
+                 force_refresh: bool = False, journal_dir: str = DEFAULT_JOURNAL_DIR,
+                 journal_max_age: float = DEFAULT_JOURNAL_MAX_AGE, mode: str = ""):
+        """
+        Args:
+            company_names (List[str]): ชื่อที่ต้องค้นหา (ลำดับเดียวกับผลลัพธ์)
+            engine_factory (Callable): สร้าง DBDLookupEngine (เรียกใน thread ของงาน ปิดด้วย close() เมื่อเสร็จ)
+            force_refresh (bool): ไม่ใช้แคช DBD และไม่ใช้ผลจาก journal เดิม
+            journal_dir (str): โฟลเดอร์เก็บ journal
+            journal_max_age (float): อายุสูงสุดของ journal ที่นำมาใช้ต่อ (วินาที)
+            mode (str): โหมดค้นหาของ engine_factory (ผลของ lookup_mode)
+        """
+        self.company_names = list(company_names)
+        self.mode = mode
+        self.job_id = make_job_id(self.company_names, mode)
+        self.engine_factory = engine_factory
+        self.force_refresh = force_refresh
+        self.journal = LookupJournal(os.path.join(journal_dir, f"{self.job_id}.jsonl"))
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._results: List[Optional[Dict[str, Any]]] = [None] * len(self.company_names)
+        self._completed: List[Tuple[int, Dict[str, Any]]] = []
+        self._logs: List[Dict[str, str]] = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.resumed_count = self._resume(journal_max_age)
+
+    def _resume(self, journal_max_age: float) -> int:
+        """นำผลที่ยังไม่หมดอายุจาก journal มาใช้ คืนจำนวนรายการที่ไม่ต้องค้นหาใหม่"""
+        if not self.journal.exists():
+            return 0
+        if self.force_refresh or self.journal.age() > journal_max_age:
+            self.journal.remove()
+            return 0
+        saved = self.journal.load()
+        resumed = 0
+        for position, name in enumerate(self.company_names):
+            company_info = saved.get(name)
+            if company_info is not None and "error" not in company_info:
+                self._results[position] = company_info
+                self._completed.append((position, company_info))
+                resumed += 1
+        if resumed:
+            logger.info(f"♻️ งาน {self.job_id}: ใช้ผลจาก journal {resumed}/{len(self.company_names)} รายการ")
+        return resumed
+
+    def pending_positions(self) -> List[int]:
+        """ตำแหน่งที่ยังไม่มีผลหรือผลเป็นข้อผิดพลาด"""
+        with self._lock:
+            return [position for position, company_info in enumerate(self._results)
+                    if company_info is None or "error" in company_info]
+
+    def _log(self, message: str, status: str = "info") -> None:
+        with self._lock:
+            self._logs.append({"message": message, "status": status, "time": datetime.now().strftime("%H:%M:%S")})
+            del self._logs[:-MAX_LOG_MESSAGES]
+
+    def _record(self, position: int, company_info: Dict[str, Any]) -> None:
+        self.journal.append(self.company_names[position], company_info)
+        with self._lock:
+            self._results[position] = company_info
+            self._completed.append((position, company_info))
+
+    def run(self) -> None:
+        """ค้นหารายการที่ยังค้างทั้งหมด (บล็อกจนเสร็จ ใช้ start() เพื่อรันใน thread แยก)"""
+        self.started_at = time.time()
+        pending = self.pending_positions()
+        engine = None
+        try:
+            if pending:
+                engine = self.engine_factory()
+                names = [self.company_names[position] for position in pending]
+                for index, company_info in engine.iter_lookups(names, log_callback=self._log,
+                                                                force_refresh=self.force_refresh):
+                    self._record(pending[index], company_info)
+                    if self._cancelled.is_set():
+                        self._log("⏹️ ยกเลิกงานค้นหา - ผลที่เสร็จแล้วถูกบันทึกใน journal", "warning")
+                        break
+        except Exception as e:
+            logger.error(f"งานค้นหา DBD {self.job_id} หยุดกลางทาง: {e}")
+            self.error = str(e) or type(e).__name__
+            self._log(f"งานค้นหาหยุดกลางทาง: {self.error}", "error")
+        finally:
+            if engine is not None:
+                engine.close()
+            self.journal.close()
+            self.finished_at = time.time()
+
+    def start(self) -> "DBDEnrichmentJob":
+        """เริ่มงานใน daemon thread (ไม่ผูกกับ session ของ Streamlit)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name=f"dbd_job_{self.job_id}", daemon=True)
+            self._thread.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """รอจนงานเสร็จ คืน True ถ้าเสร็จแล้ว"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.finished
+
+    def cancel(self) -> None:
+        """หยุดหลังรายการที่กำลังค้นหาอยู่ (งานที่ส่งให้ engine แล้วแต่ยังไม่เริ่มถูกยกเลิกเมื่อปิด engine)"""
+        self._cancelled.set()
+
+    def results(self) -> List[Optional[Dict[str, Any]]]:
+        """company_info ของแต่ละตำแหน่ง (None = ยังไม่เสร็จ)"""
+        with self._lock:
+            return list(self._results)
+
+    def completed_since(self, cursor: int = 0) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        (ตำแหน่ง, company_info) ตามลำดับที่เสร็จ นับจาก cursor (รวมผลจาก journal ที่ต้นรายการ)
+
+        ผู้อ่านแต่ละรายเก็บ cursor ของตัวเอง session ใหม่ที่กลับมาดูงานเดิมจึงเริ่มจาก 0 ได้
+        """
+        with self._lock:
+            return self._completed[cursor:]
+
+    def recent_logs(self, limit: int = 50) -> List[Dict[str, str]]:
+        """ข้อความ log ล่าสุด (ถูกเรียกจาก thread ของ engine จึงเก็บไว้ที่งาน ไม่ใช่ที่ session)"""
+        with self._lock:
+            return self._logs[-limit:]
+
+    def progress(self) -> Dict[str, Any]:
+        """ความคืบหน้า: total, done, resumed, errors, running, finished, elapsed และ error ของงาน"""
+        with self._lock:
+            done = sum(company_info is not None for company_info in self._results)
+            errors = sum(company_info is not None and "error" in company_info for company_info in self._results)
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        return {
+            "job_id": self.job_id,
+            "total": len(self.company_names),
+            "done": done,
+            "resumed": self.resumed_count,
+            "errors": errors,
+            "running": self.running,
+            "finished": self.finished,
+            "elapsed": elapsed,
+            "error": self.error,
+        }
+
+    def discard(self) -> None:
+        """ลบ journal และนำงานออกจากรายการงาน (เรียกหลังเขียนผลลง DataFrame แล้ว)"""
+        if self.running:
+            return
+        self.journal.remove()
+        with _jobs_lock:
+            if _jobs.get(self.job_id) is self:
+                del _jobs[self.job_id]
+
+
+def start_enrichment_job(company_names: List[str], engine_factory: Callable[[], Any],
+                         force_refresh: bool = False, journal_dir: str = DEFAULT_JOURNAL_DIR,
+                         mode: str = "") -> DBDEnrichmentJob:
+    """
+    เริ่มงานค้นหา หรือคืนงานเดิมของรายชื่อและโหมดชุดเดียวกันที่ยังรันอยู่/ยังไม่ถูก discard (เช่น หลังรีเฟรชหน้า)
+
+    งานที่จบแล้วแต่ยังมีรายการค้างหรือผิดพลาดจะถูกสร้างใหม่จาก journal แล้วค้นหาต่อเฉพาะส่วนที่เหลือ
+    การหยุดงานเดิม (force_refresh) และการอ่าน journal ทำนอก _jobs_lock เพื่อไม่ให้ session อื่นที่
+    เรียก get_enrichment_job / list_enrichment_jobs ต้องรอ
+    """
+    job_id = make_job_id(company_names, mode)
+    with _jobs_lock:
+        previous = _jobs.get(job_id)
+    if previous is not None and not force_refresh and (
+            previous.running or (previous.finished and not previous.pending_positions())):
+        return previous
+    if previous is not None and previous.running:
+        previous.cancel()
+        previous.wait(timeout=30)
+
+    job = DBDEnrichmentJob(company_names, engine_factory, force_refresh=force_refresh,
+                           journal_dir=journal_dir, mode=mode)
+    with _jobs_lock:
+        current = _jobs.get(job_id)
+        if current is not None and current is not previous and current.running:
+            # session อื่นเริ่มงานเดียวกันไปแล้วระหว่างที่รอ - ใช้งานนั้นแทน
+            return current
+        _jobs[job_id] = job
+    return job.start()
+
+
+def get_enrichment_job(job_id: str) -> Optional[DBDEnrichmentJob]:
+    """คืนงานตาม id (None ถ้าไม่มีในโปรเซสนี้)"""
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def list_enrichment_jobs(running_only: bool = False) -> List[DBDEnrichmentJob]:
+    """งานทั้งหมดในโปรเซสนี้ (running_only=True เฉพาะงานที่กำลังรัน)"""
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+    return [job for job in jobs if job.running or not running_only]
+
+
+def run_enrichment_job_with_reporter(job: DBDEnrichmentJob, reporter, company_names: Sequence[str],
+                                     group_sizes: Sequence[int],
+                                     poll_interval: float = DEFAULT_POLL_INTERVAL
+                                     ) -> Tuple[List[Optional[DBDCompanyRecord]], Dict[str, int]]:
+    """
+    รอจนงานค้นหา DBD เสร็จ พร้อมส่งความคืบหน้า metric ผลรายบริษัท และ log ให้ reporter (ใช้ร่วมกันทุกหน้า)
+
+    reporter เป็น object แบบ ui_reporter.UIReporter (add_outcome, set_progress, set_metric, replace_logs, flush)
+    โมดูลนี้จึงไม่ต้อง import ส่วน UI
+
+    Args:
+        job (DBDEnrichmentJob): งานจาก start_enrichment_job (ค้นหา company_names ตามลำดับเดียวกัน)
+        reporter: reporter ที่มี metric ตาม DBD_METRIC_LABELS
+        company_names (Sequence[str]): ชื่อไม่ซ้ำที่ส่งให้งานค้นหา
+        group_sizes (Sequence[int]): จำนวนแถวของแต่ละชื่อ (สถิตินับตามจำนวนแถว)
+        poll_interval (float): เวลารอระหว่างการอ่านผลจากงาน (วินาที)
+
+    Returns:
+        Tuple: (records - DBDCompanyRecord ของแต่ละชื่อ (None = ยังไม่เสร็จ), stats - {"success", "error", "not_found"})
+    """
+    total_companies = len(company_names)
+    records: List[Optional[DBDCompanyRecord]] = [None] * total_companies
+    stats = {"success": 0, "error": 0, "not_found": 0}
+    processed_count = 0
+    cursor = 0
+    while True:
+        job_finished = job.finished  # อ่านก่อนดึงผล เพื่อไม่ให้พลาดผลสุดท้าย
+        completed = job.completed_since(cursor)
+        cursor += len(completed)
+        for position, company_info in completed:
+            company_name = company_names[position]
+            row_count = int(group_sizes[position])
+            processed_count += 1
+
+            # เก็บผลเป็น record (ผู้เรียกเขียนลงคอลัมน์จริงหลังค้นหาครบ)
+            record = DBDCompanyRecord.from_company_info(company_info)
+            records[position] = record
+
+            # อัปเดตสถิติ (นับตามจำนวนแถว) และบันทึกผลลงตารางสรุปรายบริษัท
+            if record.error:
+                stats["error"] += row_count
+                reporter.add_outcome(company_name, "❌ ข้อผิดพลาด", row_count, record.error)
+            elif not record.to_details():
+                stats["not_found"] += row_count
+                reporter.add_outcome(company_name, "🔍 ไม่พบข้อมูล", row_count)
+            else:
+                stats["success"] += row_count
+                reporter.add_outcome(company_name, "✅ พบข้อมูล", row_count, record.registration_number)
+
+        if completed:
+            reporter.set_progress(processed_count / total_companies,
+                                  f"ค้นหาเสร็จ {processed_count}/{total_companies}: {company_names[completed[-1][0]]}")
+            for label, value in zip(DBD_METRIC_LABELS, (stats["success"], stats["error"], stats["not_found"],
+                                                        sum(stats.values()))):
+                reporter.set_metric(label, value)
+        if getattr(reporter, "log_placeholder", None) is not None:
+            reporter.replace_logs(job.recent_logs(getattr(reporter, "log_lines", 50)))
+        if job_finished:
+            break
+        time.sleep(poll_interval)
+    reporter.flush()
+    return records, stats
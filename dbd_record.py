@@ -0,0 +1,250 @@
+"""
+ข้อมูลบริษัทจาก DBD แบบมีโครงสร้าง (ไม่พึ่ง Streamlit)
+
+DBDCompanyRecord ถูกเก็บเป็นคอลัมน์จริงใน DataFrame (เลขทะเบียนจาก DBD, ประเภทธุรกิจ, ที่อยู่_จังหวัด, ...)
+ส่วนข้อความในคอลัมน์ "ข้อมูล DBD" ใช้แสดงผลเท่านั้น ขั้นตอนถัดไป (ตารางสรุป, PeakEngine, NewPeak)
+อ่านจากคอลัมน์โดยตรง และแยกข้อความเฉพาะไฟล์ Excel เก่าที่ยังไม่มีคอลัมน์เหล่านี้
+"""
+import re
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+DBD_INFO_COLUMN = "ข้อมูล DBD"
+NOT_FOUND_TEXT = "ไม่พบข้อมูล"
+ERROR_LABEL = "ข้อผิดพลาด"
+
+# field -> label ในข้อความแสดงผล "เลขทะเบียน: ... | ประเภทธุรกิจ: ..." (ลำดับเดียวกับที่แสดง)
+DISPLAY_LABELS = {
+    "registration_number": "เลขทะเบียน",
+    "business_type": "ประเภทธุรกิจ",
+    "status": "สถานะ",
+    "registered_capital": "ทุนจดทะเบียน",
+    "address": "ที่อยู่",
+    "phone": "โทรศัพท์",
+    "found_date": "วันที่จดทะเบียน",
+}
+
+# field -> คอลัมน์ใน DataFrame
+RECORD_COLUMNS = {
+    "registration_number": "เลขทะเบียนจาก DBD",
+    "company_name": "ชื่อบริษัทจาก DBD",
+    "business_type": "ประเภทธุรกิจ",
+    "status": "สถานะกิจการ",
+    "registered_capital": "ทุนจดทะเบียน",
+    "address": "ที่อยู่",
+    "phone": "โทรศัพท์จาก DBD",
+    "found_date": "วันที่จดทะเบียน",
+    "directors": "รายชื่อกรรมการ",
+}
+
+# ส่วนประกอบที่อยู่ (ผลของ parse_thai_address) -> คอลัมน์ใน DataFrame
+ADDRESS_COLUMNS = {
+    "house_no": "ที่อยู่_บ้านเลขที่",
+    "village": "ที่อยู่_หมู่บ้าน",
+    "moo": "ที่อยู่_หมู่ที่",
+    "subdistrict": "ที่อยู่_ตำบล",
+    "district": "ที่อยู่_อำเภอ",
+    "province": "ที่อยู่_จังหวัด",
+    "postal_code": "ที่อยู่_รหัสไปรษณีย์",
+}
+
+# field -> คอลัมน์ในตารางสรุปข้อมูล DBD
+SUMMARY_COLUMNS = {
+    "registration_number": "เลขทะเบียน",
+    "business_type": "ประเภทธุรกิจ",
+    "status": "สถานะ",
+    "registered_capital": "ทุนจดทะเบียน",
+    "address": "ที่อยู่",
+}
+
+_LABEL_FIELDS = {label: field for field, label in DISPLAY_LABELS.items()}
+_ERROR_PATTERN = rf"(?:^|\|)\s*{ERROR_LABEL}\s*:"
+# 1 pattern ต่อ field: ค่าหลัง "label:" จนถึง | ถัดไป (แบบเดียวกับ from_display_text - strip ทีหลัง)
+_DISPLAY_PATTERNS = {
+    field: rf"(?:^|\|)\s*{re.escape(label)}\s*:([^|]*)"
+    for field, label in DISPLAY_LABELS.items()
+}
+
+
+def _text(value: Any) -> str:
+    """แปลงค่าจาก DataFrame/Excel เป็นข้อความ (None, NaN, "nan" -> "")"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and pd.isna(value):
+        return ""
+    text = str(value).strip()
+    return "" if text.lower() in ("nan", "none") else text
+
+
+def _text_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """_text ของทั้งคอลัมน์ (คอลัมน์ที่ไม่มีคืนข้อความว่าง)"""
+    if column not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    series = df[column]
+    text = series.astype(object).where(series.notna(), "").astype(str).str.strip()
+    return text.mask(text.str.lower().isin(("nan", "none")), "")
+
+
+def _directors_text(value: Any) -> str:
+    if isinstance(value, list):
+        return " | ".join(value)
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return str(value).strip()
+
+
+class DBDCompanyRecord:
+    """ข้อมูลบริษัท 1 รายจาก DBD (ผลของ DBDDataWarehouseBot.search_company_info)"""
+
+    __slots__ = tuple(RECORD_COLUMNS) + ("address_components", "error")
+
+    def __init__(self, registration_number: str = "", company_name: str = "", business_type: str = "",
+                 status: str = "", registered_capital: str = "", address: str = "", phone: str = "",
+                 found_date: str = "", directors: str = "",
+                 address_components: Optional[Dict[str, str]] = None, error: str = ""):
+        self.registration_number = registration_number
+        self.company_name = company_name
+        self.business_type = business_type
+        self.status = status
+        self.registered_capital = registered_capital
+        self.address = address
+        self.phone = phone
+        self.found_date = found_date
+        self.directors = directors
+        self.address_components = address_components or {}
+        self.error = error
+
+    @classmethod
+    def from_company_info(cls, company_info: Mapping[str, Any]) -> "DBDCompanyRecord":
+        """สร้างจาก dict ที่ได้จาก search_company_info (หลัง _post_process_company_info)"""
+        if "error" in company_info:
+            return cls(error=_text(company_info["error"]))
+        directors_list = company_info.get("directors_list") or []
+        directors = " | ".join(directors_list) if directors_list else _text(company_info.get("directors"))
+        components = company_info.get("address_components") or {}
+        return cls(
+            directors=directors,
+            address_components={key: _text(components.get(key)) for key in ADDRESS_COLUMNS},
+            **{field: _text(company_info.get(field)) for field in RECORD_COLUMNS if field != "directors"}
+        )
+
+    @classmethod
+    def from_display_text(cls, text: Any) -> "DBDCompanyRecord":
+        """แยกข้อความ "เลขทะเบียน: ... | ..." (คอลัมน์ ข้อมูล DBD ของไฟล์เก่า) กลับเป็น record"""
+        record = cls()
+        for part in _text(text).split("|"):
+            if ":" not in part:
+                continue
+            label, value = (item.strip() for item in part.split(":", 1))
+            if label == ERROR_LABEL:
+                record.error = value
+            elif label in _LABEL_FIELDS and value:
+                setattr(record, _LABEL_FIELDS[label], value)
+        return record
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any], info_column: str = DBD_INFO_COLUMN,
+                 fallback_text: Any = None) -> "DBDCompanyRecord":
+        """
+        อ่าน record จากแถวของ DataFrame (หรือ dict ของแถว)
+
+        ใช้คอลัมน์แยกเมื่อมีเลขทะเบียนจาก DBD ไม่เช่นนั้นแยกข้อความใน info_column (หรือ fallback_text)
+        ถ้า info_column เป็นข้อความข้อผิดพลาด คืน record ที่มีข้อผิดพลาดเสมอ (ไม่ใช้ค่าเก่าที่ค้างในคอลัมน์แยก)
+        """
+        text = row.get(info_column)
+        if re.match(_ERROR_PATTERN, _text(text)):
+            return cls.from_display_text(text)
+        if _text(row.get(RECORD_COLUMNS["registration_number"])):
+            return cls(
+                address_components={key: _text(row.get(column)) for key, column in ADDRESS_COLUMNS.items()},
+                **{field: _text(row.get(column)) for field, column in RECORD_COLUMNS.items()}
+            )
+        return cls.from_display_text(text if _text(text) else fallback_text)
+
+    @property
+    def found(self) -> bool:
+        """ค้นหาพบบริษัท (มีเลขทะเบียนและไม่มีข้อผิดพลาด)"""
+        return not self.error and bool(self.registration_number)
+
+    def display_text(self) -> str:
+        """ข้อความสำหรับแสดงผลในคอลัมน์ ข้อมูล DBD"""
+        if self.error:
+            return f"{ERROR_LABEL}: {self.error}"
+        parts = [f"{label}: {getattr(self, field)}" for field, label in DISPLAY_LABELS.items() if getattr(self, field)]
+        return " | ".join(parts) if parts else NOT_FOUND_TEXT
+
+    def to_details(self) -> Dict[str, str]:
+        """{label: ค่า} แบบเดียวกับการแยกข้อความแสดงผล (เฉพาะค่าที่ไม่ว่าง)"""
+        if self.error:
+            return {ERROR_LABEL: self.error}
+        return {label: getattr(self, field) for field, label in DISPLAY_LABELS.items() if getattr(self, field)}
+
+    def to_columns(self) -> Dict[str, str]:
+        """
+        {ชื่อคอลัมน์: ค่า} สำหรับเขียนลง DataFrame รวมคอลัมน์ ข้อมูล DBD (ข้อความแสดงผล)
+
+        record ที่มีข้อผิดพลาดคืนค่าว่างให้ทุกคอลัมน์ข้อมูลบริษัท เพื่อไม่ให้ผลเก่าของแถวเดียวกันค้างอยู่
+        """
+        columns = {DBD_INFO_COLUMN: self.display_text()}
+        if self.error:
+            columns.update({column: "" for column in [*RECORD_COLUMNS.values(), *ADDRESS_COLUMNS.values()]})
+            return columns
+        columns.update({column: getattr(self, field) for field, column in RECORD_COLUMNS.items()})
+        columns.update({column: self.address_components.get(key, "") for key, column in ADDRESS_COLUMNS.items()})
+        return columns
+
+    def __repr__(self) -> str:
+        return f"DBDCompanyRecord({self.registration_number or self.error or NOT_FOUND_TEXT!r}, {self.company_name!r})"
+
+
+def create_dbd_summary_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    สร้างตารางสรุปข้อมูล DBD (1 แถวต่อรายการที่พบข้อมูล) แบบทำทั้งคอลัมน์พร้อมกัน
+
+    แถวที่มีเลขทะเบียนจาก DBD ใช้คอลัมน์ของ DBDCompanyRecord ส่วนแถวของไฟล์เก่าแยกข้อความ ข้อมูล DBD
+    แถวที่ ข้อมูล DBD เป็นข้อความข้อผิดพลาดไม่ถูกนับ แม้คอลัมน์แยกจะยังมีค่าเก่าค้างอยู่
+    ด้วย str.extract 1 pattern ต่อ field ผลลัพธ์เหมือนการเรียก DBDCompanyRecord.from_row ทีละแถว
+
+    Args:
+        df (pd.DataFrame): DataFrame ที่มีข้อมูล DBD
+
+    Returns:
+        pd.DataFrame: ตารางสรุปข้อมูล DBD (DataFrame ว่างถ้าไม่มีคอลัมน์ ข้อมูล DBD หรือไม่พบข้อมูลเลย)
+    """
+    if DBD_INFO_COLUMN not in df.columns:
+        return pd.DataFrame()
+
+    info_text = _text_column(df, DBD_INFO_COLUMN)
+    error_rows = info_text.str.match(_ERROR_PATTERN).to_numpy()
+    from_columns = _text_column(df, RECORD_COLUMNS["registration_number"]).ne("").to_numpy() & ~error_rows
+    text_rows = ~from_columns & ~info_text.str.contains(_ERROR_PATTERN, regex=True).to_numpy()
+    text_values = info_text[text_rows]
+    column_rows = df[from_columns]
+
+    fields = {}
+    for field, pattern in _DISPLAY_PATTERNS.items():
+        values = np.full(len(df), "", dtype=object)
+        values[from_columns] = _text_column(column_rows, RECORD_COLUMNS[field]).to_numpy()
+        values[text_rows] = text_values.str.extract(pattern, expand=False).fillna("").str.strip().to_numpy()
+        fields[field] = values
+
+    has_details = np.any([values != "" for values in fields.values()], axis=0)
+    keep = from_columns | (text_rows & has_details)
+    if not keep.any():
+        return pd.DataFrame()
+
+    kept = df[keep].reset_index(drop=True)
+
+    def source_column(column: str):
+        return kept[column] if column in kept.columns else ""
+
+    directors = kept["รายชื่อกรรมการ"].map(_directors_text) if "รายชื่อกรรมการ" in kept.columns else ""
+    return pd.DataFrame({
+        "ชื่อบริษัท": source_column("ชื่อบริษัท/บุคคล"),
+        "ชื่อบริษัทจาก DBD": source_column(RECORD_COLUMNS["company_name"]),
+        **{column: fields[field][keep] for field, column in SUMMARY_COLUMNS.items()},
+        "รายชื่อกรรมการ": directors,
+        **{column: source_column(column) for column in ADDRESS_COLUMNS.values()},
+    }, index=kept.index)
@@ -7,8 +7,8 @@ st.set_page_config(
     layout="wide"
 )
 
+import numpy as np
 import pandas as pd
-import pdfplumber
 from datetime import datetime, timedelta
 import io
 import re
@@ -16,19 +16,24 @@ import zipfile
 from typing import Dict, List, Tuple, Optional, Any
 import os
 import sys
-import importlib.util
-import importlib.machinery
-import importlib
+import inspect
 import time
 import logging
 import asyncio
 import subprocess
 from concurrent.futures import ThreadPoolExecutor
 
-try:
-    from NewPeak import NewPeakBot
-except ImportError:
-    NewPeakBot = None
+from bank_pdf_reader import BankPDFReader
+from dbd_cache import DBDCompanyCache
+from dbd_jobs import DBD_METRIC_LABELS, list_enrichment_jobs, lookup_mode, run_enrichment_job_with_reporter, start_enrichment_job
+from dbd_record import ADDRESS_COLUMNS, RECORD_COLUMNS, DBDCompanyRecord, create_dbd_summary_table
+from module_loader import is_dev_hot_reload_enabled, load_project_module
+from parse_cache import ParseCache
+from pdf_extraction import merge_page_results
+from statement_batch import collect_pdf_sources, process_statement_batch, write_batch_workbook
+from statement_parser import PARSER_VERSION, drop_internal_columns, parse_amount, parse_amount_series
+from thai_address import fill_address_columns, get_address_gazetteer
+from ui_reporter import UIReporter
 
 # ตั้งค่า logging ก่อน (เพื่อใช้ logger ในการตรวจสอบ config)
 logging.basicConfig(level=logging.INFO)
@@ -50,6 +55,15 @@ except ImportError:
     config = None
     logger.error("❌ ไม่สามารถ import config ได้")
 
+# แคชผลการแปลง Statement บนดิสก์ (key = SHA-256 ของไฟล์ + เวอร์ชันตัวแปลง)
+parse_cache = ParseCache(version=PARSER_VERSION)
+
+
+@st.cache_resource(show_spinner=False)
+def get_dbd_cache() -> DBDCompanyCache:
+    """แคชข้อมูลบริษัทจาก DBD (SQLite) ที่ใช้ร่วมกันทุก session และทุก rerun"""
+    return DBDCompanyCache()
+
 # เก็บ bot instances ไว้ใน module level เพื่อป้องกัน garbage collection
 _peakengine_bots = []
 _newpeak_bots = []
@@ -61,202 +75,119 @@ if sys.platform.startswith("win"):
     except Exception:
         pass
 
-# Import DBDDataWarehouseBot จาก bot_data.py
-try:
-    # ลบ cache เก่าเพื่อให้แน่ใจว่าโหลดโค้ดใหม่
-    modules_to_remove = [key for key in sys.modules.keys() if 'bot_data' in key.lower()]
-    for module_name in modules_to_remove:
-        try:
-            del sys.modules[module_name]
-        except:
-            pass
-    
-    # ลบ __pycache__ ด้วย
-    import shutil
-    import inspect
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    cache_dir = os.path.join(current_dir, '__pycache__')
-    if os.path.exists(cache_dir):
-        try:
-            shutil.rmtree(cache_dir, ignore_errors=True)
-        except:
-            pass
-    
-    # Import จากไฟล์แยก
-    bot_data_path = os.path.join(current_dir, 'bot_data.py')
-    
-    if os.path.exists(bot_data_path):
-        # ใช้ unique module name เพื่อบังคับให้โหลดใหม่ทุกครั้ง
-        module_name = f"bot_data_module_{int(time.time() * 1000)}"
-        spec = importlib.util.spec_from_file_location(module_name, bot_data_path)
-        bot_data_module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = bot_data_module
-        spec.loader.exec_module(bot_data_module)
-        
-        # ตรวจสอบว่า class มี use_browser parameter หรือไม่
-        sig = inspect.signature(bot_data_module.DBDDataWarehouseBot.__init__)
-        params = list(sig.parameters.keys())
-        
-        if 'use_browser' not in params:
-            raise AttributeError(f"bot_data.py ไม่มี use_browser parameter ใน __init__ (พบ parameters: {params})")
-        
-        DBDDataWarehouseBot = bot_data_module.DBDDataWarehouseBot
-        create_dbd_summary_table = bot_data_module.create_dbd_summary_table
-        
-        logger.info(f"✅ โหลด bot_data.py สำเร็จ (parameters: {params})")
-    else:
-        # Fallback
-        logger.warning(f"ไม่พบไฟล์ bot_data.py ที่ {bot_data_path}")
-        from bot_data import DBDDataWarehouseBot, create_dbd_summary_table
-        
-        # ตรวจสอบอีกครั้ง
-        sig = inspect.signature(DBDDataWarehouseBot.__init__)
-        params = list(sig.parameters.keys())
-        if 'use_browser' not in params:
-            raise AttributeError(f"bot_data module ไม่มี use_browser parameter (พบ: {params})")
-        
-except Exception as e:
-    error_msg = str(e)
-    logger.error(f"ไม่สามารถโหลด bot_data module ได้: {error_msg}")
-    st.error(f"❌ ไม่สามารถโหลด bot_data module ได้: {error_msg}")
-    st.error(f"กรุณาตรวจสอบว่าไฟล์ bot_data.py มี use_browser parameter ใน __init__")
-    st.error(f"Path ที่ลองหา: {bot_data_path if 'bot_data_path' in locals() else 'ไม่พบ'}")
+# โหลด DBDDataWarehouseBot จาก bot_data.py เมื่อหน้าที่ใช้บอท DBD ถูกเรียกครั้งแรกเท่านั้น
+# (bot_data import requests/bs4 ซึ่งหน้าอื่นไม่ได้ใช้) แล้วใช้โมดูลเดิมซ้ำทุก rerun
+# ตั้ง DEV_HOT_RELOAD = True ใน config.py ตอนพัฒนา เพื่อโหลดใหม่อัตโนมัติเมื่อแก้ไข bot_data.py
+DEV_HOT_RELOAD = is_dev_hot_reload_enabled()
+
+
+def load_bot_data_module():
+    """โหลดโมดูล bot_data และตรวจสอบว่า DBDDataWarehouseBot รองรับ use_browser"""
+    bot_data_module = load_project_module('bot_data', hot_reload=DEV_HOT_RELOAD)
     
-    # Fallback: สร้าง class เก่าเป็น dummy (แต่มี use_browser)
-    class DBDDataWarehouseBot:
-        def __init__(self, use_browser=False, headless=False):
-            st.error(f"ไม่สามารถโหลด bot_data.py ได้: {error_msg}")
-            st.stop()
-        
-        def search_company_info(self, company_name, log_callback=None):
-            return {"error": "ไม่สามารถโหลด bot_data module ได้"}
-        
-        def format_company_info(self, company_info):
-            return "ไม่พบข้อมูล"
+    # ตรวจสอบว่า class มี use_browser parameter หรือไม่
+    sig = inspect.signature(bot_data_module.DBDDataWarehouseBot.__init__)
+    params = list(sig.parameters.keys())
+    if 'use_browser' not in params:
+        raise AttributeError(f"bot_data.py ไม่มี use_browser parameter ใน __init__ (พบ parameters: {params})")
     
-    def create_dbd_summary_table(df):
-        return pd.DataFrame()
+    return bot_data_module
+
+
+def get_dbd_bot_class():
+    """คืนคลาส DBDDataWarehouseBot (แสดงข้อผิดพลาดและหยุดหน้าถ้าโหลด bot_data ไม่ได้)"""
+    try:
+        return load_bot_data_module().DBDDataWarehouseBot
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f"ไม่สามารถโหลด bot_data module ได้: {error_msg}")
+        st.error(f"❌ ไม่สามารถโหลด bot_data module ได้: {error_msg}")
+        st.error(f"กรุณาตรวจสอบว่าไฟล์ bot_data.py มี use_browser parameter ใน __init__")
+        st.stop()
 
 # ฟังก์ชันสำหรับใช้งานบอทกับ Streamlit
 def integrate_with_streamlit(df: pd.DataFrame, company_column: str = 'ชื่อบริษัท/บุคคล',
-                              use_browser: bool = False, headless: bool = False) -> pd.DataFrame:
-    """ฟังก์ชันสำหรับใช้งานร่วมกับ Streamlit พร้อมแสดงการทำงาน"""
-    # สร้าง bot instance พร้อม browser mode
-    bot = DBDDataWarehouseBot(use_browser=use_browser, headless=headless)
+                              use_browser: bool = False, headless: bool = False,
+                              workers: Optional[int] = None, rate_per_second: Optional[float] = None) -> pd.DataFrame:
+    """ฟังก์ชันสำหรับใช้งานร่วมกับ Streamlit พร้อมแสดงการทำงาน (ค้นหาหลายบริษัทพร้อมกันด้วย DBDLookupEngine)"""
+    get_dbd_bot_class()  # ตรวจสอบ bot_data (แสดงข้อผิดพลาดและหยุดหน้าถ้าโหลดไม่ได้)
+    if workers is None:
+        workers = st.session_state.get('dbd_lookup_workers', 3)
+    if rate_per_second is None:
+        rate_per_second = st.session_state.get('dbd_lookup_rate', 1.0)
+    force_refresh = st.session_state.get('dbd_force_refresh', False)
+    fast_mode = st.session_state.get('dbd_fast_mode', False)
+    use_http_api = st.session_state.get('dbd_use_http_api', False)
+    dbd_cache = get_dbd_cache()
+    cache_stats_before = dbd_cache.stats()
     
-    # สร้างคอลัมน์ใหม่สำหรับข้อมูล DBD
+    # สร้างคอลัมน์ใหม่สำหรับข้อมูล DBD (ข้อความแสดงผล + คอลัมน์ของ DBDCompanyRecord)
     df['ข้อมูล DBD'] = ""
     df['ชื่อบริษัทจาก DBD'] = ""
-    address_column_map = [
-        ('ที่อยู่_บ้านเลขที่', 'address_house_no'),
-        ('ที่อยู่_หมู่บ้าน', 'address_village'),
-        ('ที่อยู่_หมู่ที่', 'address_moo'),
-        ('ที่อยู่_ตำบล', 'address_subdistrict'),
-        ('ที่อยู่_อำเภอ', 'address_district'),
-        ('ที่อยู่_จังหวัด', 'address_province'),
-        ('ที่อยู่_รหัสไปรษณีย์', 'address_postal_code')
-    ]
-
-    for column_name, _ in address_column_map:
+    for column_name in [*RECORD_COLUMNS.values(), *ADDRESS_COLUMNS.values()]:
         if column_name not in df.columns:
             df[column_name] = ""
     
-    # สร้าง progress bar และ status
+    # สร้าง progress bar, status, สถิติ และ log (วาดผ่าน UIReporter ไม่เกิน 4 ครั้งต่อวินาที)
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    # สร้างสถิติ
     stats_container = st.container()
     with stats_container:
-        col1, col2, col3, col4 = st.columns(4)
-        success_count = col1.metric("✅ สำเร็จ", "0")
-        error_count = col2.metric("❌ ข้อผิดพลาด", "0")
-        not_found_count = col3.metric("🔍 ไม่พบข้อมูล", "0")
-        total_count = col4.metric("📊 รวม", "0")
+        metric_columns = st.columns(4)
     
-    # สร้าง container สำหรับแสดงขั้นตอนการทำงาน
     log_container = st.container()
     with log_container:
         st.subheader("📋 ขั้นตอนการทำงานของบอท")
+        outcome_placeholder = st.empty()
         log_expander = st.expander("🔍 ดูขั้นตอนการทำงานแบบละเอียด", expanded=False)
-        log_messages = []
-        log_placeholder = log_expander.empty()
     
-    # ดึงข้อมูลสำหรับแต่ละบริษัท
-    total_companies = len(df[df[company_column].notna() & (df[company_column] != '')])
-    processed_count = 0
-    success_stats = 0
-    error_stats = 0
-    not_found_stats = 0
+    reporter = UIReporter(
+        log_placeholder=log_expander.empty(),
+        metrics={label: column.empty() for label, column in zip(DBD_METRIC_LABELS, metric_columns)},
+        outcome_placeholder=outcome_placeholder, status_placeholder=status_text, progress_bar=progress_bar
+    )
     
-    def log_callback(message, status="info"):
-        """Callback สำหรับแสดง log"""
-        log_messages.append({
-            "message": message,
-            "status": status,
-            "time": datetime.now().strftime("%H:%M:%S")
-        })
-        
-        # แสดง log ใน expander
-        log_text = ""
-        for log in log_messages[-50:]:  # แสดงล่าสุด 50 รายการ
-            icon = {
-                "info": "ℹ️",
-                "success": "✅",
-                "warning": "⚠️",
-                "error": "❌"
-            }.get(log["status"], "📝")
-            
-            log_text += f"[{log['time']}] {icon} {log['message']}\n"
-        
-        log_placeholder.code(log_text, language=None)
+    # รายการที่ต้องค้นหา (ข้ามชื่อว่าง)
+    name_series = df[company_column]
+    valid_mask = name_series.notna() & name_series.astype(str).str.strip().ne("")
+    lookup_index = df.index[valid_mask.to_numpy()]
+    total_rows = len(lookup_index)
     
-    for index, row in df.iterrows():
-        company_name = row[company_column]
-        
-        if pd.isna(company_name) or not str(company_name).strip():
-            continue
-        
-        # อัปเดต status
-        processed_count += 1
-        progress = processed_count / total_companies
-        progress_bar.progress(progress)
-        
-        status_text.text(f"กำลังประมวลผล {processed_count}/{total_companies}: {company_name}")
-        
-        # ค้นหาข้อมูลบริษัท (พร้อม log callback)
-        company_info = bot.search_company_info(str(company_name), log_callback=log_callback)
-        
-        # จัดรูปแบบข้อมูลสำหรับใส่ในคอลัมน์
-        formatted_info = bot.format_company_info(company_info)
-        df.at[index, 'ข้อมูล DBD'] = formatted_info
-        if isinstance(company_info, dict):
-            if company_info.get("company_name"):
-                df.at[index, 'ชื่อบริษัทจาก DBD'] = company_info.get("company_name")
-
-            for column_name, key_name in address_column_map:
-                if key_name in company_info:
-                    df.at[index, column_name] = company_info.get(key_name, "")
-        
-        # อัปเดตสถิติ
-        if "error" in company_info:
-            error_stats += 1
-            st.warning(f"⚠️ {company_name}: {company_info['error']}")
-        elif formatted_info == "ไม่พบข้อมูล":
-            not_found_stats += 1
-            st.info(f"🔍 {company_name}: ไม่พบข้อมูล")
-        else:
-            success_stats += 1
-            st.success(f"✅ {company_name}: พบข้อมูล")
-        
-        # อัปเดต metrics
-        success_count.metric("✅ สำเร็จ", str(success_stats))
-        error_count.metric("❌ ข้อผิดพลาด", str(error_stats))
-        not_found_count.metric("🔍 ไม่พบข้อมูล", str(not_found_stats))
-        total_count.metric("📊 รวม", str(processed_count))
-        
-        # หน่วงเวลาเพื่อไม่ให้โหลดเซิร์ฟเวอร์หนักเกินไป
-        time.sleep(0.5)
+    bot_data_module = load_bot_data_module()
+    
+    def make_engine():
+        return bot_data_module.DBDLookupEngine(
+            workers=workers, rate_per_second=rate_per_second,
+            use_browser=use_browser, headless=headless, cache=dbd_cache, fast_mode=fast_mode,
+            use_http_api=use_http_api
+        )
+    
+    # วางแผนการค้นหา: ชื่อที่ซ้ำกัน (หลัง clean_company_name) ค้นหาครั้งเดียวแล้วกระจายผลไปทุกแถว
+    # (engine สำหรับวางแผนไม่เปิด browser - งานค้นหาสร้าง engine ของตัวเองใน thread ของงาน)
+    with bot_data_module.DBDLookupEngine(workers=1, cache=dbd_cache) as planner:
+        lookup_codes, company_names = planner.plan_lookups(name_series[valid_mask])
+    group_sizes = np.bincount(lookup_codes, minlength=len(company_names))
+    total_companies = len(company_names)
+    st.info(f"🧮 {total_rows} แถว เป็นชื่อไม่ซ้ำ {total_companies} ราย - ลดการค้นหาได้ {total_rows - total_companies} ครั้ง")
+    
+    # ค้นหาใน thread ของงาน (ทำงานต่อแม้ปิดแท็บ) ผลแต่ละรายถูกบันทึกลง journal ทันที
+    # ถ้ารอบก่อนหยุดกลางทาง จะใช้ผลที่เสร็จแล้วจาก journal และค้นหาเฉพาะที่เหลือ
+    job = start_enrichment_job(company_names, make_engine, force_refresh=force_refresh,
+                               mode=lookup_mode(use_browser, use_http_api))
+    if job.resumed_count:
+        st.info(f"♻️ ใช้ผลที่ค้นหาเสร็จแล้ว {job.resumed_count} ราย จากรอบก่อนที่หยุดกลางทาง - ค้นหาต่อเฉพาะที่เหลือ")
+    reporter.set_progress(0.0, f"กำลังค้นหาพร้อมกัน {workers} รายการ จากทั้งหมด {total_companies} รายการ...")
+    company_records, stats = run_enrichment_job_with_reporter(job, reporter, company_names, group_sizes)
+    success_stats, error_stats, not_found_stats = stats["success"], stats["error"], stats["not_found"]
+    
+    if job.error:
+        st.error(f"❌ งานค้นหาหยุดกลางทาง: {job.error} - ผลที่เสร็จแล้วถูกบันทึกไว้ กดค้นหาอีกครั้งเพื่อทำต่อ")
+    
+    # กระจายผลของแต่ละชื่อไปยังทุกแถวที่ชื่อตรงกัน
+    bot_data_module.assign_company_records(df, lookup_index, lookup_codes, company_records)
+    if not job.error:
+        job.discard()
     
     # แสดงสรุปสุดท้าย
     st.markdown("---")
@@ -264,11 +195,19 @@ def integrate_with_streamlit(df: pd.DataFrame, company_column: str = 'ชื่
     
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("✅ สำเร็จ", success_stats, delta=f"{success_stats/total_companies*100:.1f}%")
+        st.metric("✅ สำเร็จ", success_stats, delta=f"{success_stats/total_rows*100:.1f}%")
     with col2:
-        st.metric("❌ ข้อผิดพลาด", error_stats, delta=f"{error_stats/total_companies*100:.1f}%")
+        st.metric("❌ ข้อผิดพลาด", error_stats, delta=f"{error_stats/total_rows*100:.1f}%")
     with col3:
-        st.metric("🔍 ไม่พบข้อมูล", not_found_stats, delta=f"{not_found_stats/total_companies*100:.1f}%")
+        st.metric("🔍 ไม่พบข้อมูล", not_found_stats, delta=f"{not_found_stats/total_rows*100:.1f}%")
+    
+    cache_stats = dbd_cache.stats()
+    cache_hits = cache_stats["hits"] - cache_stats_before["hits"]
+    cache_misses = cache_stats["misses"] - cache_stats_before["misses"]
+    if force_refresh:
+        st.caption(f"🔄 ดึงข้อมูลใหม่จากเว็บ DBD ทั้งหมด (แคชมี {cache_stats['entries']} บริษัท)")
+    else:
+        st.caption(f"⚡ ใช้ข้อมูลจากแคช {cache_hits} รายการ | ค้นหาจากเว็บ DBD {cache_misses} รายการ (แคชมี {cache_stats['entries']} บริษัท)")
     
     # ล้าง progress bar และ status
     progress_bar.empty()
@@ -276,57 +215,6 @@ def integrate_with_streamlit(df: pd.DataFrame, company_column: str = 'ชื่
     
     return df
 
-def create_dbd_summary_table(df: pd.DataFrame) -> pd.DataFrame:
-    """สร้างตารางสรุปข้อมูล DBD"""
-    if 'ข้อมูล DBD' not in df.columns:
-        return pd.DataFrame()
-    
-    # สร้างตารางสรุป
-    summary_data = []
-    
-    for index, row in df.iterrows():
-        dbd_info = row.get('ข้อมูล DBD', '')
-        company_name = row.get('ชื่อบริษัท/บุคคล', '')
-        db_company_name = row.get('ชื่อบริษัทจาก DBD', '')
-        
-        if dbd_info and dbd_info != "ไม่พบข้อมูล" and "ข้อผิดพลาด" not in dbd_info:
-            # แยกข้อมูล
-            info_parts = dbd_info.split(' | ')
-            
-            summary_row = {
-                'ชื่อบริษัท': company_name,
-                'ชื่อบริษัทจาก DBD': db_company_name,
-                'เลขทะเบียน': '',
-                'ประเภทธุรกิจ': '',
-                'สถานะ': '',
-                'ทุนจดทะเบียน': '',
-                'ที่อยู่': '',
-                'ที่อยู่_บ้านเลขที่': row.get('ที่อยู่_บ้านเลขที่', ''),
-                'ที่อยู่_หมู่บ้าน': row.get('ที่อยู่_หมู่บ้าน', ''),
-                'ที่อยู่_หมู่ที่': row.get('ที่อยู่_หมู่ที่', ''),
-                'ที่อยู่_ตำบล': row.get('ที่อยู่_ตำบล', ''),
-                'ที่อยู่_อำเภอ': row.get('ที่อยู่_อำเภอ', ''),
-                'ที่อยู่_จังหวัด': row.get('ที่อยู่_จังหวัด', ''),
-                'ที่อยู่_รหัสไปรษณีย์': row.get('ที่อยู่_รหัสไปรษณีย์', '')
-            }
-            
-            for part in info_parts:
-                if 'เลขทะเบียน:' in part:
-                    summary_row['เลขทะเบียน'] = part.replace('เลขทะเบียน:', '').strip()
-                elif 'ประเภทธุรกิจ:' in part:
-                    summary_row['ประเภทธุรกิจ'] = part.replace('ประเภทธุรกิจ:', '').strip()
-                elif 'สถานะ:' in part:
-                    summary_row['สถานะ'] = part.replace('สถานะ:', '').strip()
-                elif 'ทุนจดทะเบียน:' in part:
-                    summary_row['ทุนจดทะเบียน'] = part.replace('ทุนจดทะเบียน:', '').strip()
-                elif 'ที่อยู่:' in part:
-                    summary_row['ที่อยู่'] = part.replace('ที่อยู่:', '').strip()
-            
-            summary_data.append(summary_row)
-    
-    return pd.DataFrame(summary_data)
-
-
 def test_playwright_browser(url: str = "https://datawarehouse.dbd.go.th/index") -> bool:
     """ทดสอบการเปิด Playwright Chromium ผ่านคำสั่ง CLI"""
     try:
@@ -500,6 +388,10 @@ def open_peakengine_login() -> bool:
 
 def open_newpeak_login() -> bool:
     """เปิดหน้าเว็บ PEAK Account (ระบบใหม่) และทดสอบการ Login ด้วย NewPeakBot"""
+    try:
+        from NewPeak import NewPeakBot
+    except ImportError:
+        NewPeakBot = None
     if NewPeakBot is None:
         st.error("❌ ไม่พบคลาส NewPeakBot (ตรวจสอบว่าไฟล์ NewPeak.py อยู่ในโฟลเดอร์เดียวกัน)")
         logger.error("NewPeakBot ไม่พร้อมใช้งาน - ไม่พบโมดูล NewPeak")
@@ -550,7 +442,7 @@ def open_newpeak_login() -> bool:
                 logger.warning("⚠️ NewPeakBot Login ไม่สำเร็จ กรุณาตรวจสอบ log และข้อมูลใน config.py")
         except Exception as exc:
             logger.error(f"❌ เกิดข้อผิดพลาดใน NewPeakBot: {exc}", exc_info=True)
-            if bot and bot._executor:  # type: ignore[attr-defined]
+            if bot and bot._lease:  # type: ignore[attr-defined]
                 try:
                     bot.close()
                 except Exception:
@@ -587,587 +479,49 @@ def wait_for_newpeak_instance(timeout: float = 30.0, poll_interval: float = 0.5)
         time.sleep(poll_interval)
     return _newpeak_bots[-1] if _newpeak_bots else None
 
-class BankPDFReader:
-    """คลาสสำหรับอ่านไฟล์ PDF ของธนาคารต่างๆ"""
-    
-    def __init__(self):
-        self.bank_configs = self.load_bank_configs()
-    
-    def load_bank_configs(self) -> Dict:
-        """โหลดการตั้งค่าสำหรับแต่ละธนาคาร"""
-        return {
-            "กสิกรไทย": {
-                "patterns": {
-                    "date": r"(\d{2}/\d{2}/\d{4})",
-                    "amount": r"([\d,]+\.\d{2})",
-                    "description": r"([A-Za-z0-9\s\-\.]+)",
-                    "balance": r"([\d,]+\.\d{2})"
-                },
-                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
-            },
-            "กรุงเทพ": {
-                "patterns": {
-                    "date": r"(\d{2}/\d{2}/\d{4})",
-                    "amount": r"([\d,]+\.\d{2})",
-                    "description": r"([A-Za-z0-9\s\-\.]+)",
-                    "balance": r"([\d,]+\.\d{2})"
-                },
-                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
-            },
-            "กรุงศรี": {
-                "patterns": {
-                    "date": r"(\d{2}/\d{2}/\d{4})",
-                    "amount": r"([\d,]+\.\d{2})",
-                    "description": r"([A-Za-z0-9\s\-\.]+)",
-                    "balance": r"([\d,]+\.\d{2})"
-                },
-                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
-            },
-            "กรุงไทย": {
-                "patterns": {
-                    "date": r"(\d{2}/\d{2}/\d{4})",
-                    "amount": r"([\d,]+\.\d{2})",
-                    "description": r"([A-Za-z0-9\s\-\.]+)",
-                    "balance": r"([\d,]+\.\d{2})"
-                },
-                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
-            },
-            "TMB": {
-                "patterns": {
-                    "date": r"(\d{2}/\d{2}/\d{4})",
-                    "amount": r"([\d,]+\.\d{2})",
-                    "description": r"([A-Za-z0-9\s\-\.]+)",
-                    "balance": r"([\d,]+\.\d{2})"
-                },
-                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
-            },
-            "ธนชาต": {
-                "patterns": {
-                    "date": r"(\d{2}/\d{2}/\d{4})",
-                    "amount": r"([\d,]+\.\d{2})",
-                    "description": r"([A-Za-z0-9\s\-\.]+)",
-                    "balance": r"([\d,]+\.\d{2})"
-                },
-                "columns": ["วันที่", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ"]
-            }
-        }
-    
-    def extract_text_from_pdf(self, pdf_file) -> str:
-        """ดึงข้อความจากไฟล์ PDF"""
-        try:
-            with pdfplumber.open(pdf_file) as pdf:
-                text = ""
-                page_texts = []
-                for i, page in enumerate(pdf.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                        page_texts.append({
-                            "page_number": i + 1,
-                            "text": page_text,
-                            "char_count": len(page_text),
-                            "line_count": len(page_text.split('\n'))
-                        })
-                
-                # เก็บข้อมูลหน้าไว้สำหรับการวิเคราะห์
-                self.pdf_pages_info = page_texts
-                return text
-        except Exception as e:
-            st.error(f"เกิดข้อผิดพลาดในการอ่านไฟล์ PDF: {str(e)}")
-            return ""
-    
-    def extract_tables_from_pdf(self, pdf_file) -> List:
-        """ดึงตารางจากไฟล์ PDF"""
-        try:
-            tables = []
-            with pdfplumber.open(pdf_file) as pdf:
-                for i, page in enumerate(pdf.pages):
-                    page_tables = page.extract_tables()
-                    if page_tables:
-                        for j, table in enumerate(page_tables):
-                            tables.append({
-                                "page_number": i + 1,
-                                "table_number": j + 1,
-                                "table_data": table,
-                                "row_count": len(table),
-                                "col_count": len(table[0]) if table else 0
-                            })
-            return tables
-        except Exception as e:
-            st.error(f"เกิดข้อผิดพลาดในการดึงตาราง: {str(e)}")
-            return []
-    
-    def analyze_kbank_statement(self, text: str) -> Dict:
-        """วิเคราะห์ข้อมูลดิบของธนาคารกสิกรไทย"""
-        analysis = {
-            "account_info": {},
-            "transaction_patterns": [],
-            "date_ranges": [],
-            "amount_patterns": [],
-            "keywords": []
-        }
-        
-        # ค้นหาข้อมูลบัญชี
-        account_patterns = {
-            "account_number": r"เลขที่บัญชี[:\s]*(\d+)",
-            "account_name": r"ชื่อบัญชี[:\s]*([^\n]+)",
-            "account_type": r"ประเภทบัญชี[:\s]*([^\n]+)",
-            "branch": r"สาขา[:\s]*([^\n]+)"
-        }
-        
-        for key, pattern in account_patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                analysis["account_info"][key] = match.group(1).strip()
-        
-        # ค้นหารูปแบบวันที่
-        date_patterns = [
-            r"(\d{1,2}/\d{1,2}/\d{4})",
-            r"(\d{1,2}-\d{1,2}-\d{4})",
-            r"(\d{4}-\d{1,2}-\d{1,2})"
-        ]
-        
-        for pattern in date_patterns:
-            dates = re.findall(pattern, text)
-            analysis["date_ranges"].extend(dates)
-        
-        # ค้นหารูปแบบจำนวนเงิน
-        amount_patterns = [
-            r"([\d,]+\.\d{2})",
-            r"([\d,]+\.\d{2})",
-            r"([\d,]+)"
-        ]
-        
-        for pattern in amount_patterns:
-            amounts = re.findall(pattern, text)
-            analysis["amount_patterns"].extend(amounts)
-        
-        # ค้นหาคำสำคัญ
-        keywords = [
-            "ถอน", "ฝาก", "โอน", "ชำระ", "รายได้", "รายจ่าย",
-            "ยอดคงเหลือ", "ยอดยกมา", "ยอดยกไป", "ดอกเบี้ย",
-            "ค่าธรรมเนียม", "ค่าบริการ", "ATM", "POS"
-        ]
-        
-        for keyword in keywords:
-            if keyword in text:
-                analysis["keywords"].append(keyword)
-        
-        return analysis
-    
-    def parse_bank_statement(self, text: str, bank_name: str) -> pd.DataFrame:
-        """แปลงข้อความจาก PDF เป็น DataFrame"""
-        if bank_name == "กสิกรไทย":
-            return self.parse_kbank_statement(text)
-        else:
-            return self.parse_generic_statement(text, bank_name)
-    
-    def parse_kbank_statement(self, text: str) -> pd.DataFrame:
-        """แปลงข้อความจาก PDF ธนาคารกสิกรไทยเป็น DataFrame"""
-        lines = text.split('\n')
-        transactions = []
-        
-        # ค้นหาข้อมูลบัญชี
-        account_info = self.extract_account_info(text)
-        
-        # เก็บยอดคงเหลือก่อนหน้าเพื่อเปรียบเทียบ
-        previous_balance = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # รูปแบบ: วันที่ เวลา รายการ จำนวนเงิน ยอดคงเหลือ คำอธิบาย
-            # ตัวอย่าง: 01-10-25 11:17 ค่าธรรมเนียม 51.43 22,127,753.64 โอนเข้า/หักบัญชีอัตโนมัติ...
-            
-            # ค้นหาวันที่ (รูปแบบ DD-MM-YY หรือ DD/MM/YYYY)
-            date_match = re.search(r'(\d{2}[-/]\d{2}[-/]\d{2,4})', line)
-            if date_match:
-                date = date_match.group(1)
-                
-                # ค้นหาเวลา (รูปแบบ HH:MM)
-                time_match = re.search(r'(\d{2}:\d{2})', line)
-                time = time_match.group(1) if time_match else ""
-                
-                # ค้นหาจำนวนเงินทั้งหมด (รูปแบบ 123,456.78)
-                amount_matches = re.findall(r'([\d,]+\.\d{2})', line)
-                
-                if len(amount_matches) >= 2:
-                    amount = amount_matches[0]  # จำนวนเงินแรก
-                    balance = amount_matches[1]  # ยอดคงเหลือ
-                elif len(amount_matches) == 1:
-                    amount = amount_matches[0]
-                    balance = ""
-                else:
-                    amount = ""
-                    balance = ""
-                
-                # แยกรายการและคำอธิบาย
-                parts = line.split()
-                transaction_type = ""
-                description = ""
-                
-                # หาตำแหน่งของจำนวนเงิน
-                amount_pos = -1
-                for i, part in enumerate(parts):
-                    if re.match(r'[\d,]+\.\d{2}', part):
-                        amount_pos = i
-                        break
-                
-                # แยกรายการ (ระหว่างวันที่-เวลา กับ จำนวนเงิน) - เอาเวลาออก
-                if amount_pos > 2:  # วันที่ เวลา รายการ
-                    # ข้ามวันที่และเวลา แล้วเอาเฉพาะรายการ
-                    transaction_type = " ".join(parts[2:amount_pos])
-                    # เอาเวลาออกจากรายการถ้ามี
-                    transaction_type = re.sub(r'\d{2}:\d{2}\s*', '', transaction_type).strip()
-                
-                # แยกคำอธิบาย (หลังยอดคงเหลือ)
-                if len(amount_matches) >= 2:
-                    balance_pos = -1
-                    for i, part in enumerate(parts):
-                        if part == balance:
-                            balance_pos = i
-                            break
-                    
-                    if balance_pos > -1 and balance_pos < len(parts) - 1:
-                        description = " ".join(parts[balance_pos + 1:])
-                
-                # กำหนดทิศทางของจำนวนเงิน
-                amount_display = amount
-                if amount and balance and previous_balance:
-                    try:
-                        # แปลงจำนวนเงินเป็นตัวเลข
-                        current_balance = float(balance.replace(',', ''))
-                        prev_balance = float(previous_balance.replace(',', ''))
-                        amount_value = float(amount.replace(',', ''))
-                        
-                        # ถ้ายอดคงเหลือลดลง แสดงจำนวนเงินเป็นติดลบ
-                        if current_balance < prev_balance:
-                            amount_display = f"({amount})"
-                    except:
-                        pass
-                
-                # ตรวจสอบว่าคือค่าธรรมเนียมหรือไม่ และแสดงเป็นยอดลบ
-                if transaction_type and any(keyword in transaction_type.lower() for keyword in ['ค่าธรรมเนียม', 'fee', 'charge', 'commission']):
-                    if amount and not amount_display.startswith('('):
-                        amount_display = f"({amount})"
-                
-                transactions.append({
-                    "วันที่": date,
-                    "เวลา": time,
-                    "รายการ": transaction_type,
-                    "จำนวนเงิน": amount_display,
-                    "ยอดคงเหลือ": balance,
-                    "คำอธิบาย": description
-                })
-                
-                # อัปเดตยอดคงเหลือก่อนหน้า
-                if balance:
-                    previous_balance = balance
-        
-        return pd.DataFrame(transactions)
-    
-    def extract_account_info(self, text: str) -> Dict:
-        """ดึงข้อมูลบัญชีจากข้อความ"""
-        account_info = {}
-        
-        # ค้นหาเลขที่บัญชี
-        account_match = re.search(r'เลขที่บัญชีเงินฝาก\s*(\d+-\d+-\d+-\d+)', text)
-        if account_match:
-            account_info['account_number'] = account_match.group(1)
-        
-        # ค้นหาชื่อบัญชี
-        name_match = re.search(r'ชื่อบัญชี\s*([^\n]+)', text)
-        if name_match:
-            account_info['account_name'] = name_match.group(1).strip()
-        
-        # ค้นหาสาขา
-        branch_match = re.search(r'สาขาเจ้าของบัญชี\s*([^\n]+)', text)
-        if branch_match:
-            account_info['branch'] = branch_match.group(1).strip()
-        
-        # ค้นหาช่วงวันที่
-        period_match = re.search(r'รอบระหว่างวันที่\s*(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})', text)
-        if period_match:
-            account_info['period_start'] = period_match.group(1)
-            account_info['period_end'] = period_match.group(2)
-        
-        # ค้นหายอดยกไป
-        balance_match = re.search(r'ยอดยกไป\s*([\d,]+\.\d{2})', text)
-        if balance_match:
-            account_info['opening_balance'] = balance_match.group(1)
-        
-        return account_info
-    
-    def classify_transfer_type(self, description: str) -> str:
-        """จำแนกประเภทผู้ส่งโอนเงินจากรายการธุรกรรม"""
-        if not description:
-            return "อื่นๆ"
-        
-        description_lower = description.lower()
-        
-        # บริษัท (บจก.)
-        company_keywords = ['บริษัท', 'บจก', 'company', 'co.', 'ltd', 'limited']
-        if any(keyword in description_lower for keyword in company_keywords):
-            return "บริษัท (บจก.)"
-        
-        # ห้างหุ้นส่วน (หจก.)
-        partnership_keywords = ['ห้างหุ้นส่วน', 'หจก', 'partnership']
-        if any(keyword in description_lower for keyword in partnership_keywords):
-            return "ห้างหุ้นส่วน (หจก.)"
-        
-        # บุคคล
-        person_keywords = ['นาย', 'นาง', 'น.ส.', 'miss', 'mr', 'mrs', 'ms', 'นส.']
-        if any(keyword in description_lower for keyword in person_keywords):
-            return "บุคคล"
-        
-        # ตรวจสอบรูปแบบชื่อบุคคล (ชื่อ-นามสกุล)
-        # ถ้ามีรูปแบบที่คล้ายชื่อบุคคล
-        if re.search(r'[ก-๙]+\s+[ก-๙]+', description) and len(description.split()) <= 3:
-            return "บุคคล"
-        
-        return "อื่นๆ"
-    
-    def extract_entity_name(self, description: str) -> str:
-        """แยกชื่อบริษัท/บุคคลออกจากคำอธิบาย"""
-        if not description:
-            return ""
-        
-        description_lower = description.lower()
-        
-        # รูปแบบที่พบในธนาคารกสิกรไทย
-        patterns = [
-            # รูปแบบ: ... บริษัท ชื่อบริษัท ...
-            r'บริษัท\s+([ก-๙A-Za-z0-9\s\.\-\+]+?)(?:\s+กร|\s+จำกัด|\s+มหาชน|\s+ฯลฯ|\s+จาก|\s+ถึง|\s+$|$)',
-            # รูปแบบ: ... บจก. ชื่อบริษัท ...
-            r'บจก\.\s+([ก-๙A-Za-z0-9\s\.\-\+]+?)(?:\s+กร|\s+จำกัด|\s+มหาชน|\s+ฯลฯ|\s+จาก|\s+ถึง|\s+$|$)',
-            # รูปแบบ: ... ห้างหุ้นส่วน ชื่อห้าง ...
-            r'ห้างหุ้นส่วน\s+([ก-๙A-Za-z0-9\s\.\-\+]+?)(?:\s+กร|\s+จำกัด|\s+มหาชน|\s+ฯลฯ|\s+จาก|\s+ถึง|\s+$|$)',
-            # รูปแบบ: ... นาย ชื่อ นามสกุล ...
-            r'นาย\s+([ก-๙A-Za-z0-9\s\.\-\+]+?)(?:\s+จาก|\s+ถึง|\s+$|$)',
-            # รูปแบบ: ... นาง ชื่อ นามสกุล ...
-            r'นาง\s+([ก-๙A-Za-z0-9\s\.\-\+]+?)(?:\s+จาก|\s+ถึง|\s+$|$)',
-            # รูปแบบ: ... น.ส. ชื่อ นามสกุล ...
-            r'น\.ส\.\s+([ก-๙A-Za-z0-9\s\.\-\+]+?)(?:\s+จาก|\s+ถึง|\s+$|$)',
-            # รูปแบบ: ... นส. ชื่อ นามสกุล ...
-            r'นส\.\s+([ก-๙A-Za-z0-9\s\.\-\+]+?)(?:\s+จาก|\s+ถึง|\s+$|$)',
-            # รูปแบบ: ... Mr. ชื่อ นามสกุล ...
-            r'mr\.?\s+([A-Za-z0-9\s\.\-\+]+?)(?:\s+from|\s+to|\s+$|$)',
-            # รูปแบบ: ... Miss ชื่อ นามสกุล ...
-            r'miss\s+([A-Za-z0-9\s\.\-\+]+?)(?:\s+from|\s+to|\s+$|$)',
-            # รูปแบบ: ... Mrs. ชื่อ นามสกุล ...
-            r'mrs\.?\s+([A-Za-z0-9\s\.\-\+]+?)(?:\s+from|\s+to|\s+$|$)',
-            # รูปแบบ: ... Ms. ชื่อ นามสกุล ...
-            r'ms\.?\s+([A-Za-z0-9\s\.\-\+]+?)(?:\s+from|\s+to|\s+$|$)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, description, re.IGNORECASE)
-            if match:
-                entity_name = match.group(1).strip()
-                
-                # ทำความสะอาดชื่อ
-                entity_name = re.sub(r'\s+', ' ', entity_name)  # ลบช่องว่างซ้ำ
-                
-                # ลบคำที่ไม่ต้องการ
-                entity_name = re.sub(r'\bบจก\.?\b', '', entity_name, flags=re.IGNORECASE)  # ลบ "บจก."
-                entity_name = re.sub(r'\bบริษัท\b', '', entity_name, flags=re.IGNORECASE)  # ลบ "บริษัท"
-                entity_name = re.sub(r'\bห้างหุ้นส่วน\b', '', entity_name, flags=re.IGNORECASE)  # ลบ "ห้างหุ้นส่วน"
-                entity_name = re.sub(r'\bจำกัด\b', '', entity_name, flags=re.IGNORECASE)  # ลบ "จำกัด"
-                entity_name = re.sub(r'\bมหาชน\b', '', entity_name, flags=re.IGNORECASE)  # ลบ "มหาชน"
-                
-                # ลบสัญลักษณ์ที่ไม่ต้องการ
-                entity_name = re.sub(r'\+\+', '', entity_name)  # ลบ "++"
-                entity_name = re.sub(r'\+', '', entity_name)  # ลบ "+"
-                entity_name = re.sub(r'ฯลฯ', '', entity_name)  # ลบ "ฯลฯ"
-                
-                # ลบคำที่ขึ้นต้นด้วยตัวเลขหรือสัญลักษณ์พิเศษ
-                entity_name = re.sub(r'^[0-9\-\+\.\s]+', '', entity_name)
-                
-                # ทำความสะอาดอีกครั้ง
-                entity_name = re.sub(r'\s+', ' ', entity_name)  # ลบช่องว่างซ้ำ
-                entity_name = entity_name.strip()
-                
-                # ตรวจสอบว่าไม่ใช่คำที่ยาวเกินไป (อาจเป็นข้อผิดพลาด)
-                if len(entity_name) <= 100 and len(entity_name) > 0:
-                    return entity_name
-        
-        return ""
-    
-    def format_date_column(self, df: pd.DataFrame) -> pd.DataFrame:
-        """แปลงคอลัมน์วันที่เป็นรูปแบบ dd/MM/yyyy"""
-        if df.empty or 'วันที่' not in df.columns:
-            return df
-        
-        df_formatted = df.copy()
-        
-        def convert_date_format(date_str):
-            if not date_str or pd.isna(date_str):
-                return date_str
-            
-            try:
-                # รูปแบบที่พบในธนาคารกสิกรไทย
-                date_patterns = [
-                    # DD-MM-YY (เช่น 01-10-25)
-                    r'(\d{2})-(\d{2})-(\d{2})',
-                    # DD/MM/YYYY (เช่น 01/10/2025)
-                    r'(\d{2})/(\d{2})/(\d{4})',
-                    # DD-MM-YYYY (เช่น 01-10-2025)
-                    r'(\d{2})-(\d{2})-(\d{4})',
-                    # YYYY-MM-DD (เช่น 2025-10-01)
-                    r'(\d{4})-(\d{2})-(\d{2})',
-                ]
-                
-                for pattern in date_patterns:
-                    match = re.match(pattern, str(date_str).strip())
-                    if match:
-                        if len(match.groups()) == 3:
-                            day, month, year = match.groups()
-                            
-                            # แปลงปี 2 หลักเป็น 4 หลัก
-                            if len(year) == 2:
-                                year_int = int(year)
-                                if year_int >= 0 and year_int <= 30:  # สมมติว่า 00-30 เป็น 2000-2030
-                                    year = f"20{year}"
-                                else:  # 31-99 เป็น 1931-1999
-                                    year = f"19{year}"
-                            
-                            # สร้างวันที่ในรูปแบบ dd/MM/yyyy
-                            return f"{day.zfill(2)}/{month.zfill(2)}/{year}"
-                
-                # ถ้าไม่ตรงกับรูปแบบใดเลย ให้คืนค่าเดิม
-                return date_str
-                
-            except Exception:
-                # ถ้าเกิดข้อผิดพลาด ให้คืนค่าเดิม
-                return date_str
-        
-        # แปลงคอลัมน์วันที่
-        df_formatted['วันที่'] = df_formatted['วันที่'].apply(convert_date_format)
-        
-        return df_formatted
-    
-    def create_transfer_summary(self, df: pd.DataFrame) -> pd.DataFrame:
-        """สร้างตารางสรุปข้อมูลแยกตามประเภทผู้ส่งโอน"""
-        if df.empty or 'คำอธิบาย' not in df.columns:
-            return pd.DataFrame()
-        
-        # เพิ่มคอลัมน์ประเภทผู้ส่งโอน (ใช้คอลัมน์คำอธิบาย)
-        df['ประเภทผู้ส่งโอน'] = df['คำอธิบาย'].apply(self.classify_transfer_type)
-        
-        # เพิ่มคอลัมน์ชื่อบริษัท/บุคคล
-        df['ชื่อบริษัท/บุคคล'] = df['คำอธิบาย'].apply(self.extract_entity_name)
-        
-        # สร้างตารางสรุป
-        summary_data = []
-        
-        for transfer_type in df['ประเภทผู้ส่งโอน'].unique():
-            type_data = df[df['ประเภทผู้ส่งโอน'] == transfer_type]
-            
-            # คำนวณจำนวนรายการ
-            count = len(type_data)
-            
-            # คำนวณยอดรวม
-            total_amount = 0
-            positive_amount = 0
-            negative_amount = 0
-            
-            for amount in type_data['จำนวนเงิน']:
-                if amount and amount != "":
-                    try:
-                        # แปลงจำนวนเงินเป็นตัวเลข
-                        clean_amount = amount.replace(',', '').replace('(', '').replace(')', '')
-                        amount_value = float(clean_amount)
-                        
-                        if '(' in amount and ')' in amount:
-                            # รายการติดลบ
-                            total_amount -= amount_value
-                            negative_amount += amount_value
-                        else:
-                            # รายการบวก
-                            total_amount += amount_value
-                            positive_amount += amount_value
-                    except:
-                        pass
-            
-            summary_data.append({
-                'ประเภทผู้ส่งโอน': transfer_type,
-                'จำนวนรายการ': count,
-                'ยอดรวม': f"{total_amount:,.2f}",
-                'ยอดเพิ่ม': f"{positive_amount:,.2f}",
-                'ยอดลด': f"{negative_amount:,.2f}",
-                'ร้อยละ': f"{(count/len(df)*100):.1f}%"
-            })
-        
-        # เรียงลำดับตามจำนวนรายการ (มากไปน้อย)
-        summary_df = pd.DataFrame(summary_data)
-        summary_df = summary_df.sort_values('จำนวนรายการ', ascending=False)
-        
-        return summary_df
-    
-    def parse_generic_statement(self, text: str, bank_name: str) -> pd.DataFrame:
-        """แปลงข้อความจาก PDF ธนาคารอื่นๆ เป็น DataFrame"""
-        config = self.bank_configs.get(bank_name, self.bank_configs["กสิกรไทย"])
-        
-        lines = text.split('\n')
-        transactions = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # ค้นหาวันที่
-            date_match = re.search(config["patterns"]["date"], line)
-            if date_match:
-                date = date_match.group(1)
-                
-                # ค้นหาจำนวนเงิน
-                amount_match = re.search(config["patterns"]["amount"], line)
-                amount = amount_match.group(1) if amount_match else ""
-                
-                # ค้นหาคำอธิบาย
-                description_match = re.search(config["patterns"]["description"], line)
-                description = description_match.group(1) if description_match else ""
-                
-                # ค้นหายอดคงเหลือ
-                balance_match = re.search(config["patterns"]["balance"], line)
-                balance = balance_match.group(1) if balance_match else ""
-                
-                transactions.append({
-                    "วันที่": date,
-                    "รายการ": description,
-                    "จำนวนเงิน": amount,
-                    "ยอดคงเหลือ": balance
-                })
-        
-        return pd.DataFrame(transactions)
-    
-    def detect_bank(self, text: str) -> str:
-        """ตรวจสอบว่าเป็นธนาคารไหนจากข้อความ"""
-        bank_keywords = {
-            "กสิกรไทย": ["กสิกรไทย", "Kasikorn", "KBank"],
-            "กรุงเทพ": ["กรุงเทพ", "Bangkok Bank", "BBL"],
-            "กรุงศรี": ["กรุงศรี", "Krungsri", "Bank of Ayudhya"],
-            "กรุงไทย": ["กรุงไทย", "Krung Thai", "KTB"],
-            "TMB": ["TMB", "ธนาคารทหารไทย"],
-            "ธนชาต": ["ธนชาต", "Thanachart", "TBank"]
-        }
-        
-        text_lower = text.lower()
-        for bank, keywords in bank_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    return bank
-        
-        return "กสิกรไทย"  # default
-
-def process_pdf_file(uploaded_file, reader, selected_bank):
+def split_page_results(pdf_content: Dict) -> List[Dict]:
+    """แยกผลการดึง PDF กลับเป็นรายหน้า (รูปแบบเดียวกับที่ merge_page_results รับ) สำหรับเก็บในแคช"""
+    page_results = {
+        page_info["page_number"]: {"page_number": page_info["page_number"], "text": page_info["text"], "tables": []}
+        for page_info in pdf_content["pages"]
+    }
+    for table_info in pdf_content["tables"]:
+        page_results.setdefault(
+            table_info["page_number"],
+            {"page_number": table_info["page_number"], "text": "", "tables": []}
+        )["tables"].append(table_info)
+    return list(page_results.values())
+
+
+def format_date_bound(df: pd.DataFrame, bound: str) -> str:
+    """คืนวันที่แรก/สุดท้าย (bound = "min"/"max") จากคอลัมน์ datetime64 ในรูปแบบ dd/MM/yyyy"""
+    if 'วันที่_datetime' in df.columns:
+        value = getattr(df['วันที่_datetime'], bound)()
+        return value.strftime("%d/%m/%Y") if pd.notna(value) else "N/A"
+    if 'วันที่' in df.columns and not df.empty:
+        return str(getattr(df['วันที่'], bound)())
+    return "N/A"
+
+
+def process_pdf_file(uploaded_file, reader, selected_bank, include_tables: bool = True,
+                     parallel: bool = False):
     """ประมวลผลไฟล์ PDF และแสดงผลลัพธ์"""
     with st.spinner("กำลังประมวลผลไฟล์ PDF..."):
-        # ดึงข้อความจาก PDF
-        text = reader.extract_text_from_pdf(uploaded_file)
+        # ไฟล์เดิม (เนื้อหาเดียวกัน) ที่เคยประมวลผลแล้วอ่านผลจากแคชบนดิสก์
+        cache_key = parse_cache.make_key(uploaded_file.getvalue(), include_tables=include_tables)
+        cached = parse_cache.get(cache_key)
+        
+        if cached is not None:
+            st.caption("⚡ ใช้ผลการประมวลผลจากแคช (ไฟล์นี้เคยประมวลผลแล้ว)")
+            pdf_content = merge_page_results(cached["meta"]["page_results"])
+            reader.pdf_pages_info = pdf_content["pages"]
+        else:
+            # ดึงข้อความ ข้อมูลหน้า และตารางจาก PDF ในรอบเดียว
+            pdf_content = reader.extract_pdf_content(uploaded_file, include_tables=include_tables,
+                                                     parallel=parallel)
+            if pdf_content.get("error"):
+                st.error(f"เกิดข้อผิดพลาดในการอ่านไฟล์ PDF: {pdf_content['error']}")
+        text = pdf_content["text"]
         
         if text:
             # ตรวจสอบธนาคารอัตโนมัติ
@@ -1200,8 +554,8 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                             else:
                                 st.text(page_info['text'])
             
-            # ดึงตารางจาก PDF
-            tables = reader.extract_tables_from_pdf(uploaded_file)
+            # ตารางจาก PDF (ดึงมาพร้อมข้อความแล้ว)
+            tables = pdf_content["tables"]
             if tables:
                 st.subheader("📊 ตารางที่พบใน PDF")
                 for table_info in tables:
@@ -1265,35 +619,16 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                     st.write(f"**คำสำคัญที่พบ:** {', '.join(analysis['keywords'])}")
             
             # แปลงข้อมูล
-            df = reader.parse_bank_statement(text, detected_bank)
-            
-            # แปลงรูปแบบวันที่เป็น dd/MM/yyyy
-            df = reader.format_date_column(df)
-
-            def parse_amount_value(amount_str):
-                if amount_str is None or (isinstance(amount_str, float) and pd.isna(amount_str)):
-                    return None
-                text_amount = str(amount_str).strip()
-                if not text_amount:
-                    return None
-                negative = False
-                if text_amount.startswith('(') and text_amount.endswith(')'):
-                    negative = True
-                    text_amount = text_amount[1:-1]
-                text_amount = text_amount.replace(',', '').replace('+', '').strip()
-                try:
-                    value = float(text_amount)
-                    return -value if negative else value
-                except ValueError:
-                    return None
-
-            if not df.empty and 'จำนวนเงิน' in df.columns:
-                df['ยอดเงิน_numeric'] = df['จำนวนเงิน'].apply(parse_amount_value)
+            if cached is not None:
+                df = cached["frame"]
             else:
-                df['ยอดเงิน_numeric'] = pd.Series(dtype=float)
+                df = reader.parse_statement_frame(text, detected_bank)
+                parse_cache.put(cache_key, df, {
+                    "detected_bank": detected_bank,
+                    "page_results": split_page_results(pdf_content)
+                })
 
-            if not df.empty and 'คำอธิบาย' in df.columns:
-                df['ประเภทผู้ส่งโอน'] = df['คำอธิบาย'].apply(reader.classify_transfer_type)
+            if not df.empty and 'ประเภทผู้ส่งโอน' in df.columns:
                 st.subheader("🏷️ ประเภทผู้ส่งโอนที่พบ")
                 category_counts = df['ประเภทผู้ส่งโอน'].value_counts()
                 category_summary = pd.DataFrame({
@@ -1337,7 +672,7 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                 # เพิ่มคอลัมน์ชื่อบริษัท/บุคคลถ้ามีคำอธิบาย
                 if 'คำอธิบาย' in df.columns:
                     df_display = df.copy()
-                    df_display['ชื่อบริษัท/บุคคล'] = df_display['คำอธิบาย'].apply(reader.extract_entity_name)
+                    df_display['ชื่อบริษัท/บุคคล'] = reader.extract_entity_names(df_display['คำอธิบาย'])
                     if 'ชื่อบริษัท/บุคคล' in df_display.columns:
                         display_columns.append('ชื่อบริษัท/บุคคล')
                 else:
@@ -1370,9 +705,9 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                 with col1:
                     st.metric("จำนวนรายการ", len(df))
                 with col2:
-                    st.metric("วันที่เริ่มต้น", df['วันที่'].min() if 'วันที่' in df.columns else "N/A")
+                    st.metric("วันที่เริ่มต้น", format_date_bound(df, "min"))
                 with col3:
-                    st.metric("วันที่สิ้นสุด", df['วันที่'].max() if 'วันที่' in df.columns else "N/A")
+                    st.metric("วันที่สิ้นสุด", format_date_bound(df, "max"))
                 with col4:
                     # คำนวณยอดรวมและแยกรายการเพิ่ม/ลด
                     if 'ยอดเงิน_numeric' in df.columns and not df['ยอดเงิน_numeric'].isna().all():
@@ -1445,13 +780,7 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                         with col2:
                             st.write("**💰 กราฟยอดรวม:**")
                             # แปลงยอดรวมเป็นตัวเลขสำหรับกราฟ
-                            chart_amounts = []
-                            for amount_str in transfer_summary['ยอดรวม']:
-                                try:
-                                    amount_value = float(amount_str.replace(',', ''))
-                                    chart_amounts.append(amount_value)
-                                except:
-                                    chart_amounts.append(0)
+                            chart_amounts = parse_amount_series(transfer_summary['ยอดรวม']).fillna(0).tolist()
                             
                             chart_df = pd.DataFrame({
                                 'ประเภทผู้ส่งโอน': transfer_summary['ประเภทผู้ส่งโอน'],
@@ -1468,7 +797,7 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                             type_total = transfer_summary[transfer_summary['ประเภทผู้ส่งโอน'] == transfer_type]['ยอดรวม'].iloc[0]
                             
                             with st.expander(f"🔍 {transfer_type} ({type_count} รายการ, ยอดรวม: {type_total})"):
-                                type_data = df[df['คำอธิบาย'].apply(reader.classify_transfer_type) == transfer_type]
+                                type_data = df[df['ประเภทผู้ส่งโอน'] == transfer_type]
                                 
                                 if not type_data.empty:
                                     # แสดงสถิติย่อย
@@ -1490,7 +819,11 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                                     with col1:
                                         # กรองตามวันที่
                                         if 'วันที่' in type_data.columns:
-                                            unique_dates = sorted(type_data['วันที่'].unique())
+                                            unique_dates = list(
+                                                type_data.sort_values('วันที่_datetime')['วันที่'].unique()
+                                                if 'วันที่_datetime' in type_data.columns
+                                                else sorted(type_data['วันที่'].unique())
+                                            )
                                             selected_dates = st.multiselect(
                                                 "เลือกวันที่:",
                                                 unique_dates,
@@ -1583,9 +916,9 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                                     with col2:
                                         st.write(f"📉 รายการลด: {negative_count}")
                                     with col3:
-                                        st.write(f"📅 วันที่เริ่ม: {type_data['วันที่'].min()}")
+                                        st.write(f"📅 วันที่เริ่ม: {format_date_bound(type_data, 'min')}")
                                     with col4:
-                                        st.write(f"📅 วันที่สิ้นสุด: {type_data['วันที่'].max()}")
+                                        st.write(f"📅 วันที่สิ้นสุด: {format_date_bound(type_data, 'max')}")
                                         
                                 else:
                                     st.write("ไม่มีข้อมูล")
@@ -1625,7 +958,10 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                 # แสดงข้อมูลแยกตามวันที่
                 if 'วันที่' in df.columns:
                     st.subheader("📅 สรุปข้อมูลตามวันที่")
-                    date_summary = df['วันที่'].value_counts().sort_index()
+                    if 'วันที่_datetime' in df.columns:
+                        date_summary = df['วันที่_datetime'].dropna().value_counts().sort_index()
+                    else:
+                        date_summary = df['วันที่'].value_counts().sort_index()
                     st.line_chart(date_summary)
                 
                 # ดาวน์โหลดไฟล์ Excel
@@ -1637,7 +973,7 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                     # สร้างไฟล์ Excel ข้อมูลดิบ
                     output_raw = io.BytesIO()
                     with pd.ExcelWriter(output_raw, engine='openpyxl') as writer:
-                        df.to_excel(writer, sheet_name='Bank_Statement', index=False)
+                        drop_internal_columns(df).to_excel(writer, sheet_name='Bank_Statement', index=False)
                     
                     output_raw.seek(0)
                     
@@ -1655,8 +991,8 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                     if 'คำอธิบาย' in df.columns:
                         # เพิ่มคอลัมน์ประเภทผู้ส่งโอนและชื่อบริษัท/บุคคล
                         df_classified = df.copy()
-                        df_classified['ประเภทผู้ส่งโอน'] = df_classified['คำอธิบาย'].apply(reader.classify_transfer_type)
-                        df_classified['ชื่อบริษัท/บุคคล'] = df_classified['คำอธิบาย'].apply(reader.extract_entity_name)
+                        df_classified['ประเภทผู้ส่งโอน'] = reader.classify_transfer_types(df_classified['คำอธิบาย'])
+                        df_classified['ชื่อบริษัท/บุคคล'] = reader.extract_entity_names(df_classified['คำอธิบาย'])
                         
                         # สร้างตารางสรุป
                         transfer_summary = reader.create_transfer_summary(df.copy())
@@ -1664,7 +1000,7 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                         output_classified = io.BytesIO()
                         with pd.ExcelWriter(output_classified, engine='openpyxl') as writer:
                             # Sheet 1: ข้อมูลที่จำแนกแล้ว
-                            df_classified.to_excel(writer, sheet_name='ข้อมูลจำแนกแล้ว', index=False)
+                            drop_internal_columns(df_classified).to_excel(writer, sheet_name='ข้อมูลจำแนกแล้ว', index=False)
                             
                             # Sheet 2: สรุปตามประเภท
                             if not transfer_summary.empty:
@@ -1674,7 +1010,7 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
                             for transfer_type in df_classified['ประเภทผู้ส่งโอน'].unique():
                                 type_data = df_classified[df_classified['ประเภทผู้ส่งโอน'] == transfer_type]
                                 sheet_name = f"ประเภท_{transfer_type}"[:31]  # Excel sheet name limit
-                                type_data.to_excel(writer, sheet_name=sheet_name, index=False)
+                                drop_internal_columns(type_data).to_excel(writer, sheet_name=sheet_name, index=False)
                         
                         output_classified.seek(0)
                         
@@ -1712,13 +1048,91 @@ def process_pdf_file(uploaded_file, reader, selected_bank):
         else:
             st.error("❌ ไม่สามารถอ่านไฟล์ PDF ได้")
 
+def render_statement_batch_tab(reader):
+    """แท็บประมวลผล Statement หลายไฟล์ (หลาย PDF หรือ ZIP) แล้วรวมเป็นไฟล์ Excel เดียว"""
+    st.write("**อัปโหลด Statement หลายบัญชีพร้อมกัน (PDF หลายไฟล์ หรือ ZIP)**")
+    
+    batch_files = st.file_uploader(
+        "เลือกไฟล์ PDF/ZIP",
+        type=['pdf', 'zip'],
+        accept_multiple_files=True,
+        help="ระบบจะตรวจธนาคารและข้อมูลบัญชีของแต่ละไฟล์อัตโนมัติ",
+        key="batch_pdf_upload"
+    )
+    if not batch_files:
+        return
+    
+    max_workers = st.slider(
+        "จำนวน process ที่ใช้ดึงข้อความ",
+        min_value=1,
+        max_value=max(os.cpu_count() or 1, 1),
+        value=max(os.cpu_count() or 1, 1),
+        key="batch_max_workers"
+    )
+    
+    if st.button("🔄 ประมวลผลทุกไฟล์", type="primary", key="process_batch_btn"):
+        try:
+            sources = collect_pdf_sources(batch_files)
+        except Exception as e:
+            st.error(f"❌ ไม่สามารถอ่านไฟล์ที่อัปโหลดได้: {str(e)}")
+            return
+        if not sources:
+            st.warning("⚠️ ไม่พบไฟล์ PDF ในไฟล์ที่อัปโหลด")
+            return
+        
+        progress_bar = st.progress(0.0, text=f"กำลังดึงข้อความ 0/{len(sources)} ไฟล์")
+        
+        def update_progress(done: int, total: int):
+            progress_bar.progress(done / total, text=f"กำลังดึงข้อความ {done}/{total} ไฟล์")
+        
+        start_time = time.time()
+        with st.spinner(f"กำลังประมวลผล {len(sources)} ไฟล์..."):
+            st.session_state["batch_result"] = process_statement_batch(
+                reader, sources, max_workers=max_workers, cache=parse_cache,
+                progress_callback=update_progress
+            )
+        progress_bar.progress(1.0, text=f"เสร็จสิ้น {len(sources)} ไฟล์ ใน {time.time() - start_time:.1f} วินาที")
+    
+    batch_result = st.session_state.get("batch_result")
+    if not batch_result:
+        return
+    
+    files_df = batch_result["files"]
+    transactions_df = batch_result["transactions"]
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("จำนวนไฟล์", len(files_df))
+    with col2:
+        st.metric("จำนวนบัญชี", files_df['เลขที่บัญชี'].replace("", pd.NA).nunique())
+    with col3:
+        st.metric("รายการรวม", len(transactions_df))
+    
+    st.subheader("📋 สรุปรายไฟล์")
+    st.dataframe(files_df, use_container_width=True, hide_index=True)
+    
+    if not transactions_df.empty:
+        st.subheader("📊 รายการรวมทุกบัญชี")
+        st.dataframe(transactions_df, use_container_width=True, height=400)
+    
+    output_batch = io.BytesIO()
+    write_batch_workbook(batch_result, output_batch)
+    st.download_button(
+        label="📥 ดาวน์โหลด Excel รวมทุกบัญชี",
+        data=output_batch.getvalue(),
+        file_name=f"bank_statements_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        key="download_batch_excel"
+    )
+
+
 def render_statement_page(reader, selected_bank):
     """หน้า Statement - ประมวลผล PDF และ Excel ของธนาคาร"""
     st.header("📄 Statement - ประมวลผล Statement ธนาคาร")
     st.markdown("---")
     
     # แท็บสำหรับอัปโหลด PDF และ Excel
-    tab1, tab2 = st.tabs(["📄 อัปโหลดไฟล์ PDF", "📊 อัปโหลดไฟล์ Excel"])
+    tab1, tab2, tab3 = st.tabs(["📄 อัปโหลดไฟล์ PDF", "📊 อัปโหลดไฟล์ Excel", "📚 หลายไฟล์ (Batch)"])
     
     uploaded_file = None
     
@@ -1747,9 +1161,26 @@ def render_statement_page(reader, selected_bank):
             with col3:
                 st.metric("ธนาคารที่เลือก", selected_bank)
             
-            # ปุ่มประมวลผล
+            include_tables = st.checkbox(
+                "📊 ดึงตารางจาก PDF",
+                value=True,
+                help="ปิดเพื่อประมวลผลเร็วขึ้นเมื่อต้องการเฉพาะรายการธุรกรรม",
+                key="include_tables_checkbox"
+            )
+            parallel_pages = st.checkbox(
+                "⚡ ประมวลผลหลายหน้าพร้อมกัน (ใช้ทุก CPU core)",
+                value=False,
+                help="เหมาะกับ Statement ที่มีหลายสิบหน้าขึ้นไป",
+                key="parallel_pages_checkbox"
+            )
+            
+            # ปุ่มประมวลผล (จำไฟล์ที่ประมวลผลแล้ว เพื่อให้ผลลัพธ์ยังแสดงเมื่อหน้า rerun จากตัวกรอง/ปุ่มอื่น)
+            uploaded_file_id = f"{uploaded_file.name}:{uploaded_file.size}"
             if st.button("🔄 ประมวลผลไฟล์ PDF", type="primary", key="process_pdf_btn"):
-                process_pdf_file(uploaded_file, reader, selected_bank)
+                st.session_state["processed_pdf_file"] = uploaded_file_id
+            if st.session_state.get("processed_pdf_file") == uploaded_file_id:
+                process_pdf_file(uploaded_file, reader, selected_bank, include_tables=include_tables,
+                                 parallel=parallel_pages)
     
     with tab2:
         st.write("**อัปโหลดไฟล์ Excel ที่มีข้อมูลบริษัท**")
@@ -1876,6 +1307,9 @@ def render_statement_page(reader, selected_bank):
             except Exception as e:
                 st.error(f"❌ เกิดข้อผิดพลาดในการอ่านไฟล์ Excel: {str(e)}")
     
+    with tab3:
+        render_statement_batch_tab(reader)
+    
     return uploaded_file, selected_bank
 
 def render_dbd_bot_page(reader):
@@ -1884,6 +1318,9 @@ def render_dbd_bot_page(reader):
     st.markdown("---")
     st.write("**ค้นหาข้อมูลบริษัทจาก DBD DataWarehouse**")
     
+    # โหลด bot_data เฉพาะเมื่อเปิดหน้านี้ (ใช้โมดูลที่ cache ไว้ใน rerun ถัดไป)
+    DBDDataWarehouseBot = get_dbd_bot_class()
+    
     # แสดงสถานะการตั้งค่า
     use_browser_mode = st.session_state.get('use_browser_mode', True)
     headless_mode = st.session_state.get('headless_mode', False)
@@ -1962,7 +1399,9 @@ def render_dbd_bot_page(reader):
                         st.info("🚀 **กำลังเปิด Chromium Browser...**")
                         st.info("👀 **Browser จะเปิดขึ้นมาในอีกสักครู่ - รอสักครู่แล้วดู Browser window!**")
                     
-                    bot = DBDDataWarehouseBot(use_browser=use_browser_mode, headless=headless_mode)
+                    bot = DBDDataWarehouseBot(use_browser=use_browser_mode, headless=headless_mode, cache=get_dbd_cache(),
+                                              fast_mode=st.session_state.get('dbd_fast_mode', False),
+                                              use_http_api=st.session_state.get('dbd_use_http_api', False))
                     
                     if use_browser_mode and bot.browser:
                         st.success("✅ **Browser เปิดสำเร็จ!**")
@@ -1974,10 +1413,14 @@ def render_dbd_bot_page(reader):
                     st.info("💡 **วิธีแก้:**")
                     st.code("pip install playwright\nplaywright install chromium", language="bash")
                     # ยังคงดำเนินการต่อไปด้วย requests mode
-                    bot = DBDDataWarehouseBot(use_browser=False, headless=False)
+                    bot = DBDDataWarehouseBot(use_browser=False, headless=False, cache=get_dbd_cache(),
+                                              use_http_api=st.session_state.get('dbd_use_http_api', False))
                 
                 # ค้นหาข้อมูล (พร้อม log callback)
-                company_info = bot.search_company_info(company_name, log_callback=log_callback)
+                company_info = bot.search_company_info(
+                    company_name, log_callback=log_callback,
+                    force_refresh=st.session_state.get('dbd_force_refresh', False)
+                )
                 
                 if "error" in company_info:
                     st.error(f"❌ {company_info['error']}")
@@ -2350,6 +1793,12 @@ def render_dbd_bot_page(reader):
 
 def render_receipt_bot_page():
     """หน้า Bot รันเปิดใบเสร็จ - ยังไม่สร้างระบบ แค่ปุ่มไว้"""
+    # โหลด NewPeak เฉพาะเมื่อเปิดหน้านี้
+    try:
+        from NewPeak import NewPeakBot
+    except ImportError:
+        NewPeakBot = None
+
     st.header("🧾 Bot รันเปิดใบเสร็จ")
     st.markdown("---")
     st.write("**ระบบกรอกข้อมูลใบเสร็จอัตโนมัติ**")
@@ -2377,17 +1826,9 @@ def render_receipt_bot_page():
             digits = "0" + digits[1:]
         return digits
 
-    def parse_dbd_info(text: str) -> Dict[str, str]:
-        results = {}
-        if not text or pd.isna(text):
-            return results
-        parts = [part.strip() for part in str(text).split('|')]
-        for part in parts:
-            if ':' not in part:
-                continue
-            key, value = part.split(':', 1)
-            results[key.strip()] = value.strip()
-        return results
+    def parse_dbd_info(row: Any, fallback_text: Any = None) -> Dict[str, str]:
+        """{label: ค่า} ของข้อมูล DBD จากคอลัมน์ของแถว (แยกข้อความ ข้อมูล DBD เฉพาะไฟล์เก่าที่ไม่มีคอลัมน์)"""
+        return DBDCompanyRecord.from_row(row, fallback_text=fallback_text).to_details()
 
     def slugify_filename(value: Any) -> str:
         text = str(value).strip()
@@ -2403,7 +1844,7 @@ def render_receipt_bot_page():
 
         summary_rows: List[Dict[str, Any]] = []
         for _, row in source_df.iterrows():
-            dbd_parsed = parse_dbd_info(row.get("ข้อมูล DBD", ""))
+            dbd_parsed = parse_dbd_info(row)
             reg_candidates = [
                 row.get("เลขทะเบียน"),
                 row.get("เลขทะเบียนจาก DBD"),
@@ -2469,6 +1910,8 @@ def render_receipt_bot_page():
                         st.info(f"📄 ชีตที่พบ: {available_sheets}")
                 else:
                     df_peak = pd.read_excel(excel_file, sheet_name="ข้อมูลพร้อม DBD")
+                    # ไฟล์เก่าที่มีเฉพาะที่อยู่เต็ม: แยกที่อยู่ทั้งชีตครั้งเดียวก่อนส่งให้ PeakEngine
+                    df_peak = fill_address_columns(df_peak, gazetteer=get_address_gazetteer())
                     st.success("✅ โหลดข้อมูลจากชีต 'ข้อมูลพร้อม DBD' สำเร็จ!")
 
                     available_company_cols = [col for col in df_peak.columns if "ชื่อบริษัท" in str(col)]
@@ -2688,7 +2131,7 @@ def render_receipt_bot_page():
                     reg_info_map: Dict[str, Dict[str, Any]] = {}
                     for idx_row, row in df_peak_filtered.iterrows():
                         dbd_raw = row.get("ข้อมูล DBD", "")
-                        dbd_parsed = parse_dbd_info(dbd_raw)
+                        dbd_parsed = parse_dbd_info(row)
                         reg_candidate = (
                             row.get("เลขทะเบียน")
                             or row.get("เลขทะเบียนจาก DBD")
@@ -2899,28 +2342,7 @@ def render_receipt_bot_page():
                 except (TypeError, ValueError):
                     pass
 
-            raw_amount = row_data.get("จำนวนเงิน")
-            if raw_amount is None:
-                return None
-
-            text_amount = str(raw_amount).strip()
-            if not text_amount or text_amount.lower() in {"nan", "none"}:
-                return None
-
-            negative = False
-            if text_amount.startswith("(") and text_amount.endswith(")"):
-                negative = True
-                text_amount = text_amount[1:-1]
-
-            text_amount = text_amount.replace(",", "").replace("+", "").strip()
-            if not text_amount:
-                return None
-
-            try:
-                value = float(text_amount)
-                return -value if negative else value
-            except ValueError:
-                return None
+            return parse_amount(row_data.get("จำนวนเงิน"))
 
         def normalize_company_key(raw_name: Any) -> str:
             if raw_name is None:
@@ -2998,7 +2420,7 @@ def render_receipt_bot_page():
                     continue
 
                 dbd_info_raw_value = clean_text(row.get("ข้อมูล DBD", "")) or str(row.get("ข้อมูล DBD", "")).strip()
-                dbd_info_dict = parse_dbd_info(dbd_info_raw_value)
+                dbd_info_dict = parse_dbd_info(row)
 
                 reg_candidate = (
                     row.get("เลขทะเบียน")
@@ -3747,7 +3169,7 @@ def render_receipt_bot_page():
                     existing_reg_info_map.get(reg_value, {}).get("dbd_raw")
                 ]
                 dbd_raw_text = pick_first_text(*dbd_raw_candidates) or ""
-                dbd_parsed = parse_dbd_info(dbd_raw_text)
+                dbd_parsed = parse_dbd_info(base_row_dict, fallback_text=dbd_raw_text)
 
                 combined_row: Dict[str, Any] = {}
                 combined_row.update(base_row_dict)
@@ -4090,26 +3512,10 @@ def render_receipt_bot_page():
                 st.experimental_rerun()
 
             log_expander = st.expander("📋 Log การทำงาน", expanded=False)
-            log_placeholder = log_expander.empty()
-            log_messages: List[Dict[str, str]] = []
-
-            def peak_log(message: str, status: str = "info"):
-                icon_map = {
-                    "info": "ℹ️",
-                    "success": "✅",
-                    "warning": "⚠️",
-                    "error": "❌"
-                }
-                log_messages.append({
-                    "time": datetime.now().strftime("%H:%M:%S"),
-                    "status": status,
-                    "message": message
-                })
-                lines = []
-                for entry in log_messages[-200:]:
-                    icon = icon_map.get(entry["status"], "📝")
-                    lines.append(f"[{entry['time']}] {icon} {entry['message']}")
-                log_placeholder.code("\n".join(lines), language=None)
+            # log ของบอทมาจาก event loop ของ browser pool: UIReporter เก็บไว้ใน ring buffer
+            # แล้ววาดจาก thread หลักไม่เกิน 4 ครั้งต่อวินาที (flush หลังงานแต่ละชุดจบ)
+            peak_reporter = UIReporter(log_placeholder=log_expander.empty(), log_lines=200)
+            peak_log = peak_reporter.log
 
             col_fill_peak, col_newpeak = st.columns(2)
             with col_fill_peak:
@@ -4181,6 +3587,7 @@ def render_receipt_bot_page():
                                 row_payload_map=row_payload_map_session,
                                 log_callback=peak_log
                             )
+                            peak_reporter.flush()
 
                             if "error" in fill_result:
                                 st.error(f"❌ ไม่สามารถกรอกข้อมูลได้: {fill_result['error']}")
@@ -4272,6 +3679,7 @@ def render_receipt_bot_page():
                         except Exception as e:
                             st.error(f"❌ เกิดข้อผิดพลาดระหว่างกรอกข้อมูล: {str(e)}")
                             peak_log(f"❌ เกิดข้อผิดพลาด: {str(e)}", "error")
+                            peak_reporter.flush()
 
         stored_links = st.session_state.get("peakengine_receipt_links", [])
         if stored_links:
@@ -4622,6 +4030,7 @@ def render_receipt_bot_page():
                                             prepared_tasks=tasks,
                                             skipped_info=skipped_records,
                                         )
+                                        peak_reporter.flush()
                                         if "error" in result:
                                             st.error(f"❌ ไม่สามารถประมวลผลได้: {result['error']}")
                                         else:
@@ -4647,6 +4056,7 @@ def render_receipt_bot_page():
                                 except Exception as exc:
                                     st.error(f"❌ เกิดข้อผิดพลาดระหว่างประมวลผล New Peak: {exc}")
                                     peak_log(f"❌ เกิดข้อผิดพลาดระหว่างประมวลผล New Peak: {exc}", "error")
+                                    peak_reporter.flush()
                     else:
                         st.error("❌ ไม่สามารถเริ่มการทำงานของ NewPeakBot ได้ กรุณาตรวจสอบ log และไฟล์ config.py")
 
@@ -4719,6 +4129,54 @@ def main():
         # เก็บค่าใน session state
         st.session_state['use_browser_mode'] = use_browser_mode
         st.session_state['headless_mode'] = False  # บังคับให้แสดง browser เสมอ
+        
+        # การค้นหาพร้อมกัน (DBDLookupEngine) และอัตราการเรียกเว็บ DBD
+        st.session_state['dbd_lookup_workers'] = int(st.sidebar.number_input(
+            "🔀 จำนวนการค้นหาพร้อมกัน",
+            min_value=1,
+            max_value=8,
+            value=3,
+            step=1,
+            help="จำนวนหน้า browser (หรือ session) ที่ค้นหาข้อมูล DBD พร้อมกัน",
+            key="dbd_lookup_workers_input"
+        ))
+        st.session_state['dbd_lookup_rate'] = st.sidebar.slider(
+            "⏱️ จำนวนการค้นหาต่อวินาที",
+            min_value=0.2,
+            max_value=5.0,
+            value=1.0,
+            step=0.1,
+            help="จำกัดอัตราการเรียกเว็บ DBD (token bucket) เพื่อไม่ให้โหลดเซิร์ฟเวอร์หนักเกินไป",
+            key="dbd_lookup_rate_input"
+        )
+        st.session_state['dbd_force_refresh'] = st.sidebar.checkbox(
+            "🔄 ดึงข้อมูลใหม่จาก DBD (ไม่ใช้แคช)",
+            value=False,
+            help="ข้อมูลบริษัทที่เคยค้นหาจะถูกเก็บในแคช 30 วัน - เลือกเพื่อค้นหาจากเว็บใหม่และบันทึกทับ",
+            key="dbd_force_refresh_checkbox"
+        )
+        st.session_state['dbd_fast_mode'] = st.sidebar.checkbox(
+            "⚡ โหมดเร็ว (ไม่หน่วงเวลาให้ดูการทำงาน)",
+            value=False,
+            help="Browser Mode: รอเฉพาะเว็บ DBD ตอบกลับ ไม่หยุดพักระหว่างขั้นตอนเพื่อให้ดูการทำงานใน browser",
+            key="dbd_fast_mode_checkbox",
+            disabled=not use_browser_mode
+        )
+        st.session_state['dbd_use_http_api'] = st.sidebar.checkbox(
+            "🔌 ใช้ HTTP API ของเว็บ DBD (ทดลอง - ไม่เปิด browser)",
+            value=False,
+            help="เมื่อไม่ใช้ Browser: เรียก endpoint ค้นหาและหน้าข้อมูลบริษัทโดยตรง เร็วกว่าเปิด Chromium มาก (ทดลอง - ถ้าพบข้อผิดพลาดให้ปิดแล้วใช้ Browser Mode)",
+            key="dbd_use_http_api_checkbox",
+            disabled=use_browser_mode
+        )
+        
+        # งานค้นหา DBD ที่รันอยู่เบื้องหลัง (ยังทำงานต่อแม้ปิดแท็บหรือรีเฟรชหน้า)
+        for dbd_job in list_enrichment_jobs(running_only=True):
+            job_progress = dbd_job.progress()
+            st.sidebar.info(
+                f"⏳ งานค้นหา DBD เบื้องหลัง: {job_progress['done']}/{job_progress['total']} ราย "
+                f"(ใช้ผลเดิม {job_progress['resumed']} ราย) - กดค้นหาไฟล์เดิมอีกครั้งเพื่อติดตามผล"
+            )
     
     if use_browser_mode:
         st.sidebar.success("👀 **Browser จะเปิดขึ้นมาแสดงการทำงานแบบเรียลไทม์!**")
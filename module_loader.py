@@ -0,0 +1,77 @@
+"""
+โหลดโมดูลของโปรเจ็กต์ (เช่น bot_data) ครั้งเดียวแล้วใช้ซ้ำทุก rerun (ไม่พึ่ง Streamlit)
+
+โหมดพัฒนา (DEV_HOT_RELOAD ใน config.py หรือ environment variable BANK_TO_BOT_DEV_RELOAD=1)
+จะโหลดโมดูลใหม่เฉพาะเมื่อเนื้อหาไฟล์เปลี่ยน (ตรวจ mtime/ขนาดก่อน แล้วยืนยันด้วย SHA-256)
+"""
+import hashlib
+import importlib
+import logging
+import os
+import sys
+import threading
+from types import ModuleType
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEV_RELOAD_ENV = "BANK_TO_BOT_DEV_RELOAD"
+
+# ชื่อโมดูล -> (mtime_ns, ขนาดไฟล์, SHA-256) ของไฟล์ที่โหลดอยู่
+_fingerprints: Dict[str, Tuple[int, int, str]] = {}
+_lock = threading.Lock()
+
+
+def is_dev_hot_reload_enabled() -> bool:
+    """เปิดโหมด hot reload หรือไม่ (environment variable มาก่อน config.py)"""
+    env_value = os.environ.get(DEV_RELOAD_ENV)
+    if env_value is not None:
+        return env_value.strip().lower() in ("1", "true", "yes", "on")
+    try:
+        import config
+    except ImportError:
+        return False
+    return bool(getattr(config, "DEV_HOT_RELOAD", False))
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fingerprint(path: str, previous: Optional[Tuple[int, int, str]]) -> Tuple[int, int, str]:
+    """คำนวณ fingerprint ของไฟล์ (อ่านไฟล์มา hash เฉพาะเมื่อ mtime หรือขนาดเปลี่ยน)"""
+    stat = os.stat(path)
+    if previous is not None and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+        return previous
+    return stat.st_mtime_ns, stat.st_size, _file_hash(path)
+
+
+def load_project_module(name: str, hot_reload: bool = False) -> ModuleType:
+    """
+    Import โมดูลตามปกติ (ใช้ bytecode ใน __pycache__ และโมดูลเดิมใน sys.modules)
+
+    Args:
+        name (str): ชื่อโมดูล เช่น "bot_data"
+        hot_reload (bool): โหลดใหม่ (importlib.reload) เมื่อเนื้อหาไฟล์เปลี่ยนจากครั้งที่แล้ว
+
+    Returns:
+        ModuleType: โมดูลที่พร้อมใช้งาน
+    """
+    with _lock:
+        already_loaded = name in sys.modules
+        module = importlib.import_module(name)
+        path = getattr(module, "__file__", None)
+        if not hot_reload or not path:
+            return module
+
+        previous = _fingerprints.get(name)
+        current = _fingerprint(path, previous)
+        if already_loaded and previous is not None and current[2] != previous[2]:
+            logger.info(f"🔄 {os.path.basename(path)} ถูกแก้ไข - โหลดโมดูล {name} ใหม่")
+            module = importlib.reload(module)
+        _fingerprints[name] = current
+        return module
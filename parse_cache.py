@@ -0,0 +1,172 @@
+"""
+แคชผลการแปลง Statement ลงดิสก์ โดยใช้ SHA-256 ของไฟล์ PDF + เวอร์ชันตัวแปลงเป็น key (ไม่พึ่ง Streamlit)
+
+ไฟล์เดิมที่อัปโหลดซ้ำหรือกดประมวลผลซ้ำจะอ่านผลจากแคชแทนการดึงข้อความและแปลงใหม่ทั้งหมด
+"""
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ตรวจแค่ว่ามี pyarrow ติดตั้งอยู่ (ไม่ import ตอนโหลดโมดูล) - pandas จะ import เองเมื่ออ่าน/เขียน parquet
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+if not PARQUET_AVAILABLE:
+    logger.warning("⚠️ ไม่พบ pyarrow - แคชผลการแปลงจะใช้ pickle แทน parquet")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".parse_cache")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_FRAME_EXTENSIONS = (".parquet", ".pkl")
+
+
+class ParseCache:
+    """แคชบนดิสก์แบบ content-addressed จำกัดขนาดรวม และลบรายการที่ไม่ได้ใช้นานที่สุดก่อน (LRU)"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 version: str = ""):
+        """
+        Args:
+            cache_dir (str): โฟลเดอร์เก็บแคช
+            max_bytes (int): ขนาดรวมสูงสุดของแคช
+            version (str): เวอร์ชันตัวแปลง (เปลี่ยนเมื่อผลการแปลงเปลี่ยน แคชเก่าจะไม่ถูกใช้)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = version
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, pdf_bytes: bytes, **options: Any) -> str:
+        """สร้าง key จากเนื้อหาไฟล์ เวอร์ชันตัวแปลง และตัวเลือกที่มีผลต่อผลลัพธ์"""
+        digest = hashlib.sha256(pdf_bytes)
+        digest.update(f"|{self.version}|{json.dumps(options, sort_keys=True)}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _frame_path(self, key: str) -> Optional[str]:
+        for extension in _FRAME_EXTENSIONS:
+            path = os.path.join(self.cache_dir, f"{key}{extension}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        อ่านผลจากแคช
+
+        Returns:
+            Optional[Dict]: {"frame": DataFrame, "meta": dict} หรือ None ถ้าไม่มีในแคช
+        """
+        meta_path = self._meta_path(key)
+        frame_path = self._frame_path(key)
+        if frame_path is None or not os.path.exists(meta_path):
+            return None
+
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if frame_path.endswith(".parquet"):
+                frame = pd.read_parquet(frame_path)
+            else:
+                frame = pd.read_pickle(frame_path)
+        except Exception as e:
+            logger.warning(f"⚠️ อ่านแคช {key[:12]} ไม่สำเร็จ - ลบทิ้ง: {e}")
+            self._remove(key)
+            return None
+
+        # อัปเดตเวลาใช้งานล่าสุดสำหรับ LRU
+        for path in (meta_path, frame_path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+        logger.info(f"⚡ ใช้ผลการแปลงจากแคช {key[:12]} ({len(frame)} แถว)")
+        return {"frame": frame, "meta": meta}
+
+    def put(self, key: str, frame: pd.DataFrame, meta: Dict[str, Any]) -> None:
+        """บันทึกผลการแปลงลงแคช แล้วลบรายการเก่าถ้าขนาดรวมเกิน max_bytes"""
+        try:
+            frame_path = self._write_frame(key, frame)
+            meta_path = self._meta_path(key)
+            tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_path, meta_path)
+        except Exception as e:
+            logger.warning(f"⚠️ บันทึกแคช {key[:12]} ไม่สำเร็จ: {e}")
+            self._remove(key)
+            return
+
+        logger.info(f"💾 บันทึกแคช {key[:12]} ({len(frame)} แถว, {os.path.basename(frame_path)})")
+        self._evict()
+
+    def _write_frame(self, key: str, frame: pd.DataFrame) -> str:
+        """เขียน DataFrame เป็น parquet (ถ้ามี pyarrow) ไม่เช่นนั้นใช้ pickle"""
+        base_path = os.path.join(self.cache_dir, key)
+        tmp_suffix = f".{threading.get_ident()}.tmp"
+        if PARQUET_AVAILABLE:
+            try:
+                frame.to_parquet(base_path + ".parquet" + tmp_suffix, index=False)
+                os.replace(base_path + ".parquet" + tmp_suffix, base_path + ".parquet")
+                return base_path + ".parquet"
+            except Exception as e:
+                # คอลัมน์ที่ชนิดข้อมูลปนกันบางแบบ parquet เขียนไม่ได้
+                logger.info(f"ℹ️ เขียน parquet ไม่ได้ ใช้ pickle แทน: {e}")
+                try:
+                    os.remove(base_path + ".parquet" + tmp_suffix)
+                except OSError:
+                    pass
+        frame.to_pickle(base_path + ".pkl" + tmp_suffix)
+        os.replace(base_path + ".pkl" + tmp_suffix, base_path + ".pkl")
+        return base_path + ".pkl"
+
+    def _remove(self, key: str) -> None:
+        for extension in (".json",) + _FRAME_EXTENSIONS:
+            try:
+                os.remove(os.path.join(self.cache_dir, f"{key}{extension}"))
+            except OSError:
+                pass
+
+    def _entries(self) -> List[Dict[str, Any]]:
+        """รวมไฟล์ในแคชตาม key พร้อมขนาดและเวลาใช้งานล่าสุด"""
+        entries: Dict[str, Dict[str, Any]] = {}
+        for name in os.listdir(self.cache_dir):
+            key, extension = os.path.splitext(name)
+            if extension not in (".json",) + _FRAME_EXTENSIONS:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entry = entries.setdefault(key, {"key": key, "size": 0, "last_used": 0.0})
+            entry["size"] += stat.st_size
+            entry["last_used"] = max(entry["last_used"], stat.st_mtime)
+        return list(entries.values())
+
+    def _evict(self) -> None:
+        """ลบรายการที่ไม่ได้ใช้นานที่สุดจนขนาดรวมไม่เกิน max_bytes"""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry["last_used"])
+            total_size = sum(entry["size"] for entry in entries)
+            for entry in entries:
+                if total_size <= self.max_bytes:
+                    break
+                self._remove(entry["key"])
+                total_size -= entry["size"]
+                logger.info(f"🗑️ ลบแคช {entry['key'][:12]} (LRU)")
+
+    def clear(self) -> None:
+        """ลบแคชทั้งหมด"""
+        with self._lock:
+            for entry in self._entries():
+                self._remove(entry["key"])
@@ -0,0 +1,282 @@
+"""
+ฟังก์ชันดึงข้อมูลจากไฟล์ PDF ของธนาคาร (ไม่พึ่ง Streamlit)
+"""
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+# pdfplumber (และ pdfminer) import ตอนเปิดไฟล์ครั้งแรก เพื่อไม่ให้หน้าที่ไม่ได้อ่าน PDF ต้องโหลดด้วย
+
+logger = logging.getLogger(__name__)
+
+# จำนวนหน้าขั้นต่ำที่คุ้มค่ากับการกระจายงานไปหลาย process
+MIN_PAGES_FOR_PARALLEL = 8
+
+# process pool ที่ใช้ร่วมกันทุกไฟล์ (สร้างเมื่อใช้งานครั้งแรก)
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+
+def _extract_page(page, page_number: int, include_tables: bool) -> Dict[str, Any]:
+    """ดึงข้อความและตารางจากหน้าเดียว โดยใช้ layout ของหน้าร่วมกัน"""
+    page_text = page.extract_text() or ""
+
+    tables = []
+    if include_tables:
+        # extract_tables ใช้ตัวอักษร/เส้นที่ pdfplumber cache ไว้จาก extract_text แล้ว
+        page_tables = page.extract_tables()
+        if page_tables:
+            for j, table in enumerate(page_tables):
+                tables.append({
+                    "page_number": page_number,
+                    "table_number": j + 1,
+                    "table_data": table,
+                    "row_count": len(table),
+                    "col_count": len(table[0]) if table else 0
+                })
+
+    # คืนหน่วยความจำของ layout หน้านี้เมื่อใช้งานเสร็จ
+    page.flush_cache()
+
+    return {
+        "page_number": page_number,
+        "text": page_text,
+        "tables": tables
+    }
+
+
+def merge_page_results(page_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """รวมผลลัพธ์รายหน้าเป็นข้อความรวม ข้อมูลหน้า (pdf_pages_info) และตาราง"""
+    text_parts = []
+    pages_info = []
+    tables = []
+
+    for result in sorted(page_results, key=lambda item: item["page_number"]):
+        page_text = result["text"]
+        if page_text:
+            text_parts.append(page_text)
+            pages_info.append({
+                "page_number": result["page_number"],
+                "text": page_text,
+                "char_count": len(page_text),
+                "line_count": len(page_text.split('\n'))
+            })
+        tables.extend(result["tables"])
+
+    return {
+        "text": "".join(f"{page_text}\n" for page_text in text_parts),
+        "pages": pages_info,
+        "tables": tables
+    }
+
+
+def extract_pdf_content(pdf_file, include_tables: bool = True) -> Dict[str, Any]:
+    """
+    เปิดไฟล์ PDF ครั้งเดียวแล้วดึงข้อความ ข้อมูลบรรทัด และตารางของทุกหน้าพร้อมกัน
+
+    Args:
+        pdf_file: path หรือ file-like object ของไฟล์ PDF
+        include_tables (bool): ดึงตารางด้วยหรือไม่ (ปิดได้เมื่อต้องการเฉพาะธุรกรรม)
+
+    Returns:
+        Dict: {"text": ข้อความรวม, "pages": ข้อมูลแต่ละหน้า, "tables": ตารางที่พบ}
+    """
+    import pdfplumber
+
+    with pdfplumber.open(pdf_file) as pdf:
+        page_results = [
+            _extract_page(page, i + 1, include_tables)
+            for i, page in enumerate(pdf.pages)
+        ]
+    return merge_page_results(page_results)
+
+
+def _open_source(source: Union[str, bytes]):
+    """แปลง path หรือ bytes ให้เป็น input ที่ pdfplumber เปิดได้"""
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    return source
+
+
+def _extract_page_range(source: Union[str, bytes], start: int, end: int,
+                        include_tables: bool) -> List[Dict[str, Any]]:
+    """Worker ของ process pool: เปิดไฟล์เองแล้วดึงข้อมูลหน้า start..end (1-based, รวมปลาย)"""
+    import pdfplumber
+
+    page_numbers = list(range(start, end + 1))
+    with pdfplumber.open(_open_source(source), pages=page_numbers) as pdf:
+        return [
+            _extract_page(page, page.page_number, include_tables)
+            for page in pdf.pages
+        ]
+
+
+def _get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """คืน process pool ที่ใช้ร่วมกัน (สร้างใหม่เมื่อจำนวน worker เปลี่ยน)"""
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers != max_workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers)
+            _process_pool_workers = max_workers
+        return _process_pool
+
+
+def _reset_process_pool() -> None:
+    """ทิ้ง process pool ที่เสียหาย เพื่อให้สร้างใหม่ในครั้งถัดไป"""
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False)
+        _process_pool = None
+        _process_pool_workers = 0
+
+
+def _split_page_ranges(page_count: int, workers: int) -> List[tuple]:
+    """แบ่งหน้าเป็นช่วงๆ (ประมาณ 2 ช่วงต่อ worker เพื่อให้กระจายงานได้สมดุล)"""
+    chunk_count = min(page_count, workers * 2)
+    chunk_size = -(-page_count // chunk_count)
+    return [
+        (start, min(start + chunk_size - 1, page_count))
+        for start in range(1, page_count + 1, chunk_size)
+    ]
+
+
+def extract_pdf_content_parallel(pdf_file, include_tables: bool = True,
+                                 max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    ดึงข้อมูล PDF แบบขนานรายช่วงหน้าด้วย ProcessPoolExecutor
+
+    แต่ละ worker เปิดไฟล์เองและประมวลผลเฉพาะช่วงหน้าของตน จากนั้นรวมผลกลับตามลำดับหน้า
+    ในรูปแบบเดียวกับ extract_pdf_content
+
+    Args:
+        pdf_file: path, bytes หรือ file-like object ของไฟล์ PDF
+        include_tables (bool): ดึงตารางด้วยหรือไม่
+        max_workers (Optional[int]): จำนวน process (ค่าเริ่มต้น = จำนวน CPU)
+
+    Returns:
+        Dict: {"text": ข้อความรวม, "pages": ข้อมูลแต่ละหน้า, "tables": ตารางที่พบ}
+    """
+    # worker ต้องเปิดไฟล์เอง จึงส่งเป็น path หรือ bytes (file-like ส่งข้าม process ไม่ได้)
+    if isinstance(pdf_file, (str, os.PathLike)):
+        source: Union[str, bytes] = os.fspath(pdf_file)
+    elif isinstance(pdf_file, bytes):
+        source = pdf_file
+    else:
+        if hasattr(pdf_file, "seek"):
+            pdf_file.seek(0)
+        source = pdf_file.read()
+
+    import pdfplumber
+
+    with pdfplumber.open(_open_source(source)) as pdf:
+        page_count = len(pdf.pages)
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or page_count < MIN_PAGES_FOR_PARALLEL:
+        return extract_pdf_content(_open_source(source), include_tables=include_tables)
+
+    page_ranges = _split_page_ranges(page_count, workers)
+    logger.info(f"⚡ แบ่ง {page_count} หน้าเป็น {len(page_ranges)} ช่วง ให้ {workers} process")
+
+    try:
+        pool = _get_process_pool(workers)
+        futures = [
+            pool.submit(_extract_page_range, source, start, end, include_tables)
+            for start, end in page_ranges
+        ]
+        page_results = []
+        for future in futures:
+            page_results.extend(future.result())
+    except BrokenProcessPool:
+        logger.warning("⚠️ process pool เสียหาย - กลับไปประมวลผลแบบทีละหน้า")
+        _reset_process_pool()
+        return extract_pdf_content(_open_source(source), include_tables=include_tables)
+
+    return merge_page_results(page_results)
+
+
+def _extract_source(source: Union[str, bytes], include_tables: bool) -> Dict[str, Any]:
+    """Worker ของ process pool: ดึงข้อมูลทั้งไฟล์จาก path หรือ bytes"""
+    return extract_pdf_content(_open_source(source), include_tables=include_tables)
+
+
+def extract_pdf_contents(sources: List[Union[str, bytes]], include_tables: bool = False,
+                         max_workers: Optional[int] = None,
+                         progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, Any]]:
+    """
+    ดึงข้อมูลหลายไฟล์พร้อมกัน (1 ไฟล์ต่อ 1 งานใน process pool ที่ใช้ร่วมกัน)
+
+    Args:
+        sources: path หรือ bytes ของแต่ละไฟล์
+        include_tables (bool): ดึงตารางด้วยหรือไม่
+        max_workers (Optional[int]): จำนวน process (ค่าเริ่มต้น = จำนวน CPU)
+        progress_callback: เรียกด้วย (จำนวนไฟล์ที่เสร็จ, จำนวนไฟล์ทั้งหมด) เมื่อแต่ละไฟล์เสร็จ
+
+    Returns:
+        List[Dict]: ผลลัพธ์ตามลำดับเดียวกับ sources (ไฟล์ที่อ่านไม่ได้จะมี key "error")
+    """
+    total = len(sources)
+    results: List[Optional[Dict[str, Any]]] = [None] * total
+    workers = max_workers or os.cpu_count() or 1
+
+    if workers <= 1 or total <= 1:
+        for index, source in enumerate(sources):
+            try:
+                results[index] = _extract_source(source, include_tables)
+            except Exception as e:
+                results[index] = {"text": "", "pages": [], "tables": [], "error": str(e)}
+            if progress_callback:
+                progress_callback(index + 1, total)
+        return results
+
+    try:
+        pool = _get_process_pool(workers)
+        futures = {
+            pool.submit(_extract_source, source, include_tables): index
+            for index, source in enumerate(sources)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                results[index] = {"text": "", "pages": [], "tables": [], "error": str(e)}
+            if progress_callback:
+                progress_callback(done, total)
+    except BrokenProcessPool:
+        logger.warning("⚠️ process pool เสียหาย - กลับไปประมวลผลทีละไฟล์")
+        _reset_process_pool()
+        return extract_pdf_contents(sources, include_tables=include_tables, max_workers=1,
+                                    progress_callback=progress_callback)
+
+    return results
+
+
+def iter_pdf_page_texts(pdf_file) -> Iterator[str]:
+    """
+    อ่านข้อความทีละหน้าแบบ generator โดยไม่เก็บข้อความทั้งไฟล์ไว้ในหน่วยความจำ
+
+    Args:
+        pdf_file: path หรือ file-like object ของไฟล์ PDF
+
+    Yields:
+        str: ข้อความของแต่ละหน้า (หน้าที่ไม่มีข้อความจะถูกข้าม)
+    """
+    import pdfplumber
+
+    with pdfplumber.open(pdf_file) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text() or ""
+            page.flush_cache()
+            if page_text:
+                yield page_text
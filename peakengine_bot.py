@@ -3,10 +3,15 @@ import time
 import re
 from typing import Dict, List, Optional, Callable, Any, Tuple
 import logging
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future
 import asyncio
 from datetime import datetime, timedelta
 
+from browser_pool import get_browser_pool
+from dbd_record import ADDRESS_COLUMNS, DBDCompanyRecord
+from statement_parser import parse_amount
+from thai_address import get_address_gazetteer, parse_thai_address
+
 # ตั้งค่า logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,7 +34,7 @@ class PeakEngineBot:
         self.browser = None
         self.page = None
         self.playwright = None
-        self._executor = None
+        self._lease = None
         self.is_logged_in = False
         self.link_company: Optional[str] = None
         self.link_receipt: Optional[str] = None
@@ -37,55 +42,21 @@ class PeakEngineBot:
         
         if use_browser:
             try:
-                from playwright.async_api import async_playwright
-                
-                # ใช้ ThreadPoolExecutor เพื่อหลีกเลี่ยงปัญหา event loop ใน Streamlit
-                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="playwright")
-                
-                def init_playwright_in_new_event_loop():
-                    """สร้าง event loop ใหม่ใน thread เพื่อหลีกเลี่ยงปัญหา Streamlit"""
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    try:
-                        async def async_init():
-                            logger.info("🚀 กำลังเปิด Playwright Browser...")
-                            pw = await async_playwright().start()
-                            
-                            logger.info("🌐 กำลัง launch Chromium browser...")
-                            browser = await pw.chromium.launch(
-                                headless=headless,
-                                args=[
-                                    '--disable-blink-features=AutomationControlled',
-                                    '--disable-dev-shm-usage',
-                                    '--no-sandbox',
-                                    '--start-maximized'
-                                ]
-                            )
-                            
-                            logger.info("📄 กำลังสร้าง browser context...")
-                            context = await browser.new_context(
-                                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                                viewport=None,
-                                screen=self._screen_size
-                            )
-                            
-                            logger.info("🆕 กำลังสร้าง new page...")
-                            page = await context.new_page()
-                            await self._maximize_window(page)
-                            
-                            logger.info("✅ เปิด Playwright Browser สำเร็จ!")
-                            return pw, browser, page
-                        
-                        return loop.run_until_complete(async_init())
-                    finally:
-                        pass
-                
-                logger.info("🚀 กำลังเริ่มต้น Playwright Browser ใน thread แยก...")
-                
-                # รันใน thread แยก
-                future = self._executor.submit(init_playwright_in_new_event_loop)
-                self.playwright, self.browser, self.page = future.result(timeout=60)
+                # ยืม context/page จาก Chromium ที่เปิดค้างไว้ใน browser pool (เปิดจริงแค่ครั้งแรกของโปรเซส)
+                # งาน async ทั้งหมดของ bot ส่งผ่าน submit() ไปรันบน event loop ถาวรของ pool ที่เป็นเจ้าของ page
+                pool = get_browser_pool()
+                logger.info("🚀 กำลังยืม Playwright Browser จาก browser pool...")
+                self._lease = pool.acquire(
+                    headless=headless,
+                    context_options={
+                        "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                        "viewport": None,
+                        "screen": self._screen_size
+                    }
+                )
+                self.browser = self._lease.browser
+                self.page = self._lease.page
+                self.submit(self._maximize_window(self.page)).result(timeout=30)
                 
                 logger.info("✅ เปิด Playwright Browser สำเร็จ!")
                     
@@ -94,24 +65,22 @@ class PeakEngineBot:
                 logger.error(f"❌ ไม่สามารถเปิด Playwright Browser ได้: {error_msg}")
                 raise Exception(f"ไม่สามารถเปิด Browser ได้: {error_msg}\n\n💡 ตรวจสอบ:\n1. Playwright ติดตั้งแล้ว: pip install playwright\n2. Browser binaries ติดตั้งแล้ว: playwright install chromium")
     
+    def submit(self, coro) -> Future:
+        """
+        ส่ง coroutine ไปรันบน event loop ถาวรของ browser (loop เดียวกับที่สร้าง page)
+        
+        Returns:
+            Future: concurrent.futures.Future ของผลลัพธ์ (เรียก .result(timeout) เพื่อรอ)
+        """
+        if self._lease is None:
+            coro.close()
+            raise RuntimeError("Browser ยังไม่ได้เปิด")
+        return self._lease.pool.submit(coro)
+    
     @staticmethod
     def _parse_dbd_text(raw: Any) -> Dict[str, str]:
-        if raw is None:
-            return {}
-        text = str(raw).strip()
-        if not text or text.lower() in {"nan", "none"}:
-            return {}
-        segments = [segment.strip() for segment in text.split("|")]
-        results: Dict[str, str] = {}
-        for segment in segments:
-            if ":" not in segment:
-                continue
-            key, value = segment.split(":", 1)
-            key = key.strip()
-            value = value.strip()
-            if key and value:
-                results[key] = value
-        return results
+        """{label: ค่า} จากข้อความ ข้อมูล DBD (ใช้กับไฟล์เก่าที่ไม่มีคอลัมน์ของ DBDCompanyRecord)"""
+        return DBDCompanyRecord.from_display_text(raw).to_details()
     
     def open_login_page_and_fill(self, username: str, password: str, link_company: Optional[str] = None, link_receipt: Optional[str] = None, log_callback: Optional[Callable] = None) -> bool:
         """
@@ -168,415 +137,402 @@ class PeakEngineBot:
                 log(f"⚠️ เกิดข้อผิดพลาดในการอ่าน config: {str(e)}", "warning")
         
         try:
-            def fill_async():
-                """รัน fill operations ใน thread ด้วย async"""
+            async def async_fill():
                 try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_closed():
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                except:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                
-                async def async_fill():
+                    log("📍 กำลังเข้าหน้า Login...", "info")
+                    # ใช้ 'domcontentloaded' แทน 'networkidle' เพื่อให้โหลดเร็วขึ้น
+                    # และเพิ่ม timeout เป็น 60 วินาที
                     try:
-                        log("📍 กำลังเข้าหน้า Login...", "info")
-                        # ใช้ 'domcontentloaded' แทน 'networkidle' เพื่อให้โหลดเร็วขึ้น
-                        # และเพิ่ม timeout เป็น 60 วินาที
-                        try:
-                            await self.page.goto(self.login_url, wait_until='domcontentloaded', timeout=60000)
-                            log("✅ โหลดหน้า Login (domcontentloaded) เสร็จแล้ว", "success")
-                        except Exception as e:
-                            log(f"⚠️ domcontentloaded timeout, ลอง load แทน: {str(e)[:100]}", "warning")
-                            # ถ้า domcontentloaded timeout ลอง load แทน
-                            await self.page.goto(self.login_url, wait_until='load', timeout=60000)
-                            log("✅ โหลดหน้า Login (load) เสร็จแล้ว", "success")
-                        
-                        # รอให้หน้าเว็บโหลดเสร็จและ JavaScript ทำงาน (ลดเวลาเพื่อเพิ่มความเร็ว)
-                        await asyncio.sleep(0.2)
-                        
-                        # รอให้ input fields ปรากฏ (ลด timeout เพื่อเพิ่มความเร็ว)
-                        log("🔍 กำลังรอให้ input fields ปรากฏ...", "info")
-                        fields_found = False
+                        await self.page.goto(self.login_url, wait_until='domcontentloaded', timeout=60000)
+                        log("✅ โหลดหน้า Login (domcontentloaded) เสร็จแล้ว", "success")
+                    except Exception as e:
+                        log(f"⚠️ domcontentloaded timeout, ลอง load แทน: {str(e)[:100]}", "warning")
+                        # ถ้า domcontentloaded timeout ลอง load แทน
+                        await self.page.goto(self.login_url, wait_until='load', timeout=60000)
+                        log("✅ โหลดหน้า Login (load) เสร็จแล้ว", "success")
+                    
+                    # รอให้หน้าเว็บโหลดเสร็จและ JavaScript ทำงาน (ลดเวลาเพื่อเพิ่มความเร็ว)
+                    await asyncio.sleep(0.2)
+                    
+                    # รอให้ input fields ปรากฏ (ลด timeout เพื่อเพิ่มความเร็ว)
+                    log("🔍 กำลังรอให้ input fields ปรากฏ...", "info")
+                    fields_found = False
+                    try:
+                        # ลอง CSS selector ก่อน
+                        await self.page.wait_for_selector('#usernametxt', timeout=3000, state='visible')
+                        log("✅ พบ input fields บนหน้าเว็บ (CSS selector)", "success")
+                        fields_found = True
+                    except Exception as e:
+                        log(f"⚠️ ไม่พบด้วย CSS selector: {str(e)[:100]}", "warning")
                         try:
-                            # ลอง CSS selector ก่อน
-                            await self.page.wait_for_selector('#usernametxt', timeout=3000, state='visible')
-                            log("✅ พบ input fields บนหน้าเว็บ (CSS selector)", "success")
+                            # ลอง XPath
+                            username_locator = self.page.locator('//*[@id="usernametxt"]')
+                            await username_locator.wait_for(state='visible', timeout=3000)
+                            log("✅ พบ input fields บนหน้าเว็บ (XPath)", "success")
                             fields_found = True
-                        except Exception as e:
-                            log(f"⚠️ ไม่พบด้วย CSS selector: {str(e)[:100]}", "warning")
-                            try:
-                                # ลอง XPath
-                                username_locator = self.page.locator('//*[@id="usernametxt"]')
-                                await username_locator.wait_for(state='visible', timeout=3000)
-                                log("✅ พบ input fields บนหน้าเว็บ (XPath)", "success")
-                                fields_found = True
-                            except Exception as e2:
-                                log(f"⚠️ ไม่พบด้วย XPath: {str(e2)[:100]}", "warning")
-                        
-                        if not fields_found:
-                            log("⚠️ รอ input fields เพิ่มเติม...", "warning")
-                            await asyncio.sleep(0.2)
-                        
-                        # หาช่องกรอก username
-                        log("🔍 กำลังค้นหาช่องกรอก username...", "info")
+                        except Exception as e2:
+                            log(f"⚠️ ไม่พบด้วย XPath: {str(e2)[:100]}", "warning")
+                    
+                    if not fields_found:
+                        log("⚠️ รอ input fields เพิ่มเติม...", "warning")
+                        await asyncio.sleep(0.2)
+                    
+                    # หาช่องกรอก username
+                    log("🔍 กำลังค้นหาช่องกรอก username...", "info")
+                    username_input = None
+                    
+                    # ลอง XPath ก่อน (ตามที่ผู้ใช้ระบุ) - ลด timeout เพื่อเพิ่มความเร็ว
+                    try:
+                        username_input = self.page.locator('//*[@id="usernametxt"]')
+                        await username_input.wait_for(state='visible', timeout=1500)
+                        if await username_input.count() > 0:
+                            log("✅ พบช่อง username ด้วย XPath: //*[@id=\"usernametxt\"]", "success")
+                    except Exception as e:
+                        log(f"⚠️ ไม่พบด้วย XPath: {str(e)[:100]}", "warning")
                         username_input = None
+                    
+                    # ถ้ายังไม่พบ ลอง CSS selector - ลด timeout เพื่อเพิ่มความเร็ว
+                    if not username_input or await username_input.count() == 0:
+                        username_selectors = [
+                            '#usernametxt',
+                            'input#usernametxt',
+                            'input[id="usernametxt"]',
+                            'input[name="username"]',
+                            'input[name="email"]',
+                            'input[type="text"]',
+                            'input#username',
+                            'input#email',
+                            'input.form-control',
+                            'input[placeholder*="username" i]',
+                            'input[placeholder*="email" i]'
+                        ]
                         
-                        # ลอง XPath ก่อน (ตามที่ผู้ใช้ระบุ) - ลด timeout เพื่อเพิ่มความเร็ว
-                        try:
-                            username_input = self.page.locator('//*[@id="usernametxt"]')
-                            await username_input.wait_for(state='visible', timeout=1500)
-                            if await username_input.count() > 0:
-                                log("✅ พบช่อง username ด้วย XPath: //*[@id=\"usernametxt\"]", "success")
-                        except Exception as e:
-                            log(f"⚠️ ไม่พบด้วย XPath: {str(e)[:100]}", "warning")
-                            username_input = None
-                        
-                        # ถ้ายังไม่พบ ลอง CSS selector - ลด timeout เพื่อเพิ่มความเร็ว
-                        if not username_input or await username_input.count() == 0:
-                            username_selectors = [
-                                '#usernametxt',
-                                'input#usernametxt',
-                                'input[id="usernametxt"]',
-                                'input[name="username"]',
-                                'input[name="email"]',
-                                'input[type="text"]',
-                                'input#username',
-                                'input#email',
-                                'input.form-control',
-                                'input[placeholder*="username" i]',
-                                'input[placeholder*="email" i]'
-                            ]
-                            
-                            for selector in username_selectors:
-                                try:
-                                    element = await self.page.wait_for_selector(selector, timeout=1000)
-                                    if element:
-                                        username_input = self.page.locator(selector)
-                                        log(f"✅ พบช่อง username ด้วย selector: {selector}", "success")
-                                        break
-                                except:
-                                    continue
-                        
-                        if not username_input or (hasattr(username_input, 'count') and await username_input.count() == 0):
-                            log("❌ ไม่พบช่องกรอก username", "error")
-                            # ถ่าย screenshot เพื่อ debug
+                        for selector in username_selectors:
                             try:
-                                await self.page.screenshot(path='peakengine_username_error.png', full_page=True)
-                                log("📸 ถ่าย screenshot ไว้ที่: peakengine_username_error.png", "info")
+                                element = await self.page.wait_for_selector(selector, timeout=1000)
+                                if element:
+                                    username_input = self.page.locator(selector)
+                                    log(f"✅ พบช่อง username ด้วย selector: {selector}", "success")
+                                    break
                             except:
-                                pass
-                            return False
-                        
-                        # กรอก username (ลด delay เพื่อเพิ่มความเร็ว)
+                                continue
+                    
+                    if not username_input or (hasattr(username_input, 'count') and await username_input.count() == 0):
+                        log("❌ ไม่พบช่องกรอก username", "error")
+                        # ถ่าย screenshot เพื่อ debug
                         try:
-                            await username_input.click()
-                            await asyncio.sleep(0.05)
-                            await username_input.clear()
-                            await username_input.fill(username)
-                            await asyncio.sleep(0.05)
-                            
-                            # ตรวจสอบว่ากรอกสำเร็จหรือไม่
-                            value = await username_input.input_value()
-                            if value == username or username in value:
-                                log(f"✅ กรอก username สำเร็จ: {username}", "success")
-                            else:
-                                log(f"⚠️ กรอก username อาจไม่สำเร็จ (ค่า: {value})", "warning")
-                        except Exception as e:
-                            log(f"❌ เกิดข้อผิดพลาดในการกรอก username: {str(e)}", "error")
-                            return False
-                        
-                        await asyncio.sleep(0.1)
+                            await self.page.screenshot(path='peakengine_username_error.png', full_page=True)
+                            log("📸 ถ่าย screenshot ไว้ที่: peakengine_username_error.png", "info")
+                        except:
+                            pass
+                        return False
+                    
+                    # กรอก username (ลด delay เพื่อเพิ่มความเร็ว)
+                    try:
+                        await username_input.click()
+                        await asyncio.sleep(0.05)
+                        await username_input.clear()
+                        await username_input.fill(username)
+                        await asyncio.sleep(0.05)
                         
-                        # หาช่องกรอก password
-                        log("🔍 กำลังค้นหาช่องกรอก password...", "info")
+                        # ตรวจสอบว่ากรอกสำเร็จหรือไม่
+                        value = await username_input.input_value()
+                        if value == username or username in value:
+                            log(f"✅ กรอก username สำเร็จ: {username}", "success")
+                        else:
+                            log(f"⚠️ กรอก username อาจไม่สำเร็จ (ค่า: {value})", "warning")
+                    except Exception as e:
+                        log(f"❌ เกิดข้อผิดพลาดในการกรอก username: {str(e)}", "error")
+                        return False
+                    
+                    await asyncio.sleep(0.1)
+                    
+                    # หาช่องกรอก password
+                    log("🔍 กำลังค้นหาช่องกรอก password...", "info")
+                    password_input = None
+                    
+                    # ลอง XPath ก่อน (ตามที่ผู้ใช้ระบุ) - ลด timeout เพื่อเพิ่มความเร็ว
+                    try:
+                        password_input = self.page.locator('//*[@id="passwordtxt"]')
+                        await password_input.wait_for(state='visible', timeout=1500)
+                        if await password_input.count() > 0:
+                            log("✅ พบช่อง password ด้วย XPath: //*[@id=\"passwordtxt\"]", "success")
+                    except Exception as e:
+                        log(f"⚠️ ไม่พบด้วย XPath: {str(e)[:100]}", "warning")
                         password_input = None
+                    
+                    # ถ้ายังไม่พบ ลอง CSS selector - ลด timeout เพื่อเพิ่มความเร็ว
+                    if not password_input or await password_input.count() == 0:
+                        password_selectors = [
+                            '#passwordtxt',
+                            'input#passwordtxt',
+                            'input[id="passwordtxt"]',
+                            'input[name="password"]',
+                            'input[type="password"]',
+                            'input#password',
+                            'input.form-control[type="password"]'
+                        ]
                         
-                        # ลอง XPath ก่อน (ตามที่ผู้ใช้ระบุ) - ลด timeout เพื่อเพิ่มความเร็ว
-                        try:
-                            password_input = self.page.locator('//*[@id="passwordtxt"]')
-                            await password_input.wait_for(state='visible', timeout=1500)
-                            if await password_input.count() > 0:
-                                log("✅ พบช่อง password ด้วย XPath: //*[@id=\"passwordtxt\"]", "success")
-                        except Exception as e:
-                            log(f"⚠️ ไม่พบด้วย XPath: {str(e)[:100]}", "warning")
-                            password_input = None
-                        
-                        # ถ้ายังไม่พบ ลอง CSS selector - ลด timeout เพื่อเพิ่มความเร็ว
-                        if not password_input or await password_input.count() == 0:
-                            password_selectors = [
-                                '#passwordtxt',
-                                'input#passwordtxt',
-                                'input[id="passwordtxt"]',
-                                'input[name="password"]',
-                                'input[type="password"]',
-                                'input#password',
-                                'input.form-control[type="password"]'
-                            ]
-                            
-                            for selector in password_selectors:
-                                try:
-                                    element = await self.page.wait_for_selector(selector, timeout=1000)
-                                    if element:
-                                        password_input = self.page.locator(selector)
-                                        log(f"✅ พบช่อง password ด้วย selector: {selector}", "success")
-                                        break
-                                except:
-                                    continue
-                        
-                        if not password_input or (hasattr(password_input, 'count') and await password_input.count() == 0):
-                            log("❌ ไม่พบช่องกรอก password", "error")
-                            # ถ่าย screenshot เพื่อ debug
+                        for selector in password_selectors:
                             try:
-                                await self.page.screenshot(path='peakengine_password_error.png', full_page=True)
-                                log("📸 ถ่าย screenshot ไว้ที่: peakengine_password_error.png", "info")
+                                element = await self.page.wait_for_selector(selector, timeout=1000)
+                                if element:
+                                    password_input = self.page.locator(selector)
+                                    log(f"✅ พบช่อง password ด้วย selector: {selector}", "success")
+                                    break
                             except:
-                                pass
-                            return False
-                        
-                        # กรอก password (ลด delay เพื่อเพิ่มความเร็ว)
+                                continue
+                    
+                    if not password_input or (hasattr(password_input, 'count') and await password_input.count() == 0):
+                        log("❌ ไม่พบช่องกรอก password", "error")
+                        # ถ่าย screenshot เพื่อ debug
                         try:
-                            await password_input.click()
-                            await asyncio.sleep(0.05)
-                            await password_input.clear()
-                            await password_input.fill(password)
-                            await asyncio.sleep(0.05)
-                            
-                            # ตรวจสอบว่ากรอกสำเร็จหรือไม่ (password อาจจะไม่แสดงค่า)
+                            await self.page.screenshot(path='peakengine_password_error.png', full_page=True)
+                            log("📸 ถ่าย screenshot ไว้ที่: peakengine_password_error.png", "info")
+                        except:
+                            pass
+                        return False
+                    
+                    # กรอก password (ลด delay เพื่อเพิ่มความเร็ว)
+                    try:
+                        await password_input.click()
+                        await asyncio.sleep(0.05)
+                        await password_input.clear()
+                        await password_input.fill(password)
+                        await asyncio.sleep(0.05)
+                        
+                        # ตรวจสอบว่ากรอกสำเร็จหรือไม่ (password อาจจะไม่แสดงค่า)
+                        value = await password_input.input_value()
+                        if len(value) > 0:
+                            log(f"✅ กรอก password สำเร็จ (ความยาว: {len(value)} ตัวอักษร)", "success")
+                        else:
+                            # ลองใช้ type แทน (ลด delay)
+                            await password_input.type(password, delay=10)
+                            await asyncio.sleep(0.1)
                             value = await password_input.input_value()
                             if len(value) > 0:
-                                log(f"✅ กรอก password สำเร็จ (ความยาว: {len(value)} ตัวอักษร)", "success")
+                                log(f"✅ กรอก password สำเร็จด้วย type() (ความยาว: {len(value)} ตัวอักษร)", "success")
+                            else:
+                                log("⚠️ กรอก password อาจไม่สำเร็จ", "warning")
+                    except Exception as e:
+                        log(f"❌ เกิดข้อผิดพลาดในการกรอก password: {str(e)}", "error")
+                        return False
+                    
+                    await asyncio.sleep(0.1)
+                    
+                    # คลิกปุ่ม Login (ลด timeout และ delay เพื่อเพิ่มความเร็ว)
+                    log("🔍 กำลังค้นหาปุ่ม Login...", "info")
+                    login_button = None
+                    
+                    # ลองหลายวิธีในการหาปุ่ม Login - ลด timeout เพื่อเพิ่มความเร็ว
+                    login_button_selectors = [
+                        '#loginbtn',  # ID
+                        'div#loginbtn',  # ID with tag
+                        '.login-btn',  # Class
+                        'div.login-btn',  # Class with tag
+                        'div[class*="login-btn"]',  # Class contains
+                        '//div[@id="loginbtn"]',  # XPath by ID
+                        '//div[contains(@class, "login-btn")]',  # XPath by class
+                        '//div[text()="เข้าใช้งาน"]',  # XPath by text
+                        'button[type="submit"]',  # Submit button
+                        'button:has-text("เข้าใช้งาน")',  # Button with text
+                    ]
+                    
+                    for selector in login_button_selectors:
+                        try:
+                            if selector.startswith('//'):
+                                # XPath - ลด timeout เพื่อเพิ่มความเร็ว
+                                login_button = self.page.locator(selector)
+                                await login_button.wait_for(state='visible', timeout=1000)
+                                if await login_button.count() > 0:
+                                    log(f"✅ พบปุ่ม Login ด้วย XPath: {selector}", "success")
+                                    break
                             else:
-                                # ลองใช้ type แทน (ลด delay)
-                                await password_input.type(password, delay=10)
-                                await asyncio.sleep(0.1)
-                                value = await password_input.input_value()
-                                if len(value) > 0:
-                                    log(f"✅ กรอก password สำเร็จด้วย type() (ความยาว: {len(value)} ตัวอักษร)", "success")
-                                else:
-                                    log("⚠️ กรอก password อาจไม่สำเร็จ", "warning")
+                                # CSS selector - ลด timeout เพื่อเพิ่มความเร็ว
+                                element = await self.page.wait_for_selector(selector, timeout=1000, state='visible')
+                                if element:
+                                    login_button = self.page.locator(selector)
+                                    log(f"✅ พบปุ่ม Login ด้วย selector: {selector}", "success")
+                                    break
                         except Exception as e:
-                            log(f"❌ เกิดข้อผิดพลาดในการกรอก password: {str(e)}", "error")
-                            return False
-                        
-                        await asyncio.sleep(0.1)
-                        
-                        # คลิกปุ่ม Login (ลด timeout และ delay เพื่อเพิ่มความเร็ว)
-                        log("🔍 กำลังค้นหาปุ่ม Login...", "info")
-                        login_button = None
+                            log(f"⚠️ ไม่พบด้วย selector {selector}: {str(e)[:50]}", "debug")
+                            continue
+                    
+                    if not login_button or (hasattr(login_button, 'count') and await login_button.count() == 0):
+                        log("❌ ไม่พบปุ่ม Login", "error")
+                        # ถ่าย screenshot เพื่อ debug
+                        try:
+                            await self.page.screenshot(path='peakengine_login_button_error.png', full_page=True)
+                            log("📸 ถ่าย screenshot ไว้ที่: peakengine_login_button_error.png", "info")
+                        except:
+                            pass
+                        return False
+                    
+                    # คลิกปุ่ม Login (ลด delay เพื่อเพิ่มความเร็ว)
+                    try:
+                        log("🔘 กำลังคลิกปุ่ม Login...", "info")
+                        await login_button.click()
+                        await asyncio.sleep(0.5)  # ลดเวลา
+                        log("✅ คลิกปุ่ม Login สำเร็จ", "success")
                         
-                        # ลองหลายวิธีในการหาปุ่ม Login - ลด timeout เพื่อเพิ่มความเร็ว
-                        login_button_selectors = [
-                            '#loginbtn',  # ID
-                            'div#loginbtn',  # ID with tag
-                            '.login-btn',  # Class
-                            'div.login-btn',  # Class with tag
-                            'div[class*="login-btn"]',  # Class contains
-                            '//div[@id="loginbtn"]',  # XPath by ID
-                            '//div[contains(@class, "login-btn")]',  # XPath by class
-                            '//div[text()="เข้าใช้งาน"]',  # XPath by text
-                            'button[type="submit"]',  # Submit button
-                            'button:has-text("เข้าใช้งาน")',  # Button with text
-                        ]
+                        # รอให้หน้าเว็บโหลดเสร็จหลังคลิก Login (ไม่รอ networkidle เพื่อความเร็ว)
+                        log("⏳ รอให้หน้าเว็บโหลดเสร็จ...", "info")
+                        try:
+                            await self.page.wait_for_load_state('domcontentloaded', timeout=5000)
+                        except:
+                            pass
+                        await asyncio.sleep(0.2)  # รอเล็กน้อยเพื่อให้หน้าเว็บแสดงผล
                         
-                        for selector in login_button_selectors:
-                            try:
-                                if selector.startswith('//'):
-                                    # XPath - ลด timeout เพื่อเพิ่มความเร็ว
-                                    login_button = self.page.locator(selector)
-                                    await login_button.wait_for(state='visible', timeout=1000)
-                                    if await login_button.count() > 0:
-                                        log(f"✅ พบปุ่ม Login ด้วย XPath: {selector}", "success")
-                                        break
-                                else:
-                                    # CSS selector - ลด timeout เพื่อเพิ่มความเร็ว
-                                    element = await self.page.wait_for_selector(selector, timeout=1000, state='visible')
-                                    if element:
-                                        login_button = self.page.locator(selector)
-                                        log(f"✅ พบปุ่ม Login ด้วย selector: {selector}", "success")
-                                        break
-                            except Exception as e:
-                                log(f"⚠️ ไม่พบด้วย selector {selector}: {str(e)[:50]}", "debug")
-                                continue
+                        # ตรวจสอบว่า login สำเร็จหรือไม่ (ดูจาก URL หรือหน้าเว็บ)
+                        current_url = self.page.url
+                        log(f"📍 URL หลังคลิก Login: {current_url}", "info")
                         
-                        if not login_button or (hasattr(login_button, 'count') and await login_button.count() == 0):
-                            log("❌ ไม่พบปุ่ม Login", "error")
-                            # ถ่าย screenshot เพื่อ debug
-                            try:
-                                await self.page.screenshot(path='peakengine_login_button_error.png', full_page=True)
-                                log("📸 ถ่าย screenshot ไว้ที่: peakengine_login_button_error.png", "info")
-                            except:
-                                pass
-                            return False
+                        # ตรวจสอบว่า login สำเร็จ (URL ไม่มี "login" หรือมี "SelectApplication" หรือ "Home")
+                        login_success = (
+                            "login" not in current_url.lower() or 
+                            "selectapplication" in current_url.lower() or
+                            "/home" in current_url.lower() or
+                            current_url.endswith("secure.peakengine.com/") or
+                            "?emi=" in current_url
+                        )
                         
-                        # คลิกปุ่ม Login (ลด delay เพื่อเพิ่มความเร็ว)
-                        try:
-                            log("🔘 กำลังคลิกปุ่ม Login...", "info")
-                            await login_button.click()
-                            await asyncio.sleep(0.5)  # ลดเวลา
-                            log("✅ คลิกปุ่ม Login สำเร็จ", "success")
+                        if login_success:
+                            log("✅ Login สำเร็จ! (URL เปลี่ยนแล้ว)", "success")
                             
-                            # รอให้หน้าเว็บโหลดเสร็จหลังคลิก Login (ไม่รอ networkidle เพื่อความเร็ว)
-                            log("⏳ รอให้หน้าเว็บโหลดเสร็จ...", "info")
+                            # รอให้หน้าเว็บแสดงผลเสร็จก่อนคลิกปุ่ม (ไม่รอ networkidle เพื่อความเร็ว)
+                            log("⏳ รอให้หน้าเว็บแสดงผลเสร็จ...", "info")
                             try:
-                                await self.page.wait_for_load_state('domcontentloaded', timeout=5000)
+                                await self.page.wait_for_load_state('domcontentloaded', timeout=2000)
                             except:
                                 pass
-                            await asyncio.sleep(0.2)  # รอเล็กน้อยเพื่อให้หน้าเว็บแสดงผล
+                            await asyncio.sleep(0.1)  # รอเล็กน้อยเพื่อให้หน้าเว็บแสดงผล
                             
-                            # ตรวจสอบว่า login สำเร็จหรือไม่ (ดูจาก URL หรือหน้าเว็บ)
-                            current_url = self.page.url
-                            log(f"📍 URL หลังคลิก Login: {current_url}", "info")
+                            # คลิกที่ปุ่ม "PEAK (Deprecated)" ก่อน navigate
+                            log("🔍 กำลังค้นหาปุ่ม PEAK (Deprecated)...", "info")
+                            back_button = None
                             
-                            # ตรวจสอบว่า login สำเร็จ (URL ไม่มี "login" หรือมี "SelectApplication" หรือ "Home")
-                            login_success = (
-                                "login" not in current_url.lower() or 
-                                "selectapplication" in current_url.lower() or
-                                "/home" in current_url.lower() or
-                                current_url.endswith("secure.peakengine.com/") or
-                                "?emi=" in current_url
-                            )
+                            # ลองหลายวิธีในการหาปุ่ม
+                            back_button_selectors = [
+                                '#btnBackToOldPeak',  # ID
+                                'p#btnBackToOldPeak',  # ID with tag
+                                'p[id="btnBackToOldPeak"]',  # ID with attribute
+                                '//p[@id="btnBackToOldPeak"]',  # XPath by ID
+                                '//p[contains(text(), "PEAK (Deprecated)")]',  # XPath by text
+                            ]
                             
-                            if login_success:
-                                log("✅ Login สำเร็จ! (URL เปลี่ยนแล้ว)", "success")
-                                
-                                # รอให้หน้าเว็บแสดงผลเสร็จก่อนคลิกปุ่ม (ไม่รอ networkidle เพื่อความเร็ว)
-                                log("⏳ รอให้หน้าเว็บแสดงผลเสร็จ...", "info")
+                            for selector in back_button_selectors:
                                 try:
-                                    await self.page.wait_for_load_state('domcontentloaded', timeout=2000)
-                                except:
-                                    pass
-                                await asyncio.sleep(0.1)  # รอเล็กน้อยเพื่อให้หน้าเว็บแสดงผล
-                                
-                                # คลิกที่ปุ่ม "PEAK (Deprecated)" ก่อน navigate
-                                log("🔍 กำลังค้นหาปุ่ม PEAK (Deprecated)...", "info")
-                                back_button = None
-                                
-                                # ลองหลายวิธีในการหาปุ่ม
-                                back_button_selectors = [
-                                    '#btnBackToOldPeak',  # ID
-                                    'p#btnBackToOldPeak',  # ID with tag
-                                    'p[id="btnBackToOldPeak"]',  # ID with attribute
-                                    '//p[@id="btnBackToOldPeak"]',  # XPath by ID
-                                    '//p[contains(text(), "PEAK (Deprecated)")]',  # XPath by text
-                                ]
-                                
-                                for selector in back_button_selectors:
-                                    try:
-                                        if selector.startswith('//'):
-                                            # XPath
+                                    if selector.startswith('//'):
+                                        # XPath
+                                        back_button = self.page.locator(selector)
+                                        await back_button.wait_for(state='visible', timeout=2000)
+                                        if await back_button.count() > 0:
+                                            log(f"✅ พบปุ่ม PEAK (Deprecated) ด้วย XPath: {selector}", "success")
+                                            break
+                                    else:
+                                        # CSS selector
+                                        element = await self.page.wait_for_selector(selector, timeout=2000, state='visible')
+                                        if element:
                                             back_button = self.page.locator(selector)
-                                            await back_button.wait_for(state='visible', timeout=2000)
-                                            if await back_button.count() > 0:
-                                                log(f"✅ พบปุ่ม PEAK (Deprecated) ด้วย XPath: {selector}", "success")
-                                                break
-                                        else:
-                                            # CSS selector
-                                            element = await self.page.wait_for_selector(selector, timeout=2000, state='visible')
-                                            if element:
-                                                back_button = self.page.locator(selector)
-                                                log(f"✅ พบปุ่ม PEAK (Deprecated) ด้วย selector: {selector}", "success")
-                                                break
-                                    except Exception as e:
-                                        log(f"⚠️ ไม่พบด้วย selector {selector}: {str(e)[:50]}", "debug")
-                                        continue
-                                
-                                if back_button and await back_button.count() > 0:
+                                            log(f"✅ พบปุ่ม PEAK (Deprecated) ด้วย selector: {selector}", "success")
+                                            break
+                                except Exception as e:
+                                    log(f"⚠️ ไม่พบด้วย selector {selector}: {str(e)[:50]}", "debug")
+                                    continue
+                            
+                            if back_button and await back_button.count() > 0:
+                                try:
+                                    log("🔘 กำลังคลิกปุ่ม PEAK (Deprecated)...", "info")
+                                    await back_button.click()
+                                    await asyncio.sleep(0.2)  # รอเล็กน้อยหลังคลิก
+                                    log("✅ คลิกปุ่ม PEAK (Deprecated) สำเร็จ", "success")
+                                    
+                                    # รอให้หน้าเว็บแสดงผลหลังคลิก (ไม่รอ networkidle เพื่อความเร็ว)
                                     try:
-                                        log("🔘 กำลังคลิกปุ่ม PEAK (Deprecated)...", "info")
-                                        await back_button.click()
-                                        await asyncio.sleep(0.2)  # รอเล็กน้อยหลังคลิก
-                                        log("✅ คลิกปุ่ม PEAK (Deprecated) สำเร็จ", "success")
-                                        
-                                        # รอให้หน้าเว็บแสดงผลหลังคลิก (ไม่รอ networkidle เพื่อความเร็ว)
-                                        try:
-                                            await self.page.wait_for_load_state('domcontentloaded', timeout=2000)
-                                        except:
-                                            pass
-                                        await asyncio.sleep(0.1)
-                                    except Exception as e:
-                                        log(f"⚠️ เกิดข้อผิดพลาดในการคลิกปุ่ม: {str(e)[:100]}", "warning")
-                                else:
-                                    log("⚠️ ไม่พบปุ่ม PEAK (Deprecated) - ข้ามการคลิก", "warning")
-                                
-                                # Navigate ไปที่ Link_conpany และ Link_receipt หลังจากคลิกปุ่ม
-                                # ใช้ลิงค์ที่อ่านไว้แล้วจาก closure
-                                # Navigate ไปที่ Link_conpany
-                                if link_company:
-                                    self.link_company = link_company
+                                        await self.page.wait_for_load_state('domcontentloaded', timeout=2000)
+                                    except:
+                                        pass
+                                    await asyncio.sleep(0.1)
+                                except Exception as e:
+                                    log(f"⚠️ เกิดข้อผิดพลาดในการคลิกปุ่ม: {str(e)[:100]}", "warning")
+                            else:
+                                log("⚠️ ไม่พบปุ่ม PEAK (Deprecated) - ข้ามการคลิก", "warning")
+                            
+                            # Navigate ไปที่ Link_conpany และ Link_receipt หลังจากคลิกปุ่ม
+                            # ใช้ลิงค์ที่อ่านไว้แล้วจาก closure
+                            # Navigate ไปที่ Link_conpany
+                            if link_company:
+                                self.link_company = link_company
+                                try:
+                                    log(f"🌐 กำลังไปที่ Link_conpany: {link_company}", "info")
+                                    
+                                    # Navigate ไปที่ Link_conpany (ใช้ domcontentloaded เพื่อความเร็ว - ไม่รอ networkidle)
                                     try:
-                                        log(f"🌐 กำลังไปที่ Link_conpany: {link_company}", "info")
-                                        
-                                        # Navigate ไปที่ Link_conpany (ใช้ domcontentloaded เพื่อความเร็ว - ไม่รอ networkidle)
-                                        try:
-                                            await self.page.goto(link_company, wait_until='domcontentloaded', timeout=30000)
-                                            log("✅ โหลดหน้า Link_conpany (domcontentloaded) เสร็จแล้ว", "success")
-                                        except Exception as e:
-                                            log(f"⚠️ domcontentloaded timeout: {str(e)[:100]}", "warning")
-                                        
-                                        # ตรวจสอบว่า URL เปลี่ยนแล้วหรือยัง (ไม่รอ networkidle เพื่อความเร็ว)
-                                        await asyncio.sleep(0.1)  # รอเล็กน้อยเพื่อให้ URL อัปเดต
-                                        current_url = self.page.url
-                                        log(f"📍 URL ปัจจุบัน: {current_url}", "info")
-                                        
-                                        if link_company in current_url or current_url.startswith(link_company.split('?')[0]):
-                                            log("✅ ไปที่ Link_conpany สำเร็จ (URL ถูกต้อง)", "success")
-                                        else:
-                                            log(f"⚠️ URL อาจไม่ตรงกับที่ต้องการ (คาดหวัง: {link_company})", "warning")
-                                        
+                                        await self.page.goto(link_company, wait_until='domcontentloaded', timeout=30000)
+                                        log("✅ โหลดหน้า Link_conpany (domcontentloaded) เสร็จแล้ว", "success")
                                     except Exception as e:
-                                        log(f"⚠️ เกิดข้อผิดพลาดในการ navigate ไปที่ Link_conpany: {str(e)[:100]}", "warning")
-                                
-                                # Navigate ไปที่ Link_receipt (แยก try-except เพื่อให้ทำงานต่อได้แม้ Link_conpany จะมีปัญหา)
-                                log(f"🔍 ตรวจสอบ link_receipt: {repr(link_receipt)}", "info")
-                                if link_receipt:
-                                    self.link_receipt = link_receipt
+                                        log(f"⚠️ domcontentloaded timeout: {str(e)[:100]}", "warning")
+                                    
+                                    # ตรวจสอบว่า URL เปลี่ยนแล้วหรือยัง (ไม่รอ networkidle เพื่อความเร็ว)
+                                    await asyncio.sleep(0.1)  # รอเล็กน้อยเพื่อให้ URL อัปเดต
+                                    current_url = self.page.url
+                                    log(f"📍 URL ปัจจุบัน: {current_url}", "info")
+                                    
+                                    if link_company in current_url or current_url.startswith(link_company.split('?')[0]):
+                                        log("✅ ไปที่ Link_conpany สำเร็จ (URL ถูกต้อง)", "success")
+                                    else:
+                                        log(f"⚠️ URL อาจไม่ตรงกับที่ต้องการ (คาดหวัง: {link_company})", "warning")
+                                    
+                                except Exception as e:
+                                    log(f"⚠️ เกิดข้อผิดพลาดในการ navigate ไปที่ Link_conpany: {str(e)[:100]}", "warning")
+                            
+                            # Navigate ไปที่ Link_receipt (แยก try-except เพื่อให้ทำงานต่อได้แม้ Link_conpany จะมีปัญหา)
+                            log(f"🔍 ตรวจสอบ link_receipt: {repr(link_receipt)}", "info")
+                            if link_receipt:
+                                self.link_receipt = link_receipt
+                                try:
+                                    log(f"🌐 กำลังไปที่ Link_receipt: {link_receipt}", "info")
+                                    
+                                    # Navigate ไปที่ Link_receipt (ใช้ domcontentloaded เพื่อความเร็ว - ไม่รอ networkidle)
                                     try:
-                                        log(f"🌐 กำลังไปที่ Link_receipt: {link_receipt}", "info")
-                                        
-                                        # Navigate ไปที่ Link_receipt (ใช้ domcontentloaded เพื่อความเร็ว - ไม่รอ networkidle)
-                                        try:
-                                            await self.page.goto(link_receipt, wait_until='domcontentloaded', timeout=30000)
-                                            log("✅ โหลดหน้า Link_receipt (domcontentloaded) เสร็จแล้ว", "success")
-                                        except Exception as e:
-                                            log(f"⚠️ domcontentloaded timeout: {str(e)[:100]}", "warning")
-                                        
-                                        # ตรวจสอบว่า URL เปลี่ยนแล้วหรือยัง (ไม่รอ networkidle เพื่อความเร็ว)
-                                        await asyncio.sleep(0.1)  # รอเล็กน้อยเพื่อให้ URL อัปเดต
-                                        current_url = self.page.url
-                                        log(f"📍 URL ปัจจุบัน: {current_url}", "info")
-                                        
-                                        if link_receipt in current_url or current_url.startswith(link_receipt.split('?')[0]):
-                                            log("✅ ไปที่ Link_receipt สำเร็จ (URL ถูกต้อง)", "success")
-                                        else:
-                                            log(f"⚠️ URL อาจไม่ตรงกับที่ต้องการ (คาดหวัง: {link_receipt})", "warning")
+                                        await self.page.goto(link_receipt, wait_until='domcontentloaded', timeout=30000)
+                                        log("✅ โหลดหน้า Link_receipt (domcontentloaded) เสร็จแล้ว", "success")
                                     except Exception as e:
-                                        log(f"⚠️ เกิดข้อผิดพลาดในการ navigate ไปที่ Link_receipt: {str(e)[:100]}", "warning")
-                                else:
-                                    log("⚠️ ไม่พบ Link_receipt ใน config.py", "warning")
-                                if not link_company:
-                                    log("⚠️ ไม่พบ Link_conpany ใน config.py", "warning")
+                                        log(f"⚠️ domcontentloaded timeout: {str(e)[:100]}", "warning")
+                                    
+                                    # ตรวจสอบว่า URL เปลี่ยนแล้วหรือยัง (ไม่รอ networkidle เพื่อความเร็ว)
+                                    await asyncio.sleep(0.1)  # รอเล็กน้อยเพื่อให้ URL อัปเดต
+                                    current_url = self.page.url
+                                    log(f"📍 URL ปัจจุบัน: {current_url}", "info")
+                                    
+                                    if link_receipt in current_url or current_url.startswith(link_receipt.split('?')[0]):
+                                        log("✅ ไปที่ Link_receipt สำเร็จ (URL ถูกต้อง)", "success")
+                                    else:
+                                        log(f"⚠️ URL อาจไม่ตรงกับที่ต้องการ (คาดหวัง: {link_receipt})", "warning")
+                                except Exception as e:
+                                    log(f"⚠️ เกิดข้อผิดพลาดในการ navigate ไปที่ Link_receipt: {str(e)[:100]}", "warning")
                             else:
-                                log("⚠️ ยังอยู่ที่หน้า Login - อาจจะต้องตรวจสอบ username/password", "warning")
-                            
-                        except Exception as e:
-                            log(f"❌ เกิดข้อผิดพลาดในการคลิกปุ่ม Login: {str(e)}", "error")
-                            return False
-                        
-                        log("✅ กรอกข้อมูลและคลิกปุ่ม Login สำเร็จแล้ว", "success")
-                        self.is_logged_in = True
-                        return True
+                                log("⚠️ ไม่พบ Link_receipt ใน config.py", "warning")
+                            if not link_company:
+                                log("⚠️ ไม่พบ Link_conpany ใน config.py", "warning")
+                        else:
+                            log("⚠️ ยังอยู่ที่หน้า Login - อาจจะต้องตรวจสอบ username/password", "warning")
                         
                     except Exception as e:
-                        log(f"❌ เกิดข้อผิดพลาด: {str(e)}", "error")
-                        self.is_logged_in = False
+                        log(f"❌ เกิดข้อผิดพลาดในการคลิกปุ่ม Login: {str(e)}", "error")
                         return False
-                
-                return loop.run_until_complete(async_fill())
+                    
+                    log("✅ กรอกข้อมูลและคลิกปุ่ม Login สำเร็จแล้ว", "success")
+                    self.is_logged_in = True
+                    return True
+                    
+                except Exception as e:
+                    log(f"❌ เกิดข้อผิดพลาด: {str(e)}", "error")
+                    self.is_logged_in = False
+                    return False
             
-            # รัน fill ใน thread
-            result = self._executor.submit(fill_async).result(timeout=60)
+            # ส่งไปรันบน event loop ถาวรของ browser
+            result = self.submit(async_fill()).result(timeout=60)
             return result
             
         except Exception as e:
@@ -661,361 +617,349 @@ class PeakEngineBot:
             log("⚠️ ไม่มีค่าที่พร้อมสำหรับกรอก", "warning")
             return {"total": 0, "success": 0, "errors": []}
 
-        def fill_async():
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
+        async def async_fill():
+            clean_values = [value for value, _ in paired_inputs]
+            clean_row_keys = [row_key for _, row_key in paired_inputs]
+            results = {
+                "total": len(clean_values),
+                "success": 0,
+                "errors": [],
+                "processed": [],
+                "processed_row_keys": [],
+                "dropdown_options": [],
+                "plus_clicked": [],
+                "selected_existing": [],
+                "validation": [],
+                "receipt_links": [],
+                "not_found_contacts": []
+            }
+            anonymous_categories = {
+                re.sub(r"\s+", "", text.casefold())
+                for text in [
+                    "ลูกค้าไม่ประสงค์ออกนาม/ยอดต่างเข้าลูกค้า",
+                    "ลูกค้าไม่ประสงค์ออกนาม/ภาษีปกติ"
+                ]
+            }
+            anonymous_placeholder = "ลูกค้าไม่ประสงค์ออกนาม"
 
-            async def async_fill():
-                clean_values = [value for value, _ in paired_inputs]
-                clean_row_keys = [row_key for _, row_key in paired_inputs]
-                results = {
-                    "total": len(clean_values),
-                    "success": 0,
-                    "errors": [],
-                    "processed": [],
-                    "processed_row_keys": [],
-                    "dropdown_options": [],
-                    "plus_clicked": [],
-                    "selected_existing": [],
-                    "validation": [],
-                    "receipt_links": [],
-                    "not_found_contacts": []
-                }
-                anonymous_categories = {
-                    re.sub(r"\s+", "", text.casefold())
-                    for text in [
-                        "ลูกค้าไม่ประสงค์ออกนาม/ยอดต่างเข้าลูกค้า",
-                        "ลูกค้าไม่ประสงค์ออกนาม/ภาษีปกติ"
-                    ]
-                }
-                anonymous_placeholder = "ลูกค้าไม่ประสงค์ออกนาม"
+            for idx, value in enumerate(clean_values, 1):
+                try:
+                    try:
+                        await self.page.wait_for_selector('#iptnumber', timeout=5000)
+                    except Exception:
+                        log("⚠️ ไม่สามารถรอให้ช่องเลขที่เอกสารถูกโหลดได้ภายในเวลาที่กำหนด", "warning")
+                    current_row_key = clean_row_keys[idx - 1] if idx - 1 < len(clean_row_keys) else None
+                    reg_info = None
+                    if current_row_key and row_payload_map:
+                        reg_info = row_payload_map.get(current_row_key)
+                    if not reg_info and reg_info_map:
+                        reg_info = reg_info_map.get(value)
+
+                    work_category_raw = ""
+                    if reg_info:
+                        work_category_raw = (
+                            reg_info.get("work_category")
+                            or (reg_info.get("row") or {}).get("work_category")
+                            or (reg_info.get("row") or {}).get("ประเภทการทำงาน")
+                            or ""
+                        )
+                    work_category_cf = work_category_raw.casefold()
+                    normalized_work_category = re.sub(r"\s+", "", work_category_cf) if work_category_raw else ""
+                    is_anonymous_fill = (
+                        normalized_work_category in anonymous_categories
+                        or ("ลูกค้าไม่ประสงค์ออกนาม" in work_category_cf)
+                    )
+                    value_to_fill = anonymous_placeholder if is_anonymous_fill else value
+                    log_id_display = value_to_fill if is_anonymous_fill else value
+                    log(f"✏️ ({idx}/{len(clean_values)}) กำลังกรอกเลขทะเบียน: {log_id_display}", "info")
 
-                for idx, value in enumerate(clean_values, 1):
+                    input_element = await self.page.wait_for_selector(field_selector, timeout=5000)
+                    await input_element.click()
                     try:
-                        try:
-                            await self.page.wait_for_selector('#iptnumber', timeout=5000)
-                        except Exception:
-                            log("⚠️ ไม่สามารถรอให้ช่องเลขที่เอกสารถูกโหลดได้ภายในเวลาที่กำหนด", "warning")
-                        current_row_key = clean_row_keys[idx - 1] if idx - 1 < len(clean_row_keys) else None
-                        reg_info = None
-                        if current_row_key and row_payload_map:
-                            reg_info = row_payload_map.get(current_row_key)
-                        if not reg_info and reg_info_map:
-                            reg_info = reg_info_map.get(value)
-
-                        work_category_raw = ""
-                        if reg_info:
-                            work_category_raw = (
-                                reg_info.get("work_category")
-                                or (reg_info.get("row") or {}).get("work_category")
-                                or (reg_info.get("row") or {}).get("ประเภทการทำงาน")
-                                or ""
-                            )
-                        work_category_cf = work_category_raw.casefold()
-                        normalized_work_category = re.sub(r"\s+", "", work_category_cf) if work_category_raw else ""
-                        is_anonymous_fill = (
-                            normalized_work_category in anonymous_categories
-                            or ("ลูกค้าไม่ประสงค์ออกนาม" in work_category_cf)
+                        await input_element.fill("")
+                    except Exception:
+                        pass
+                    await asyncio.sleep(0.1)
+                    await input_element.fill(value_to_fill)
+                    log(f"✅ กรอก {value_to_fill} สำเร็จ", "success")
+                    await asyncio.sleep(0.5)
+                    results["success"] += 1
+                    results["processed"].append(value)
+                    if current_row_key:
+                        results["processed_row_keys"].append(current_row_key)
+                    dropdown_items: List[str] = []
+                    non_plus_options: List[Tuple[Any, str]] = []
+                    existing_selected = False
+                    plus_option = None
+                    dropdown_locator = None
+                    status_text = ""
+                    not_found = False
+                    success_found = False
+
+                    await asyncio.sleep(0.1)
+                    try:
+                        await self.page.wait_for_function(
+                            """() => {
+                                const lists = Array.from(document.querySelectorAll('ul.ui-autocomplete'));
+                                return lists.some(el => {
+                                    if (!el) return false;
+                                    const style = window.getComputedStyle(el);
+                                    if (!style || style.display === 'none') return false;
+                                    return el.querySelectorAll('li').length > 0;
+                                });
+                            }""",
+                            timeout=3000
                         )
-                        value_to_fill = anonymous_placeholder if is_anonymous_fill else value
-                        log_id_display = value_to_fill if is_anonymous_fill else value
-                        log(f"✏️ ({idx}/{len(clean_values)}) กำลังกรอกเลขทะเบียน: {log_id_display}", "info")
+                    except Exception:
+                        pass
 
-                        input_element = await self.page.wait_for_selector(field_selector, timeout=5000)
-                        await input_element.click()
-                        try:
-                            await input_element.fill("")
-                        except Exception:
-                            pass
-                        await asyncio.sleep(0.1)
-                        await input_element.fill(value_to_fill)
-                        log(f"✅ กรอก {value_to_fill} สำเร็จ", "success")
-                        await asyncio.sleep(0.5)
-                        results["success"] += 1
-                        results["processed"].append(value)
-                        if current_row_key:
-                            results["processed_row_keys"].append(current_row_key)
-                        dropdown_items: List[str] = []
-                        non_plus_options: List[Tuple[Any, str]] = []
-                        existing_selected = False
-                        plus_option = None
-                        dropdown_locator = None
-                        status_text = ""
-                        not_found = False
-                        success_found = False
-
-                        await asyncio.sleep(0.1)
+                    dropdown_selectors = [
+                        '//ul[contains(@class,"ui-autocomplete") and not(contains(@style,"display: none"))]',
+                        '#ui-id-15',
+                        '#ui-id-4',
+                        'ul.ui-autocomplete'
+                    ]
+                    for selector in dropdown_selectors:
+                        locator_candidate = self.page.locator(selector)
                         try:
-                            await self.page.wait_for_function(
-                                """() => {
-                                    const lists = Array.from(document.querySelectorAll('ul.ui-autocomplete'));
-                                    return lists.some(el => {
-                                        if (!el) return false;
-                                        const style = window.getComputedStyle(el);
-                                        if (!style || style.display === 'none') return false;
-                                        return el.querySelectorAll('li').length > 0;
-                                    });
-                                }""",
-                                timeout=3000
+                            await locator_candidate.wait_for(state='visible', timeout=1200)
+                            has_items = await locator_candidate.evaluate(
+                                """el => Array.from(el.querySelectorAll('li')).length > 0"""
                             )
+                            if not has_items:
+                                continue
+                            dropdown_locator = locator_candidate
+                            break
                         except Exception:
-                            pass
+                            continue
 
-                        dropdown_selectors = [
-                            '//ul[contains(@class,"ui-autocomplete") and not(contains(@style,"display: none"))]',
-                            '#ui-id-15',
-                            '#ui-id-4',
-                            'ul.ui-autocomplete'
-                        ]
-                        for selector in dropdown_selectors:
-                            locator_candidate = self.page.locator(selector)
-                            try:
-                                await locator_candidate.wait_for(state='visible', timeout=1200)
-                                has_items = await locator_candidate.evaluate(
-                                    """el => Array.from(el.querySelectorAll('li')).length > 0"""
-                                )
-                                if not has_items:
+                    plus_option_clicked = False
+                    if dropdown_locator:
+                        try:
+                            option_locators = dropdown_locator.locator('li')
+                            option_count = await option_locators.count()
+                            for option_index in range(option_count):
+                                option = option_locators.nth(option_index)
+                                try:
+                                    option_text = await option.inner_text()
+                                    cleaned_text = option_text.strip()
+                                    if cleaned_text:
+                                        dropdown_items.append(cleaned_text)
+                                    if cleaned_text.startswith('+ เพิ่มผู้ติดต่อ'):
+                                        plus_option = option
+                                    else:
+                                        non_plus_options.append((option, cleaned_text))
+                                except Exception:
                                     continue
-                                dropdown_locator = locator_candidate
-                                break
-                            except Exception:
-                                continue
 
-                        plus_option_clicked = False
-                        if dropdown_locator:
-                            try:
-                                option_locators = dropdown_locator.locator('li')
-                                option_count = await option_locators.count()
-                                for option_index in range(option_count):
-                                    option = option_locators.nth(option_index)
-                                    try:
-                                        option_text = await option.inner_text()
-                                        cleaned_text = option_text.strip()
-                                        if cleaned_text:
-                                            dropdown_items.append(cleaned_text)
-                                        if cleaned_text.startswith('+ เพิ่มผู้ติดต่อ'):
-                                            plus_option = option
-                                        else:
-                                            non_plus_options.append((option, cleaned_text))
-                                    except Exception:
-                                        continue
-
-                                if dropdown_items:
-                                    if len(dropdown_items) > 1 and dropdown_items[0].startswith('+ เพิ่มผู้ติดต่อ') and dropdown_items[1:]:
-                                        log(f"ℹ️ พบตัวเลือกเพิ่มเติมใน dropdown: {', '.join(dropdown_items[1:3])}", "info")
-                                    target_option = None
-                                    target_text = None
-                                    if non_plus_options:
-                                        expected_texts: List[str] = []
-                                        if reg_info:
-                                            for key in ["company_name_display", "company_name", "ชื่อบริษัท/บุคคล", "ชื่อบริษัทจาก DBD"]:
-                                                value_candidate = reg_info.get("row", {}).get(key) if isinstance(reg_info.get("row"), dict) else None
-                                                if not value_candidate:
-                                                    value_candidate = reg_info.get(key)
-                                                if value_candidate:
-                                                    expected_texts.append(str(value_candidate).strip())
-                                        matched = None
-                                        if expected_texts:
-                                            for option, text_value in non_plus_options:
-                                                for expected in expected_texts:
-                                                    if expected and expected in text_value:
-                                                        matched = (option, text_value)
-                                                        break
-                                                if matched:
+                            if dropdown_items:
+                                if len(dropdown_items) > 1 and dropdown_items[0].startswith('+ เพิ่มผู้ติดต่อ') and dropdown_items[1:]:
+                                    log(f"ℹ️ พบตัวเลือกเพิ่มเติมใน dropdown: {', '.join(dropdown_items[1:3])}", "info")
+                                target_option = None
+                                target_text = None
+                                if non_plus_options:
+                                    expected_texts: List[str] = []
+                                    if reg_info:
+                                        for key in ["company_name_display", "company_name", "ชื่อบริษัท/บุคคล", "ชื่อบริษัทจาก DBD"]:
+                                            value_candidate = reg_info.get("row", {}).get(key) if isinstance(reg_info.get("row"), dict) else None
+                                            if not value_candidate:
+                                                value_candidate = reg_info.get(key)
+                                            if value_candidate:
+                                                expected_texts.append(str(value_candidate).strip())
+                                    matched = None
+                                    if expected_texts:
+                                        for option, text_value in non_plus_options:
+                                            for expected in expected_texts:
+                                                if expected and expected in text_value:
+                                                    matched = (option, text_value)
                                                     break
-                                        if matched:
-                                            target_option, target_text = matched
-                                        else:
-                                            target_option, target_text = non_plus_options[0]
-                                    elif plus_option is not None:
-                                        target_option = plus_option
-                                        target_text = dropdown_items[0]
-
-                                    if target_option is plus_option and len(dropdown_items) > 1 and non_plus_options:
+                                            if matched:
+                                                break
+                                    if matched:
+                                        target_option, target_text = matched
+                                    else:
                                         target_option, target_text = non_plus_options[0]
+                                elif plus_option is not None:
+                                    target_option = plus_option
+                                    target_text = dropdown_items[0]
 
-                                    if target_option is plus_option and plus_option is not None:
-                                        try:
-                                            await plus_option.click()
-                                            plus_option_clicked = True
-                                            log("🖱️ คลิก '+ เพิ่มผู้ติดต่อ' เพื่อเพิ่มผู้ติดต่อใหม่", "info")
-                                            await asyncio.sleep(1)
-                                        except Exception as click_error:
-                                            log(f"⚠️ คลิก '+ เพิ่มผู้ติดต่อ' ไม่สำเร็จ: {click_error}", "warning")
-                                    elif target_option is not None:
-                                        try:
-                                            await target_option.click()
-                                            chosen_text = target_text or dropdown_items[min(1, len(dropdown_items) - 1)]
-                                            log(f"✅ เลือกรายการ '{chosen_text}' จาก dropdown", "success")
-                                            await asyncio.sleep(0.5)
-                                            existing_selected = True
-                                            results.setdefault("selected_existing", []).append(value)
-                                        except Exception as select_error:
-                                            log(f"⚠️ เลือกรายการจาก dropdown ไม่สำเร็จ: {select_error}", "warning")
-                            except Exception:
-                                dropdown_items = []
-
-                        if dropdown_items:
-                            log(f"🧾 ตัวเลือก dropdown ({len(dropdown_items)}): {', '.join(dropdown_items[:5])}", "info")
-                        else:
-                            log("ℹ️ ไม่พบตัวเลือกใน dropdown หลังกรอกเลขทะเบียน", "info")
+                                if target_option is plus_option and len(dropdown_items) > 1 and non_plus_options:
+                                    target_option, target_text = non_plus_options[0]
 
-                        results["dropdown_options"].append({
-                            "value": value,
-                            "items": dropdown_items
-                        })
-                        if plus_option_clicked:
-                            results["plus_clicked"].append(value)
-                            try:
-                                log("⏳ รอหน้าต่างเพิ่มผู้ติดต่อแสดงผล...", "info")
-                                modal_field = await self.page.wait_for_selector('#mdccipttaxid1', timeout=5000)
-                                if modal_field:
-                                    log("✅ พบหน้าต่างเพิ่มผู้ติดต่อ - กำลังกรอกเลข 13 หลัก", "success")
-                                    for idx_digit, digit in enumerate(value[:13], start=1):
-                                        input_selector = f'#mdccipttaxid{idx_digit}'
-                                        try:
-                                            digit_input = await self.page.wait_for_selector(input_selector, timeout=1000)
-                                            if digit_input:
-                                                await digit_input.click()
-                                                await digit_input.fill(digit)
-                                                await asyncio.sleep(0.05)
-                                        except Exception as digit_error:
-                                            log(f"⚠️ กรอกเลขหลักที่ {idx_digit} ไม่สำเร็จ: {digit_error}", "warning")
-                                    log("✅ กรอกเลข 13 หลักในหน้าต่างเพิ่มผู้ติดต่อเรียบร้อย", "success")
+                                if target_option is plus_option and plus_option is not None:
+                                    try:
+                                        await plus_option.click()
+                                        plus_option_clicked = True
+                                        log("🖱️ คลิก '+ เพิ่มผู้ติดต่อ' เพื่อเพิ่มผู้ติดต่อใหม่", "info")
+                                        await asyncio.sleep(1)
+                                    except Exception as click_error:
+                                        log(f"⚠️ คลิก '+ เพิ่มผู้ติดต่อ' ไม่สำเร็จ: {click_error}", "warning")
+                                elif target_option is not None:
+                                    try:
+                                        await target_option.click()
+                                        chosen_text = target_text or dropdown_items[min(1, len(dropdown_items) - 1)]
+                                        log(f"✅ เลือกรายการ '{chosen_text}' จาก dropdown", "success")
+                                        await asyncio.sleep(0.5)
+                                        existing_selected = True
+                                        results.setdefault("selected_existing", []).append(value)
+                                    except Exception as select_error:
+                                        log(f"⚠️ เลือกรายการจาก dropdown ไม่สำเร็จ: {select_error}", "warning")
+                        except Exception:
+                            dropdown_items = []
 
+                    if dropdown_items:
+                        log(f"🧾 ตัวเลือก dropdown ({len(dropdown_items)}): {', '.join(dropdown_items[:5])}", "info")
+                    else:
+                        log("ℹ️ ไม่พบตัวเลือกใน dropdown หลังกรอกเลขทะเบียน", "info")
+
+                    results["dropdown_options"].append({
+                        "value": value,
+                        "items": dropdown_items
+                    })
+                    if plus_option_clicked:
+                        results["plus_clicked"].append(value)
+                        try:
+                            log("⏳ รอหน้าต่างเพิ่มผู้ติดต่อแสดงผล...", "info")
+                            modal_field = await self.page.wait_for_selector('#mdccipttaxid1', timeout=5000)
+                            if modal_field:
+                                log("✅ พบหน้าต่างเพิ่มผู้ติดต่อ - กำลังกรอกเลข 13 หลัก", "success")
+                                for idx_digit, digit in enumerate(value[:13], start=1):
+                                    input_selector = f'#mdccipttaxid{idx_digit}'
                                     try:
-                                        search_button = await self.page.wait_for_selector('#contactgetinfobtn', timeout=2000)
-                                        if search_button:
-                                            log("🔍 กำลังกดปุ่ม 'ค้นหา'", "info")
-                                            await search_button.click()
-                                            await asyncio.sleep(0.5)
-                                            deadline = time.time() + 25
-                                            while time.time() < deadline:
-                                                try:
-                                                    status_element = await self.page.wait_for_selector('#mdccperrmsg', timeout=500)
-                                                    if status_element:
-                                                        candidate_text = (await status_element.inner_text() or "").strip()
-                                                        if candidate_text:
-                                                            status_text = candidate_text
-                                                            break
-                                                except Exception:
-                                                    pass
-                                                await asyncio.sleep(0.2)
-                                            if not status_text:
-                                                log("⚠️ ไม่ได้รับสถานะตอบกลับจากปุ่มค้นหาภายในเวลาที่กำหนด", "warning")
-                                    except Exception as search_error:
-                                        log(f"⚠️ ไม่สามารถกดปุ่มค้นหาได้: {search_error}", "warning")
-
-                                    if status_text:
-                                        if "ไม่พบข้อมูลลูกค้า" in status_text:
-                                            not_found = True
-                                            log("ℹ️ ระบบไม่พบข้อมูลลูกค้าในฐานข้อมูล", "warning")
-                                        elif "ค้นหาสำเร็จ" in status_text:
-                                            success_found = True
-                                            log("✅ ระบบค้นหาข้อมูลลูกค้าเรียบร้อย", "success")
-
-                                    if plus_option_clicked:
-                                        if not_found and reg_info:
-                                            await self._fill_contact_from_excel(value, reg_info, log)
-                                            await asyncio.sleep(0.5)
+                                        digit_input = await self.page.wait_for_selector(input_selector, timeout=1000)
+                                        if digit_input:
+                                            await digit_input.click()
+                                            await digit_input.fill(digit)
+                                            await asyncio.sleep(0.05)
+                                    except Exception as digit_error:
+                                        log(f"⚠️ กรอกเลขหลักที่ {idx_digit} ไม่สำเร็จ: {digit_error}", "warning")
+                                log("✅ กรอกเลข 13 หลักในหน้าต่างเพิ่มผู้ติดต่อเรียบร้อย", "success")
+
+                                try:
+                                    search_button = await self.page.wait_for_selector('#contactgetinfobtn', timeout=2000)
+                                    if search_button:
+                                        log("🔍 กำลังกดปุ่ม 'ค้นหา'", "info")
+                                        await search_button.click()
+                                        await asyncio.sleep(0.5)
+                                        deadline = time.time() + 25
+                                        while time.time() < deadline:
+                                            try:
+                                                status_element = await self.page.wait_for_selector('#mdccperrmsg', timeout=500)
+                                                if status_element:
+                                                    candidate_text = (await status_element.inner_text() or "").strip()
+                                                    if candidate_text:
+                                                        status_text = candidate_text
+                                                        break
+                                            except Exception:
+                                                pass
+                                            await asyncio.sleep(0.2)
+                                        if not status_text:
+                                            log("⚠️ ไม่ได้รับสถานะตอบกลับจากปุ่มค้นหาภายในเวลาที่กำหนด", "warning")
+                                except Exception as search_error:
+                                    log(f"⚠️ ไม่สามารถกดปุ่มค้นหาได้: {search_error}", "warning")
+
+                                if status_text:
+                                    if "ไม่พบข้อมูลลูกค้า" in status_text:
+                                        not_found = True
+                                        log("ℹ️ ระบบไม่พบข้อมูลลูกค้าในฐานข้อมูล", "warning")
+                                    elif "ค้นหาสำเร็จ" in status_text:
+                                        success_found = True
+                                        log("✅ ระบบค้นหาข้อมูลลูกค้าเรียบร้อย", "success")
+
+                                if plus_option_clicked:
+                                    if not_found and reg_info:
+                                        await self._fill_contact_from_excel(value, reg_info, log)
+                                        await asyncio.sleep(0.5)
+                                        validation = await self._compare_contact_fields(reg_info, log)
+                                        await asyncio.sleep(0.5)
+                                        if validation:
+                                            results.setdefault("validation", []).append(validation)
+                                            if validation.get("overall_match"):
+                                                await self._confirm_create_contact(log)
+                                                await asyncio.sleep(0.5)
+                                                receipt_record = await self._post_validation_tasks(reg_info, log)
+                                                if receipt_record:
+                                                    results["receipt_links"].append(receipt_record)
+                                    elif not_found and not reg_info:
+                                        log("⚠️ ไม่มีข้อมูลในไฟล์ Excel สำหรับเติมในหน้าต่างเพิ่มผู้ติดต่อ", "warning")
+                                    else:
+                                        if success_found and reg_info:
                                             validation = await self._compare_contact_fields(reg_info, log)
                                             await asyncio.sleep(0.5)
                                             if validation:
                                                 results.setdefault("validation", []).append(validation)
                                                 if validation.get("overall_match"):
-                                                    await self._confirm_create_contact(log)
-                                                    await asyncio.sleep(0.5)
+                                                    # คลิกปุ่มเพิ่มลูกค้า/ผู้จ่ายเงิน
+                                                    try:
+                                                        add_button = await self.page.wait_for_selector('#contactcreatebtn', timeout=2000)
+                                                        if add_button:
+                                                            await add_button.click()
+                                                            log("✅ กดปุ่ม 'เพิ่มลูกค้า/ผู้จ่ายเงิน' หลังค้นหาสำเร็จ", "success")
+                                                            await asyncio.sleep(0.5)
+                                                        else:
+                                                            log("⚠️ ไม่พบปุ่ม 'เพิ่มลูกค้า/ผู้จ่ายเงิน'", "warning")
+                                                    except Exception as add_error:
+                                                        log(f"⚠️ ไม่สามารถกดปุ่ม 'เพิ่มลูกค้า/ผู้จ่ายเงิน': {add_error}", "warning")
                                                     receipt_record = await self._post_validation_tasks(reg_info, log)
                                                     if receipt_record:
                                                         results["receipt_links"].append(receipt_record)
-                                        elif not_found and not reg_info:
-                                            log("⚠️ ไม่มีข้อมูลในไฟล์ Excel สำหรับเติมในหน้าต่างเพิ่มผู้ติดต่อ", "warning")
-                                        else:
-                                            if success_found and reg_info:
-                                                validation = await self._compare_contact_fields(reg_info, log)
-                                                await asyncio.sleep(0.5)
-                                                if validation:
-                                                    results.setdefault("validation", []).append(validation)
-                                                    if validation.get("overall_match"):
-                                                        # คลิกปุ่มเพิ่มลูกค้า/ผู้จ่ายเงิน
-                                                        try:
-                                                            add_button = await self.page.wait_for_selector('#contactcreatebtn', timeout=2000)
-                                                            if add_button:
-                                                                await add_button.click()
-                                                                log("✅ กดปุ่ม 'เพิ่มลูกค้า/ผู้จ่ายเงิน' หลังค้นหาสำเร็จ", "success")
-                                                                await asyncio.sleep(0.5)
-                                                            else:
-                                                                log("⚠️ ไม่พบปุ่ม 'เพิ่มลูกค้า/ผู้จ่ายเงิน'", "warning")
-                                                        except Exception as add_error:
-                                                            log(f"⚠️ ไม่สามารถกดปุ่ม 'เพิ่มลูกค้า/ผู้จ่ายเงิน': {add_error}", "warning")
-                                                        receipt_record = await self._post_validation_tasks(reg_info, log)
-                                                        if receipt_record:
-                                                            results["receipt_links"].append(receipt_record)
-                                            elif success_found:
-                                                log("ℹ️ ระบบค้นหาสำเร็จแต่ไม่มีข้อมูล Excel สำหรับตรวจสอบ", "info")
-                                    elif existing_selected and reg_info:
-                                        receipt_record = await self._post_validation_tasks(reg_info, log)
-                                        if receipt_record:
-                                            results["receipt_links"].append(receipt_record)
-                                else:
-                                    log("⚠️ ไม่พบช่องกรอกเลข 13 หลักในหน้าต่างเพิ่มผู้ติดต่อ", "warning")
-                            except Exception as modal_error:
-                                log(f"⚠️ ไม่สามารถกรอกข้อมูลในหน้าต่างเพิ่มผู้ติดต่อ: {modal_error}", "warning")
-                        elif existing_selected:
-                            log("ℹ️ เลือกผู้ติดต่อที่มีอยู่แล้ว - ดำเนินกรอกข้อมูลต่อ", "info")
-                            if reg_info:
-                                receipt_record = await self._post_validation_tasks(reg_info, log)
-                                if receipt_record:
-                                    results["receipt_links"].append(receipt_record)
+                                        elif success_found:
+                                            log("ℹ️ ระบบค้นหาสำเร็จแต่ไม่มีข้อมูล Excel สำหรับตรวจสอบ", "info")
+                                elif existing_selected and reg_info:
+                                    receipt_record = await self._post_validation_tasks(reg_info, log)
+                                    if receipt_record:
+                                        results["receipt_links"].append(receipt_record)
                             else:
-                                log("ℹ️ ไม่มีข้อมูลจาก Excel สำหรับดำเนินการต่อ", "info")
-                        if not_found:
-                            company_name_for_log = ""
-                            if reg_info:
-                                company_name_for_log = (
-                                    reg_info.get("company_name_display")
-                                    or reg_info.get("company_name")
-                                    or (reg_info.get("row") or {}).get("ชื่อบริษัท/บุคคล")
-                                    or (reg_info.get("row") or {}).get("ชื่อบริษัทจาก DBD")
-                                    or (reg_info.get("dbd_info") or {}).get("ชื่อบริษัท")
-                                )
-                            if not company_name_for_log and current_row_key and row_payload_map:
-                                payload_entry = row_payload_map.get(current_row_key, {})
-                                company_name_for_log = (
-                                    payload_entry.get("company_name_display")
-                                    or payload_entry.get("company_name")
-                                    or payload_entry.get("dbd_company_name")
-                                )
-                            log(f"📝 บันทึก '{company_name_for_log or value}' ว่าไม่พบข้อมูลในระบบ PEAK", "warning")
-                            results["not_found_contacts"].append({
-                                "registration": value,
-                                "company_name": company_name_for_log or "",
-                                "row_key": current_row_key,
-                                "message": status_text,
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        if idx < len(clean_values) and self.link_receipt:
-                            await self._navigate_to_receipt_page(log)
-                        await asyncio.sleep(0.2)
-                    except Exception as e:
-                        error_msg = str(e)
-                        log(f"❌ กรอก {value} ไม่สำเร็จ: {error_msg}", "error")
-                        results["errors"].append({"index": idx, "value": value, "error": error_msg})
-                        if isinstance(e, RuntimeError) and "ประเภทการทำงานที่ไม่รองรับ" in error_msg:
-                            raise
-                        await asyncio.sleep(0.2)
-
-                return results
+                                log("⚠️ ไม่พบช่องกรอกเลข 13 หลักในหน้าต่างเพิ่มผู้ติดต่อ", "warning")
+                        except Exception as modal_error:
+                            log(f"⚠️ ไม่สามารถกรอกข้อมูลในหน้าต่างเพิ่มผู้ติดต่อ: {modal_error}", "warning")
+                    elif existing_selected:
+                        log("ℹ️ เลือกผู้ติดต่อที่มีอยู่แล้ว - ดำเนินกรอกข้อมูลต่อ", "info")
+                        if reg_info:
+                            receipt_record = await self._post_validation_tasks(reg_info, log)
+                            if receipt_record:
+                                results["receipt_links"].append(receipt_record)
+                        else:
+                            log("ℹ️ ไม่มีข้อมูลจาก Excel สำหรับดำเนินการต่อ", "info")
+                    if not_found:
+                        company_name_for_log = ""
+                        if reg_info:
+                            company_name_for_log = (
+                                reg_info.get("company_name_display")
+                                or reg_info.get("company_name")
+                                or (reg_info.get("row") or {}).get("ชื่อบริษัท/บุคคล")
+                                or (reg_info.get("row") or {}).get("ชื่อบริษัทจาก DBD")
+                                or (reg_info.get("dbd_info") or {}).get("ชื่อบริษัท")
+                            )
+                        if not company_name_for_log and current_row_key and row_payload_map:
+                            payload_entry = row_payload_map.get(current_row_key, {})
+                            company_name_for_log = (
+                                payload_entry.get("company_name_display")
+                                or payload_entry.get("company_name")
+                                or payload_entry.get("dbd_company_name")
+                            )
+                        log(f"📝 บันทึก '{company_name_for_log or value}' ว่าไม่พบข้อมูลในระบบ PEAK", "warning")
+                        results["not_found_contacts"].append({
+                            "registration": value,
+                            "company_name": company_name_for_log or "",
+                            "row_key": current_row_key,
+                            "message": status_text,
+                            "timestamp": datetime.now().isoformat()
+                        })
+                    if idx < len(clean_values) and self.link_receipt:
+                        await self._navigate_to_receipt_page(log)
+                    await asyncio.sleep(0.2)
+                except Exception as e:
+                    error_msg = str(e)
+                    log(f"❌ กรอก {value} ไม่สำเร็จ: {error_msg}", "error")
+                    results["errors"].append({"index": idx, "value": value, "error": error_msg})
+                    if isinstance(e, RuntimeError) and "ประเภทการทำงานที่ไม่รองรับ" in error_msg:
+                        raise
+                    await asyncio.sleep(0.2)
 
-            return loop.run_until_complete(async_fill())
+            return results
 
-        return self._executor.submit(fill_async).result(timeout=300)
+        return self.submit(async_fill()).result(timeout=300)
     
     def execute_workflow(self, steps: List[Dict[str, Any]], log_callback: Optional[Callable] = None) -> Dict[str, Any]:
         """
@@ -1057,72 +1001,59 @@ class PeakEngineBot:
         }
         
         try:
-            def workflow_async():
-                """รัน workflow operations ใน thread ด้วย async"""
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_closed():
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                except:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                
-                async def async_workflow():
-                    for i, step in enumerate(steps, 1):
-                        step_type = step.get("type", "")
-                        selector = step.get("selector", "")
-                        value = step.get("value", "")
-                        timeout = step.get("timeout", 5000)
-                        
-                        log(f"📋 ขั้นตอน {i}/{len(steps)}: {step_type} - {selector[:50]}...", "info")
-                        
-                        try:
-                            if step_type == "click":
-                                element = await self.page.wait_for_selector(selector, timeout=timeout)
-                                await element.click()
-                                log(f"✅ คลิก {selector} สำเร็จ", "success")
-                                await asyncio.sleep(1)
-                                
-                            elif step_type == "fill":
-                                element = await self.page.wait_for_selector(selector, timeout=timeout)
-                                await element.fill(value)
-                                log(f"✅ กรอกข้อมูล {selector} สำเร็จ", "success")
-                                await asyncio.sleep(0.5)
-                                
-                            elif step_type == "wait":
-                                wait_time = int(value) if value else 2
-                                await asyncio.sleep(wait_time)
-                                log(f"✅ รอ {wait_time} วินาที", "success")
-                                
-                            elif step_type == "navigate":
-                                await self.page.goto(value, wait_until='networkidle', timeout=30000)
-                                log(f"✅ ไปที่ {value} สำเร็จ", "success")
-                                await asyncio.sleep(1)
-                                
-                            elif step_type == "extract":
-                                # Extract data from current page
-                                data = await self.extract_table_data_async(selector)
-                                results["data"].append(data)
-                                log(f"✅ ดึงข้อมูลจาก {selector} สำเร็จ", "success")
-                                
-                            results["steps_completed"] += 1
-                            
-                        except Exception as e:
-                            error_msg = f"ขั้นตอน {i} ไม่สำเร็จ: {str(e)}"
-                            log(error_msg, "error")
-                            results["errors"].append({
-                                "step": i,
-                                "type": step_type,
-                                "error": str(e)
-                            })
+            async def async_workflow():
+                for i, step in enumerate(steps, 1):
+                    step_type = step.get("type", "")
+                    selector = step.get("selector", "")
+                    value = step.get("value", "")
+                    timeout = step.get("timeout", 5000)
+                    
+                    log(f"📋 ขั้นตอน {i}/{len(steps)}: {step_type} - {selector[:50]}...", "info")
                     
-                    return results
+                    try:
+                        if step_type == "click":
+                            element = await self.page.wait_for_selector(selector, timeout=timeout)
+                            await element.click()
+                            log(f"✅ คลิก {selector} สำเร็จ", "success")
+                            await asyncio.sleep(1)
+                            
+                        elif step_type == "fill":
+                            element = await self.page.wait_for_selector(selector, timeout=timeout)
+                            await element.fill(value)
+                            log(f"✅ กรอกข้อมูล {selector} สำเร็จ", "success")
+                            await asyncio.sleep(0.5)
+                            
+                        elif step_type == "wait":
+                            wait_time = int(value) if value else 2
+                            await asyncio.sleep(wait_time)
+                            log(f"✅ รอ {wait_time} วินาที", "success")
+                            
+                        elif step_type == "navigate":
+                            await self.page.goto(value, wait_until='networkidle', timeout=30000)
+                            log(f"✅ ไปที่ {value} สำเร็จ", "success")
+                            await asyncio.sleep(1)
+                            
+                        elif step_type == "extract":
+                            # Extract data from current page
+                            data = await self.extract_table_data_async(selector)
+                            results["data"].append(data)
+                            log(f"✅ ดึงข้อมูลจาก {selector} สำเร็จ", "success")
+                            
+                        results["steps_completed"] += 1
+                        
+                    except Exception as e:
+                        error_msg = f"ขั้นตอน {i} ไม่สำเร็จ: {str(e)}"
+                        log(error_msg, "error")
+                        results["errors"].append({
+                            "step": i,
+                            "type": step_type,
+                            "error": str(e)
+                        })
                 
-                return loop.run_until_complete(async_workflow())
+                return results
             
-            # รัน workflow ใน thread
-            results = self._executor.submit(workflow_async).result(timeout=300)
+            # ส่งไปรันบน event loop ถาวรของ browser
+            results = self.submit(async_workflow()).result(timeout=300)
             return results
             
         except Exception as e:
@@ -1176,24 +1107,8 @@ class PeakEngineBot:
             return pd.DataFrame()
         
         try:
-            def extract_async():
-                """รัน extract operations ใน thread ด้วย async"""
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_closed():
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                except:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                
-                async def async_extract():
-                    return await self.extract_table_data_async(selector)
-                
-                return loop.run_until_complete(async_extract())
-            
-            # รัน extract ใน thread
-            data = self._executor.submit(extract_async).result(timeout=30)
+            # ส่งไปรันบน event loop ถาวรของ browser
+            data = self.submit(self.extract_table_data_async(selector)).result(timeout=30)
             
             if data:
                 return pd.DataFrame(data)
@@ -1261,8 +1176,9 @@ class PeakEngineBot:
                 if not company_name_raw:
                     company_name_raw = step2_row.get("dbd_company_name") or step2_row.get("company_name")
 
-            if not dbd_info and row_data.get("ข้อมูล DBD"):
-                dbd_info = self._parse_dbd_text(row_data.get("ข้อมูล DBD"))
+            row_data = self._fill_address_components(row_data)
+            if not dbd_info:
+                dbd_info = DBDCompanyRecord.from_row(row_data).to_details()
 
             if not transfer_type:
                 transfer_type = row_data.get("ประเภทผู้ส่งโอน", "")
@@ -1399,6 +1315,7 @@ class PeakEngineBot:
         if not row_data:
             log("⚠️ ไม่มีข้อมูลใน Excel สำหรับใช้ตรวจสอบความถูกต้อง", "warning")
             return None
+        row_data = self._fill_address_components(row_data)
 
         dbd_info = info.get("dbd_info", {}) or {}
 
@@ -1611,25 +1528,7 @@ class PeakEngineBot:
             log(f"⚠️ ไม่สามารถเลือกสินค้า/บริการ: {e}", "warning")
 
     def _parse_amount_value(self, value: Any) -> Optional[float]:
-        if value is None:
-            return None
-        if isinstance(value, (int, float)):
-            try:
-                if pd.isna(value):
-                    return None
-            except Exception:
-                pass
-            return float(value)
-        text = str(value).strip()
-        if not text or text.lower() in {"nan", "none", "-", "--"}:
-            return None
-        text = text.replace(",", "").replace("+", "").strip()
-        if not text:
-            return None
-        try:
-            return float(text)
-        except Exception:
-            return None
+        return parse_amount(value)
 
     async def _apply_tax_settings(self, row_data: Dict[str, Any], log: Callable[[str, str], None]) -> bool:
         work_category = self._normalize_component(row_data.get("work_category"))
@@ -2428,6 +2327,19 @@ class PeakEngineBot:
             return f"X{match.group(1)}"
         return None
 
+    def _fill_address_components(self, row_data: Dict[str, Any]) -> Dict[str, Any]:
+        """เติมคอลัมน์ ที่อยู่_* ที่ว่างจากที่อยู่เต็ม (ผลการแยกถูกแคชต่อที่อยู่ คืน dict ใหม่)"""
+        address = self._normalize_component(row_data.get("ที่อยู่"))
+        missing = [column for column in ADDRESS_COLUMNS.values() if not self._normalize_component(row_data.get(column))]
+        if not address or not missing:
+            return row_data
+        components = parse_thai_address(address, get_address_gazetteer())
+        filled = dict(row_data)
+        for key, column in ADDRESS_COLUMNS.items():
+            if column in missing and components.get(key):
+                filled[column] = components[key]
+        return filled
+
     def _format_main_address(self, row_data: Dict[str, Any]) -> str:
         house = self._normalize_component(row_data.get("ที่อยู่_บ้านเลขที่"))
         village = self._normalize_component(row_data.get("ที่อยู่_หมู่บ้าน"))
@@ -2442,33 +2354,10 @@ class PeakEngineBot:
         return " ".join(parts).strip()
     
     def close(self):
-        """Close browser"""
-        if self.browser:
-            try:
-                def close_async():
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_closed():
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                    except:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                    
-                    async def async_close():
-                        await self.browser.close()
-                        await self.playwright.stop()
-                    
-                    loop.run_until_complete(async_close())
-                
-                self._executor.submit(close_async).result(timeout=10)
-                logger.info("✅ ปิด Browser สำเร็จ")
-            except Exception as e:
-                logger.error(f"Error closing browser: {str(e)}")
-        
-        if self._executor:
-            self._executor.shutdown(wait=True)
-
-
-
-
+        """คืน context/page ให้ browser pool (Chromium ยังเปิดค้างไว้ให้ bot ตัวถัดไปใช้)"""
+        if self._lease is not None:
+            self._lease.release()
+            self._lease = None
+            logger.info("✅ ปิด Browser สำเร็จ")
+        self.page = None
+        self.browser = None
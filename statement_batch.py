@@ -0,0 +1,151 @@
+"""
+ประมวลผล Statement หลายไฟล์ในครั้งเดียว (หลาย PDF หรือไฟล์ ZIP) แล้วรวมเป็นตารางเดียว (ไม่พึ่ง Streamlit)
+"""
+import io
+import logging
+import os
+import zipfile
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from pdf_extraction import extract_pdf_contents, merge_page_results
+from statement_parser import drop_internal_columns
+
+logger = logging.getLogger(__name__)
+
+# คอลัมน์ที่เพิ่มหน้าตารางรวม เพื่อบอกว่าแต่ละรายการมาจากไฟล์/บัญชีใด
+SOURCE_FILE_COLUMN = "ไฟล์ต้นทาง"
+BANK_COLUMN = "ธนาคาร"
+ACCOUNT_NUMBER_COLUMN = "เลขที่บัญชี"
+ACCOUNT_NAME_COLUMN = "ชื่อบัญชี"
+
+
+def _read_named_file(file: Any) -> Tuple[str, bytes]:
+    """อ่านชื่อและเนื้อหาจาก path หรือ file-like (เช่น UploadedFile ของ Streamlit)"""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return os.path.basename(os.fspath(file)), f.read()
+    name = getattr(file, "name", "statement.pdf")
+    if hasattr(file, "getvalue"):
+        return name, file.getvalue()
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return name, file.read()
+
+
+def collect_pdf_sources(files: Iterable[Any]) -> List[Tuple[str, bytes]]:
+    """
+    รวบรวมไฟล์ PDF จากรายการไฟล์ที่อัปโหลด/path โดยแตกไฟล์ ZIP ออกเป็น PDF แต่ละไฟล์
+
+    Returns:
+        List[Tuple[str, bytes]]: (ชื่อไฟล์, เนื้อหาไฟล์) เรียงตามลำดับที่ได้รับ
+    """
+    sources: List[Tuple[str, bytes]] = []
+    for file in files:
+        name, data = _read_named_file(file)
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for member in archive.infolist():
+                    member_name = member.filename
+                    if member.is_dir() or not member_name.lower().endswith(".pdf"):
+                        continue
+                    if member_name.startswith("__MACOSX/") or os.path.basename(member_name).startswith("._"):
+                        continue
+                    sources.append((f"{name}/{member_name}", archive.read(member)))
+        else:
+            sources.append((name, data))
+    return sources
+
+
+def process_statement_batch(reader, sources: List[Tuple[str, bytes]], max_workers: Optional[int] = None,
+                            cache=None,
+                            progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    แปลง Statement หลายไฟล์: ดึงข้อความแบบขนานหลาย process แล้วตรวจธนาคารและแปลงทีละไฟล์
+
+    Args:
+        reader: BankPDFReader (ใช้ detect_bank, extract_account_info, parse_statement_frame)
+        sources: (ชื่อไฟล์, เนื้อหาไฟล์) จาก collect_pdf_sources
+        max_workers (Optional[int]): จำนวน process สำหรับดึงข้อความ
+        cache (Optional[ParseCache]): แคชผลการแปลง (ไฟล์ที่เคยแปลงแล้วจะไม่ถูกอ่านซ้ำ)
+        progress_callback: เรียกด้วย (จำนวนไฟล์ที่ดึงข้อความเสร็จ, จำนวนไฟล์ที่ต้องดึง)
+
+    Returns:
+        Dict: {"transactions": ตารางรวมทุกไฟล์, "files": สรุปรายไฟล์}
+    """
+    cache_keys: List[Optional[str]] = [None] * len(sources)
+    cached: Dict[int, Dict[str, Any]] = {}
+    if cache is not None:
+        for index, (_, data) in enumerate(sources):
+            cache_keys[index] = cache.make_key(data, include_tables=False)
+            entry = cache.get(cache_keys[index])
+            if entry is not None:
+                cached[index] = entry
+
+    pending = [index for index in range(len(sources)) if index not in cached]
+    contents = extract_pdf_contents([sources[index][1] for index in pending], include_tables=False,
+                                    max_workers=max_workers, progress_callback=progress_callback)
+    extracted = dict(zip(pending, contents))
+
+    frames = []
+    file_rows = []
+    for index, (name, _) in enumerate(sources):
+        if index in cached:
+            content = merge_page_results(cached[index]["meta"]["page_results"])
+        else:
+            content = extracted[index]
+        text = content["text"]
+
+        file_row = {SOURCE_FILE_COLUMN: name, BANK_COLUMN: "", ACCOUNT_NUMBER_COLUMN: "",
+                    ACCOUNT_NAME_COLUMN: "", "จำนวนรายการ": 0, "เงินเข้า": 0.0, "เงินออก": 0.0,
+                    "สถานะ": ""}
+        if content.get("error") or not text:
+            file_row["สถานะ"] = f"❌ อ่านไฟล์ไม่ได้: {content.get('error') or 'ไม่พบข้อความ'}"
+            file_rows.append(file_row)
+            continue
+
+        bank_name = reader.detect_bank(text)
+        account_info = reader.extract_account_info(text)
+        if index in cached:
+            df = cached[index]["frame"]
+        else:
+            df = reader.parse_statement_frame(text, bank_name)
+            if cache is not None:
+                cache.put(cache_keys[index], df, {
+                    "detected_bank": bank_name,
+                    "page_results": [
+                        {"page_number": page["page_number"], "text": page["text"], "tables": []}
+                        for page in content["pages"]
+                    ]
+                })
+
+        df = df.copy()
+        df.insert(0, ACCOUNT_NAME_COLUMN, account_info.get("account_name", ""))
+        df.insert(0, ACCOUNT_NUMBER_COLUMN, account_info.get("account_number", ""))
+        df.insert(0, BANK_COLUMN, bank_name)
+        df.insert(0, SOURCE_FILE_COLUMN, name)
+        frames.append(df)
+
+        amounts = df["ยอดเงิน_numeric"] if "ยอดเงิน_numeric" in df.columns else pd.Series(dtype=float)
+        file_row.update({
+            BANK_COLUMN: bank_name,
+            ACCOUNT_NUMBER_COLUMN: account_info.get("account_number", ""),
+            ACCOUNT_NAME_COLUMN: account_info.get("account_name", ""),
+            "จำนวนรายการ": len(df),
+            "เงินเข้า": float(amounts[amounts > 0].sum()),
+            "เงินออก": float(amounts[amounts < 0].sum()),
+            "สถานะ": "✅ สำเร็จ" if len(df) else "⚠️ ไม่พบรายการธุรกรรม"
+        })
+        file_rows.append(file_row)
+
+    transactions = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    logger.info(f"📚 รวม {len(sources)} ไฟล์ ได้ {len(transactions)} รายการ")
+    return {"transactions": transactions, "files": pd.DataFrame(file_rows)}
+
+
+def write_batch_workbook(result: Dict[str, pd.DataFrame], output) -> None:
+    """เขียนผลรวมเป็นไฟล์ Excel เดียว: ชีตรายการทุกบัญชี และชีตสรุปรายไฟล์"""
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        drop_internal_columns(result["transactions"]).to_excel(writer, sheet_name="รวมทุกบัญชี", index=False)
+        result["files"].to_excel(writer, sheet_name="สรุปรายไฟล์", index=False)
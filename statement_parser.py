@@ -0,0 +1,493 @@
+"""
+เครื่องมือแปลงข้อมูล Statement ธนาคารที่ใช้ร่วมกัน (ไม่พึ่ง Streamlit)
+"""
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# เวอร์ชันของตัวแปลง (เปลี่ยนเมื่อผลการแปลงเปลี่ยน เพื่อไม่ให้ใช้แคชผลลัพธ์เก่า)
+PARSER_VERSION = "2"
+
+# คอลัมน์ของ DataFrame ธุรกรรมธนาคารกสิกรไทย
+KBANK_COLUMNS = ["วันที่", "เวลา", "รายการ", "จำนวนเงิน", "ยอดคงเหลือ", "คำอธิบาย"]
+
+# รูปแบบบรรทัดธุรกรรมกสิกรไทยแบบรวม: วันที่ เวลา รายการ จำนวนเงิน ยอดคงเหลือ คำอธิบาย
+# ตัวอย่าง: 01-10-25 11:17 ค่าธรรมเนียม 51.43 22,127,753.64 โอนเข้า/หักบัญชีอัตโนมัติ...
+KBANK_LINE_PATTERN = (
+    r'(?P<date>\d{2}[-/]\d{2}[-/]\d{2,4}) '
+    r'(?P<time>\d{2}:\d{2}) '
+    r'(?:(?P<type>[^\d\s]\S*(?: [^\d\s]\S*)*) )?'
+    r'(?P<amount>\d[\d,]*\.\d{2}) '
+    r'(?P<balance>\d[\d,]*\.\d{2})'
+    r'(?: (?P<description>\S.*))?$'
+)
+
+_KBANK_DATE_RE = re.compile(r'(\d{2}[-/]\d{2}[-/]\d{2,4})')
+_TIME_RE = re.compile(r'(\d{2}:\d{2})')
+_TIME_CLEAN_RE = re.compile(r'\d{2}:\d{2}\s*')
+_AMOUNT_RE = re.compile(r'([\d,]+\.\d{2})')
+_FEE_KEYWORDS = ['ค่าธรรมเนียม', 'fee', 'charge', 'commission']
+
+# ค่าที่ถือว่าไม่มีจำนวนเงิน และอักขระที่ตัดทิ้งก่อนแปลงเป็นตัวเลข
+_BLANK_AMOUNTS = ["", "nan", "none", "-", "--"]
+_AMOUNT_NOISE_PATTERN = r'[,+\s]'
+_AMOUNT_NOISE_RE = re.compile(_AMOUNT_NOISE_PATTERN)
+
+# วันที่ใน Statement: DD-MM-YY, DD/MM/YYYY, DD-MM-YYYY หรือ YYYY-MM-DD (ตรวจจากต้นข้อความ)
+_DATE_PATTERN = (
+    r'^(?:(?P<day>\d{2})[-/](?P<month>\d{2})[-/](?P<year>\d{4}|\d{2})(?!\d)'
+    r'|(?P<iso_year>\d{4})-(?P<iso_month>\d{2})-(?P<iso_day>\d{2}))'
+)
+# ปี 2 หลักตั้งแต่ 00-30 เป็น 20xx ที่เหลือเป็น 19xx
+_TWO_DIGIT_YEAR_PIVOT = 30
+
+
+class TransactionRuleEngine:
+    """กฎแยกบรรทัดธุรกรรมของธนาคารหนึ่งแห่ง (คอมไพล์ regex จาก bank_configs ครั้งเดียวตอนสร้าง)"""
+
+    def __init__(self, patterns: Dict[str, str]):
+        compiled: Dict[str, re.Pattern] = {}
+        self.field_patterns: Dict[str, re.Pattern] = {}
+        for field, pattern in patterns.items():
+            # ฟิลด์ที่ใช้ pattern เดียวกัน (เช่น amount/balance) ใช้ผลค้นหาร่วมกัน
+            if pattern not in compiled:
+                compiled[pattern] = re.compile(pattern)
+            self.field_patterns[field] = compiled[pattern]
+
+    def search_fields(self, line: str) -> Optional[Dict[str, str]]:
+        """ค้นหาแต่ละฟิลด์ตาม pattern ของธนาคาร (None ถ้าบรรทัดไม่มีวันที่)"""
+        date_pattern = self.field_patterns.get("date")
+        date_match = date_pattern.search(line) if date_pattern else None
+        if not date_match:
+            return None
+
+        matches = {date_pattern: date_match}
+        fields = {}
+        for field, pattern in self.field_patterns.items():
+            if pattern not in matches:
+                matches[pattern] = pattern.search(line)
+            match = matches[pattern]
+            fields[field] = match.group(1) if match else ""
+        return fields
+
+
+class KBankRuleEngine(TransactionRuleEngine):
+    """
+    กฎแยกบรรทัดธุรกรรมของธนาคารกสิกรไทย
+
+    บรรทัดปกติถูกแยกด้วย pattern รวมเพียงครั้งเดียว (named groups)
+    บรรทัดที่รูปแบบไม่ตรงหรือกำกวมจะใช้วิธีแยกทีละส่วนแบบเดิม ผลลัพธ์จึงเหมือนเดิมทุกกรณี
+    """
+
+    def __init__(self, patterns: Dict[str, str], line_pattern: str = KBANK_LINE_PATTERN):
+        super().__init__(patterns)
+        self.line_pattern = re.compile(line_pattern)
+
+    def tokenize(self, line: str) -> Optional[Dict[str, str]]:
+        """แยกบรรทัดเป็น date/time/type/amount/balance/description (None ถ้าไม่ใช่บรรทัดธุรกรรม)"""
+        match = self.line_pattern.match(line)
+        if match:
+            date, time, transaction_type, amount, balance, description = match.groups()
+            # รายการที่มีตัวเลขรูปแบบเงิน หรือจำนวนเงินซ้ำกับยอดคงเหลือ ต้องแยกแบบเดิม
+            if amount != balance and not (transaction_type and '.' in transaction_type
+                                          and _AMOUNT_RE.search(transaction_type)):
+                if transaction_type is None:
+                    transaction_type = ""
+                elif ':' in transaction_type:
+                    transaction_type = _TIME_CLEAN_RE.sub('', transaction_type).strip()
+                if description is None:
+                    description = ""
+                elif '  ' in description or not description.isprintable():
+                    # ช่องว่างซ้ำ/tab/ช่องว่างพิเศษ ให้ผลเหมือน " ".join(parts)
+                    description = " ".join(description.split())
+                return {
+                    "date": date,
+                    "time": time,
+                    "type": transaction_type,
+                    "amount": amount,
+                    "balance": balance,
+                    "description": description
+                }
+        return self._tokenize_fallback(line)
+
+    @staticmethod
+    def _tokenize_fallback(line: str) -> Optional[Dict[str, str]]:
+        """แยกบรรทัดทีละส่วนสำหรับบรรทัดที่ไม่ตรงกับ pattern รวม"""
+        date_match = _KBANK_DATE_RE.search(line)
+        if not date_match:
+            return None
+
+        time_match = _TIME_RE.search(line)
+        amount_matches = _AMOUNT_RE.findall(line)
+        amount = amount_matches[0] if amount_matches else ""
+        balance = amount_matches[1] if len(amount_matches) >= 2 else ""
+
+        parts = line.split()
+        transaction_type = ""
+        description = ""
+
+        # หาตำแหน่งของจำนวนเงิน แล้วแยกรายการ (ระหว่างวันที่-เวลา กับ จำนวนเงิน)
+        amount_pos = next((i for i, part in enumerate(parts) if _AMOUNT_RE.match(part)), -1)
+        if amount_pos > 2:
+            transaction_type = _TIME_CLEAN_RE.sub('', " ".join(parts[2:amount_pos])).strip()
+
+        # แยกคำอธิบาย (หลังยอดคงเหลือ)
+        if balance:
+            balance_pos = next((i for i, part in enumerate(parts) if part == balance), -1)
+            if -1 < balance_pos < len(parts) - 1:
+                description = " ".join(parts[balance_pos + 1:])
+
+        return {
+            "date": date_match.group(1),
+            "time": time_match.group(1) if time_match else "",
+            "type": transaction_type,
+            "amount": amount,
+            "balance": balance,
+            "description": description
+        }
+
+
+class TransferTypeClassifier:
+    """
+    จำแนกประเภทผู้ส่งโอนจากคำอธิบายรายการ
+
+    คำสำคัญทุกกลุ่มถูกรวมเป็น regex เดียว (alternation แบบ lookahead จึงพบคำที่ซ้อนกันด้วย)
+    และจำผลลัพธ์ตามคำอธิบาย เพราะผู้โอนรายเดิมซ้ำกันหลายร้อยครั้งต่อ Statement
+    """
+
+    OTHER = "อื่นๆ"
+    PERSON = "บุคคล"
+
+    # เรียงตามลำดับความสำคัญ: พบคำของกลุ่มก่อนหน้าในข้อความ ให้ใช้กลุ่มนั้น
+    CATEGORY_KEYWORDS = [
+        ("บริษัท (บจก.)", ['บริษัท', 'บจก', 'company', 'co.', 'ltd', 'limited']),
+        ("ห้างหุ้นส่วน (หจก.)", ['ห้างหุ้นส่วน', 'หจก', 'partnership']),
+        (PERSON, ['นาย', 'นาง', 'น.ส.', 'miss', 'mr', 'mrs', 'ms', 'นส.']),
+    ]
+
+    # ชื่อ-นามสกุลภาษาไทยที่ไม่มีคำนำหน้า
+    _PERSON_NAME_RE = re.compile(r'[ก-๙]+\s+[ก-๙]+')
+
+    def __init__(self, max_memo_size: int = 100_000):
+        self.categories = [category for category, _ in self.CATEGORY_KEYWORDS]
+        alternatives = [
+            f"(?P<g{rank}>{'|'.join(re.escape(keyword) for keyword in keywords)})"
+            for rank, (_, keywords) in enumerate(self.CATEGORY_KEYWORDS)
+        ]
+        self._keyword_re = re.compile(f"(?=(?:{'|'.join(alternatives)}))")
+        self._memo: Dict[str, str] = {}
+        self.max_memo_size = max_memo_size
+
+    def _classify_uncached(self, description: str) -> str:
+        best_rank = len(self.categories)
+        for match in self._keyword_re.finditer(description.lower()):
+            rank = match.lastindex - 1
+            if rank < best_rank:
+                best_rank = rank
+                if rank == 0:
+                    break
+        if best_rank < len(self.categories):
+            return self.categories[best_rank]
+
+        if self._PERSON_NAME_RE.search(description) and len(description.split()) <= 3:
+            return self.PERSON
+        return self.OTHER
+
+    def classify(self, description: Any) -> str:
+        """จำแนกคำอธิบายเดียว"""
+        if not description or not isinstance(description, str):
+            return self.OTHER
+        category = self._memo.get(description)
+        if category is None:
+            category = self._classify_uncached(description)
+            if len(self._memo) >= self.max_memo_size:
+                self._memo.clear()
+            self._memo[description] = category
+        return category
+
+    def classify_series(self, descriptions: pd.Series) -> pd.Series:
+        """จำแนกทั้งคอลัมน์ในครั้งเดียว (คำนวณเฉพาะคำอธิบายที่ไม่ซ้ำกัน)"""
+        codes, uniques = pd.factorize(descriptions)
+        categories = np.array([self.classify(value) for value in uniques] + [self.OTHER], dtype=object)
+        # code -1 (ค่าว่าง/NaN) ชี้ไปที่ OTHER ท้าย array
+        return pd.Series(categories[codes], index=descriptions.index, dtype=object)
+
+
+class EntityNameExtractor:
+    """
+    แยกชื่อบริษัท/บุคคลออกจากคำอธิบายรายการ
+
+    pattern ทั้งหมดคอมไพล์ไว้ครั้งเดียว และจะค้นเฉพาะ pattern ที่คำนำหน้าปรากฏในข้อความ
+    การทำความสะอาดชื่อรวมเป็น regex เดียว ผลลัพธ์ถูกเก็บใน LRU cache ตามคำอธิบาย และตามชื่อดิบที่แยกได้
+    """
+
+    _COMPANY_END = r'(?:\s+กร|\s+จำกัด|\s+มหาชน|\s+ฯลฯ|\s+จาก|\s+ถึง|\s+$|$)'
+    _THAI_PERSON_END = r'(?:\s+จาก|\s+ถึง|\s+$|$)'
+    _ENGLISH_PERSON_END = r'(?:\s+from|\s+to|\s+$|$)'
+    _THAI_NAME = r'([ก-๙A-Za-z0-9\s\.\-\+]+?)'
+    _ENGLISH_NAME = r'([A-Za-z0-9\s\.\-\+]+?)'
+
+    # (คำนำหน้าที่ต้องมีในข้อความ, pattern) เรียงตามลำดับความสำคัญ
+    PATTERNS = [
+        ('บริษัท', r'บริษัท\s+' + _THAI_NAME + _COMPANY_END),
+        ('บจก.', r'บจก\.\s+' + _THAI_NAME + _COMPANY_END),
+        ('ห้างหุ้นส่วน', r'ห้างหุ้นส่วน\s+' + _THAI_NAME + _COMPANY_END),
+        ('นาย', r'นาย\s+' + _THAI_NAME + _THAI_PERSON_END),
+        ('นาง', r'นาง\s+' + _THAI_NAME + _THAI_PERSON_END),
+        ('น.ส.', r'น\.ส\.\s+' + _THAI_NAME + _THAI_PERSON_END),
+        ('นส.', r'นส\.\s+' + _THAI_NAME + _THAI_PERSON_END),
+        ('mr', r'mr\.?\s+' + _ENGLISH_NAME + _ENGLISH_PERSON_END),
+        ('miss', r'miss\s+' + _ENGLISH_NAME + _ENGLISH_PERSON_END),
+        ('mrs', r'mrs\.?\s+' + _ENGLISH_NAME + _ENGLISH_PERSON_END),
+        ('ms', r'ms\.?\s+' + _ENGLISH_NAME + _ENGLISH_PERSON_END),
+    ]
+
+    # คำ/สัญลักษณ์ที่ตัดออกจากชื่อ: บจก. บริษัท ห้างหุ้นส่วน จำกัด มหาชน + และ ฯลฯ
+    _NOISE_RE = re.compile(
+        r'\bบจก\.?\b|\bบริษัท\b|\bห้างหุ้นส่วน\b|\bจำกัด\b|\bมหาชน\b|\+|ฯลฯ',
+        re.IGNORECASE
+    )
+    _LEADING_NOISE_RE = re.compile(r'^[0-9\-\+\.\s]+')
+    _SPACES_RE = re.compile(r'\s+')
+
+    def __init__(self, max_cache_size: int = 50_000):
+        self._patterns = [
+            (prefix, re.compile(pattern, re.IGNORECASE)) for prefix, pattern in self.PATTERNS
+        ]
+        self._extract_cached = lru_cache(maxsize=max_cache_size)(self._extract_uncached)
+        # คำอธิบายที่ต่างกันมักให้ชื่อดิบเดียวกัน (ต่างแค่เลขบัญชี/เวลา) จึงแคชการทำความสะอาดชื่อแยกอีกชั้น
+        self._clean_cached = lru_cache(maxsize=max_cache_size)(self._clean_name)
+
+    def _clean_name(self, entity_name: str) -> str:
+        entity_name = self._SPACES_RE.sub(' ', entity_name)
+        entity_name = self._NOISE_RE.sub('', entity_name)
+        entity_name = self._LEADING_NOISE_RE.sub('', entity_name)
+        return self._SPACES_RE.sub(' ', entity_name).strip()
+
+    def _extract_uncached(self, description: str) -> str:
+        folded = description.casefold()
+        for prefix, pattern in self._patterns:
+            if prefix not in folded:
+                continue
+            match = pattern.search(description)
+            if match:
+                entity_name = self._clean_cached(match.group(1).strip())
+                # ชื่อที่ยาวเกินไปน่าจะเป็นข้อผิดพลาด ให้ลอง pattern ถัดไป
+                if 0 < len(entity_name) <= 100:
+                    return entity_name
+        return ""
+
+    def extract(self, description: Any) -> str:
+        """แยกชื่อจากคำอธิบายเดียว (ค่าว่างถ้าไม่พบ)"""
+        if not description or not isinstance(description, str):
+            return ""
+        return self._extract_cached(description)
+
+    def extract_many(self, descriptions: pd.Series) -> pd.Series:
+        """แยกชื่อทั้งคอลัมน์ (คำนวณเฉพาะคำอธิบายที่ไม่ซ้ำกัน)"""
+        codes, uniques = pd.factorize(descriptions)
+        names = np.array([self.extract(value) for value in uniques.tolist()] + [""], dtype=object)
+        return pd.Series(names[codes], index=descriptions.index, dtype=object)
+
+
+def build_rule_engines(bank_configs: Dict[str, Dict]) -> Dict[str, TransactionRuleEngine]:
+    """สร้าง rule engine ของทุกธนาคารจาก bank_configs (ธนาคารที่มี line_pattern ใช้ KBankRuleEngine)"""
+    engines: Dict[str, TransactionRuleEngine] = {}
+    for bank_name, config in bank_configs.items():
+        patterns = config.get("patterns", {})
+        if config.get("line_pattern"):
+            engines[bank_name] = KBankRuleEngine(patterns, config["line_pattern"])
+        else:
+            engines[bank_name] = TransactionRuleEngine(patterns)
+    return engines
+
+
+def build_kbank_transaction(tokens: Dict[str, str], previous_balance: Optional[str]) -> Dict[str, str]:
+    """สร้างรายการธุรกรรมกสิกรไทยจากผลแยกบรรทัด พร้อมกำหนดทิศทางของจำนวนเงิน"""
+    amount = tokens["amount"]
+    balance = tokens["balance"]
+    transaction_type = tokens["type"]
+
+    # ถ้ายอดคงเหลือลดลง แสดงจำนวนเงินเป็นติดลบ
+    amount_display = amount
+    if amount and balance and previous_balance:
+        try:
+            current_balance = float(balance.replace(',', ''))
+            prev_balance = float(previous_balance.replace(',', ''))
+            if current_balance < prev_balance:
+                amount_display = f"({amount})"
+        except ValueError:
+            pass
+
+    # ตรวจสอบว่าคือค่าธรรมเนียมหรือไม่ และแสดงเป็นยอดลบ
+    if transaction_type and any(keyword in transaction_type.lower() for keyword in _FEE_KEYWORDS):
+        if amount and not amount_display.startswith('('):
+            amount_display = f"({amount})"
+
+    return {
+        "วันที่": tokens["date"],
+        "เวลา": tokens["time"],
+        "รายการ": transaction_type,
+        "จำนวนเงิน": amount_display,
+        "ยอดคงเหลือ": balance,
+        "คำอธิบาย": tokens["description"]
+    }
+
+
+def parse_amount_series(values: Iterable[Any]) -> pd.Series:
+    """
+    แปลงจำนวนเงินทั้งคอลัมน์เป็น float64 แบบ vectorized
+
+    รองรับยอดติดลบในวงเล็บ "(1,234.50)", ตัวคั่นหลักพัน, เครื่องหมาย +
+    ค่าว่าง/"-"/"nan" และค่าที่แปลงไม่ได้จะเป็น NaN
+
+    Args:
+        values: Series หรือ iterable ของจำนวนเงิน (ข้อความหรือตัวเลข)
+
+    Returns:
+        pd.Series: float64 (index เดิมถ้าส่ง Series เข้ามา)
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype("float64")
+
+    text = series.astype("string").str.strip()
+    negative = (text.str.startswith("(") & text.str.endswith(")")).fillna(False).astype(bool)
+    text = text.str.replace(r'^\((.*)\)$', r'\1', regex=True)
+    text = text.str.replace(_AMOUNT_NOISE_PATTERN, "", regex=True)
+    text = text.mask(text.str.lower().isin(_BLANK_AMOUNTS))
+
+    amounts = pd.to_numeric(text, errors="coerce").astype("float64")
+    return amounts.where(~negative, -amounts)
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """แปลงจำนวนเงินค่าเดียวด้วยกฎเดียวกับ parse_amount_series (None ถ้าไม่มี/แปลงไม่ได้)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return None if pd.isna(value) else float(value)
+
+    text = str(value).strip()
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    text = _AMOUNT_NOISE_RE.sub("", text)
+    if text.lower() in _BLANK_AMOUNTS:
+        return None
+    try:
+        amount = float(text)
+    except ValueError:
+        return None
+    return -amount if negative else amount
+
+
+# คอลัมน์ datetime64 ที่ format_date_column เพิ่มไว้ใช้เรียง/กรอง/หาช่วงวันที่ภายในโปรแกรม
+DATE_DATETIME_COLUMN = "วันที่_datetime"
+# คอลัมน์ภายในที่ไม่เขียนลงไฟล์ Excel ที่ผู้ใช้ดาวน์โหลด (คงรูปแบบไฟล์เดิมที่นำไปใช้ต่อที่อื่น)
+INTERNAL_COLUMNS = (DATE_DATETIME_COLUMN,)
+
+
+def drop_internal_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """ตัดคอลัมน์ภายใน (INTERNAL_COLUMNS) ออกก่อนเขียนลง Excel"""
+    columns = [column for column in INTERNAL_COLUMNS if column in df.columns]
+    return df.drop(columns=columns) if columns else df
+
+
+def normalize_date_series(values: Iterable[Any]) -> Tuple[pd.Series, pd.Series]:
+    """
+    แปลงวันที่ทั้งคอลัมน์แบบ vectorized เป็นข้อความ dd/MM/yyyy และ datetime64
+
+    Args:
+        values: Series หรือ iterable ของวันที่ในรูปแบบ DD-MM-YY, DD/MM/YYYY, DD-MM-YYYY หรือ YYYY-MM-DD
+
+    Returns:
+        Tuple[pd.Series, pd.Series]: (ข้อความสำหรับแสดงผล, datetime64)
+            ค่าที่ไม่ตรงรูปแบบจะคงข้อความเดิมไว้ และเป็น NaT ในคอลัมน์ datetime64
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    parts = series.astype("string").str.strip().str.extract(_DATE_PATTERN)
+
+    day = parts["day"].fillna(parts["iso_day"])
+    month = parts["month"].fillna(parts["iso_month"])
+    year = parts["year"].fillna(parts["iso_year"])
+
+    # ขยายปี 2 หลักเป็น 4 หลักในครั้งเดียว
+    short_year = (year.str.len() == 2).fillna(False).astype(bool)
+    recent = (pd.to_numeric(year, errors="coerce") <= _TWO_DIGIT_YEAR_PIVOT).fillna(False)
+    century = pd.Series(np.where(recent.to_numpy(dtype=bool), "20", "19"), index=year.index, dtype="string")
+    year = year.mask(short_year, century + year)
+
+    display = day + "/" + month + "/" + year
+    matched = display.notna()
+    display_text = series.astype(object).where(~matched, display.astype(object))
+    dates = pd.to_datetime(display.astype(object), format="%d/%m/%Y", errors="coerce")
+    return display_text, dates
+
+
+def iter_record_frames(records: Iterable[Dict], chunk_size: int = 5000,
+                       columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    รวมรายการธุรกรรมจาก generator เป็น DataFrame ทีละก้อน
+
+    Args:
+        records (Iterable[Dict]): รายการธุรกรรม (เช่นจาก iter_kbank_transactions)
+        chunk_size (int): จำนวนแถวสูงสุดต่อก้อน
+        columns (Optional[List[str]]): ลำดับคอลัมน์ของ DataFrame
+
+    Yields:
+        pd.DataFrame: DataFrame ขนาดไม่เกิน chunk_size แถว
+    """
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield pd.DataFrame(chunk, columns=columns)
+            chunk = []
+    if chunk:
+        yield pd.DataFrame(chunk, columns=columns)
+
+
+def write_frames_to_excel(frames: Iterable[pd.DataFrame], output,
+                          sheet_name: str = "Bank_Statement") -> int:
+    """
+    เขียน DataFrame ทีละก้อนลงไฟล์ Excel ด้วย openpyxl แบบ write-only
+
+    ใช้หน่วยความจำคงที่ตามขนาดก้อน ไม่ต้องรวมทุกก้อนเป็น DataFrame เดียวก่อนเขียน
+
+    Args:
+        frames (Iterable[pd.DataFrame]): DataFrame ที่มีคอลัมน์เหมือนกันทุกก้อน
+        output: path หรือ file-like object ปลายทาง
+        sheet_name (str): ชื่อชีต
+
+    Returns:
+        int: จำนวนแถวข้อมูลที่เขียน
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    header_written = False
+    row_count = 0
+
+    for frame in frames:
+        if not header_written:
+            worksheet.append(list(frame.columns))
+            header_written = True
+        frame = frame.astype(object).where(frame.notna(), None)
+        for row in frame.itertuples(index=False, name=None):
+            worksheet.append(list(row))
+        row_count += len(frame)
+
+    if not header_written:
+        worksheet.append([])
+
+    workbook.save(output)
+    logger.info(f"💾 เขียน Excel {row_count} แถว")
+    return row_count
@@ -0,0 +1,151 @@
+"""
+ทดสอบโหมดไม่ใช้ browser ของ DBD (HTTP API และ Requests) กับแคช ด้วยไฟล์ที่บันทึกไว้ใน tests/fixtures (ไม่เรียกเว็บจริง)
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot_data import DBDDataWarehouseBot  # noqa: E402
+from dbd_cache import DBDCompanyCache  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+class FakeResponse:
+    """response ของ requests แบบย่อ (เฉพาะที่ bot ใช้)"""
+
+    def __init__(self, content: bytes, status_code: int = 200):
+        self.content = content
+        self.text = content.decode("utf-8")
+        self.status_code = status_code
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"Status: {self.status_code}")
+
+
+class FakeSession:
+    """session ที่ตอบ POST ค้นหาและ GET หน้าข้อมูลบริษัทจาก fixture"""
+
+    def __init__(self, search: bytes, profile: bytes = b""):
+        self.search = search
+        self.profile = profile
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append(("GET", url))
+        return FakeResponse(self.profile if "/company/profile/" in url else b"<html></html>")
+
+    def post(self, url, **kwargs):
+        self.requests.append(("POST", url))
+        return FakeResponse(self.search)
+
+
+@pytest.fixture
+def bot():
+    return DBDDataWarehouseBot(use_browser=False, use_http_api=True)
+
+
+def test_parse_search_results_json(bot):
+    results = bot._parse_http_search_results(FakeResponse(_fixture("dbd_search_results.json")))
+
+    assert results == [
+        ("บริษัท ทดสอบการค้า จำกัด (สำนักงานใหญ่)", "0105561234567"),
+        ("บริษัท ทดสอบการค้า อินเตอร์ จำกัด", "0105562345678"),
+    ]
+
+
+def test_parse_search_results_empty_json_is_not_found(bot):
+    assert bot._parse_http_search_results(FakeResponse(_fixture("dbd_search_empty.json"))) == []
+
+
+def test_parse_search_results_html(bot):
+    results = bot._parse_http_search_results(FakeResponse(_fixture("dbd_search_results.html")))
+
+    assert results == [
+        ("บริษัท ทดสอบการค้า จำกัด", "0105561234567"),
+        ("ห้างหุ้นส่วนจำกัด ทดสอบการค้า", "0103562345678"),
+    ]
+
+
+def test_parse_search_results_unrecognised(bot):
+    assert bot._parse_http_search_results(FakeResponse(_fixture("dbd_unrecognised.html"))) is None
+    assert bot._parse_http_search_results(FakeResponse(b'{"status": "error"}')) is None
+
+
+def test_parse_profile_html(bot):
+    info = bot.parse_profile_html(_fixture("dbd_profile.html").decode("utf-8"), "ทดสอบการค้า")
+
+    assert info["company_name"] == "บริษัท ทดสอบการค้า จำกัด"
+    assert info["registration_number"] == "0105561234567"
+    assert info["business_type"] == "บริษัทจำกัด"
+    assert info["status"] == "ยังดำเนินกิจการอยู่"
+    assert info["registered_capital"] == "1,000,000.00 บาท"
+    assert info["found_date"] == "15/03/2561"
+    assert "ตำบลบางพูด" in info["address"]
+    assert info["directors_list"] == ["นายสมชาย ใจดี", "นางสาวสมหญิง ตั้งใจ"]
+    assert info["authorized_signatories"].startswith("กรรมการลงชื่อผูกพัน")
+
+
+def test_search_follows_result_to_profile(bot, tmp_path):
+    bot.cache = DBDCompanyCache(str(tmp_path / "dbd_cache.sqlite"))
+    bot.session = FakeSession(_fixture("dbd_search_results.json"), _fixture("dbd_profile.html"))
+
+    info = bot.search_company_info("บริษัท ทดสอบการค้า จำกัด")
+
+    assert info["registration_number"] == "0105561234567"
+    assert ("GET", bot.base_url + "/company/profile/5/0105561234567") in bot.session.requests
+    assert bot.cache.get(bot.clean_company_name("บริษัท ทดสอบการค้า จำกัด")) is not None
+
+
+@pytest.mark.parametrize("search, profile", [
+    # หน้าผลค้นหาที่อ่านไม่ออก
+    ("dbd_unrecognised.html", "dbd_profile.html"),
+    # ผลค้นหาปกติ แต่หน้าข้อมูลบริษัทไม่มีแท็บข้อมูลบริษัท
+    ("dbd_search_results.json", "dbd_unrecognised.html"),
+])
+def test_unrecognised_page_is_error_and_not_cached(bot, tmp_path, search, profile):
+    bot.cache = DBDCompanyCache(str(tmp_path / "dbd_cache.sqlite"))
+    bot.session = FakeSession(_fixture(search), _fixture(profile))
+
+    info = bot.search_company_info("บริษัท ทดสอบการค้า จำกัด")
+
+    assert "error" in info
+    assert bot.cache.get(bot.clean_company_name("บริษัท ทดสอบการค้า จำกัด")) is None
+
+
+def test_requests_mode_unrelated_page_is_not_cached(tmp_path):
+    # Requests Mode เดา form ของเว็บ - หน้าที่ได้กลับมาอาจไม่ใช่ผลค้นหาจริง จึงไม่เก็บเป็น "ไม่พบข้อมูล"
+    bot = DBDDataWarehouseBot(use_browser=False, cache=DBDCompanyCache(str(tmp_path / "dbd_cache.sqlite")))
+    form_page = b'<html><body><form action="/search"><input name="q"></form></body></html>'
+    bot.session = FakeSession(form_page, form_page)
+    bot.session.get = lambda url, **kwargs: FakeResponse(form_page)
+
+    info = bot.search_company_info("บริษัท ทดสอบการค้า จำกัด")
+
+    assert "error" not in info and not info.get("registration_number")
+    assert bot.cache.get(bot.clean_company_name("บริษัท ทดสอบการค้า จำกัด")) is None
+
+
+def test_registration_number_lookup_uses_cached_name_result(bot, tmp_path):
+    bot.cache = DBDCompanyCache(str(tmp_path / "dbd_cache.sqlite"))
+    bot.session = FakeSession(_fixture("dbd_search_results.json"), _fixture("dbd_profile.html"))
+    bot.search_company_info("บริษัท ทดสอบการค้า จำกัด")
+    bot.session = FakeSession(b"", b"")
+
+    info = bot.search_company_info("0105561234567")
+
+    assert info["company_name"] == "บริษัท ทดสอบการค้า จำกัด"
+    assert bot.session.requests == []
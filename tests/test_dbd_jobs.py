@@ -0,0 +1,150 @@
+"""
+ทดสอบงานค้นหา DBD แบบบันทึก journal และทำต่อได้ (dbd_jobs.py) ด้วย engine จำลอง (ไม่เรียกเว็บจริง)
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dbd_jobs  # noqa: E402
+from dbd_jobs import (  # noqa: E402
+    DBDEnrichmentJob, LookupJournal, list_enrichment_jobs, lookup_mode, make_job_id, start_enrichment_job
+)
+
+
+class FakeEngine:
+    """engine ที่คืนผลจาก dict ตามชื่อ (ชื่อที่ไม่มีใน dict ได้ผลเป็น error) และหยุดรอได้ด้วย gate"""
+
+    def __init__(self, results, gate=None):
+        self.results = results
+        self.gate = gate
+        self.looked_up = []
+        self.closed = False
+
+    def iter_lookups(self, company_names, log_callback=None, force_refresh=False):
+        for index, name in enumerate(company_names):
+            if self.gate is not None:
+                self.gate.wait(5)
+            self.looked_up.append(name)
+            yield index, self.results.get(name, {"error": "หมดเวลาเชื่อมต่อ"})
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def clear_jobs():
+    yield
+    with dbd_jobs._jobs_lock:
+        jobs = list(dbd_jobs._jobs.values())
+        dbd_jobs._jobs.clear()
+    for job in jobs:
+        job.cancel()
+        job.wait(5)
+
+
+FOUND = {"registration_number": "0105561234567", "company_name": "บริษัท ทดสอบการค้า จำกัด"}
+NOT_FOUND = {"registration_number": "", "company_name": "สมชาย"}
+
+
+class CrashingEngine(FakeEngine):
+    """engine ที่ล้มหลังได้ผล crash_after รายการ (จำลอง session ตายกลางทาง)"""
+
+    def __init__(self, results, crash_after):
+        super().__init__(results)
+        self.crash_after = crash_after
+
+    def iter_lookups(self, company_names, log_callback=None, force_refresh=False):
+        for count, item in enumerate(super().iter_lookups(company_names, log_callback, force_refresh)):
+            if count == self.crash_after:
+                raise RuntimeError("browser ปิดไปแล้ว")
+            yield item
+
+
+def test_journal_written_per_result(tmp_path):
+    names = ["ทดสอบการค้า", "สมชาย", "ผิดพลาด"]
+    engine = CrashingEngine({"ทดสอบการค้า": FOUND, "สมชาย": NOT_FOUND}, crash_after=2)
+    job = DBDEnrichmentJob(names, lambda: engine, journal_dir=str(tmp_path))
+
+    job.run()
+
+    assert job.error == "browser ปิดไปแล้ว"
+    assert engine.closed
+    assert LookupJournal(job.journal.path).load() == {"ทดสอบการค้า": FOUND, "สมชาย": NOT_FOUND}
+    assert job.results() == [FOUND, NOT_FOUND, None]
+
+
+def test_resume_skips_completed_and_retries_errors(tmp_path):
+    names = ["ทดสอบการค้า", "สมชาย", "ผิดพลาด", "ยังไม่ค้นหา"]
+    first = CrashingEngine({"ทดสอบการค้า": FOUND, "สมชาย": NOT_FOUND}, crash_after=3)
+    DBDEnrichmentJob(names, lambda: first, journal_dir=str(tmp_path)).run()
+    assert first.looked_up == ["ทดสอบการค้า", "สมชาย", "ผิดพลาด", "ยังไม่ค้นหา"]
+
+    second = FakeEngine({"ผิดพลาด": FOUND, "ยังไม่ค้นหา": NOT_FOUND})
+    job = DBDEnrichmentJob(names, lambda: second, journal_dir=str(tmp_path))
+    assert job.resumed_count == 2
+    job.run()
+
+    assert second.looked_up == ["ผิดพลาด", "ยังไม่ค้นหา"]
+    assert job.error is None
+    assert job.results() == [FOUND, NOT_FOUND, FOUND, NOT_FOUND]
+    assert [position for position, _ in job.completed_since(0)] == [0, 1, 2, 3]
+
+
+def test_force_refresh_ignores_journal(tmp_path):
+    names = ["ทดสอบการค้า"]
+    DBDEnrichmentJob(names, lambda: FakeEngine({"ทดสอบการค้า": FOUND}), journal_dir=str(tmp_path)).run()
+
+    engine = FakeEngine({"ทดสอบการค้า": FOUND})
+    job = DBDEnrichmentJob(names, lambda: engine, force_refresh=True, journal_dir=str(tmp_path))
+    job.run()
+
+    assert job.resumed_count == 0
+    assert engine.looked_up == names
+
+
+def test_job_id_depends_on_mode():
+    names = ["ทดสอบการค้า", "สมชาย"]
+
+    assert make_job_id(names, lookup_mode(use_browser=True)) != make_job_id(names, lookup_mode())
+    assert make_job_id(names, lookup_mode(use_http_api=True)) != make_job_id(names, lookup_mode())
+    assert make_job_id(names, lookup_mode()) == make_job_id(list(names), "requests")
+
+
+def test_other_mode_does_not_reattach(tmp_path):
+    gate = threading.Event()
+    names = ["ทดสอบการค้า"]
+    browser_job = start_enrichment_job(names, lambda: FakeEngine({}, gate), journal_dir=str(tmp_path),
+                                       mode=lookup_mode(use_browser=True))
+    http_job = start_enrichment_job(names, lambda: FakeEngine({}, gate), journal_dir=str(tmp_path),
+                                    mode=lookup_mode(use_http_api=True))
+
+    assert http_job is not browser_job
+    assert http_job.journal.path != browser_job.journal.path
+    gate.set()
+
+
+def test_force_refresh_waits_outside_jobs_lock(tmp_path):
+    gate = threading.Event()
+    names = ["ทดสอบการค้า", "สมชาย"]
+    old_job = start_enrichment_job(names, lambda: FakeEngine({}, gate), journal_dir=str(tmp_path))
+    while not old_job.running:
+        time.sleep(0.01)
+
+    # job เดิมไม่ตอบการยกเลิกจนกว่า gate จะเปิด - force refresh ต้องรอ แต่ session อื่นต้องไม่ต้องรอ
+    restart = threading.Thread(target=start_enrichment_job, args=(names, lambda: FakeEngine({})),
+                               kwargs={"force_refresh": True, "journal_dir": str(tmp_path)})
+    restart.start()
+    time.sleep(0.1)
+    started = time.monotonic()
+    list_enrichment_jobs()
+    assert time.monotonic() - started < 0.5
+    assert restart.is_alive()
+
+    gate.set()
+    restart.join(5)
+    assert dbd_jobs.get_enrichment_job(old_job.job_id) is not old_job
@@ -0,0 +1,70 @@
+"""
+ทดสอบการเขียน/อ่าน DBDCompanyRecord ลง DataFrame (dbd_record.py, bot_data.assign_company_records)
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot_data import assign_company_records  # noqa: E402
+from dbd_record import (  # noqa: E402
+    ADDRESS_COLUMNS, DBD_INFO_COLUMN, RECORD_COLUMNS, DBDCompanyRecord, create_dbd_summary_table
+)
+
+
+def _found_record() -> DBDCompanyRecord:
+    return DBDCompanyRecord(
+        registration_number="0105561234567",
+        company_name="บริษัท ทดสอบ จำกัด",
+        business_type="บริษัทจำกัด",
+        status="ยังดำเนินกิจการอยู่",
+        registered_capital="1,000,000.00 บาท",
+        address="99 ถนนสุขุมวิท แขวงคลองเตย เขตคลองเตย กรุงเทพมหานคร 10110",
+        address_components={"house_no": "99", "province": "กรุงเทพมหานคร", "postal_code": "10110"},
+    )
+
+
+def _assign(df: pd.DataFrame, record: DBDCompanyRecord) -> None:
+    codes = np.zeros(len(df), dtype=int)
+    assign_company_records(df, df.index, codes, [record])
+
+
+def test_error_after_success_clears_company_columns():
+    df = pd.DataFrame({"ชื่อบริษัท/บุคคล": ["บริษัท ทดสอบ จำกัด", "บริษัท ทดสอบ จำกัด"]})
+
+    _assign(df, _found_record())
+    assert DBDCompanyRecord.from_row(df.iloc[0]).found
+    assert len(create_dbd_summary_table(df)) == 2
+
+    _assign(df, DBDCompanyRecord(error="หมดเวลาเชื่อมต่อ"))
+    for column in [*RECORD_COLUMNS.values(), *ADDRESS_COLUMNS.values()]:
+        assert (df[column] == "").all(), column
+    assert df[DBD_INFO_COLUMN].str.startswith("ข้อผิดพลาด").all()
+
+    record = DBDCompanyRecord.from_row(df.iloc[0])
+    assert not record.found
+    assert record.error == "หมดเวลาเชื่อมต่อ"
+    assert create_dbd_summary_table(df).empty
+
+
+def test_error_text_wins_over_stale_columns():
+    # ไฟล์ที่บันทึกก่อนการแก้ไข: ข้อมูล DBD เป็นข้อผิดพลาดแต่คอลัมน์แยกยังมีค่าเก่า
+    row = {**_found_record().to_columns(), DBD_INFO_COLUMN: "ข้อผิดพลาด: หมดเวลาเชื่อมต่อ"}
+    df = pd.DataFrame([row, _found_record().to_columns()])
+
+    assert not DBDCompanyRecord.from_row(row).found
+    summary = create_dbd_summary_table(df)
+    assert len(summary) == 1
+    assert summary.loc[0, "เลขทะเบียน"] == "0105561234567"
+
+
+def test_unlooked_rows_keep_previous_values():
+    df = pd.DataFrame({"ชื่อบริษัท/บุคคล": ["บริษัท ทดสอบ จำกัด"]})
+    _assign(df, _found_record())
+
+    assign_company_records(df, df.index, np.zeros(1, dtype=int), [None])
+
+    assert DBDCompanyRecord.from_row(df.iloc[0]).registration_number == "0105561234567"
@@ -0,0 +1,338 @@
+"""
+แยกที่อยู่ภาษาไทยเป็นส่วนๆ (บ้านเลขที่, หมู่บ้าน, หมู่, ตำบล, อำเภอ, จังหวัด, รหัสไปรษณีย์) (ไม่พึ่ง Streamlit)
+
+pattern ทั้งหมดคอมไพล์ครั้งเดียวตอน import และผลการแยกถูกแคชต่อข้อความที่อยู่ที่ไม่ซ้ำกัน
+parse_thai_addresses แยกทั้ง Series โดยแยกที่อยู่ที่ซ้ำกันเพียงครั้งเดียว
+ThaiAddressGazetteer (ไม่บังคับ) เป็นดัชนีจังหวัด/อำเภอ/ตำบล/รหัสไปรษณีย์ในหน่วยความจำ
+ใช้ตรวจสอบและเติมส่วนที่ขาด เช่น จังหวัดจากรหัสไปรษณีย์ หรือรหัสไปรษณีย์จากตำบล+อำเภอ+จังหวัด
+"""
+import csv
+import json
+import logging
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import pandas as pd
+
+from dbd_record import ADDRESS_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+ADDRESS_KEYS = tuple(ADDRESS_COLUMNS)
+_EMPTY_COMPONENTS = ("",) * len(ADDRESS_KEYS)
+BANGKOK = "กรุงเทพมหานคร"
+GAZETTEER_PATH_ENV = "THAI_ADDRESS_GAZETTEER_PATH"
+PARSE_CACHE_SIZE = 50_000
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_POSTAL_RE = re.compile(r"(\d{5})(?!.*\d)")
+_PROVINCE_RES = (
+    re.compile(r"(?:จังหวัด|จ\.)\s*([ก-๙]+)"),
+    re.compile(r"(กรุงเทพมหานคร)"),
+)
+_DISTRICT_RE = re.compile(r"(?:อำเภอ|อ\.|เขต)\s*([ก-๙]+(?:\s[ก-๙]+)*)")
+_SUBDISTRICT_RE = re.compile(r"(?:ตำบล|ต\.|แขวง)\s*([ก-๙]+(?:\s[ก-๙]+)*)")
+_MOO_RE = re.compile(r"(?:หมู่ที่|หมู่)\s*([\d]+)")
+_VILLAGE_RE = re.compile(
+    r"(?:หมู่บ้าน|บ้าน)\s*([ก-๙0-9\s]+?)"
+    r"(?=(?:หมู่ที่|หมู่|ตำบล|ต\.|แขวง|อำเภอ|อ\.|เขต|จังหวัด|จ\.|กรุงเทพ|$))"
+)
+_HOUSE_RE = re.compile(r"^(?:บ้านเลขที่|เลขที่)?\s*([^\s,]+)")
+_HOUSE_FALLBACK_RE = re.compile(r"([0-9]+[\/0-9-]*)")
+
+# คำนำหน้าชื่อเขตการปกครองที่ตัดออกก่อนเทียบกับดัชนี
+_NAME_PREFIX_RE = re.compile(r"^(?:จังหวัด|จ\.|อำเภอ|อ\.|เขต|ตำบล|ต\.|แขวง)\s*")
+_BANGKOK_ALIASES = ("กรุงเทพ", "กรุงเทพฯ", "กทม", "กทม.")
+
+# หัวคอลัมน์ของไฟล์ดัชนีที่รองรับ (ไทย/อังกฤษ)
+_GAZETTEER_HEADERS = {
+    "province": ("province", "province_th", "changwat", "จังหวัด"),
+    "district": ("district", "district_th", "amphoe", "อำเภอ", "เขต/อำเภอ", "อำเภอ/เขต"),
+    "subdistrict": ("subdistrict", "subdistrict_th", "tambon", "ตำบล", "แขวง/ตำบล", "ตำบล/แขวง"),
+    "postal_code": ("postal_code", "zipcode", "zip", "รหัสไปรษณีย์"),
+}
+
+_gazetteer: Optional["ThaiAddressGazetteer"] = None
+_gazetteer_loaded = False
+_gazetteer_lock = threading.Lock()
+
+
+def _remove_match(text: str, match: re.Match) -> str:
+    return (text[:match.start()] + text[match.end():]).strip(' ,')
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_address_text(address: str) -> Tuple[str, ...]:
+    """แยกข้อความที่อยู่ 1 รายการ คืน tuple ตามลำดับ ADDRESS_KEYS (แคชต่อข้อความ)"""
+    components = dict.fromkeys(ADDRESS_KEYS, "")
+    text = _WHITESPACE_RE.sub(" ", address).strip().strip(',')
+    if not text:
+        return _EMPTY_COMPONENTS
+
+    # ตัดส่วนที่แยกได้ออกจากข้อความทีละขั้น เพื่อไม่ให้ขั้นถัดไปจับซ้ำ
+    postal_match = _POSTAL_RE.search(text)
+    if postal_match:
+        components["postal_code"] = postal_match.group(1)
+        text = _remove_match(text, postal_match)
+
+    for pattern in _PROVINCE_RES:
+        province_match = pattern.search(text)
+        if province_match:
+            components["province"] = province_match.group(province_match.lastindex or 0).strip()
+            text = _remove_match(text, province_match)
+            break
+
+    district_match = _DISTRICT_RE.search(text)
+    if district_match:
+        components["district"] = district_match.group(1).strip()
+        text = _remove_match(text, district_match)
+
+    subdistrict_match = _SUBDISTRICT_RE.search(text)
+    if subdistrict_match:
+        components["subdistrict"] = subdistrict_match.group(1).strip()
+        text = _remove_match(text, subdistrict_match)
+
+    moo_match = _MOO_RE.search(text)
+    if moo_match:
+        components["moo"] = moo_match.group(1).strip()
+        text = _remove_match(text, moo_match)
+
+    village_match = _VILLAGE_RE.search(text)
+    if village_match:
+        components["village"] = village_match.group(1).strip()
+        text = _remove_match(text, village_match)
+
+    house_match = _HOUSE_RE.search(text)
+    if house_match:
+        components["house_no"] = house_match.group(1).strip()
+        text = _remove_match(text, house_match)
+
+    if not components["house_no"]:
+        fallback_match = _HOUSE_FALLBACK_RE.search(text)
+        if fallback_match and fallback_match.start() == 0:
+            components["house_no"] = fallback_match.group(1).strip()
+
+    if not components["province"] and BANGKOK in address:
+        components["province"] = BANGKOK
+
+    return tuple(components.values())
+
+
+def parse_thai_address(address: Any,
+                       gazetteer: Optional["ThaiAddressGazetteer"] = None) -> Dict[str, str]:
+    """
+    แยกองค์ประกอบที่อยู่ภาษาไทยออกเป็นส่วนๆ
+
+    Args:
+        address: ข้อความที่อยู่
+        gazetteer (Optional[ThaiAddressGazetteer]): ดัชนีสำหรับเติมส่วนที่ขาด (ไม่ระบุ = ไม่เติม)
+
+    Returns:
+        Dict[str, str]: {house_no, village, moo, subdistrict, district, province, postal_code}
+    """
+    if not address:
+        return dict.fromkeys(ADDRESS_KEYS, "")
+    components = dict(zip(ADDRESS_KEYS, _parse_address_text(str(address))))
+    if gazetteer is not None:
+        components = gazetteer.fill(components)
+    return components
+
+
+def parse_thai_addresses(addresses: pd.Series,
+                         gazetteer: Optional["ThaiAddressGazetteer"] = None) -> pd.DataFrame:
+    """
+    แยกที่อยู่ทั้ง Series (ที่อยู่ที่ซ้ำกันแยกเพียงครั้งเดียว)
+
+    Args:
+        addresses (pd.Series): ข้อความที่อยู่ (NaN/None ถือเป็นค่าว่าง)
+        gazetteer (Optional[ThaiAddressGazetteer]): ดัชนีสำหรับเติมส่วนที่ขาด
+
+    Returns:
+        pd.DataFrame: คอลัมน์ตาม ADDRESS_KEYS และ index เดียวกับ addresses
+    """
+    text = addresses.astype(object).where(addresses.notna(), "")
+    codes, uniques = pd.factorize(text.map(str))
+    if gazetteer is None:
+        rows = [_parse_address_text(value) if value else _EMPTY_COMPONENTS for value in uniques]
+    else:
+        rows = [tuple(parse_thai_address(value, gazetteer).values()) for value in uniques]
+    parsed = pd.DataFrame(rows, columns=list(ADDRESS_KEYS), dtype=object)
+    result = parsed.take(codes)
+    result.index = addresses.index
+    return result
+
+
+def fill_address_columns(df: pd.DataFrame, address_column: str = "ที่อยู่",
+                         gazetteer: Optional["ThaiAddressGazetteer"] = None) -> pd.DataFrame:
+    """
+    เติมคอลัมน์ ที่อยู่_* ที่ว่าง (หรือยังไม่มี) จากคอลัมน์ที่อยู่ทั้งตารางในครั้งเดียว
+
+    ใช้กับไฟล์ Excel เก่าที่มีเฉพาะที่อยู่เต็ม ค่าที่มีอยู่แล้วไม่ถูกเขียนทับ
+
+    Returns:
+        pd.DataFrame: df เดิม (แก้ไขในตัว)
+    """
+    if address_column not in df.columns or df.empty:
+        return df
+    parsed = parse_thai_addresses(df[address_column], gazetteer)
+    for key, column in ADDRESS_COLUMNS.items():
+        if column not in df.columns:
+            df[column] = parsed[key]
+            continue
+        current = df[column].astype(object)
+        text = current.where(current.notna(), "").map(str).str.strip()
+        empty = text.eq("") | text.str.lower().isin(("nan", "none"))
+        if empty.any():
+            df[column] = current.where(~empty, parsed[key])
+    return df
+
+
+def _normalize_name(value: Any) -> str:
+    """ตัดคำนำหน้า (จังหวัด/อำเภอ/เขต/ตำบล/แขวง) และช่องว่าง เพื่อใช้เป็น key ของดัชนี"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    text = _NAME_PREFIX_RE.sub("", _WHITESPACE_RE.sub("", str(value)))
+    return BANGKOK if text in _BANGKOK_ALIASES else text
+
+
+def _normalize_postal(value: Any) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    digits = re.sub(r"\D", "", str(value).split(".")[0])
+    return digits if len(digits) == 5 else ""
+
+
+class ThaiAddressGazetteer:
+    """
+    ดัชนีตำบล/อำเภอ/จังหวัด/รหัสไปรษณีย์ในหน่วยความจำ
+
+    แต่ละรายการคือ (จังหวัด, อำเภอ, ตำบล, รหัสไปรษณีย์) ค้นได้จากรหัสไปรษณีย์หรือชื่อตำบล
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, str, str]]):
+        """
+        Args:
+            entries: (province, district, subdistrict, postal_code) ต่อ 1 ตำบล
+        """
+        self._entries: List[Tuple[str, str, str, str]] = []
+        self._by_postal: Dict[str, List[int]] = {}
+        self._by_subdistrict: Dict[str, List[int]] = {}
+        self._by_district: Dict[str, List[int]] = {}
+        for province, district, subdistrict, postal_code in entries:
+            entry = (_normalize_name(province), _normalize_name(district),
+                     _normalize_name(subdistrict), _normalize_postal(postal_code))
+            if not entry[0]:
+                continue
+            index = len(self._entries)
+            self._entries.append(entry)
+            if entry[3]:
+                self._by_postal.setdefault(entry[3], []).append(index)
+            if entry[2]:
+                self._by_subdistrict.setdefault(entry[2], []).append(index)
+            if entry[1]:
+                self._by_district.setdefault(entry[1], []).append(index)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> "ThaiAddressGazetteer":
+        """สร้างจาก dict ต่อแถว (หัวคอลัมน์ไทยหรืออังกฤษตาม _GAZETTEER_HEADERS)"""
+        def pick(record: Mapping[str, Any], field: str) -> Any:
+            for header in _GAZETTEER_HEADERS[field]:
+                if header in record:
+                    return record[header]
+            return ""
+
+        return cls(
+            (pick(record, "province"), pick(record, "district"),
+             pick(record, "subdistrict"), pick(record, "postal_code"))
+            for record in records
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "ThaiAddressGazetteer":
+        """โหลดจากไฟล์ .csv หรือ .json (list ของ object)"""
+        if path.lower().endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                return cls.from_records(json.load(f))
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            return cls.from_records(csv.DictReader(f))
+
+    def _candidates(self, components: Mapping[str, str]) -> List[Tuple[str, str, str, str]]:
+        """รายการในดัชนีที่ไม่ขัดกับส่วนที่แยกได้ (เริ่มจาก key ที่เจาะจงที่สุดที่มี)"""
+        province = _normalize_name(components.get("province"))
+        district = _normalize_name(components.get("district"))
+        subdistrict = _normalize_name(components.get("subdistrict"))
+        postal_code = _normalize_postal(components.get("postal_code"))
+
+        if subdistrict:
+            indexes = self._by_subdistrict.get(subdistrict, [])
+        elif postal_code:
+            indexes = self._by_postal.get(postal_code, [])
+        elif district:
+            indexes = self._by_district.get(district, [])
+        else:
+            return []
+
+        return [
+            entry for entry in (self._entries[index] for index in indexes)
+            if (not province or entry[0] == province)
+            and (not district or entry[1] == district)
+            and (not subdistrict or entry[2] == subdistrict)
+            and (not postal_code or entry[3] == postal_code)
+        ]
+
+    def is_valid(self, components: Mapping[str, str]) -> bool:
+        """ตำบล/อำเภอ/จังหวัด/รหัสไปรษณีย์ที่แยกได้ตรงกับอย่างน้อย 1 รายการในดัชนี"""
+        return bool(self._candidates(components))
+
+    def fill(self, components: Mapping[str, str]) -> Dict[str, str]:
+        """
+        เติมจังหวัด/อำเภอ/ตำบล/รหัสไปรษณีย์ที่ว่าง เมื่อทุกรายการที่ตรงกันให้ค่าเดียวกัน
+
+        ค่าที่แยกได้อยู่แล้วไม่ถูกเปลี่ยน (คืน dict ใหม่)
+        """
+        filled = dict(components)
+        candidates = self._candidates(components)
+        if not candidates:
+            return filled
+        for position, key in enumerate(("province", "district", "subdistrict", "postal_code")):
+            if filled.get(key):
+                continue
+            values = {entry[position] for entry in candidates}
+            if len(values) == 1:
+                filled[key] = values.pop()
+        return filled
+
+
+def get_address_gazetteer() -> Optional[ThaiAddressGazetteer]:
+    """
+    คืนดัชนีที่อยู่ที่ใช้ร่วมกันทั้งโปรเซส (โหลดครั้งแรกที่เรียก)
+
+    path ของไฟล์อ่านจาก environment variable THAI_ADDRESS_GAZETTEER_PATH หรือ
+    THAI_ADDRESS_GAZETTEER_PATH ใน config.py คืน None เมื่อไม่ได้ตั้งค่าหรือโหลดไม่สำเร็จ
+    """
+    global _gazetteer, _gazetteer_loaded
+    with _gazetteer_lock:
+        if _gazetteer_loaded:
+            return _gazetteer
+        _gazetteer_loaded = True
+        path = os.environ.get(GAZETTEER_PATH_ENV)
+        if path is None:
+            try:
+                import config
+                path = getattr(config, "THAI_ADDRESS_GAZETTEER_PATH", None)
+            except ImportError:
+                path = None
+        if not path:
+            return None
+        try:
+            _gazetteer = ThaiAddressGazetteer.from_file(path)
+            logger.info(f"📍 โหลดดัชนีที่อยู่ {len(_gazetteer)} รายการจาก {path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ โหลดดัชนีที่อยู่จาก {path} ไม่สำเร็จ: {e}")
+        return _gazetteer
@@ -0,0 +1,155 @@
+"""
+รวมการแสดง log / metric / ผลรายแถวของงานบอทก่อนวาดลงหน้า Streamlit (ไม่ import Streamlit เอง)
+
+หน้า UI ส่ง placeholder (st.empty(), คอลัมน์ของ metric, st.progress) ให้ UIReporter
+การเรียก log()/set_metric()/add_outcome() แค่อัปเดตข้อมูลในหน่วยความจำ และวาดจริงไม่เกิน refresh_hz ครั้งต่อวินาที
+log เก็บใน ring buffer และผลรายแถวแสดงเป็นตารางเดียว หน้าจึงไม่ช้าลงเรื่อยๆ ตามจำนวนรายการ
+เรียก log() จาก thread อื่น (เช่น event loop ของ browser pool) ได้ - การวาดเกิดเฉพาะใน thread ที่สร้าง reporter
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+DEFAULT_REFRESH_HZ = 4.0
+DEFAULT_MAX_LOGS = 500
+
+LOG_ICONS = {
+    "info": "ℹ️",
+    "success": "✅",
+    "warning": "⚠️",
+    "error": "❌"
+}
+
+OUTCOME_COLUMNS = ["เวลา", "รายการ", "ผล", "จำนวนแถว", "รายละเอียด"]
+
+
+class UIReporter:
+    """
+    บัฟเฟอร์ log และค่าที่แสดงผล แล้ววาดลง placeholder ของ Streamlit เป็นรอบๆ
+
+    ตัวอย่าง:
+        reporter = UIReporter(log_placeholder=log_expander.empty(), metrics={"✅ สำเร็จ": col1.empty()})
+        reporter.log("เริ่มค้นหา")
+        reporter.set_metric("✅ สำเร็จ", 10)
+        reporter.flush()  # วาดค่าล่าสุดเมื่อจบงาน
+    """
+
+    def __init__(self, log_placeholder=None, metrics: Optional[Dict[str, Any]] = None,
+                 outcome_placeholder=None, status_placeholder=None, progress_bar=None,
+                 refresh_hz: float = DEFAULT_REFRESH_HZ, max_logs: int = DEFAULT_MAX_LOGS,
+                 log_lines: int = 50):
+        """
+        Args:
+            log_placeholder: placeholder สำหรับ log (วาดด้วย .code)
+            metrics (Optional[Dict]): {label: placeholder} ของ metric (วาดด้วย .metric)
+            outcome_placeholder: placeholder ของตารางผลรายแถว (วาดด้วย .dataframe)
+            status_placeholder: placeholder ของข้อความสถานะ (วาดด้วย .text)
+            progress_bar: ผลของ st.progress (วาดด้วย .progress)
+            refresh_hz (float): จำนวนครั้งสูงสุดที่วาดต่อวินาที
+            max_logs (int): จำนวน log ที่เก็บไว้ (เก่ากว่านี้ถูกทิ้ง)
+            log_lines (int): จำนวน log ล่าสุดที่แสดง
+        """
+        self.log_placeholder = log_placeholder
+        self.metric_placeholders = dict(metrics or {})
+        self.outcome_placeholder = outcome_placeholder
+        self.status_placeholder = status_placeholder
+        self.progress_bar = progress_bar
+        self.interval = 1.0 / refresh_hz if refresh_hz > 0 else 0.0
+        self.log_lines = log_lines
+        self._owner = threading.current_thread()
+        self._lock = threading.Lock()
+        self._logs = deque(maxlen=max_logs)
+        self._metrics: Dict[str, Any] = {label: "0" for label in self.metric_placeholders}
+        self._outcomes: List[List[Any]] = []
+        self._status: Optional[str] = None
+        self._progress: Optional[float] = None
+        self._dirty = {"metrics"}
+        self._last_render = 0.0
+        self.refresh(force=True)
+
+    def log(self, message: str, status: str = "info") -> None:
+        """เพิ่ม log 1 บรรทัด (ใช้เป็น log_callback ของบอทได้โดยตรง)"""
+        with self._lock:
+            self._logs.append({"message": message, "status": status, "time": datetime.now().strftime("%H:%M:%S")})
+            self._dirty.add("logs")
+        self.refresh()
+
+    def replace_logs(self, entries: Iterable[Dict[str, str]]) -> None:
+        """แทนที่ log ทั้งหมด (ใช้กับ log ที่เก็บไว้ที่อื่น เช่น DBDEnrichmentJob.recent_logs)"""
+        entries = list(entries)
+        with self._lock:
+            if entries == list(self._logs):
+                return
+            self._logs.clear()
+            self._logs.extend(entries)
+            self._dirty.add("logs")
+        self.refresh()
+
+    def set_metric(self, label: str, value: Any) -> None:
+        with self._lock:
+            if self._metrics.get(label) != value:
+                self._metrics[label] = value
+                self._dirty.add("metrics")
+        self.refresh()
+
+    def set_progress(self, fraction: float, status: Optional[str] = None) -> None:
+        """อัปเดตแถบความคืบหน้า (0-1) และข้อความสถานะ"""
+        with self._lock:
+            self._progress = min(max(fraction, 0.0), 1.0)
+            self._dirty.add("progress")
+            if status is not None:
+                self._status = status
+                self._dirty.add("status")
+        self.refresh()
+
+    def add_outcome(self, item: str, result: str, rows: int = 1, detail: str = "") -> None:
+        """บันทึกผลของ 1 รายการลงตารางสรุป (แทนการสร้าง st.success/st.warning ทีละรายการ)"""
+        with self._lock:
+            self._outcomes.append([datetime.now().strftime("%H:%M:%S"), item, result, rows, detail])
+            self._dirty.add("outcomes")
+        self.refresh()
+
+    def logs(self) -> List[Dict[str, str]]:
+        with self._lock:
+            return list(self._logs)
+
+    def outcomes(self) -> pd.DataFrame:
+        """ตารางผลรายแถวทั้งหมด"""
+        with self._lock:
+            return pd.DataFrame(self._outcomes, columns=OUTCOME_COLUMNS)
+
+    def refresh(self, force: bool = False) -> None:
+        """วาดส่วนที่เปลี่ยน ถ้าครบรอบ refresh แล้ว (หรือ force) และถูกเรียกจาก thread ที่สร้าง reporter"""
+        if threading.current_thread() is not self._owner:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_render < self.interval:
+            return
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            logs = list(self._logs)[-self.log_lines:] if "logs" in dirty else None
+            metrics = dict(self._metrics) if "metrics" in dirty else None
+            outcomes = pd.DataFrame(self._outcomes, columns=OUTCOME_COLUMNS) if "outcomes" in dirty else None
+            status, progress = self._status, self._progress
+        self._last_render = now
+
+        if logs is not None and self.log_placeholder is not None:
+            lines = [f"[{entry['time']}] {LOG_ICONS.get(entry['status'], '📝')} {entry['message']}" for entry in logs]
+            self.log_placeholder.code("\n".join(lines), language=None)
+        if metrics is not None:
+            for label, placeholder in self.metric_placeholders.items():
+                placeholder.metric(label, str(metrics.get(label, "")))
+        if outcomes is not None and self.outcome_placeholder is not None:
+            self.outcome_placeholder.dataframe(outcomes, use_container_width=True, hide_index=True)
+        if "status" in dirty and self.status_placeholder is not None:
+            self.status_placeholder.text(status or "")
+        if "progress" in dirty and self.progress_bar is not None and progress is not None:
+            self.progress_bar.progress(progress)
+
+    def flush(self) -> None:
+        """วาดค่าล่าสุดทั้งหมดทันที (เรียกเมื่อจบงาน)"""
+        self.refresh(force=True)